@@ -0,0 +1,144 @@
+import os
+
+# 소켓 버퍼 상한 (커널 int 범위 내 2의 거듭제곱)
+MAX_SOCKET_BUFFER = 1 << 30
+# 권장값이 이보다 작아지지 않도록 하는 하한 (Linux 기본 tcp_rmem max 6MB / tcp_wmem max 4MB)
+MIN_RMEM_MAX = 6291456
+MIN_WMEM_MAX = 4194304
+TCP_RMEM_DEFAULT = 131072
+# tcp_adv_win_scale=1 기준 수신 버퍼의 절반만 윈도우로 광고되므로 BDP 의 2배를 확보
+BUFFER_OVERHEAD = 2
+# 최대 버퍼 산정에 사용하는 RTT 분위수 (경로 지연 변동을 흡수)
+RTT_PERCENTILE = 95
+# 링크 속도를 알 수 없을 때 가정하는 속도(Mbps)
+DEFAULT_LINK_MBPS = 10000
+
+# 프로파일별 정책
+#   socket_mem_fraction: 소켓 하나의 최대 버퍼가 차지할 수 있는 RAM 비율
+#   tcp_mem_fraction: TCP 전체(tcp_mem high)가 사용할 수 있는 RAM 비율
+PROFILES = {
+    "general": {
+        "socket_mem_fraction": 0.05,
+        "tcp_mem_fraction": 0.25,
+        "wmem_default": 16384,
+        "notsent_lowat": 131072,
+        "extra": {"net.ipv4.tcp_mtu_probing": 1, "net.core.default_qdisc": "fq"},
+    },
+    "testhost": {
+        "socket_mem_fraction": 0.25,
+        "tcp_mem_fraction": 0.5,
+        "wmem_default": 65536,
+        # 측정 도구가 송신 큐를 최대한 채우도록 제한하지 않음 (커널 기본값)
+        "notsent_lowat": 4294967295,
+        "extra": {"net.ipv4.tcp_no_metrics_save": 1, "net.ipv4.tcp_mtu_probing": 1,
+                  "net.core.default_qdisc": "fq"},
+    },
+}
+
+def page_size():
+    try:
+        return os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+def total_memory_bytes():
+    """물리 메모리 총량 (sysconf, psutil 불필요)"""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * page_size()
+    except (ValueError, OSError, AttributeError):
+        import psutil
+        return psutil.virtual_memory().total
+
+def percentile(values, pct):
+    """정렬 후 선형 보간 분위수"""
+    data = sorted(values)
+    if not data:
+        return None
+    k = (len(data) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (k - lo)
+
+def _pow2_ceil(n):
+    return 1 << max(0, int(n - 1).bit_length())
+
+def _pow2_floor(n):
+    return 1 << max(0, int(n).bit_length() - 1)
+
+def _fmt_bytes(n):
+    return f"{n / 1048576:.1f} MB" if n >= 1048576 else f"{n / 1024:.0f} KB"
+
+def recommend(link_mbps, rtt_ms, flows=1, total_mem=None, profile="general"):
+    """링크 속도 / RTT(단일 값 또는 측정 분포) / 동시 플로우 수 / 메모리로 버퍼 설정 일괄 산출
+
+    반환값: {"inputs", "bdp_bytes", "settings": {oid: 값}, "reasons": {oid: 근거}, "limited_by_memory"}
+    """
+    policy = PROFILES[profile]
+    link_mbps = link_mbps or DEFAULT_LINK_MBPS
+    samples = list(rtt_ms) if isinstance(rtt_ms, (list, tuple)) else [rtt_ms]
+    rtt_high = percentile(samples, RTT_PERCENTILE) if len(samples) > 1 else samples[0]
+    rtt_median = percentile(samples, 50)
+    flows = max(1, int(flows))
+    total_mem = total_mem or total_memory_bytes()
+    page = page_size()
+
+    bytes_per_sec = link_mbps * 1_000_000 / 8
+    bdp = int(bytes_per_sec * rtt_high / 1000)
+    wanted = _pow2_ceil(bdp * BUFFER_OVERHEAD)
+    socket_cap = min(MAX_SOCKET_BUFFER, _pow2_floor(total_mem * policy["socket_mem_fraction"]))
+    limited = wanted > socket_cap
+    socket_max = min(wanted, socket_cap)
+    rmem_max = max(socket_max, MIN_RMEM_MAX)
+    wmem_max = max(socket_max, MIN_WMEM_MAX)
+
+    rtt_desc = (f"RTT p{RTT_PERCENTILE} {rtt_high:.1f} ms (중앙값 {rtt_median:.1f} ms, {len(samples)}개 표본)"
+                if len(samples) > 1 else f"RTT {rtt_high:.1f} ms")
+    buffer_reason = (f"{link_mbps / 1000:g} Gbps x {rtt_desc} = BDP {_fmt_bytes(bdp)}, "
+                     f"윈도우 오버헤드 {BUFFER_OVERHEAD}배 → {_fmt_bytes(wanted)}")
+    if limited:
+        buffer_reason += (f" (RAM {policy['socket_mem_fraction'] * 100:g}% 상한 {_fmt_bytes(socket_cap)}로 제한, "
+                          f"단일 플로우는 약 {socket_cap / BUFFER_OVERHEAD / bytes_per_sec * 1000:.0f} ms 까지 링크 포화 가능)")
+
+    # 링크를 공유하는 플로우들의 in-flight 총량은 BDP 를 넘지 않으므로 송/수신 각 2*BDP 에
+    # 플로우별 기본 버퍼를 더한 값을 1.5배 여유로 잡는다 (커널 기본 비율 low:pressure:high = 2:3:4 근사)
+    need = 2 * BUFFER_OVERHEAD * bdp + flows * (TCP_RMEM_DEFAULT + policy["wmem_default"])
+    total_pages = total_mem // page
+    high = int(min(max(need * 1.5 // page, total_pages * 0.09), total_pages * policy["tcp_mem_fraction"]))
+    tcp_mem = (high // 2, high * 2 // 3, high)
+
+    optmem = 1048576 if link_mbps >= 25000 else 131072
+    settings = {
+        "net.core.rmem_max": rmem_max,
+        "net.core.wmem_max": wmem_max,
+        "net.ipv4.tcp_rmem": f"4096 {TCP_RMEM_DEFAULT} {rmem_max}",
+        "net.ipv4.tcp_wmem": f"4096 {policy['wmem_default']} {wmem_max}",
+        "net.ipv4.tcp_mem": " ".join(map(str, tcp_mem)),
+        "net.core.optmem_max": optmem,
+        "net.ipv4.tcp_notsent_lowat": policy["notsent_lowat"],
+    }
+    settings.update(policy["extra"])
+
+    reasons = {
+        "net.core.rmem_max": f"setsockopt(SO_RCVBUF) 상한을 TCP 자동 조정 최대값과 일치 ({_fmt_bytes(rmem_max)})",
+        "net.core.wmem_max": f"setsockopt(SO_SNDBUF) 상한을 TCP 자동 조정 최대값과 일치 ({_fmt_bytes(wmem_max)})",
+        "net.ipv4.tcp_rmem": buffer_reason,
+        "net.ipv4.tcp_wmem": f"송신측도 재전송 대기 데이터를 포함해 BDP 의 {BUFFER_OVERHEAD}배 필요 (최대 {_fmt_bytes(wmem_max)})",
+        "net.ipv4.tcp_mem": (f"동시 플로우 {flows}개, 필요 {_fmt_bytes(need)} x 1.5 여유 → high {high} 페이지 "
+                             f"({_fmt_bytes(high * page)}, RAM {policy['tcp_mem_fraction'] * 100:g}% 이내)"),
+        "net.core.optmem_max": ("25G 이상: MSG_ZEROCOPY 완료 알림/대용량 cmsg 를 위해 1 MB"
+                                if optmem > 131072 else "일반 속도: 128 KB"),
+        "net.ipv4.tcp_notsent_lowat": ("미전송 데이터를 128 KB 로 제한해 큰 버퍼에서도 지연/메모리 사용 억제"
+                                       if policy["notsent_lowat"] == 131072 else "측정 호스트: 송신 큐 제한 없음"),
+    }
+    for oid in policy["extra"]:
+        reasons[oid] = "프로파일 공통 설정"
+
+    return {
+        "inputs": {"link_mbps": link_mbps, "rtt_ms": round(rtt_high, 3), "rtt_samples": len(samples),
+                   "flows": flows, "total_mem_bytes": total_mem, "profile": profile},
+        "bdp_bytes": bdp,
+        "socket_max_bytes": socket_max,
+        "settings": settings,
+        "reasons": reasons,
+        "limited_by_memory": limited,
+    }
@@ -0,0 +1,768 @@
+import sys
+import json
+import argparse
+import contextlib
+
+# 서브커맨드 핸들러는 필요한 모듈만 함수 안에서 import 하여
+# `nettune diagnose --json` 같은 비대화형 실행의 시작 시간을 최소화한다.
+
+def _emit_json(data):
+    from utils import strip_colors
+    print(json.dumps(strip_colors(data), ensure_ascii=False, indent=2))
+
+@contextlib.contextmanager
+def _quiet_stdout(enabled):
+    """JSON 출력 모드에서는 진행 메시지를 stderr로 돌려 stdout을 JSON 전용으로 유지"""
+    if enabled:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    else:
+        yield
+
+def cmd_diagnose(args):
+    from utils import get_default_interface
+    from probe_cache import probe_stats
+    import diagnosis
+
+    iface = args.iface or get_default_interface()
+    report = diagnosis.collect_diagnosis(iface, timeout=args.timeout, counter_interval=args.counter_interval)
+    report["probe_cache"] = probe_stats()
+    if args.json:
+        _emit_json(report)
+    else:
+        diagnosis.print_diagnosis_report(report)
+    return 0 if all(r["status"] == diagnosis.STATUS_OK for r in report["probes"].values()) else 1
+
+def _percentile_arg(value):
+    return value if value == "max" else int(value)
+
+def cmd_bdp(args):
+    from test import calculate_bdp, measure_rtt
+    from rtt_probe import pick_rtt
+
+    rtt = args.rtt
+    measured = None
+    if rtt is None:
+        with _quiet_stdout(args.json):
+            measured = measure_rtt(args.target, count=args.count)
+        if measured is None:
+            print(f"RTT 측정 실패: {args.target}", file=sys.stderr)
+            return 1
+        rtt = pick_rtt(measured, args.percentile)
+    result = calculate_bdp(args.bandwidth, rtt)
+    if measured:
+        result["rtt_basis"] = "max" if args.percentile == "max" else f"p{args.percentile}"
+        result["rtt_distribution"] = measured
+    if args.json:
+        _emit_json(result)
+    else:
+        basis = f" ({result['rtt_basis']}, 손실 {measured['loss_pct']}%)" if measured else ""
+        print(f"대역폭 {result['bandwidth_gbps']} Gbps, RTT {result['rtt_ms']} ms{basis} -> "
+              f"BDP {result['bdp_mb']:.2f} MB ({result['bdp_bytes']} bytes)")
+    return 0
+
+def cmd_rtt(args):
+    import rtt_probe
+    from test import print_rtt_result
+
+    results = rtt_probe.probe_targets(args.targets, count=args.count, interval=args.interval,
+                                      timeout=args.timeout, method=args.method, port=args.port)
+    if args.json:
+        _emit_json(results)
+    else:
+        for result in results:
+            print_rtt_result(result)
+    return 0 if all(r["received"] for r in results) else 1
+
+def cmd_pmtu(args):
+    import pmtu_probe
+    from tuning import print_pmtu_result
+
+    result = pmtu_probe.discover(args.target, max_mtu=args.max, method=args.method, timeout=args.timeout)
+    if args.json:
+        _emit_json(result)
+    else:
+        print_pmtu_result(result)
+    return 0 if result["verified"] else 1
+
+def cmd_sample(args):
+    from utils import get_default_interface, get_link_speed_mbps
+    from nic_sampler import run_microburst_sampling
+    import diagnosis
+
+    iface = args.iface or get_default_interface()
+    link_mbps = args.link_mbps or get_link_speed_mbps(iface)
+    try:
+        report = run_microburst_sampling(iface, link_mbps, args.hz, args.duration, args.threshold, args.source)
+    except OSError as e:
+        print(f"카운터 읽기 실패: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        _emit_json(report)
+    else:
+        diagnosis.print_microburst_report(report)
+    return 0
+
+def cmd_counters(args):
+    from kernel_counters import analyze
+    import diagnosis
+
+    report = analyze(args.interval)
+    if args.json:
+        _emit_json(report)
+    else:
+        diagnosis.print_counter_findings(report)
+    return 0
+
+def cmd_irq(args):
+    from utils import get_default_interface
+    import irq_stats
+    import diagnosis
+
+    iface = args.iface or get_default_interface()
+    try:
+        report = irq_stats.analyze(iface, args.interval)
+    except OSError as e:
+        print(f"IRQ 통계 읽기 실패: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        _emit_json(report)
+    else:
+        diagnosis.print_irq_findings(report)
+    return 0
+
+def cmd_qdisc(args):
+    from utils import get_default_interface
+    from tuning_plan import qdisc_stats
+    import tuning
+
+    iface = args.iface or get_default_interface()
+    stats = qdisc_stats(iface)
+    if args.json:
+        _emit_json(stats)
+    else:
+        tuning.print_qdisc_stats(stats)
+    # 드롭이 있으면 1 (페이싱/큐가 병목)
+    return 1 if stats["totals"].get("dropped") else 0
+
+def cmd_numa(args):
+    from utils import get_default_interface
+    from numa_locality import check_locality
+    import diagnosis
+
+    iface = args.iface or get_default_interface()
+    try:
+        report = check_locality(iface)
+    except OSError as e:
+        print(f"NUMA 정보 조회 실패: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        _emit_json(report)
+    else:
+        diagnosis.print_numa_report(report)
+    return 0
+
+def cmd_pin(args):
+    import subprocess
+    from utils import get_default_interface
+    from numa_locality import pin_preexec
+
+    command = args.command_args[1:] if args.command_args[:1] == ["--"] else args.command_args
+    if not command:
+        print("실행할 명령이 필요합니다: nettune pin --iface eth0 -- <명령>", file=sys.stderr)
+        return 2
+    try:
+        return subprocess.call(command, preexec_fn=pin_preexec(args.iface or get_default_interface()))
+    except subprocess.SubprocessError:
+        # preexec_fn 의 예외는 자식에서 발생해 원인이 전달되지 않는다
+        print("NIC 노드에 CPU/메모리를 고정하지 못해 명령을 실행하지 않았습니다 "
+              "(sched_setaffinity 또는 set_mempolicy 실패)", file=sys.stderr)
+        return 126
+    except OSError as e:
+        print(f"명령 실행 실패: {e}", file=sys.stderr)
+        return 127
+
+def cmd_flows(args):
+    from inet_diag import analyze_flows
+    import diagnosis
+
+    try:
+        report = analyze_flows(port=args.port, peer=args.peer, top=args.top)
+    except (OSError, ValueError) as e:
+        print(f"INET_DIAG 조회 실패: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        _emit_json(report)
+    else:
+        diagnosis.print_flow_report(report)
+    return 0
+
+def _resolve_preset(name):
+    import tuning
+    presets = tuning.named_presets()
+    preset = presets.get(name)
+    if preset is None:
+        print(f"알 수 없는 프리셋: {name} (사용 가능: {', '.join(sorted(presets))})", file=sys.stderr)
+    return preset
+
+def cmd_tune_list(args):
+    import tuning
+    presets = tuning.named_presets()
+    if args.json:
+        _emit_json(presets)
+    else:
+        for name, settings in presets.items():
+            print(f"{name:16} ({len(settings)}개 항목)")
+    return 0
+
+def cmd_tune_preview(args):
+    import tuning
+    preset = _resolve_preset(args.preset)
+    if preset is None:
+        return 2
+    preview = tuning.preview_sysctl_settings(preset)
+    if args.json:
+        _emit_json({"preset": args.preset, "changes": preview})
+    else:
+        for item in preview:
+            mark = "*" if item["changed"] else " "
+            current = str(item['current']).replace("\t", " ")
+            print(f" {mark} {item['oid']:34} {current:>28} -> {item['desired']}")
+    return 0
+
+def cmd_tune_apply(args):
+    import tuning
+    import config_manager
+    preset = _resolve_preset(args.preset)
+    if preset is None:
+        return 2
+    if not args.yes:
+        print("비대화형 적용에는 --yes 옵션이 필요합니다.", file=sys.stderr)
+        return 2
+    with _quiet_stdout(args.json):
+        backup = None if args.no_backup else config_manager.save_config("bk")
+        report = tuning.write_sysctl_settings(preset)
+    if args.json:
+        results = {item["oid"]: item["status"] in ("applied", "unchanged") for item in report["items"]}
+        _emit_json({"preset": args.preset, "backup": backup, "results": results, "success": report["ok"],
+                    "transaction": report})
+    return 0 if report["ok"] else 1
+
+def cmd_tune_plan(args):
+    from utils import get_default_interface
+    from tuning_plan import build_plan, apply_plan, verify_plan
+    import tuning
+    import config_manager
+
+    iface = args.iface or get_default_interface()
+    desired = {}
+    if args.state:
+        # 부팅 시 유닛이 저장된 상태 전체를 다시 적용할 때 사용
+        try:
+            with open(args.state) as f:
+                desired = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"상태 파일을 읽을 수 없습니다: {args.state} ({e})", file=sys.stderr)
+            return 2
+    if args.preset:
+        preset = _resolve_preset(args.preset)
+        if preset is None:
+            return 2
+        desired.setdefault("sysctl", {}).update(preset)
+    if args.maxrate:
+        desired["tc"] = {iface: tuning._pacing_spec(iface, args.maxrate)}
+    if args.offloads:
+        from offload import audit_offloads
+        try:
+            rows = audit_offloads(iface)
+        except OSError as e:
+            print(f"오프로드 조회 실패: {e.strerror or e}", file=sys.stderr)
+            return 1
+        features = {r["name"]: True for r in rows if r["recommended"] and not r["fixed"]}
+        desired["ethtool"] = {iface: {"features": features}}
+    if not desired:
+        print("프리셋, --state 또는 --maxrate / --offloads 중 하나 이상을 지정하세요.", file=sys.stderr)
+        return 2
+
+    plan = build_plan(desired)
+    results = verify = backup = None
+    if args.apply and plan["changes"]:
+        if not args.yes:
+            print("비대화형 적용에는 --yes 옵션이 필요합니다.", file=sys.stderr)
+            return 2
+        with _quiet_stdout(args.json):
+            backup = None if args.no_backup else config_manager.save_config("bk")
+        results = apply_plan(plan)
+    if args.apply or args.verify or args.persist:
+        verify = verify_plan(desired)
+    persisted = None
+    if args.persist and verify["ok"]:
+        # 실제로 반영된 상태만 영구 설정으로 기록
+        from persist import persist
+        try:
+            persisted = persist(desired, root=args.root, hook=args.hook)
+        except OSError as e:
+            print(f"영구 설정 파일 생성 실패: {e.strerror or e}", file=sys.stderr)
+            return 1
+    if args.json:
+        _emit_json({"interface": iface, "plan": plan, "backup": backup, "results": results, "verify": verify,
+                    "persist": persisted})
+    else:
+        tuning.print_tuning_plan(plan, show_unchanged=args.all)
+        if results:
+            tuning.print_plan_results(results)
+        if verify and not verify["ok"]:
+            print(f" 원하는 값과 다른 항목 {len(verify['drift'])}개")
+            if args.persist:
+                print(" 적용되지 않은 상태는 영구 설정으로 기록하지 않았습니다.")
+        if persisted:
+            tuning.print_persist_result(persisted)
+    # --verify / --apply: 원하는 상태와 차이가 남아 있으면 1 (cron 감시용)
+    return 0 if verify is None or verify["ok"] else 1
+
+def cmd_tune_queues(args):
+    from utils import get_default_interface
+    from queue_tuning import build_plan, apply_plan
+    import tuning
+
+    iface = args.iface or get_default_interface()
+    plan = build_plan(iface)
+    if not args.apply:
+        if args.json:
+            _emit_json(plan)
+        else:
+            tuning.print_queue_plan(plan)
+        return 0
+    if not args.yes:
+        print("비대화형 적용에는 --yes 옵션이 필요합니다.", file=sys.stderr)
+        return 2
+    results = apply_plan(plan)
+    success = all(r["ok"] for r in results)
+    if args.json:
+        _emit_json({"interface": iface, "results": results, "success": success})
+    else:
+        for r in results:
+            print(f" {'✔' if r['ok'] else '✘'} {r['kind']:12} {r['target']} -> {r['desired']}"
+                  + (f" ({r['error']})" if r["error"] else ""))
+    return 0 if success else 1
+
+def cmd_tune_ring(args):
+    from utils import get_default_interface
+    from ring_tuning import build_ring_plan, apply_ring_plan
+    import tuning
+
+    iface = args.iface or get_default_interface()
+    try:
+        plan = build_ring_plan(iface, args.interval)
+    except OSError as e:
+        print(f"Ring Buffer 조회 실패: {e.strerror or e}", file=sys.stderr)
+        return 1
+    result = None
+    if args.apply:
+        if not args.yes:
+            print("비대화형 적용에는 --yes 옵션이 필요합니다.", file=sys.stderr)
+            return 2
+        result = apply_ring_plan(plan)
+    if args.json:
+        _emit_json({"plan": plan, "result": result})
+    else:
+        tuning.print_ring_plan(plan)
+        if result:
+            print(f" {'✔' if result['ok'] else '✘'} 적용: {result['applied'] or '변경 없음'}"
+                  + (f" ({result['error']})" if result["error"] else ""))
+    return 0 if result is None or result["ok"] else 1
+
+def cmd_tune_recommend(args):
+    from buffer_engine import recommend
+    from utils import get_default_interface, get_link_speed_mbps
+    import tuning
+    import config_manager
+
+    link_mbps = args.speed * 1000 if args.speed else get_link_speed_mbps(args.iface or get_default_interface())
+    rec = recommend(link_mbps, args.rtt, args.flows, profile=args.profile)
+    results = None
+    if args.apply:
+        if not args.yes:
+            print("비대화형 적용에는 --yes 옵션이 필요합니다.", file=sys.stderr)
+            return 2
+        with _quiet_stdout(args.json):
+            config_manager.save_config("bk")
+            results = tuning.write_sysctl_settings(rec["settings"])
+    if args.json:
+        _emit_json({"recommendation": rec, "results": results})
+    else:
+        tuning.print_recommendation(rec)
+    return 0 if results is None or results["ok"] else 1
+
+def cmd_tune_offload(args):
+    from utils import get_default_interface
+    from offload import audit_offloads, recommended_changes
+    import tuning
+    import diagnosis
+
+    iface = args.iface or get_default_interface()
+    try:
+        rows = audit_offloads(iface)
+    except OSError as e:
+        print(f"오프로드 조회 실패: {e.strerror or e}", file=sys.stderr)
+        return 1
+    if not args.apply:
+        if args.json:
+            _emit_json({"interface": iface, "features": rows, "changes": recommended_changes(rows)})
+        else:
+            diagnosis.print_offload_audit(rows)
+        return 0
+    if not args.yes:
+        print("비대화형 적용에는 --yes 옵션이 필요합니다.", file=sys.stderr)
+        return 2
+    with _quiet_stdout(args.json):
+        outcome = tuning.apply_offload_tuning(iface, backup=not args.no_backup)
+    if args.json:
+        _emit_json(dict(outcome, interface=iface))
+    else:
+        print(f" 변경 {len(outcome['changes'])}개, 성공 여부: {outcome['success']}"
+              + (f" ({outcome['error']})" if outcome["error"] else "")
+              + (" (백업 상태로 복원됨)" if outcome["rolled_back"] else ""))
+    return 0 if outcome["success"] else 1
+
+def cmd_bench_tcp(args):
+    import tcp_bench
+    import test
+
+    if args.server:
+        def on_close(record):
+            if args.json:
+                print(json.dumps(record, ensure_ascii=False), flush=True)
+            else:
+                print(f"{record['peer']:>22}  {record['bytes']:>14} bytes  {record['seconds']:>7}s  "
+                      f"{record['throughput_mbps']:>10.2f} Mbps  CPU {record['cpu_s']}s", flush=True)
+        try:
+            listener = tcp_bench.open_listener(args.bind, args.port)
+        except OSError as e:
+            print(f"서버 시작 실패: {e.strerror or e}", file=sys.stderr)
+            return 1
+        print(f"수신 대기: {args.bind}:{args.port} (종료: Ctrl+C)", file=sys.stderr)
+        try:
+            tcp_bench.serve(listener, size=args.size, on_close=on_close)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    options = dict(streams=args.streams, workers=args.workers, mode=args.mode, size=args.size,
+                   duration=args.duration, interval=args.interval)
+    try:
+        if args.local:
+            report = tcp_bench.run_local(**options)
+        else:
+            report = tcp_bench.run_client(args.client, args.port, **options)
+    except OSError as e:
+        print(f"측정 실패: {e.strerror or e}", file=sys.stderr)
+        return 1
+    if args.json:
+        _emit_json(report)
+    else:
+        test.print_bench_report(report)
+    return 0 if report["per_stream"] and not report["errors"] else 1
+
+def cmd_bench_iperf(args):
+    import iperf_runner
+    import test
+
+    cpus = [] if args.no_pin else iperf_runner.pin_cpus(args.iface)
+    on_interval = None if args.json else test.print_iperf_interval
+    options = dict(duration=args.duration, parallel=args.parallel, cpus=cpus, zerocopy=args.zerocopy,
+                   binary=args.binary, on_interval=on_interval)
+    try:
+        if args.local:
+            report = iperf_runner.run_local(args.instances, args.port, **options)
+        else:
+            report = iperf_runner.run_instances(args.server, args.instances, args.port, reverse=args.reverse, **options)
+    except FileNotFoundError as e:
+        print(f"iperf3 실행 실패: {e}", file=sys.stderr)
+        return 127
+    if args.json:
+        _emit_json(report)
+    else:
+        test.print_iperf_report(report)
+    return 0 if report["aggregate"]["instances_ok"] == len(report["instances"]) else 1
+
+def cmd_bench_udp(args):
+    import udp_bench
+    import test
+
+    if args.server:
+        def on_session(peer, summary):
+            if args.json:
+                print(json.dumps(dict(summary, peer=f"{peer[0]}:{peer[1]}"), ensure_ascii=False), flush=True)
+            else:
+                print(f"{peer[0]}:{peer[1]}  {summary['mbps']:.2f} Mbps, 손실 {summary['lost']}/{summary['expected']} "
+                      f"({summary['loss_pct']}%), 순서 뒤바뀜 {summary['reordered']}, 지터 {summary['jitter_us']} us, "
+                      f"소켓 오버플로 {summary['socket_overflow_drops']}", flush=True)
+        try:
+            sock = udp_bench.open_receiver(args.bind, args.port, args.rcvbuf)
+        except OSError as e:
+            print(f"서버 시작 실패: {e.strerror or e}", file=sys.stderr)
+            return 1
+        print(f"수신 대기: {args.bind}:{args.port}/udp (종료: Ctrl+C)", file=sys.stderr)
+        try:
+            udp_bench.serve(sock, on_session)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    options = dict(rate_mbps=args.rate, duration=args.duration, size=args.size, batch=args.batch, method=args.method)
+    try:
+        if args.local:
+            report = udp_bench.run_local(rcvbuf=args.rcvbuf, **options)
+        else:
+            report = udp_bench.send_stream(args.client, args.port, **options)
+    except (OSError, ValueError) as e:
+        print(f"측정 실패: {getattr(e, 'strerror', None) or e}", file=sys.stderr)
+        return 1
+    if args.json:
+        _emit_json(report)
+    else:
+        test.print_udp_report(report)
+    return 0 if report["receiver"] is not None else 1
+
+def cmd_backup_list(args):
+    import config_manager
+    backups = config_manager.list_backups()
+    if args.json:
+        _emit_json(backups)
+    else:
+        for name in backups:
+            print(name)
+    return 0
+
+def cmd_backup_show(args):
+    import config_manager
+    with _quiet_stdout(True):
+        content = config_manager.load_config_file(args.file)
+    if content is None:
+        return 1
+    if args.json:
+        _emit_json(content)
+    else:
+        print(json.dumps(content, ensure_ascii=False, indent=2))
+    return 0
+
+def cmd_backup_restore(args):
+    import config_manager
+    import tuning
+    if not args.yes:
+        print("비대화형 복원에는 --yes 옵션이 필요합니다.", file=sys.stderr)
+        return 2
+    with _quiet_stdout(args.json):
+        content = config_manager.load_config_file(args.file)
+        success = content is not None and tuning.restore_config(content, interactive=False)
+    if args.json:
+        _emit_json({"file": args.file, "success": bool(success)})
+    return 0 if success else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="nettune", description="NetTune: 네트워크 진단 및 튜닝 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    json_opt = argparse.ArgumentParser(add_help=False)
+    json_opt.add_argument("--json", action="store_true", help="JSON 형식으로 출력")
+
+    p = sub.add_parser("diagnose", parents=[json_opt], help="네트워크 상세 진단")
+    p.add_argument("--iface", help="진단할 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--timeout", type=float, default=3.0, help="프로브별 타임아웃(초)")
+    p.add_argument("--counter-interval", type=float, default=1.0, help="커널 카운터 측정 구간(초, 0이면 생략)")
+    p.set_defaults(func=cmd_diagnose)
+
+    p = sub.add_parser("bdp", parents=[json_opt], help="BDP(대역폭-지연) 계산")
+    p.add_argument("--bandwidth", type=float, default=10.0, help="대역폭 (Gbps)")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--rtt", type=float, help="RTT (ms)")
+    group.add_argument("--target", default="8.8.8.8", help="RTT를 측정할 대상")
+    p.add_argument("--percentile", type=_percentile_arg, choices=[50, 90, 99, "max"], default=99,
+                   help="BDP 산정에 사용할 RTT 분위수 (50/90/99/max)")
+    p.add_argument("--count", type=int, default=20, help="RTT 측정 횟수")
+    p.set_defaults(func=cmd_bdp)
+
+    p = sub.add_parser("rtt", parents=[json_opt], help="여러 대상 RTT 동시 측정 (p50/p90/p99/max, 손실)")
+    p.add_argument("targets", nargs="+", help="측정 대상 (호스트 또는 IP)")
+    p.add_argument("--count", type=int, default=10, help="대상별 측정 횟수")
+    p.add_argument("--interval", type=float, default=0.2, help="측정 간격(초)")
+    p.add_argument("--timeout", type=float, default=2.0, help="응답 대기 시간(초)")
+    p.add_argument("--method", choices=["auto", "icmp", "tcp"], default="auto",
+                   help="auto: ICMP 데이터그램 소켓, 권한이 없으면 TCP 연결 시간")
+    p.add_argument("--port", type=int, default=443, help="TCP 측정 포트")
+    p.set_defaults(func=cmd_rtt)
+
+    p = sub.add_parser("pmtu", parents=[json_opt], help="DF 프로브로 대상까지 경로 MTU 측정 (Jumbo Frame 검증)")
+    p.add_argument("target", help="측정 대상 (호스트 또는 IP)")
+    p.add_argument("--max", type=int, default=9000, help="검증할 목표 MTU")
+    p.add_argument("--method", choices=["auto", "icmp", "udp"], default="auto",
+                   help="auto: ICMP Echo, 권한이 없으면 닫힌 UDP 포트의 Port Unreachable")
+    p.add_argument("--timeout", type=float, default=1.0, help="크기별 응답 대기 시간(초)")
+    p.set_defaults(func=cmd_pmtu)
+
+    p = sub.add_parser("sample", parents=[json_opt], help="NIC 카운터 고속 샘플링 (마이크로버스트 탐지)")
+    p.add_argument("--iface", help="측정할 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--hz", type=int, default=1000, help="샘플링 주파수 (최대 1000)")
+    p.add_argument("--duration", type=float, default=5.0, help="측정 시간(초)")
+    p.add_argument("--threshold", type=float, default=0.9, help="버스트 판정 비율 (링크 속도 대비)")
+    p.add_argument("--link-mbps", type=int, help="링크 속도 직접 지정 (Mbps)")
+    p.add_argument("--source", choices=["sysfs", "procfs"], default="sysfs", help="카운터 소스")
+    p.set_defaults(func=cmd_sample)
+
+    p = sub.add_parser("counters", parents=[json_opt], help="TCP/UDP 커널 카운터 변화량 분석")
+    p.add_argument("--interval", type=float, default=5.0, help="측정 구간(초)")
+    p.set_defaults(func=cmd_counters)
+
+    p = sub.add_parser("irq", parents=[json_opt], help="NIC 큐 IRQ / softirq / softnet_stat CPU 분산 분석")
+    p.add_argument("--iface", help="분석할 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--interval", type=float, default=2.0, help="측정 구간(초)")
+    p.set_defaults(func=cmd_irq)
+
+    p = sub.add_parser("qdisc", parents=[json_opt], help="qdisc 통계 (tc -s: 드롭/throttled/플로우, 큐별 합계)")
+    p.add_argument("--iface", help="분석할 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.set_defaults(func=cmd_qdisc)
+
+    p = sub.add_parser("numa", parents=[json_opt], help="NIC NUMA 노드와 소켓 사용 프로세스 CPU 배치 비교")
+    p.add_argument("--iface", help="분석할 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.set_defaults(func=cmd_numa)
+
+    p = sub.add_parser("pin", help="명령을 NIC 로컬 NUMA 노드의 CPU/메모리에 고정하여 실행")
+    p.add_argument("--iface", help="기준 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("command_args", nargs=argparse.REMAINDER, metavar="-- 명령")
+    p.set_defaults(func=cmd_pin)
+
+    p = sub.add_parser("flows", parents=[json_opt], help="TCP 플로우별 tcp_info 분석 (rwnd/sndbuf/cwnd 제한)")
+    p.add_argument("--port", type=int, help="로컬 또는 원격 포트 필터")
+    p.add_argument("--peer", help="상대 주소 필터")
+    p.add_argument("--top", type=int, default=10, help="출력할 상위 플로우 수 (전송률 기준)")
+    p.set_defaults(func=cmd_flows)
+
+    bench = sub.add_parser("bench", help="내장 처리량 측정 (iperf3 불필요)")
+    bench_sub = bench.add_subparsers(dest="action", required=True)
+    p = bench_sub.add_parser("tcp", parents=[json_opt], help="멀티 스트림 TCP 처리량 측정 (서버/클라이언트/로컬)")
+    role = p.add_mutually_exclusive_group(required=True)
+    role.add_argument("--server", action="store_true", help="수신 서버로 실행")
+    role.add_argument("--client", metavar="HOST", help="HOST 의 서버로 전송")
+    role.add_argument("--local", action="store_true", help="루프백에서 서버와 클라이언트를 함께 실행")
+    p.add_argument("--bind", default="0.0.0.0", help="서버 바인드 주소")
+    p.add_argument("--port", type=int, default=5301, help="서버 포트")
+    p.add_argument("--streams", type=int, default=1, help="병렬 스트림 수")
+    p.add_argument("--workers", type=int, help="워커 프로세스 수 (기본: min(스트림 수, CPU 수))")
+    p.add_argument("--mode", choices=["send", "sendfile", "zerocopy"], default="send",
+                   help="전송 방식: send(memoryview 재사용) / sendfile / zerocopy(MSG_ZEROCOPY)")
+    p.add_argument("--size", type=int, default=131072, help="1회 전송/수신 버퍼 크기(bytes)")
+    p.add_argument("--duration", type=float, default=5.0, help="측정 시간(초)")
+    p.add_argument("--interval", type=float, default=0.5, help="스트림별 TCP_INFO 샘플링 간격(초)")
+    p.set_defaults(func=cmd_bench_tcp)
+
+    p = bench_sub.add_parser("iperf", parents=[json_opt], help="iperf3 다중 인스턴스 측정 (포트별 CPU 고정, JSON 점진 파싱)")
+    role = p.add_mutually_exclusive_group(required=True)
+    role.add_argument("--server", help="iperf3 서버 주소 (포트별로 iperf3 -s 가 떠 있어야 함)")
+    role.add_argument("--local", action="store_true", help="로컬 iperf3 서버를 띄워 루프백으로 측정")
+    p.add_argument("--instances", type=int, default=1, help="iperf3 클라이언트 프로세스 수 (포트 --port 부터 1씩 증가)")
+    p.add_argument("--port", type=int, default=5201, help="첫 번째 인스턴스 포트")
+    p.add_argument("--parallel", type=int, default=1, help="인스턴스별 병렬 스트림 수 (-P)")
+    p.add_argument("--duration", type=int, default=5, help="측정 시간(초)")
+    p.add_argument("--zerocopy", action="store_true", help="zero-copy 전송 (-Z)")
+    p.add_argument("--reverse", action="store_true", help="서버 → 클라이언트 방향 측정 (-R)")
+    p.add_argument("--iface", help="CPU 고정 기준 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--no-pin", action="store_true", help="CPU 고정(-A) 사용 안 함")
+    p.add_argument("--binary", default="iperf3", help="iperf3 실행 파일 경로")
+    p.set_defaults(func=cmd_bench_iperf)
+
+    p = bench_sub.add_parser("udp", parents=[json_opt], help="UDP 목표 전송률 측정 (GSO/sendmmsg 배치 송신, 손실/순서/지터/소켓 오버플로)")
+    role = p.add_mutually_exclusive_group(required=True)
+    role.add_argument("--server", action="store_true", help="수신 서버로 실행 (세션마다 결과를 송신측에 회신)")
+    role.add_argument("--client", metavar="HOST", help="HOST 의 서버로 전송")
+    role.add_argument("--local", action="store_true", help="루프백에서 수신/송신을 함께 실행")
+    p.add_argument("--bind", default="0.0.0.0", help="서버 바인드 주소")
+    p.add_argument("--port", type=int, default=5302, help="서버 포트")
+    p.add_argument("--rate", type=float, default=1000.0, help="목표 전송률 Mbps (0 = 무제한)")
+    p.add_argument("--duration", type=float, default=5.0, help="측정 시간(초)")
+    p.add_argument("--size", type=int, default=1472, help="데이터그램 페이로드 크기(bytes)")
+    p.add_argument("--batch", type=int, help="호출당 데이터그램 수 (기본: 64KB 이내 최대, 최대 64)")
+    p.add_argument("--method", choices=["gso", "mmsg", "send"], help="송신 방식 (기본: gso → mmsg → send 자동 선택)")
+    p.add_argument("--rcvbuf", type=int, help="수신 소켓 SO_RCVBUF (net.core.rmem_max 이내)")
+    p.set_defaults(func=cmd_bench_udp)
+
+    tune = sub.add_parser("tune", help="튜닝 프리셋 조회/적용")
+    tune_sub = tune.add_subparsers(dest="action", required=True)
+    p = tune_sub.add_parser("list", parents=[json_opt], help="프리셋 목록")
+    p.set_defaults(func=cmd_tune_list)
+    p = tune_sub.add_parser("preview", parents=[json_opt], help="현재 값과 프리셋 비교")
+    p.add_argument("preset")
+    p.set_defaults(func=cmd_tune_preview)
+    p = tune_sub.add_parser("apply", parents=[json_opt], help="프리셋 적용 (백업 후)")
+    p.add_argument("preset")
+    p.add_argument("--yes", action="store_true", help="확인 없이 적용")
+    p.add_argument("--no-backup", action="store_true", help="적용 전 백업 생략")
+    p.set_defaults(func=cmd_tune_apply)
+
+    p = tune_sub.add_parser("plan", parents=[json_opt],
+                            help="원하는 상태와 현재 상태의 차이만 계획/적용/검증 (sysctl, ethtool, tc 등 메커니즘별)")
+    p.add_argument("preset", nargs="?", help="sysctl 프리셋 (tune list 참고)")
+    p.add_argument("--iface", help="대상 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--maxrate", type=float,
+                   help="fq 플로우별 maxrate (Gbps). 멀티 큐 NIC 은 mq + 큐별 fq, flow_limit/quantum 은 링크 속도 기준")
+    p.add_argument("--offloads", action="store_true", help="권장 오프로드 기능 활성화 포함")
+    p.add_argument("--all", action="store_true", help="이미 적용된 항목도 출력")
+    p.add_argument("--apply", action="store_true", help="변경이 필요한 항목만 적용")
+    p.add_argument("--verify", action="store_true", help="차이가 남아 있으면 종료 코드 1")
+    p.add_argument("--yes", action="store_true", help="확인 없이 적용")
+    p.add_argument("--no-backup", action="store_true", help="적용 전 백업 생략")
+    p.add_argument("--state", metavar="FILE", help="저장된 원하는 상태(JSON)를 불러와 함께 적용 (부팅 유닛용)")
+    p.add_argument("--persist", action="store_true",
+                   help="적용된 상태를 sysctl.d / udev(또는 NM) / systemd 유닛 파일로 기록")
+    p.add_argument("--root", default="/", help="영구 설정 파일을 기록할 루트 (기본: /)")
+    p.add_argument("--hook", choices=["udev", "nm"], default="udev",
+                   help="인터페이스 설정 재적용 방식 (기본: udev)")
+    p.set_defaults(func=cmd_tune_plan)
+
+    p = tune_sub.add_parser("queues", parents=[json_opt], help="멀티 큐 분산 계획(기본) 또는 적용 (채널/IRQ/RPS/XPS)")
+    p.add_argument("--iface", help="대상 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--apply", action="store_true", help="계획 출력 대신 실제 적용")
+    p.add_argument("--yes", action="store_true", help="확인 없이 적용")
+    p.set_defaults(func=cmd_tune_queues)
+
+    p = tune_sub.add_parser("ring", parents=[json_opt], help="Ring Buffer 계획(기본) 또는 적용 (링크 속도/드롭률 기반)")
+    p.add_argument("--iface", help="대상 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--interval", type=float, default=1.0, help="드롭률 측정 구간(초, 0이면 생략)")
+    p.add_argument("--apply", action="store_true", help="계획 출력 대신 실제 적용")
+    p.add_argument("--yes", action="store_true", help="확인 없이 적용")
+    p.set_defaults(func=cmd_tune_ring)
+
+    p = tune_sub.add_parser("recommend", parents=[json_opt], help="링크 속도/RTT/동시 플로우 수 기반 버퍼 권장값 (BDP)")
+    p.add_argument("--speed", type=float, help="링크 속도 Gbps (기본: 인터페이스 속도)")
+    p.add_argument("--iface", help="링크 속도를 읽을 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--rtt", type=float, nargs="+", default=[100.0], help="RTT ms (여러 개를 주면 p95 기준)")
+    p.add_argument("--flows", type=int, default=64, help="예상 동시 플로우 수")
+    p.add_argument("--profile", choices=["general", "testhost"], default="general")
+    p.add_argument("--apply", action="store_true", help="권장값 출력 대신 실제 적용 (백업 후)")
+    p.add_argument("--yes", action="store_true", help="확인 없이 적용")
+    p.set_defaults(func=cmd_tune_recommend)
+
+    p = tune_sub.add_parser("offload", parents=[json_opt], help="오프로드 점검(기본) 또는 권장 집합 적용 (백업/롤백)")
+    p.add_argument("--iface", help="대상 인터페이스 (기본: 기본 경로 인터페이스)")
+    p.add_argument("--apply", action="store_true", help="점검 결과 출력 대신 실제 적용")
+    p.add_argument("--yes", action="store_true", help="확인 없이 적용")
+    p.add_argument("--no-backup", action="store_true", help="적용 전 백업 생략 (롤백 불가)")
+    p.set_defaults(func=cmd_tune_offload)
+
+    backup = sub.add_parser("backup", help="설정 백업 관리")
+    backup_sub = backup.add_subparsers(dest="action", required=True)
+    p = backup_sub.add_parser("list", parents=[json_opt], help="백업 목록")
+    p.set_defaults(func=cmd_backup_list)
+    p = backup_sub.add_parser("show", parents=[json_opt], help="백업 상세")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_backup_show)
+    p = backup_sub.add_parser("restore", parents=[json_opt], help="백업 복원")
+    p.add_argument("file")
+    p.add_argument("--yes", action="store_true", help="확인 없이 복원")
+    p.set_defaults(func=cmd_backup_restore)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -2,7 +2,7 @@ import os
 import json
 import platform
 from datetime import datetime
-from utils import Colors, Messenger, get_tcp_buffers, get_congestion_control, get_mtu, get_default_interface
+from utils import Colors, Messenger, get_tcp_buffers, get_congestion_control, get_mtu, get_default_interface, get_nic_info
 
 # 설정 저장 디렉토리 이름
 CONFIG_DIR = "config_list"
@@ -12,9 +12,15 @@ def ensure_config_dir():
     if not os.path.exists(CONFIG_DIR):
         os.makedirs(CONFIG_DIR)
 
-def get_current_system_config():
-    """현재 시스템의 주요 네트워크 설정을 딕셔너리로 추출"""
-    iface = get_default_interface()
+def get_offload_snapshot(iface):
+    """인터페이스의 오프로드 기능 상태 (조회 불가 시 None)"""
+    from offload import snapshot_features
+    features = get_nic_info(iface)["features"]
+    return snapshot_features(features) if features else None
+
+def get_current_system_config(iface=None):
+    """현재 시스템의 주요 네트워크 설정을 딕셔너리로 추출 (iface 미지정 시 기본 인터페이스)"""
+    iface = iface or get_default_interface()
     config = {
         "metadata": {
             "os": platform.system(),
@@ -27,13 +33,15 @@ def get_current_system_config():
             "mtu": get_mtu(iface) if iface != "Not Found" else "N/A"
         }
     }
+    if platform.system() == "Linux" and iface != "Not Found":
+        config["settings"]["offloads"] = get_offload_snapshot(iface)
     return config
 
-def save_config(label=""):
+def save_config(label="", iface=None):
     """현재 설정을 파일로 저장 (백업 생성)"""
     ensure_config_dir()
     
-    current_config = get_current_system_config()
+    current_config = get_current_system_config(iface)
     os_name = platform.system().lower()
     timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
     
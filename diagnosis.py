@@ -1,29 +1,24 @@
+import time
 import platform
-import psutil
-from utils import Colors, Messenger, get_default_interface, get_all_interfaces, get_physical_speed, get_mtu, get_tcp_buffers, get_congestion_control, get_cpu_governor
+import threading
+from probe_cache import probe_stats
+from utils import Colors, Messenger, get_nic_info, get_link_speed_mbps, get_default_interface, get_all_interfaces, get_physical_speed, get_mtu, get_tcp_buffers, get_congestion_control, get_cpu_governor
 
-def calculate_guidelines():
-    """메모리 기반 네트워크 버퍼 가이드라인 계산"""
-    total_mem = psutil.virtual_memory().total
-    total_mem_gb = total_mem / (1024**3)
-    
-    if total_mem_gb < 16:
-        suggested_mb = 64
-    elif total_mem_gb < 64:
-        suggested_mb = 128
-    else:
-        suggested_mb = 512
-        
-    suggested_bytes = suggested_mb * 1024 * 1024
-    limit_bytes = int(total_mem * 0.05)
-    if suggested_bytes > limit_bytes:
-        suggested_bytes = limit_bytes
-        suggested_mb = suggested_bytes / (1024 * 1024)
-    
+# 측정값이 없을 때 가이드라인 산정에 가정하는 경로 RTT(ms)와 동시 플로우 수
+GUIDELINE_RTT_MS = 100
+GUIDELINE_FLOWS = 64
+
+def calculate_guidelines(speed_mbps=None, rtt_ms=GUIDELINE_RTT_MS, flows=GUIDELINE_FLOWS):
+    """링크 속도/RTT/메모리 기반 네트워크 버퍼 가이드라인 계산 (buffer_engine 권장값)"""
+    from buffer_engine import recommend
+    rec = recommend(speed_mbps, rtt_ms, flows)
+    total_mem = rec["inputs"]["total_mem_bytes"]
+    suggested_bytes = rec["socket_max_bytes"]
     return {
-        "total_memory_gb": round(total_mem_gb, 2),
+        "total_memory_gb": round(total_mem / (1024**3), 2),
         "suggested_max_buffer_bytes": suggested_bytes,
-        "suggested_max_buffer_mb": round(suggested_mb, 2)
+        "suggested_max_buffer_mb": round(suggested_bytes / (1024 * 1024), 2),
+        "recommendation": rec,
     }
 
 def show_explanations():
@@ -56,9 +51,30 @@ def show_explanations():
          "             Cubic 대비 큰 성능 향상을 보여줍니다."),
         
         ("📝 튜닝 가이드라인 (NetTune Recommendation)", 
-         "현재 시스템의 RAM 용량을 분석하여 최적의 버퍼 크기를 제안합니다.\n"
+         "링크 속도 x RTT(BDP), 동시 플로우 수, 시스템 RAM 을 함께 고려해 버퍼 크기를 제안합니다.\n"
+         "      - 소켓 최대 버퍼는 BDP 의 2배(윈도우 오버헤드)를 2의 거듭제곱으로 올림합니다.\n"
          "      - 너무 작으면 속도가 제한되고, 너무 크면 시스템 메모리가 고갈될 수 있습니다.\n"
-         "      - NetTune은 전체 메모리의 5% 이내에서 최적의 안정 수치를 계산합니다."),
+         "      - 소켓당 RAM 5%, TCP 전체(tcp_mem) RAM 25% 이내로 제한합니다."),
+        
+        ("📉 커널 카운터 분석 (Linux)", 
+         "일정 구간 동안 /proc/net/snmp, netstat, sockstat 카운터의 증가량을 측정합니다.\n"
+         "      - TCPRcvQDrop, PruneCalled 등이 증가하면 실제로 버퍼가 부족하다는 의미입니다.\n"
+         "      - 각 항목마다 값을 늘려야 할 설정(tcp_rmem, rmem_max, tcp_mem 등)을 함께 안내합니다."),
+        
+        ("🧮 IRQ / softirq 분산 (Linux)", 
+         "/proc/interrupts, /proc/softirqs, /proc/net/softnet_stat 의 CPU별 증가량을 측정합니다.\n"
+         "      - 모든 RX 큐 IRQ 가 한 코어에 몰리면 100G NIC 도 20Gbps 근처에서 포화됩니다.\n"
+         "      - time_squeeze 는 NAPI 예산 부족(netdev_budget), drop 은 backlog 초과(netdev_max_backlog)를 뜻합니다."),
+        
+        ("🚚 오프로드 기능 (GRO/GSO/TSO)", 
+         "패킷 분할/병합을 NIC 또는 커널 배치 처리로 넘기는 기능입니다.\n"
+         "      - GRO/TSO 가 꺼져 있으면 기가비트당 CPU 사용량이 몇 배로 늘어납니다.\n"
+         "      - rx-gro-hw(하드웨어 GRO), tx-udp-segmentation(UDP GSO)은 지원 NIC 에서만 켤 수 있습니다."),
+        
+        ("🧩 NUMA 지역성 (Linux)", 
+         "NIC 가 연결된 NUMA 노드와, NIC 소켓을 사용하는 프로세스가 실행되는 CPU 를 비교합니다.\n"
+         "      - 듀얼 소켓 서버에서 원격 노드에서 전송하면 처리량이 1/3 가량 떨어질 수 있습니다.\n"
+         "      - `nettune pin --iface <if> -- <명령>` 으로 CPU/메모리를 NIC 노드에 고정하여 실행하세요."),
         
         ("⚙️ CPU Governor (Power Management)", 
          "CPU의 동작 클럭 전략입니다.\n"
@@ -72,8 +88,8 @@ def show_explanations():
     
     print(f"\n{Colors.BOLD}{Colors.OKBLUE}────────────────────────────────────────────────────────────────{Colors.ENDC}")
     print(f" {Colors.BOLD}💡 주의: 현재 NetTune에서 적용하는 설정은 '실시간 반영'용이며,{Colors.ENDC}")
-    print(f" {Colors.BOLD}    재부팅 시 초기화됩니다. 영구 반영을 위해서는 Linux의 경우{Colors.ENDC}")
-    print(f" {Colors.BOLD}    /etc/sysctl.conf 등에 해당 설정을 추가해야 합니다.{Colors.ENDC}")
+    print(f" {Colors.BOLD}    재부팅 시 초기화됩니다. Linux 에서는 적용 후 영구 설정 파일 생성을 선택하면{Colors.ENDC}")
+    print(f" {Colors.BOLD}    sysctl.d / udev 규칙 / systemd 유닛으로 부팅 시 다시 적용됩니다.{Colors.ENDC}")
     print(f"{Colors.BOLD}{Colors.OKBLUE}────────────────────────────────────────────────────────────────{Colors.ENDC}")
     
     input("\n메뉴로 돌아가려면 [Enter]를 누르세요...")
@@ -106,21 +122,238 @@ def select_interface():
         except ValueError:
             Messenger.error("REQUIRE_NUMBER")
 
-def run_diagnosis():
-    """진단 로직 실행"""
-    iface = select_interface()
-    
+def print_nic_details(nic):
+    """NIC 드라이버 상세(Ring/채널/병합/Flow Control) 출력"""
+    driver = nic["driver"]
+    if driver:
+        print(f"    - {'드라이버':18}: {driver['driver']} {driver['version']} ({driver['bus_info'] or 'N/A'})")
+    ring = nic["ring"]
+    if ring:
+        ring_display = f"rx {ring['rx']}/{ring['rx_max']}, tx {ring['tx']}/{ring['tx_max']} (현재/최대)"
+        color = Colors.WARNING if ring['rx'] < ring['rx_max'] else Colors.OKGREEN
+        print(f"    - {'Ring Buffer':20}: {color}{ring_display}{Colors.ENDC}")
+    channels = nic["channels"]
+    if channels:
+        print(f"    - {'채널(큐)':18}: combined {channels['combined']}/{channels['max_combined']}, "
+              f"rx {channels['rx']}/{channels['max_rx']}, tx {channels['tx']}/{channels['max_tx']}")
+    coalesce = nic["coalesce"]
+    if coalesce:
+        adaptive = "on" if coalesce['adaptive_rx'] else "off"
+        print(f"    - {'Interrupt 병합':18}: adaptive-rx {adaptive}, rx-usecs {coalesce['rx_usecs']}")
+    pause = nic["pause"]
+    if pause:
+        print(f"    - {'Flow Control':20}: rx {'on' if pause['rx'] else 'off'}, tx {'on' if pause['tx'] else 'off'}")
+    if not (driver or ring or channels or coalesce or pause):
+        print(f"    - {Colors.WARNING}드라이버 상세 정보를 조회할 수 없습니다. (가상/루프백 인터페이스){Colors.ENDC}")
+
+def print_counter_findings(counters):
+    """커널 카운터 분석 결과(발견 사항 + 관련 튜닝 항목) 출력"""
+    info = counters["info"]
+    print(f"    - 측정 구간 {counters['interval_s']}s: TCP in/out {info['Tcp.InSegs']}/{info['Tcp.OutSegs']} seg, "
+          f"UDP in/out {info['Udp.InDatagrams']}/{info['Udp.OutDatagrams']}, OFO 큐 진입 {info['TcpExt.TCPOFOQueue']}")
+    tcp_mem = counters["tcp_mem"]
+    if tcp_mem and tcp_mem["pressure_pct"] is not None:
+        print(f"    - TCP 메모리: {tcp_mem['pages']} / pressure {tcp_mem['pressure_pages']} 페이지 ({tcp_mem['pressure_pct']}%)")
+    if not counters["findings"]:
+        print(f"    {Colors.OKGREEN}✔ 버퍼 부족을 나타내는 카운터 증가가 없습니다.{Colors.ENDC}")
+    for finding in counters["findings"]:
+        rate = f" ({finding['rate_per_s']}/s)" if finding["rate_per_s"] is not None else ""
+        delta = f" +{finding['delta']}{rate}" if finding["delta"] is not None else ""
+        print(f"    {Colors.WARNING}⚠️ {finding['counter']}{delta}: {finding['message']}{Colors.ENDC}")
+        print(f"       👉 관련 설정: {', '.join(finding['knobs'])}")
+
+def print_irq_findings(irq):
+    """NIC 큐 IRQ / CPU별 NET_RX / softnet 분석 결과 출력"""
+    print(f"    - 측정 구간 {irq['interval_s']}s, 온라인 CPU {irq['online_cpus']}개, "
+          f"NIC 로컬 CPU {','.join(map(str, irq['local_cpus'])) or 'N/A'}")
+    for q in irq["queues"]:
+        spread = ", ".join(f"CPU{cpu} {count}" for cpu, count in sorted(q["cpus"].items(), key=lambda x: -x[1])[:4])
+        print(f"    - IRQ {q['irq']:>4} {q['name']:24} affinity {q['affinity'] or '?':>8}  {spread or '-'}")
+    if not irq["queues"]:
+        print(f"    - {Colors.WARNING}인터페이스에 연결된 IRQ 를 찾지 못했습니다.{Colors.ENDC}")
+    busiest = sorted(irq["per_cpu"].items(), key=lambda x: -x[1]["net_rx"])[:8]
+    if busiest:
+        print(f"    {'CPU':>7} {'NIC IRQ':>9} {'NET_RX':>9} {'점유율':>7} {'squeeze':>8} {'drop':>6}")
+        for cpu, v in busiest:
+            color = Colors.FAIL if cpu in irq["hot_cores"] else ""
+            print(f"    {color}{cpu:>7} {v['nic_irqs']:>9} {v['net_rx']:>9} {v['net_rx_share'] * 100:>6.1f}% "
+                  f"{v['time_squeeze']:>8} {v['dropped']:>6}{Colors.ENDC if color else ''}")
+    if not irq["findings"]:
+        print(f"    {Colors.OKGREEN}✔ 수신 처리가 특정 코어에 몰리는 현상이 없습니다.{Colors.ENDC}")
+    for finding in irq["findings"]:
+        print(f"    {Colors.WARNING}⚠️ {finding['message']}{Colors.ENDC}")
+        print(f"       👉 관련 설정: {', '.join(finding['knobs'])}")
+    if irq["suggested_affinity"]:
+        plan = ", ".join(f"{i}→CPU{c}" for i, c in list(irq["suggested_affinity"].items())[:8])
+        more = " ..." if len(irq["suggested_affinity"]) > 8 else ""
+        print(f"    {Colors.OKCYAN}💡 권장 IRQ 배치: {plan}{more}{Colors.ENDC}")
+
+def print_offload_audit(rows):
+    """오프로드 기능 점검 결과 출력 (꺼져 있는 권장 기능은 경고)"""
+    if not rows:
+        print(f"    - {Colors.WARNING}오프로드 정보를 제공하지 않는 인터페이스입니다.{Colors.ENDC}")
+        return
+    for r in rows:
+        state = "on" if r["active"] else "off"
+        if r["status"] == "warn":
+            print(f"    {Colors.WARNING}⚠️ {r['label']:38}: {state} (권장: on){Colors.ENDC}")
+        elif r["status"] == "unavailable":
+            print(f"    - {r['label']:38}: {state} {Colors.OKBLUE}[드라이버 미지원]{Colors.ENDC}")
+        else:
+            color = Colors.OKGREEN if r["status"] == "ok" else ""
+            print(f"    - {r['label']:38}: {color}{state}{Colors.ENDC if color else ''}")
+    if any(r["status"] == "warn" for r in rows):
+        print(f"    {Colors.OKCYAN}👉 튜닝 > 100G NIC 드라이버 최적화 > 7 또는 `nettune tune offload --apply --yes`{Colors.ENDC}")
+
+_NUMA_STATUS_LABELS = {"local": "로컬", "remote": "원격", "unpinned": "미고정", "n/a": "-"}
+
+def print_numa_report(numa):
+    """NIC NUMA 노드와 소켓 사용 프로세스의 CPU 배치 출력"""
+    node = numa["numa_node"] if numa["numa_node"] is not None else "N/A"
+    print(f"    - {numa['interface']} NUMA 노드 {node}, 로컬 CPU {','.join(map(str, numa['local_cpus'])) or 'N/A'} "
+          f"(시스템 노드 {len(numa['nodes'])}개)")
+    if len(numa["nodes"]) < 2:
+        print(f"    {Colors.OKGREEN}✔ 단일 NUMA 노드 시스템입니다. 노드 간 불일치가 발생하지 않습니다.{Colors.ENDC}")
+    for p in numa["processes"][:10]:
+        color = Colors.FAIL if p["status"] == "remote" else Colors.WARNING if p["status"] == "unpinned" else ""
+        cpus = ",".join(map(str, p["cpus_allowed"][:8])) + (" ..." if len(p["cpus_allowed"]) > 8 else "")
+        print(f"    {color}- {p['comm']}({p['pid']}) 소켓 {p['sockets']}개, 허용 CPU {cpus}, "
+              f"실행 CPU {p['last_cpu']} (노드 {p['last_node']}) → {_NUMA_STATUS_LABELS[p['status']]}"
+              f"{Colors.ENDC if color else ''}")
+    for finding in numa["findings"]:
+        print(f"    {Colors.WARNING}⚠️ {finding}{Colors.ENDC}")
+
+# 진단 프로브 기본 타임아웃(초)
+PROBE_TIMEOUT = 3.0
+
+# 커널 카운터 변화량 측정 구간(초)
+COUNTER_INTERVAL = 1.0
+
+def _interface_valid(iface):
+    return iface != "Not Found" and "Error" not in iface
+
+# 동시 프로브 결과 상태
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+def run_concurrent(probes, timeout):
+    """여러 프로브를 데몬 스레드로 동시에 실행하고 결과를 모아 반환
+
+    probes: {이름: (호출 가능 객체, 개별 타임아웃 초 또는 None)}
+    timeout: 개별 타임아웃이 없는 프로브에 적용할 기본 타임아웃(초)
+    반환값: {이름: {"status": ok|timeout|error, "value": ..., "error": ..., "elapsed_ms": ...}}
+
+    시간 초과된 프로브는 기다리지 않고 timeout 으로 표시한다. 멈춘 스레드가
+    종료를 막지 않도록 데몬 스레드를 사용한다.
+    """
+    results = {}
+    threads = {}
+    start = time.monotonic()
+
+    def worker(name, fn):
+        t0 = time.monotonic()
+        try:
+            value = fn()
+            result = {"status": STATUS_OK, "value": value, "error": None}
+        except Exception as e:
+            result = {"status": STATUS_ERROR, "value": None, "error": str(e)}
+        result["elapsed_ms"] = round((time.monotonic() - t0) * 1000, 3)
+        results[name] = result
+
+    for name, (fn, _limit) in probes.items():
+        t = threading.Thread(target=worker, args=(name, fn), name=f"nettune-probe-{name}", daemon=True)
+        threads[name] = t
+        t.start()
+
+    for name, t in threads.items():
+        limit = probes[name][1] if probes[name][1] is not None else timeout
+        t.join(max(0.0, start + limit - time.monotonic()))
+
+    report = {}
+    for name, (_fn, limit) in probes.items():
+        # join 이후 완료 여부를 한 번만 판단하여 늦게 끝난 결과가 섞이지 않도록 복사
+        result = results.get(name)
+        if result is None:
+            limit = limit if limit is not None else timeout
+            result = {"status": STATUS_TIMEOUT, "value": None,
+                      "error": f"{limit}s", "elapsed_ms": round(limit * 1000, 3)}
+        report[name] = dict(result)
+    return report
+
+def collect_diagnosis(iface, timeout=PROBE_TIMEOUT, counter_interval=COUNTER_INTERVAL):
+    """진단 프로브를 동시에 실행하여 하나의 리포트 딕셔너리로 수집
+
+    각 프로브 결과는 report["probes"][이름] 에 {"status", "value", "error", "elapsed_ms"}
+    형태로 담기며, 타임아웃된 프로브는 status 가 "timeout" 으로 표시된다.
+    """
+    probes = {
+        "tcp_buffers": (get_tcp_buffers, None),
+        "congestion_control": (get_congestion_control, None),
+        "guidelines": (lambda: calculate_guidelines(get_link_speed_mbps(iface) if _interface_valid(iface) else None), None),
+        "cpu_governor": (get_cpu_governor, None),
+    }
+    if _interface_valid(iface):
+        probes["speed"] = (lambda: get_physical_speed(iface), None)
+        probes["mtu"] = (lambda: get_mtu(iface), None)
+        if platform.system() == "Linux":
+            probes["nic"] = (lambda: get_nic_info(iface), None)
+    if platform.system() == "Linux" and counter_interval > 0:
+        from kernel_counters import analyze
+        probes["kernel_counters"] = (lambda: analyze(counter_interval), counter_interval + timeout)
+        if _interface_valid(iface):
+            import irq_stats
+            probes["irq"] = (lambda: irq_stats.analyze(iface, counter_interval), counter_interval + timeout)
+    if platform.system() == "Linux" and _interface_valid(iface):
+        from numa_locality import check_locality
+        from offload import audit_offloads
+        probes["numa"] = (lambda: check_locality(iface), None)
+        probes["offloads"] = (lambda: audit_offloads(iface), None)
+
+    start = time.monotonic()
+    results = run_concurrent(probes, timeout)
+    return {
+        "interface": iface,
+        "os": platform.system(),
+        "elapsed_ms": round((time.monotonic() - start) * 1000, 3),
+        "probes": results,
+    }
+
+def _probe_value(report, name):
+    """성공한 프로브 값 반환 (실패/타임아웃/미실행이면 None)"""
+    result = report["probes"].get(name)
+    return result["value"] if result and result["status"] == STATUS_OK else None
+
+def _probe_failure(report, name):
+    """실패/타임아웃 프로브의 표시 문자열 (성공이면 None)"""
+    result = report["probes"].get(name)
+    if result is None or result["status"] == STATUS_OK:
+        return None
+    if result["status"] == STATUS_TIMEOUT:
+        return f"{Colors.FAIL}⏱️ 시간 초과 ({result['error']}){Colors.ENDC}"
+    return f"{Colors.FAIL}Error: {result['error']}{Colors.ENDC}"
+
+def print_diagnosis_report(report):
+    """collect_diagnosis() 리포트를 화면에 출력"""
+    iface = report["interface"]
+
     print("\n" + f"{Colors.BOLD}{Colors.HEADER}╔════════════════════════════════════════════════════════════╗")
     print(f"║   🚀 [NetTune] {iface:^10} 인터페이스 진단 결과      ║")
     print(f"╚════════════════════════════════════════════════════════════╝{Colors.ENDC}")
     
     print(f"\n {Colors.BOLD}1. 🌐 선택된 인터페이스{Colors.ENDC}  : {Colors.OKBLUE}{iface}{Colors.ENDC}")
     
-    if iface != "Not Found" and "Error" not in iface:
-        speed = get_physical_speed(iface)
+    if _interface_valid(iface):
+        speed = _probe_failure(report, "speed") or _probe_value(report, "speed")
         print(f" {Colors.BOLD}2. ⚡ 물리 속도 (Media){Colors.ENDC}  : {speed}")
+        if "nic" in report["probes"]:
+            nic = _probe_value(report, "nic")
+            if nic is not None:
+                print_nic_details(nic)
+            else:
+                print(f"    - NIC 상세: {_probe_failure(report, 'nic')}")
         
-        mtu = get_mtu(iface)
+        mtu = _probe_failure(report, "mtu") or _probe_value(report, "mtu")
         try:
             mtu_val = int(mtu)
             mtu_display = f"{Colors.OKGREEN}{mtu}{Colors.ENDC}" if mtu_val >= 9000 else f"{Colors.WARNING}{mtu}{Colors.ENDC}"
@@ -129,32 +362,185 @@ def run_diagnosis():
         print(f" {Colors.BOLD}3. 📦 MTU 설정값{Colors.ENDC}         : {mtu_display}")
         if mtu == "1500":
             print(f"    {Colors.WARNING}💡 Tip: 고속망(Jumbo Frame) 사용 시 9000 설정을 권장합니다.{Colors.ENDC}")
+            print(f"    {Colors.OKCYAN}👉 적용 전 경로 검증: `nettune pmtu <상대 호스트>` (모든 홉이 9000을 통과하는지 확인){Colors.ENDC}")
     
     print(f"\n {Colors.BOLD}4. 🛠️ TCP/IP 버퍼 설정{Colors.ENDC}")
-    buffers = get_tcp_buffers()
-    for k, v in buffers.items():
+    buffers = _probe_value(report, "tcp_buffers")
+    if buffers is None:
+        print(f"    - {_probe_failure(report, 'tcp_buffers')}")
+    for k, v in (buffers or {}).items():
         v_display = f"{v} bytes" if v != "Not found" else v
         print(f"    - {k:20}: {Colors.OKCYAN}{v_display}{Colors.ENDC}")
         
-    cc = get_congestion_control()
+    cc = _probe_failure(report, "congestion_control") or _probe_value(report, "congestion_control")
     print(f"\n {Colors.BOLD}5. ⚖️ 혼잡제어 알고리즘{Colors.ENDC}  : {cc}")
     if platform.system() == "Linux" and cc and "cubic" in cc.lower():
         print(f"    {Colors.WARNING}💡 Tip: 장거리 고속 전송 시 'bbr' 사용을 권장합니다.{Colors.ENDC}")
     
-    guide = calculate_guidelines()
+    guide = _probe_value(report, "guidelines")
     print(f"\n {Colors.BOLD}6. 📝 튜닝 가이드라인{Colors.ENDC}")
-    print(f"    ┌────────────────────────────────────────────────────────┐")
-    print(f"    │  시스템 총 메모리 : {Colors.BOLD}{guide['total_memory_gb']:>6} GB{Colors.ENDC}                      │")
-    print(f"    │  권장 최대 버퍼   : {Colors.OKGREEN}{Colors.BOLD}{guide['suggested_max_buffer_mb']:>6} MB{Colors.ENDC} ({guide['suggested_max_buffer_bytes']} bytes)   │")
-    print(f"    └────────────────────────────────────────────────────────┘")
-    print(f"    * 10Gbps+ 환경에서는 BDP 확보를 위해 위 수준의 확장이 필요합니다.")
+    if guide is None:
+        print(f"    - {_probe_failure(report, 'guidelines')}")
+    else:
+        print(f"    ┌────────────────────────────────────────────────────────┐")
+        print(f"    │  시스템 총 메모리 : {Colors.BOLD}{guide['total_memory_gb']:>6} GB{Colors.ENDC}                      │")
+        print(f"    │  권장 최대 버퍼   : {Colors.OKGREEN}{Colors.BOLD}{guide['suggested_max_buffer_mb']:>6} MB{Colors.ENDC} ({guide['suggested_max_buffer_bytes']} bytes)   │")
+        print(f"    └────────────────────────────────────────────────────────┘")
+        rec = guide["recommendation"]
+        inputs = rec["inputs"]
+        print(f"    * 기준: {inputs['link_mbps'] / 1000:g} Gbps, RTT {inputs['rtt_ms']:g} ms, "
+              f"동시 플로우 {inputs['flows']}개 (BDP {rec['bdp_bytes'] / 1048576:.1f} MB)")
+        print(f"    * 근거: {rec['reasons']['net.ipv4.tcp_rmem']}")
+        print(f"    * 전체 권장값(tcp_mem/optmem/notsent_lowat 포함): nettune tune recommend --rtt <ms>")
     
-    gov = get_cpu_governor()
+    gov = _probe_failure(report, "cpu_governor") or _probe_value(report, "cpu_governor")
     print(f"\n {Colors.BOLD}7. ⚙️ CPU Governor{Colors.ENDC}       : {gov}")
     if "powersave" in gov.lower():
         print(f"    {Colors.FAIL}⚠️ 경고: 'powersave' 모드는 성능 저하의 원인이 됩니다.{Colors.ENDC}")
         if platform.system() == "Linux":
             print(f"    {Colors.OKGREEN}👉 권장: sudo cpupower frequency-set -g performance{Colors.ENDC}")
 
+    if "kernel_counters" in report["probes"]:
+        counters = _probe_value(report, "kernel_counters")
+        print(f"\n {Colors.BOLD}8. 📉 커널 카운터 분석{Colors.ENDC}")
+        if counters is None:
+            print(f"    - {_probe_failure(report, 'kernel_counters')}")
+        else:
+            print_counter_findings(counters)
+
+    if "irq" in report["probes"]:
+        irq = _probe_value(report, "irq")
+        print(f"\n {Colors.BOLD}9. 🧮 IRQ / softirq 분산{Colors.ENDC}")
+        if irq is None:
+            print(f"    - {_probe_failure(report, 'irq')}")
+        else:
+            print_irq_findings(irq)
+
+    if "numa" in report["probes"]:
+        numa = _probe_value(report, "numa")
+        print(f"\n {Colors.BOLD}10. 🧩 NUMA 지역성{Colors.ENDC}")
+        if numa is None:
+            print(f"    - {_probe_failure(report, 'numa')}")
+        else:
+            print_numa_report(numa)
+
+    if "offloads" in report["probes"]:
+        offloads = _probe_value(report, "offloads")
+        print(f"\n {Colors.BOLD}11. 🚚 오프로드 기능{Colors.ENDC}")
+        if offloads is None:
+            print(f"    - {_probe_failure(report, 'offloads')}")
+        else:
+            print_offload_audit(offloads)
+
+    stats = probe_stats()
+    print(f"\n    {Colors.OKBLUE}(진단 소요: {report['elapsed_ms']:.1f} ms / 프로브 캐시: hit {stats['hits']} / miss {stats['misses']} / 무효화 {stats['invalidations']}){Colors.ENDC}")
     print("\n" + f"{Colors.OKBLUE}============================================================{Colors.ENDC}\n")
+
+def run_diagnosis():
+    """진단 로직 실행"""
+    iface = select_interface()
+    print_diagnosis_report(collect_diagnosis(iface))
     input("진단 결과 확인 완료 [Enter]를 누르면 메뉴에 진입합니다...")
+
+def _format_bps(bps):
+    """bps 값을 Gbps/Mbps 표기로 변환"""
+    if bps >= 1e9:
+        return f"{bps / 1e9:.2f} Gbps"
+    return f"{bps / 1e6:.2f} Mbps"
+
+def print_microburst_report(report):
+    """마이크로버스트 샘플링 리포트 출력"""
+    link = f"{report['link_mbps']} Mb/s" if report['link_mbps'] else "Unknown"
+    print(f"\n{Colors.BOLD}{Colors.HEADER}📈 [{report['interface']}] 마이크로버스트 분석 "
+          f"({report['hz']} Hz, {report['duration_s']}s, 링크 {link}){Colors.ENDC}")
+    for direction in ("rx", "tx"):
+        d = report[direction]
+        ratio = d['peak_to_mean'] if d['peak_to_mean'] is not None else "-"
+        print(f"\n  {Colors.BOLD}{direction.upper()}{Colors.ENDC}  평균 {_format_bps(d['mean_bps'])} / "
+              f"최대 {_format_bps(d['peak_bps'])} / 피크 대 평균 {ratio}")
+        if report['link_mbps'] is None:
+            print(f"    {Colors.WARNING}링크 속도를 알 수 없어 버스트 구간 판정을 생략합니다.{Colors.ENDC}")
+        elif d['bursts']:
+            print(f"    {Colors.WARNING}⚠️ 링크 속도 {int(report['threshold'] * 100)}% 초과 구간 {len(d['bursts'])}개{Colors.ENDC}")
+            for b in d['bursts'][:10]:
+                print(f"      - {b['start_s'] * 1000:>9.3f} ms ~ {b['end_s'] * 1000:>9.3f} ms "
+                      f"({b['duration_ms']} ms, 최대 {_format_bps(b['peak_bps'])})")
+            if len(d['bursts']) > 10:
+                print(f"      ... 외 {len(d['bursts']) - 10}개")
+        else:
+            print(f"    {Colors.OKGREEN}✔ 임계값을 넘는 버스트 없음{Colors.ENDC}")
+        if d['intervals'] and d['zero_intervals_pct'] > 90 and d['mean_bps'] > 0:
+            print(f"    {Colors.WARNING}💡 대부분 구간의 증가량이 0입니다. 드라이버가 카운터를 주기적으로만 갱신할 수 있습니다.{Colors.ENDC}")
+    drops = report['drops']
+    if drops['rx_dropped'] or drops['tx_dropped']:
+        print(f"\n  {Colors.FAIL}⚠️ 측정 중 드롭: rx {drops['rx_dropped']}, tx {drops['tx_dropped']}{Colors.ENDC}")
+    print(f"\n  {Colors.OKBLUE}(샘플 {report['samples']}개, 놓친 틱 {report['missed_ticks']}개, "
+          f"샘플러 CPU {report['cpu_pct']}%){Colors.ENDC}")
+
+def run_microburst_check():
+    """NIC 카운터 고속 샘플링으로 마이크로버스트 측정 (대화형)"""
+    from nic_sampler import run_microburst_sampling, MAX_HZ
+    if platform.system() != "Linux":
+        Messenger.error("OS_NOT_SUPPORTED: 마이크로버스트 측정은 Linux 전용입니다.")
+        return
+    iface = select_interface()
+    duration = input(f" {Colors.BOLD}측정 시간 (초, 기본: 5) > {Colors.ENDC}").strip()
+    try:
+        duration = float(duration) if duration else 5.0
+    except ValueError:
+        Messenger.error("REQUIRE_NUMBER")
+        return
+    Messenger.info(f"{iface} 카운터를 {MAX_HZ} Hz로 {duration}초간 샘플링합니다...")
+    try:
+        report = run_microburst_sampling(iface, get_link_speed_mbps(iface), MAX_HZ, duration)
+    except OSError as e:
+        Messenger.error(f"카운터 읽기 실패: {e}")
+        return
+    print_microburst_report(report)
+    input("\n메뉴로 돌아가려면 [Enter]를 누르세요...")
+
+_LIMIT_LABELS = {"rwnd_limited": "수신 윈도우 제한", "sndbuf_limited": "송신 버퍼 제한",
+                 "cwnd_limited": "혼잡 윈도우 제한", "idle": "유휴"}
+
+def print_flow_report(report):
+    """TCP 플로우(tcp_info) 분석 리포트 출력"""
+    summary = report["summary"]
+    print(f"\n{Colors.BOLD}{Colors.HEADER}🔎 TCP 플로우 분석 (전체 소켓 {report['sockets']}개, "
+          f"대상 {summary['flows']}개){Colors.ENDC}")
+    if not summary["flows"]:
+        print(f"    {Colors.WARNING}조건에 맞는 TCP 플로우가 없습니다.{Colors.ENDC}")
+        return
+    counts = ", ".join(f"{_LIMIT_LABELS[k]} {v}" for k, v in summary["by_limit"].items() if v)
+    print(f"    - 제한 요인별 플로우 수: {counts}")
+    if summary["dominant"]:
+        share = summary["busy_time_share"]
+        shares = " / ".join(f"{_LIMIT_LABELS[k]} {v * 100:.1f}%" for k, v in share.items())
+        print(f"    - busy 시간 점유율: {shares}")
+        print(f"    - {Colors.BOLD}지배적 제한 요인: {_LIMIT_LABELS[summary['dominant']]}{Colors.ENDC}")
+        print(f"      {Colors.OKCYAN}👉 조정 항목: {summary['recommendation']}{Colors.ENDC}")
+    print(f"    - 누적 재전송: {summary['total_retrans']}")
+
+    print(f"\n  {Colors.BOLD}{'로컬':>22} {'상대':>22} {'RTT(ms)':>8} {'cwnd':>6} {'전송률':>12} {'재전송':>6}  제한{Colors.ENDC}")
+    for f in report["top_flows"]:
+        print(f"  {f['src'] + ':' + str(f['sport']):>22} {f['dst'] + ':' + str(f['dport']):>22} "
+              f"{f['rtt_us'] / 1000:>8.2f} {f['cwnd']:>6} {_format_bps(f['delivery_rate'] * 8):>12} "
+              f"{f['total_retrans']:>6}  {_LIMIT_LABELS[f['limit']]}")
+
+def run_flow_check():
+    """INET_DIAG 로 현재 TCP 플로우의 제한 요인 분석 (대화형)"""
+    from inet_diag import analyze_flows
+    if platform.system() != "Linux":
+        Messenger.error("OS_NOT_SUPPORTED: TCP 플로우 분석은 Linux 전용입니다.")
+        return
+    port = input(f" {Colors.BOLD}포트 필터 (엔터 시 전체) > {Colors.ENDC}").strip()
+    peer = input(f" {Colors.BOLD}상대 주소 필터 (엔터 시 전체) > {Colors.ENDC}").strip()
+    try:
+        report = analyze_flows(port=int(port) if port else None, peer=peer or None)
+    except ValueError:
+        Messenger.error("REQUIRE_NUMBER")
+        return
+    except OSError as e:
+        Messenger.error(f"INET_DIAG 조회 실패: {e}")
+        return
+    print_flow_report(report)
+    input("\n메뉴로 돌아가려면 [Enter]를 누르세요...")
@@ -0,0 +1,322 @@
+import array
+import fcntl
+import socket
+import struct
+
+SIOCETHTOOL = 0x8946
+
+# --- ethtool 명령 번호 (include/uapi/linux/ethtool.h) ---
+ETHTOOL_GSET = 0x01
+ETHTOOL_GDRVINFO = 0x03
+ETHTOOL_GLINK = 0x0a
+ETHTOOL_GCOALESCE = 0x0e
+ETHTOOL_GRINGPARAM = 0x10
+ETHTOOL_SRINGPARAM = 0x11
+ETHTOOL_GPAUSEPARAM = 0x12
+ETHTOOL_GSTRINGS = 0x1b
+ETHTOOL_GSTATS = 0x1d
+ETHTOOL_GSSET_INFO = 0x37
+ETHTOOL_GFEATURES = 0x3a
+ETHTOOL_SFEATURES = 0x3b
+ETHTOOL_GCHANNELS = 0x3c
+ETHTOOL_SCHANNELS = 0x3d
+ETHTOOL_GLINKSETTINGS = 0x4c
+
+ETH_SS_STATS = 1
+ETH_SS_FEATURES = 4
+ETH_GSTRING_LEN = 32
+
+SPEED_UNKNOWN = 0xffffffff
+DUPLEX_NAMES = {0: "Half", 1: "Full"}
+
+IFNAMSIZ = 16
+_IFREQ_SIZE = 40
+
+# --- 구조체 레이아웃 ---
+_LINK_SETTINGS = struct.Struct("=IIBBBBBBBbBBBB28x")  # ethtool_link_settings 헤더 (48 bytes)
+_ETHTOOL_CMD = struct.Struct("=IIIHBBBBBBIIHBBI8x")   # ethtool_cmd (레거시 GSET, 44 bytes)
+_DRVINFO = struct.Struct("=I32s32s32s32s32s12sIIIII")
+_SSET_INFO = struct.Struct("=IIQ")
+
+RING_FIELDS = ("rx_max", "rx_mini_max", "rx_jumbo_max", "tx_max",
+               "rx", "rx_mini", "rx_jumbo", "tx")
+CHANNEL_FIELDS = ("max_rx", "max_tx", "max_other", "max_combined",
+                  "rx", "tx", "other", "combined")
+PAUSE_FIELDS = ("autoneg", "rx", "tx")
+COALESCE_FIELDS = (
+    "rx_usecs", "rx_frames", "rx_usecs_irq", "rx_frames_irq",
+    "tx_usecs", "tx_frames", "tx_usecs_irq", "tx_frames_irq",
+    "stats_block_usecs", "adaptive_rx", "adaptive_tx",
+    "pkt_rate_low", "rx_usecs_low", "rx_frames_low", "tx_usecs_low", "tx_frames_low",
+    "pkt_rate_high", "rx_usecs_high", "rx_frames_high", "tx_usecs_high", "tx_frames_high",
+    "rate_sample_interval",
+)
+
+class SocketIoctlBackend:
+    """실제 커널에 SIOCETHTOOL ioctl을 보내는 기본 백엔드"""
+
+    def __init__(self):
+        self._sock = None
+
+    def __call__(self, ifname, buf):
+        """buf(bytearray)를 ethtool 명령 구조체로 보내고 커널 응답으로 덮어씀"""
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        data = array.array('B', bytes(buf))
+        addr, _ = data.buffer_info()
+        ifreq = struct.pack(f"{IFNAMSIZ}sP", ifname.encode()[:IFNAMSIZ - 1], addr)
+        ifreq += b"\0" * (_IFREQ_SIZE - len(ifreq))
+        fcntl.ioctl(self._sock.fileno(), SIOCETHTOOL, ifreq)
+        buf[:] = data.tobytes()
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+_default_backend = None
+
+def get_backend():
+    """프로세스 전역 ioctl 백엔드 반환"""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = SocketIoctlBackend()
+    return _default_backend
+
+def _u32_cmd(backend, ifname, cmd, fields):
+    """cmd + u32 필드 배열 형태의 단순 ethtool 구조체 조회"""
+    fmt = struct.Struct(f"={len(fields) + 1}I")
+    buf = bytearray(fmt.pack(cmd, *([0] * len(fields))))
+    backend(ifname, buf)
+    return dict(zip(fields, fmt.unpack(buf)[1:]))
+
+def get_link_settings(ifname, backend=None):
+    """링크 속도/듀플렉스/autoneg (GLINKSETTINGS, 미지원 시 GSET)"""
+    backend = backend or get_backend()
+    try:
+        # 1차 호출은 link mode 비트맵 길이(음수)를 돌려주는 핸드셰이크
+        buf = bytearray(_LINK_SETTINGS.size)
+        _LINK_SETTINGS.pack_into(buf, 0, ETHTOOL_GLINKSETTINGS, *([0] * 13))
+        backend(ifname, buf)
+        nwords = -_LINK_SETTINGS.unpack(bytes(buf[:_LINK_SETTINGS.size]))[9]
+        if nwords <= 0:
+            raise OSError("link_mode_masks_nwords handshake failed")
+        buf = bytearray(_LINK_SETTINGS.size + 3 * 4 * nwords)
+        _LINK_SETTINGS.pack_into(buf, 0, ETHTOOL_GLINKSETTINGS, 0, 0, 0, 0, 0, 0, 0, 0, nwords, 0, 0, 0, 0)
+        backend(ifname, buf)
+        fields = _LINK_SETTINGS.unpack(bytes(buf[:_LINK_SETTINGS.size]))
+        speed, duplex, autoneg = fields[1], fields[2], fields[5]
+    except OSError:
+        buf = bytearray(_ETHTOOL_CMD.size)
+        _ETHTOOL_CMD.pack_into(buf, 0, ETHTOOL_GSET, *([0] * 15))
+        backend(ifname, buf)
+        fields = _ETHTOOL_CMD.unpack(bytes(buf))
+        speed = fields[3] | (fields[12] << 16)
+        duplex, autoneg = fields[4], fields[8]
+        if speed in (0xffff, 0xffffffff):
+            speed = SPEED_UNKNOWN
+    return {
+        "speed_mbps": None if speed in (0, SPEED_UNKNOWN) else speed,
+        "duplex": DUPLEX_NAMES.get(duplex, "Unknown"),
+        "autoneg": bool(autoneg),
+    }
+
+def get_driver_info(ifname, backend=None):
+    """드라이버 이름/버전/펌웨어/버스 정보 (GDRVINFO)"""
+    backend = backend or get_backend()
+    buf = bytearray(_DRVINFO.size)
+    struct.pack_into("=I", buf, 0, ETHTOOL_GDRVINFO)
+    backend(ifname, buf)
+    fields = _DRVINFO.unpack(bytes(buf))
+    text = lambda b: b.split(b"\0", 1)[0].decode(errors="replace")
+    return {"driver": text(fields[1]), "version": text(fields[2]),
+            "firmware": text(fields[3]), "bus_info": text(fields[4])}
+
+def get_link_detected(ifname, backend=None):
+    """캐리어 감지 여부 (GLINK)"""
+    return bool(_u32_cmd(backend or get_backend(), ifname, ETHTOOL_GLINK, ("link",))["link"])
+
+def get_ring_params(ifname, backend=None):
+    """Ring Buffer 최대/현재 크기 (GRINGPARAM, `ethtool -g`)"""
+    return _u32_cmd(backend or get_backend(), ifname, ETHTOOL_GRINGPARAM, RING_FIELDS)
+
+def set_ring_params(ifname, backend=None, **sizes):
+    """Ring Buffer 크기 변경 (SRINGPARAM, `ethtool -G`). 지정하지 않은 항목은 현재 값 유지"""
+    backend = backend or get_backend()
+    current = get_ring_params(ifname, backend)
+    current.update(sizes)
+    fmt = struct.Struct(f"={len(RING_FIELDS) + 1}I")
+    buf = bytearray(fmt.pack(ETHTOOL_SRINGPARAM, *(current[f] for f in RING_FIELDS)))
+    backend(ifname, buf)
+    return current
+
+def get_channels(ifname, backend=None):
+    """큐/채널 최대/현재 개수 (GCHANNELS, `ethtool -l`)"""
+    return _u32_cmd(backend or get_backend(), ifname, ETHTOOL_GCHANNELS, CHANNEL_FIELDS)
+
+def set_channels(ifname, backend=None, **counts):
+    """큐/채널 개수 변경 (SCHANNELS, `ethtool -L`). 지정하지 않은 항목은 현재 값 유지"""
+    backend = backend or get_backend()
+    current = get_channels(ifname, backend)
+    current.update(counts)
+    fmt = struct.Struct(f"={len(CHANNEL_FIELDS) + 1}I")
+    buf = bytearray(fmt.pack(ETHTOOL_SCHANNELS, *(current[f] for f in CHANNEL_FIELDS)))
+    backend(ifname, buf)
+    return current
+
+# 설정 그룹별 ethtool 명령 플래그. 설정 변경은 CAP_NET_ADMIN 이 필요하므로 ioctl 대신
+# 권한 헬퍼(priv_helper)에서 이 명령으로 실행한다
+ETHTOOL_SET_FLAGS = {"ring": "-G", "channels": "-L", "features": "-K", "coalesce": "-C", "pause": "-A"}
+# 0/1 로 저장되지만 ethtool 명령에서는 on/off 로 지정하는 필드
+_TOGGLE_FIELDS = {"pause": PAUSE_FIELDS, "coalesce": ("adaptive_rx", "adaptive_tx")}
+
+def ethtool_command(ifname, group, fields):
+    """설정 그룹의 {필드: 값} 을 ethtool 명령 인자로 변환 (예: ring {"rx": 4096} → ethtool -G eth0 rx 4096)"""
+    cmd = ["ethtool", ETHTOOL_SET_FLAGS[group], ifname]
+    for field, value in fields.items():
+        if isinstance(value, bool) or field in _TOGGLE_FIELDS.get(group, ()):
+            value = "on" if value else "off"
+        cmd += [field.replace("_", "-"), str(value)]
+    return cmd
+
+def get_coalesce(ifname, backend=None):
+    """인터럽트 병합 설정 (GCOALESCE, `ethtool -c`)"""
+    return _u32_cmd(backend or get_backend(), ifname, ETHTOOL_GCOALESCE, COALESCE_FIELDS)
+
+def get_pause(ifname, backend=None):
+    """Flow Control 설정 (GPAUSEPARAM, `ethtool -a`)"""
+    return _u32_cmd(backend or get_backend(), ifname, ETHTOOL_GPAUSEPARAM, PAUSE_FIELDS)
+
+def _string_set(ifname, backend, sset):
+    """문자열 집합(기능명/통계명 등) 조회 (GSSET_INFO + GSTRINGS)"""
+    buf = bytearray(_SSET_INFO.size + 4)
+    _SSET_INFO.pack_into(buf, 0, ETHTOOL_GSSET_INFO, 0, 1 << sset)
+    backend(ifname, buf)
+    count = struct.unpack_from("=I", buf, _SSET_INFO.size)[0]
+    buf = bytearray(12 + count * ETH_GSTRING_LEN)
+    struct.pack_into("=III", buf, 0, ETHTOOL_GSTRINGS, sset, count)
+    backend(ifname, buf)
+    return [bytes(buf[12 + i * ETH_GSTRING_LEN:12 + (i + 1) * ETH_GSTRING_LEN]).split(b"\0", 1)[0].decode()
+            for i in range(count)]
+
+def get_features(ifname, backend=None):
+    """오프로드 기능 플래그 (GFEATURES, `ethtool -k`)
+
+    반환값: {기능명: {"active": bool, "requested": bool, "fixed": bool}}
+    """
+    backend = backend or get_backend()
+    names = _string_set(ifname, backend, ETH_SS_FEATURES)
+    blocks = (len(names) + 31) // 32
+    buf = bytearray(8 + blocks * 16)
+    struct.pack_into("=II", buf, 0, ETHTOOL_GFEATURES, blocks)
+    backend(ifname, buf)
+    features = {}
+    for i, name in enumerate(names):
+        if not name:
+            continue
+        available, requested, active, never_changed = struct.unpack_from("=4I", buf, 8 + (i // 32) * 16)
+        bit = 1 << (i % 32)
+        features[name] = {
+            "active": bool(active & bit),
+            "requested": bool(requested & bit),
+            # 변경 불가 = 드라이버가 제공하지 않거나 never_changed로 고정된 기능
+            "fixed": not (available & bit) or bool(never_changed & bit),
+        }
+    return features
+
+def get_stats(ifname, backend=None):
+    """드라이버 확장 통계 (GSTATS, `ethtool -S`) {이름: 값}"""
+    backend = backend or get_backend()
+    names = _string_set(ifname, backend, ETH_SS_STATS)
+    buf = bytearray(8 + 8 * len(names))
+    struct.pack_into("=II", buf, 0, ETHTOOL_GSTATS, len(names))
+    backend(ifname, buf)
+    values = struct.unpack_from(f"={len(names)}Q", buf, 8)
+    return dict(zip(names, values))
+
+def set_features(ifname, changes, backend=None):
+    """오프로드 기능 on/off (SFEATURES, `ethtool -K`). changes: {기능명: bool}
+
+    커널은 일부 요청을 조용히 무시할 수 있으므로 호출 측에서 get_features()로 결과를 확인해야 한다.
+    """
+    backend = backend or get_backend()
+    names = _string_set(ifname, backend, ETH_SS_FEATURES)
+    index = {name: i for i, name in enumerate(names) if name}
+    unknown = [name for name in changes if name not in index]
+    if unknown:
+        raise OSError(f"unknown feature: {', '.join(unknown)}")
+    blocks = (len(names) + 31) // 32
+    valid, requested = [0] * blocks, [0] * blocks
+    for name, enabled in changes.items():
+        i = index[name]
+        valid[i // 32] |= 1 << (i % 32)
+        if enabled:
+            requested[i // 32] |= 1 << (i % 32)
+    buf = bytearray(8 + blocks * 8)
+    struct.pack_into("=II", buf, 0, ETHTOOL_SFEATURES, blocks)
+    for b in range(blocks):
+        struct.pack_into("=II", buf, 8 + b * 8, valid[b], requested[b])
+    backend(ifname, buf)
+
+def read_sysfs_speed(interface):
+    """/sys/class/net/<if>/speed 에서 링크 속도(Mbps) 읽기 (알 수 없으면 0)"""
+    try:
+        with open(f"/sys/class/net/{interface}/speed", 'r') as f:
+            speed = int(f.read().strip())
+        return speed if speed > 0 else 0
+    except (OSError, ValueError):
+        return 0
+
+def get_speed_mbps(ifname, backend=None):
+    """링크 속도(Mbps): ioctl 우선, 실패 시 sysfs (알 수 없으면 None)"""
+    try:
+        speed = get_link_settings(ifname, backend)["speed_mbps"]
+        if speed:
+            return speed
+    except OSError:
+        pass
+    return read_sysfs_speed(ifname) or None
+
+def get_nic_info(ifname, backend=None):
+    """NIC 하나의 링크/드라이버/Ring/병합/채널/페이싱/오프로드 정보를 하나의 레코드로 수집
+
+    항목별 ioctl이 실패하면 해당 값은 None 이 되고 사유가 "errors" 에 기록된다.
+    링크 속도는 ioctl 실패 시 /sys/class/net/<if>/speed 로 대체한다.
+    """
+    backend = backend or get_backend()
+    info = {"name": ifname, "speed_mbps": None, "speed_source": None, "duplex": None,
+            "autoneg": None, "link_detected": None, "driver": None,
+            "ring": None, "channels": None, "coalesce": None, "pause": None,
+            "features": None, "errors": {}}
+
+    def query(key, fn):
+        try:
+            return fn(ifname, backend)
+        except OSError as e:
+            info["errors"][key] = e.strerror or str(e)
+            return None
+
+    link = query("link", get_link_settings)
+    if link and link["speed_mbps"]:
+        info.update(link)
+        info["speed_source"] = "ioctl"
+    else:
+        if link:
+            info.update(link)
+        speed = read_sysfs_speed(ifname)
+        if speed:
+            info["speed_mbps"] = speed
+            info["speed_source"] = "sysfs"
+
+    info["link_detected"] = query("link_detected", get_link_detected)
+    info["driver"] = query("driver", get_driver_info)
+    info["ring"] = query("ring", get_ring_params)
+    info["channels"] = query("channels", get_channels)
+    info["coalesce"] = query("coalesce", get_coalesce)
+    info["pause"] = query("pause", get_pause)
+    info["features"] = query("features", get_features)
+    return info
+
+def format_speed(speed_mbps):
+    """Mbps 값을 ethtool 표기(10000Mb/s)로 변환"""
+    return f"{speed_mbps}Mb/s" if speed_mbps else "Unknown!"
@@ -0,0 +1,215 @@
+import socket
+import struct
+from array import array
+from netlink import NetlinkSocket, RTATTR
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+
+INET_DIAG_INFO = 2
+INET_DIAG_CONG = 4
+
+TCP_STATES = {1: "ESTAB", 2: "SYN-SENT", 3: "SYN-RECV", 4: "FIN-WAIT-1", 5: "FIN-WAIT-2",
+              6: "TIME-WAIT", 7: "CLOSE", 8: "CLOSE-WAIT", 9: "LAST-ACK", 10: "LISTEN", 11: "CLOSING"}
+TCP_LISTEN = 10
+TCP_TIME_WAIT = 6
+# 기본 덤프 대상: LISTEN/TIME-WAIT 을 제외한 모든 상태
+DEFAULT_STATES = 0xfff & ~((1 << TCP_LISTEN) | (1 << TCP_TIME_WAIT))
+
+INET_DIAG_REQ_V2 = struct.Struct("=BBBxI48s")
+# inet_diag_msg: family, state, timer, retrans, sport(be), dport(be), src[16], dst[16], if, cookie, expires, rqueue, wqueue, uid, inode
+INET_DIAG_MSG = struct.Struct("=BBBB2H16s16sI8xIIIII")
+
+# tcp_info 중 필요한 필드만 뽑는 고정 레이아웃 (include/uapi/linux/tcp.h, 192 bytes 까지)
+#   0 state / 1 ca_state / 2 retransmits ... 8 rto / 16 snd_mss ...
+TCP_INFO = struct.Struct(
+    "=B7x"        # tcpi_state + ca_state, retransmits, probes, backoff, options, wscale, flags
+    "I4xI4x"      # rto, (ato), snd_mss, (rcv_mss)
+    "4x4xI4x4x"   # (unacked, sacked), lost, (retrans, fackets)
+    "16x"         # last_data_sent .. last_ack_recv
+    "4x4xII4xI4x4x"  # (pmtu, rcv_ssthresh), rtt, rttvar, (snd_ssthresh), snd_cwnd, (advmss, reordering)
+    "4x4x"        # rcv_rtt, rcv_space
+    "I"           # total_retrans
+    "Q8x"         # pacing_rate, (max_pacing_rate)
+    "QQ"          # bytes_acked, bytes_received
+    "8x"          # segs_out, segs_in
+    "I4x8x"       # notsent_bytes, (min_rtt, data_segs_in, data_segs_out)
+    "Q"           # delivery_rate
+    "QQQ"         # busy_time, rwnd_limited, sndbuf_limited
+)
+
+# FlowTable 컬럼: (이름, array 타입코드)
+COLUMNS = (
+    ("family", "B"), ("state", "B"), ("sport", "H"), ("dport", "H"), ("inode", "I"),
+    ("rqueue", "I"), ("wqueue", "I"), ("rto_us", "I"), ("mss", "I"), ("lost", "I"),
+    ("rtt_us", "I"), ("rttvar_us", "I"), ("cwnd", "I"), ("total_retrans", "I"),
+    ("pacing_rate", "Q"), ("bytes_acked", "Q"), ("bytes_received", "Q"), ("notsent_bytes", "I"),
+    ("delivery_rate", "Q"), ("busy_us", "Q"), ("rwnd_limited_us", "Q"), ("sndbuf_limited_us", "Q"),
+)
+_INFO_COLUMNS = ("state", "rto_us", "mss", "lost", "rtt_us", "rttvar_us", "cwnd", "total_retrans",
+                 "pacing_rate", "bytes_acked", "bytes_received", "notsent_bytes",
+                 "delivery_rate", "busy_us", "rwnd_limited_us", "sndbuf_limited_us")
+
+LIMIT_RWND = "rwnd_limited"
+LIMIT_SNDBUF = "sndbuf_limited"
+LIMIT_CWND = "cwnd_limited"
+LIMIT_IDLE = "idle"
+
+# 지배적인 제한 요인별 조치 항목
+LIMIT_KNOBS = {
+    LIMIT_RWND: "수신측 net.ipv4.tcp_rmem / net.core.rmem_max (상대 호스트의 수신 윈도우)",
+    LIMIT_SNDBUF: "송신측 net.ipv4.tcp_wmem / net.core.wmem_max",
+    LIMIT_CWND: "혼잡제어(bbr) / fq 페이싱 / 경로 손실 점검",
+}
+
+class FlowTable:
+    """소켓별 tcp_info 를 필드별 array 컬럼으로 보관하는 압축 테이블"""
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        # 주소는 소켓당 16바이트씩 연속 저장 (IPv4 는 앞 4바이트 사용)
+        self.src = bytearray()
+        self.dst = bytearray()
+        self.cong = []
+
+    def __len__(self):
+        return len(self.columns["state"])
+
+    def address(self, i, which="dst"):
+        buf = self.dst if which == "dst" else self.src
+        family = self.columns["family"][i]
+        raw = bytes(buf[i * 16:(i + 1) * 16])
+        return socket.inet_ntop(family, raw[:4] if family == socket.AF_INET else raw)
+
+    def row(self, i):
+        """i 번째 소켓을 딕셔너리로 변환 (출력용)"""
+        row = {name: col[i] for name, col in self.columns.items()}
+        row["state"] = TCP_STATES.get(row["state"], str(row["state"]))
+        row["src"] = self.address(i, "src")
+        row["dst"] = self.address(i, "dst")
+        row["cong"] = self.cong[i]
+        row["limit"] = classify(row["busy_us"], row["rwnd_limited_us"], row["sndbuf_limited_us"])
+        return row
+
+    def select(self, port=None, peer=None):
+        """포트(sport 또는 dport) / 상대 주소로 필터링한 인덱스 목록"""
+        idx = range(len(self))
+        if port is not None:
+            sport, dport = self.columns["sport"], self.columns["dport"]
+            idx = [i for i in idx if sport[i] == port or dport[i] == port]
+        if peer is not None:
+            family = socket.AF_INET6 if ":" in peer else socket.AF_INET
+            packed = socket.inet_pton(family, peer)
+            fam, dst, n = self.columns["family"], self.dst, len(packed)
+            idx = [i for i in idx if fam[i] == family and dst[i * 16:i * 16 + n] == packed]
+        return list(idx)
+
+def classify(busy_us, rwnd_us, sndbuf_us):
+    """busy 시간 중 가장 큰 비중의 제한 요인 (ss -ti 의 busy/rwnd_limited/sndbuf_limited 기준)"""
+    if not busy_us:
+        return LIMIT_IDLE
+    cwnd_us = max(0, busy_us - rwnd_us - sndbuf_us)
+    return max(((rwnd_us, LIMIT_RWND), (sndbuf_us, LIMIT_SNDBUF), (cwnd_us, LIMIT_CWND)))[1]
+
+def _unpack_info(info):
+    if len(info) < TCP_INFO.size:
+        # 구버전 커널은 tcp_info 가 짧으므로 0으로 채워 동일 레이아웃으로 해석
+        info = bytes(info) + b"\0" * (TCP_INFO.size - len(info))
+    return TCP_INFO.unpack_from(info)
+
+def parse_tcp_info(info):
+    """getsockopt(TCP_INFO) 결과 바이트를 {컬럼: 값} 으로 변환 (FlowTable 과 같은 필드)"""
+    return dict(zip(_INFO_COLUMNS, _unpack_info(info)))
+
+def _append(table, body):
+    family, state, _timer, _retrans, sport, dport, src, dst, _ifindex, _expires, rqueue, wqueue, _uid, inode = \
+        INET_DIAG_MSG.unpack_from(body)
+    info = cong = None
+    offset, end = INET_DIAG_MSG.size, len(body)
+    while offset + RTATTR.size <= end:
+        length, atype = RTATTR.unpack_from(body, offset)
+        if length < RTATTR.size:
+            break
+        if atype == INET_DIAG_INFO:
+            info = body[offset + RTATTR.size:offset + length]
+        elif atype == INET_DIAG_CONG:
+            cong = bytes(body[offset + RTATTR.size:offset + length]).rstrip(b"\0").decode()
+        offset += (length + 3) & ~3
+
+    values = (state,) + (0,) * (len(_INFO_COLUMNS) - 1) if info is None else _unpack_info(info)
+
+    cols = table.columns
+    cols["family"].append(family)
+    cols["sport"].append(socket.ntohs(sport))
+    cols["dport"].append(socket.ntohs(dport))
+    cols["inode"].append(inode)
+    cols["rqueue"].append(rqueue)
+    cols["wqueue"].append(wqueue)
+    for name, value in zip(_INFO_COLUMNS, values):
+        cols[name].append(value)
+    table.src += src
+    table.dst += dst
+    table.cong.append(cong)
+
+def dump_tcp(families=(socket.AF_INET, socket.AF_INET6), states=DEFAULT_STATES):
+    """INET_DIAG 덤프로 모든 TCP 소켓의 tcp_info 를 FlowTable 로 수집"""
+    return dump_sockets(socket.IPPROTO_TCP, families, states)
+
+def dump_sockets(protocol, families=(socket.AF_INET, socket.AF_INET6), states=DEFAULT_STATES):
+    """INET_DIAG 소켓 덤프 (UDP 등 tcp_info 가 없는 프로토콜은 해당 컬럼이 0)"""
+    table = FlowTable()
+    ext = (1 << (INET_DIAG_INFO - 1)) | (1 << (INET_DIAG_CONG - 1))
+    with NetlinkSocket(NETLINK_SOCK_DIAG) as nl:
+        nl.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        for family in families:
+            req = INET_DIAG_REQ_V2.pack(family, protocol, ext, states, b"\0" * 48)
+            for mtype, body in nl.request(SOCK_DIAG_BY_FAMILY, req):
+                if mtype == SOCK_DIAG_BY_FAMILY:
+                    _append(table, body)
+    return table
+
+def summarize(table, indices=None):
+    """제한 요인별 플로우 수와 busy 시간 점유율 요약"""
+    cols = table.columns
+    indices = range(len(table)) if indices is None else indices
+    counts = {LIMIT_RWND: 0, LIMIT_SNDBUF: 0, LIMIT_CWND: 0, LIMIT_IDLE: 0}
+    busy = rwnd = sndbuf = retrans = 0
+    total = 0
+    for i in indices:
+        b, r, s = cols["busy_us"][i], cols["rwnd_limited_us"][i], cols["sndbuf_limited_us"][i]
+        counts[classify(b, r, s)] += 1
+        busy += b
+        rwnd += r
+        sndbuf += s
+        retrans += cols["total_retrans"][i]
+        total += 1
+    share = {}
+    if busy:
+        share = {LIMIT_RWND: round(rwnd / busy, 4), LIMIT_SNDBUF: round(sndbuf / busy, 4),
+                 LIMIT_CWND: round(max(0, busy - rwnd - sndbuf) / busy, 4)}
+    dominant = max(share, key=share.get) if share else None
+    return {
+        "flows": total,
+        "by_limit": counts,
+        "busy_time_share": share,
+        "dominant": dominant,
+        "recommendation": LIMIT_KNOBS.get(dominant),
+        "total_retrans": retrans,
+    }
+
+def top_flows(table, indices, key="delivery_rate", limit=10):
+    """key 컬럼 기준 상위 플로우를 행 딕셔너리 목록으로 반환"""
+    col = table.columns[key]
+    ordered = sorted(indices, key=lambda i: col[i], reverse=True)[:limit]
+    return [table.row(i) for i in ordered]
+
+def analyze_flows(port=None, peer=None, top=10):
+    """TCP 플로우 덤프 + 필터 + 제한 요인 요약 리포트"""
+    table = dump_tcp()
+    indices = table.select(port=port, peer=peer)
+    return {
+        "sockets": len(table),
+        "filter": {"port": port, "peer": peer},
+        "summary": summarize(table, indices),
+        "top_flows": top_flows(table, indices, limit=top),
+    }
@@ -0,0 +1,214 @@
+import os
+import re
+import json
+import time
+import platform
+import selectors
+import subprocess
+
+IPERF3 = "iperf3"
+DEFAULT_BASE_PORT = 5201
+# --json-stream (한 줄에 이벤트 하나) 을 지원하는 최소 버전
+JSON_STREAM_VERSION = (3, 17)
+
+EVENT_START = "start"
+EVENT_INTERVAL = "interval"
+EVENT_END = "end"
+EVENT_ERROR = "error"
+
+def iperf3_version(binary=IPERF3):
+    """(major, minor) 또는 설치되어 있지 않으면 None"""
+    try:
+        output = subprocess.check_output([binary, "--version"], stderr=subprocess.STDOUT, timeout=5).decode()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"iperf (\d+)\.(\d+)", output)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+def pin_cpus(iface=None):
+    """iperf3 인스턴스를 고정할 CPU 순서 (NIC 로컬 노드의 물리 코어 우선)"""
+    if platform.system() != "Linux":
+        return []
+    from queue_tuning import cpu_topology
+    from utils import get_default_interface
+    return cpu_topology(iface or get_default_interface())["order"]
+
+def client_command(server, port, duration=5, parallel=1, cpu=None, zerocopy=False,
+                   reverse=False, json_stream=True, binary=IPERF3):
+    cmd = [binary, "-c", server, "-p", str(port), "-t", str(duration), "-P", str(parallel),
+           "--json-stream" if json_stream else "-J", "--connect-timeout", "5000"]
+    if cpu is not None:
+        cmd += ["-A", str(cpu)]
+    if zerocopy:
+        cmd.append("-Z")
+    if reverse:
+        cmd.append("-R")
+    return cmd
+
+def server_command(port, cpu=None, bind=None, binary=IPERF3):
+    # -1: 클라이언트 하나를 처리하고 종료
+    cmd = [binary, "-s", "-1", "-p", str(port)]
+    if bind:
+        cmd += ["-B", bind]
+    if cpu is not None:
+        cmd += ["-A", str(cpu)]
+    return cmd
+
+def parse_stream_line(line):
+    """--json-stream 한 줄을 (이벤트, 데이터) 로 변환 (JSON 이 아니면 None)"""
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict) or "event" not in obj:
+        return None
+    return obj["event"], obj.get("data")
+
+def events_from_json(text):
+    """-J 전체 출력을 --json-stream 과 같은 이벤트 목록으로 변환"""
+    try:
+        obj = json.loads(text)
+    except ValueError:
+        return [(EVENT_ERROR, "iperf3 JSON 출력을 해석할 수 없습니다")]
+    events = [(EVENT_START, obj.get("start", {}))]
+    events += [(EVENT_INTERVAL, i) for i in obj.get("intervals", [])]
+    if obj.get("error"):
+        events.append((EVENT_ERROR, obj["error"]))
+    elif "end" in obj:
+        events.append((EVENT_END, obj["end"]))
+    return events
+
+def new_instance(index, port, cpu):
+    return {"index": index, "port": port, "cpu": cpu, "intervals": [], "sent_bps": None, "received_bps": None,
+            "retransmits": None, "cpu_host_pct": None, "cpu_remote_pct": None, "error": None}
+
+def apply_event(instance, event, data):
+    """이벤트 하나를 인스턴스 결과에 반영. 구간 이벤트면 정리된 구간 레코드를 반환"""
+    if event == EVENT_INTERVAL:
+        total = (data or {}).get("sum", {})
+        record = {"start": total.get("start", 0.0), "end": total.get("end", 0.0),
+                  "bits_per_second": total.get("bits_per_second", 0.0),
+                  "retransmits": total.get("retransmits", 0), "omitted": total.get("omitted", False)}
+        instance["intervals"].append(record)
+        return record
+    if event == EVENT_END:
+        sent, received = data.get("sum_sent", {}), data.get("sum_received", {})
+        cpu = data.get("cpu_utilization_percent", {})
+        instance.update(sent_bps=sent.get("bits_per_second"), received_bps=received.get("bits_per_second"),
+                        retransmits=sent.get("retransmits"), cpu_host_pct=cpu.get("host_total"),
+                        cpu_remote_pct=cpu.get("remote_total"))
+    elif event == EVENT_ERROR:
+        instance["error"] = str(data)
+    return None
+
+def aggregate(instances):
+    """인스턴스별 결과를 구간 시계열과 합계로 통합"""
+    series = []
+    length = max((len(i["intervals"]) for i in instances), default=0)
+    for n in range(length):
+        rows = [i["intervals"][n] for i in instances if n < len(i["intervals"])]
+        series.append({"end": round(max(r["end"] for r in rows), 3),
+                       "bits_per_second": sum(r["bits_per_second"] for r in rows),
+                       "retransmits": sum(r["retransmits"] or 0 for r in rows),
+                       "instances": len(rows)})
+    done = [i for i in instances if i["received_bps"] is not None]
+
+    def total(key):
+        return sum(i[key] or 0 for i in done)
+    return {
+        "series": series,
+        "instances_ok": len(done),
+        "sent_bps": total("sent_bps"),
+        "received_bps": total("received_bps"),
+        "retransmits": total("retransmits"),
+        # 인스턴스별 CPU 사용률(코어 하나 기준)의 합
+        "cpu_host_pct": round(total("cpu_host_pct"), 1),
+        "cpu_remote_pct": round(total("cpu_remote_pct"), 1),
+    }
+
+def start_servers(count, base_port=DEFAULT_BASE_PORT, cpus=(), bind="127.0.0.1", binary=IPERF3):
+    """로컬 iperf3 서버를 포트별로 띄움 (클라이언트와 겹치지 않도록 CPU 목록 뒤쪽부터 고정)"""
+    servers = []
+    for i in range(count):
+        cpu = cpus[-1 - i % len(cpus)] if cpus else None
+        servers.append(subprocess.Popen(server_command(base_port + i, cpu, bind, binary),
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    # 서버가 listen 을 시작할 때까지 잠시 대기
+    time.sleep(0.3)
+    return servers
+
+def run_instances(server, count=1, base_port=DEFAULT_BASE_PORT, duration=5, parallel=1, cpus=(),
+                  zerocopy=False, reverse=False, binary=IPERF3, on_interval=None, json_stream=None):
+    """iperf3 클라이언트 count 개를 서로 다른 포트/CPU 로 동시에 실행하고 출력을 점진적으로 파싱
+
+    on_interval(instance, record): 구간 결과가 도착할 때마다 호출 (실시간 출력용)
+    """
+    if json_stream is None:
+        version = iperf3_version(binary)
+        if version is None:
+            raise FileNotFoundError(f"{binary} 를 찾을 수 없습니다")
+        json_stream = version >= JSON_STREAM_VERSION
+    selector = selectors.DefaultSelector()
+    procs, instances = [], []
+    for i in range(count):
+        cpu = cpus[i % len(cpus)] if cpus else None
+        instance = new_instance(i, base_port + i, cpu)
+        cmd = client_command(server, base_port + i, duration, parallel, cpu, zerocopy, reverse, json_stream, binary)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        os.set_blocking(proc.stdout.fileno(), False)
+        selector.register(proc.stdout, selectors.EVENT_READ, (instance, bytearray()))
+        procs.append(proc)
+        instances.append(instance)
+
+    deadline = time.monotonic() + duration + 15
+    open_pipes = count
+    while open_pipes and time.monotonic() < deadline:
+        for key, _ in selector.select(timeout=1.0):
+            instance, buf = key.data
+            chunk = os.read(key.fd, 65536)
+            if not chunk:
+                selector.unregister(key.fileobj)
+                open_pipes -= 1
+                if not json_stream:
+                    for event, data in events_from_json(bytes(buf)):
+                        record = apply_event(instance, event, data)
+                        if record and on_interval:
+                            on_interval(instance, record)
+                continue
+            buf += chunk
+            if not json_stream:
+                continue
+            *lines, rest = buf.split(b"\n")
+            buf[:] = rest
+            for line in lines:
+                parsed = parse_stream_line(line)
+                if parsed:
+                    record = apply_event(instance, *parsed)
+                    if record and on_interval:
+                        on_interval(instance, record)
+    for proc, instance in zip(procs, instances):
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        if instance["received_bps"] is None and instance["error"] is None:
+            instance["error"] = f"iperf3 종료 코드 {proc.returncode} (결과 없음)"
+    selector.close()
+    return {"server": server, "duration": duration, "parallel": parallel, "json_stream": json_stream,
+            "instances": instances, "aggregate": aggregate(instances)}
+
+def run_local(count=1, base_port=DEFAULT_BASE_PORT, duration=5, parallel=1, cpus=(),
+              zerocopy=False, binary=IPERF3, on_interval=None):
+    """로컬 iperf3 서버를 띄우고 루프백으로 측정 (서버는 측정 후 정리)"""
+    if iperf3_version(binary) is None:
+        raise FileNotFoundError(f"{binary} 를 찾을 수 없습니다")
+    servers = start_servers(count, base_port, cpus, binary=binary)
+    try:
+        return run_instances("127.0.0.1", count, base_port, duration, parallel, cpus, zerocopy,
+                             binary=binary, on_interval=on_interval)
+    finally:
+        for proc in servers:
+            if proc.poll() is None:
+                proc.terminate()
+            proc.wait()
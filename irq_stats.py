@@ -0,0 +1,276 @@
+import os
+import time
+
+PROC_ROOT = "/proc"
+SYS_CLASS_NET = "/sys/class/net"
+
+# softnet_stat 컬럼 (16진수): 0 processed, 1 dropped, 2 time_squeeze, ..., 12 cpu 번호(5.10+)
+_SOFTNET_CPU_COLUMN = 12
+
+# NET_RX 처리량이 이 비율 이상 한 코어에 몰리면 핫 코어로 판정
+HOT_SHARE = 0.5
+# 초당 NET_RX softirq 가 이보다 적으면 유휴 상태로 보고 집중도 판정을 생략
+MIN_NET_RX_RATE = 1000
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def parse_cpu_header(line):
+    """'CPU0 CPU1 ...' 헤더를 CPU 번호 목록으로 변환 (오프라인 CPU 는 헤더에서 빠짐)"""
+    return [int(tok[3:]) for tok in line.split()]
+
+def parse_interrupts(data, irqs=None):
+    """/proc/interrupts 를 (CPU 목록, {irq: (CPU별 카운트 tuple, 이름)}) 으로 변환
+
+    irqs 가 주어지면 해당 번호의 줄만 분할하므로 256 CPU 처럼 폭이 넓은 파일에서도
+    관심 없는 줄은 콜론 위치 확인만 하고 넘어간다.
+    """
+    lines = data.split(b"\n")
+    cpus = parse_cpu_header(lines[0])
+    ncpu = len(cpus)
+    wanted = None if irqs is None else {str(i).encode() for i in irqs}
+    result = {}
+    for line in lines[1:]:
+        head, sep, rest = line.partition(b":")
+        if not sep:
+            continue
+        head = head.strip()
+        if not head.isdigit() or (wanted is not None and head not in wanted):
+            continue
+        parts = rest.split(None, ncpu)
+        counts = tuple(int(v) for v in parts[:ncpu])
+        name = parts[ncpu].rsplit(None, 1)[-1].decode(errors="replace") if len(parts) > ncpu else ""
+        result[int(head)] = (counts, name)
+    return cpus, result
+
+def parse_irq_names(data):
+    """/proc/interrupts 의 {irq: 이름} (카운트 컬럼은 변환하지 않고 마지막 토큰만 취함)"""
+    names = {}
+    for line in data.split(b"\n")[1:]:
+        head, sep, rest = line.partition(b":")
+        head = head.strip()
+        if sep and head.isdigit():
+            names[int(head)] = rest.rsplit(None, 1)[-1].decode(errors="replace") if rest.strip() else ""
+    return names
+
+def parse_softirqs(data, names=(b"NET_RX", b"NET_TX")):
+    """/proc/softirqs 에서 지정한 softirq 줄만 {이름: CPU별 카운트 tuple} 으로 변환"""
+    lines = data.split(b"\n")
+    cpus = parse_cpu_header(lines[0])
+    result = {}
+    for line in lines[1:]:
+        name, sep, rest = line.partition(b":")
+        name = name.strip()
+        if sep and name in names:
+            result[name.decode()] = tuple(int(v) for v in rest.split())
+    return cpus, result
+
+def parse_softnet_stat(data):
+    """/proc/net/softnet_stat 을 {cpu: (processed, dropped, time_squeeze)} 로 변환"""
+    result = {}
+    for row, line in enumerate(data.split(b"\n")):
+        cols = line.split()
+        if len(cols) < 3:
+            continue
+        cpu = int(cols[_SOFTNET_CPU_COLUMN], 16) if len(cols) > _SOFTNET_CPU_COLUMN else row
+        result[cpu] = (int(cols[0], 16), int(cols[1], 16), int(cols[2], 16))
+    return result
+
+def _pci_device_dir(iface, sys_root):
+    """인터페이스의 MSI 벡터를 가진 장치 디렉터리 (virtio 는 상위 PCI 장치)"""
+    device = os.path.realpath(os.path.join(sys_root, iface, "device"))
+    for path in (device, os.path.dirname(device)):
+        if os.path.isdir(os.path.join(path, "msi_irqs")):
+            return device, path
+    return device, None
+
+def find_nic_irqs(iface, irq_names, sys_root=SYS_CLASS_NET):
+    """인터페이스에 속한 IRQ 번호 목록 (msi_irqs + IRQ 이름 매칭)
+
+    irq_names: {irq: 이름}. 이름에 인터페이스명 또는 장치명(virtio3 등)이 들어간 IRQ 를
+    큐 IRQ 로 보며, 이름으로 찾지 못하면 PCI 장치의 msi_irqs 전체를 사용한다 (mlx5 등).
+    """
+    device, pci = _pci_device_dir(iface, sys_root)
+    tokens = {iface}
+    if os.path.basename(device) != "device":
+        tokens.add(os.path.basename(device))
+    msi = set()
+    if pci:
+        msi = {int(n) for n in os.listdir(os.path.join(pci, "msi_irqs")) if n.isdigit()}
+
+    by_name = [irq for irq, name in irq_names.items()
+               if any(name == t or name.startswith(t + "-") or name.startswith(t + "@") for t in tokens)]
+    if by_name:
+        return sorted(by_name)
+    return sorted(irq for irq in irq_names if irq in msi)
+
+def read_affinity(irq, proc_root=PROC_ROOT):
+    """IRQ 의 실제(effective) 또는 설정된 affinity CPU 목록 문자열"""
+    for name in ("effective_affinity_list", "smp_affinity_list"):
+        try:
+            return _read(os.path.join(proc_root, "irq", str(irq), name)).decode().strip()
+        except OSError:
+            continue
+    return None
+
+def read_local_cpus(iface, sys_root=SYS_CLASS_NET):
+    """NIC 가 연결된 NUMA 노드의 CPU 목록 문자열 (없으면 None)"""
+    _, pci = _pci_device_dir(iface, sys_root)
+    try:
+        return _read(os.path.join(pci, "local_cpulist")).decode().strip() if pci else None
+    except OSError:
+        return None
+
+def read_numa_node(iface, sys_root=SYS_CLASS_NET):
+    """NIC 의 NUMA 노드 번호 (단일 노드/알 수 없으면 None)"""
+    _, pci = _pci_device_dir(iface, sys_root)
+    try:
+        node = int(_read(os.path.join(pci, "numa_node"))) if pci else -1
+    except (OSError, ValueError):
+        return None
+    return node if node >= 0 else None
+
+def parse_cpu_list(text):
+    """'0-3,8,10-11' 형식의 CPU 목록을 정수 리스트로 변환"""
+    cpus = []
+    for part in (text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.extend(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+def snapshot(irqs, proc_root=PROC_ROOT):
+    """IRQ/softirq/softnet 카운터 스냅샷"""
+    cpus, interrupts = parse_interrupts(_read(os.path.join(proc_root, "interrupts")), irqs)
+    sirq_cpus, softirqs = parse_softirqs(_read(os.path.join(proc_root, "softirqs")))
+    return {
+        "cpus": cpus,
+        "interrupts": {irq: counts for irq, (counts, _) in interrupts.items()},
+        "softirq_cpus": sirq_cpus,
+        "softirqs": softirqs,
+        "softnet": parse_softnet_stat(_read(os.path.join(proc_root, "net", "softnet_stat"))),
+    }
+
+_CPU_FIELDS = ("nic_irqs", "net_rx", "net_tx", "processed", "dropped", "time_squeeze")
+
+def _delta_by_cpu(cpus, before, after):
+    return {cpu: b - a for cpu, a, b in zip(cpus, before, after)}
+
+def diff(before, after):
+    """두 스냅샷에서 CPU별 증가량 계산 {cpu: {nic_irqs, net_rx, net_tx, processed, dropped, time_squeeze}}"""
+    per_cpu = {cpu: dict.fromkeys(_CPU_FIELDS, 0) for cpu in after["cpus"]}
+    queues = {}
+    for irq, counts in after["interrupts"].items():
+        prev = before["interrupts"].get(irq)
+        if prev is None:
+            continue
+        deltas = _delta_by_cpu(after["cpus"], prev, counts)
+        queues[irq] = deltas
+        for cpu, d in deltas.items():
+            per_cpu[cpu]["nic_irqs"] += d
+    for name, key in (("NET_RX", "net_rx"), ("NET_TX", "net_tx")):
+        prev, cur = before["softirqs"].get(name), after["softirqs"].get(name)
+        if prev and cur:
+            for cpu, d in _delta_by_cpu(after["softirq_cpus"], prev, cur).items():
+                per_cpu.setdefault(cpu, dict.fromkeys(_CPU_FIELDS, 0))[key] = d
+    for cpu, cur in after["softnet"].items():
+        prev = before["softnet"].get(cpu)
+        if prev and cpu in per_cpu:
+            for i, key in enumerate(("processed", "dropped", "time_squeeze")):
+                # 32비트 카운터 랩어라운드 보정
+                per_cpu[cpu][key] = (cur[i] - prev[i]) % (1 << 32)
+    return per_cpu, queues
+
+def suggest_spread(irqs, local_cpus, all_cpus):
+    """큐 IRQ 를 NIC 로컬 CPU 에 순서대로 1:1 분산하는 affinity 제안 {irq: cpu}"""
+    pool = [c for c in local_cpus if c in all_cpus] or list(all_cpus)
+    return {irq: pool[i % len(pool)] for i, irq in enumerate(irqs)} if pool else {}
+
+def evaluate(per_cpu, queues, interval, local_cpus=None):
+    """CPU별 증가량에서 핫 코어와 권장 조치를 도출"""
+    cpus = sorted(per_cpu)
+    findings = []
+    total_rx = sum(v["net_rx"] for v in per_cpu.values())
+    hot = []
+    if len(cpus) > 1 and interval and total_rx / interval >= MIN_NET_RX_RATE:
+        for cpu in cpus:
+            share = per_cpu[cpu]["net_rx"] / total_rx
+            if share >= HOT_SHARE:
+                hot.append(cpu)
+                findings.append({
+                    "message": f"CPU {cpu} 가 NET_RX softirq 의 {share * 100:.0f}% 를 처리합니다 (단일 코어 병목).",
+                    "knobs": ["/proc/irq/*/smp_affinity_list", "ethtool -L combined", "rps_cpus"],
+                })
+
+    active_queues = {irq: d for irq, d in queues.items() if sum(d.values())}
+    irq_cpus = {cpu for d in active_queues.values() for cpu, v in d.items() if v}
+    if len(active_queues) > 1 and len(irq_cpus) == 1 and len(cpus) > 1:
+        findings.append({
+            "message": f"활성 큐 IRQ {len(active_queues)}개가 모두 CPU {next(iter(irq_cpus))} 에서 처리됩니다. "
+                       "큐별로 서로 다른 코어에 affinity 를 분산하세요.",
+            "knobs": ["/proc/irq/*/smp_affinity_list", "irqbalance"],
+        })
+    elif len(queues) <= 1 and len(cpus) > 1 and total_rx:
+        findings.append({
+            "message": "NIC 큐 IRQ 가 1개 이하입니다. 멀티 큐(ethtool -L) 또는 RPS 로 수신 처리를 분산하세요.",
+            "knobs": ["ethtool -L combined", "/sys/class/net/*/queues/rx-*/rps_cpus"],
+        })
+
+    squeeze = {cpu: v["time_squeeze"] for cpu, v in per_cpu.items() if v["time_squeeze"]}
+    if squeeze:
+        findings.append({
+            "message": f"time_squeeze 증가 (CPU {', '.join(map(str, sorted(squeeze)))}): "
+                       "한 번의 NAPI 폴링 예산 안에 패킷을 다 처리하지 못했습니다.",
+            "knobs": ["net.core.netdev_budget", "net.core.netdev_budget_usecs"],
+        })
+    dropped = {cpu: v["dropped"] for cpu, v in per_cpu.items() if v["dropped"]}
+    if dropped:
+        findings.append({
+            "message": f"backlog 초과 드롭 {sum(dropped.values())}건 (CPU {', '.join(map(str, sorted(dropped)))}).",
+            "knobs": ["net.core.netdev_max_backlog"],
+        })
+        hot.extend(c for c in dropped if c not in hot)
+
+    suggestion = {}
+    if findings and len(queues) > 1:
+        suggestion = suggest_spread(sorted(queues), local_cpus or [], cpus)
+    return sorted(hot), findings, suggestion
+
+def analyze(iface, interval=1.0, proc_root=PROC_ROOT, sys_root=SYS_CLASS_NET):
+    """interval 초 동안 NIC 큐 IRQ/softirq/softnet 변화를 측정하여 리포트 반환"""
+    irq_names = parse_irq_names(_read(os.path.join(proc_root, "interrupts")))
+    irqs = find_nic_irqs(iface, irq_names, sys_root)
+
+    before = snapshot(irqs, proc_root)
+    start = time.monotonic()
+    time.sleep(interval)
+    after = snapshot(irqs, proc_root)
+    elapsed = time.monotonic() - start
+
+    per_cpu, queues = diff(before, after)
+    local_cpus = parse_cpu_list(read_local_cpus(iface, sys_root))
+    hot, findings, suggestion = evaluate(per_cpu, queues, elapsed, local_cpus)
+    total_rx = sum(v["net_rx"] for v in per_cpu.values())
+
+    return {
+        "interface": iface,
+        "interval_s": round(elapsed, 3),
+        "online_cpus": len(after["cpus"]),
+        "local_cpus": local_cpus,
+        "queues": [{
+            "irq": irq,
+            "name": irq_names.get(irq, ""),
+            "affinity": read_affinity(irq, proc_root),
+            "count": sum(queues.get(irq, {}).values()),
+            "cpus": {cpu: d for cpu, d in queues.get(irq, {}).items() if d},
+        } for irq in irqs],
+        # 활동이 있었던 CPU 만 포함 (256 CPU 환경의 출력 크기 제한)
+        "per_cpu": {cpu: dict(v, net_rx_share=round(v["net_rx"] / total_rx, 4) if total_rx else 0.0)
+                    for cpu, v in sorted(per_cpu.items()) if any(v.values())},
+        "hot_cores": hot,
+        "findings": findings,
+        "suggested_affinity": suggestion,
+    }
@@ -0,0 +1,156 @@
+import time
+
+SNMP_PATHS = ("/proc/net/snmp", "/proc/net/netstat")
+SOCKSTAT_PATH = "/proc/net/sockstat"
+
+# 유의미한 증가가 관측되면 해당 NetTune 튜닝 항목을 제안하는 규칙
+# (그룹, 카운터, 관련 튜닝 항목, 설명)
+COUNTER_RULES = [
+    ("TcpExt", "TCPRcvQDrop", ["net.ipv4.tcp_rmem", "net.core.rmem_max"],
+     "수신 큐가 가득 차 세그먼트가 버려졌습니다. 수신 버퍼 최대값을 늘리세요."),
+    ("TcpExt", "TCPOFODrop", ["net.ipv4.tcp_rmem", "net.core.rmem_max"],
+     "Out-of-order 큐 공간 부족으로 세그먼트가 버려졌습니다."),
+    ("TcpExt", "PruneCalled", ["net.ipv4.tcp_rmem", "net.ipv4.tcp_mem"],
+     "수신 버퍼 메모리 부족으로 큐 정리(prune)가 발생했습니다."),
+    ("TcpExt", "RcvPruned", ["net.ipv4.tcp_rmem", "net.ipv4.tcp_mem"],
+     "prune 후에도 공간이 부족해 수신 데이터가 버려졌습니다."),
+    ("TcpExt", "TCPMemoryPressures", ["net.ipv4.tcp_mem"],
+     "TCP 전역 메모리가 pressure 임계값에 도달했습니다."),
+    ("TcpExt", "TCPBacklogDrop", ["net.ipv4.tcp_rmem", "net.core.rmem_max"],
+     "소켓 backlog 초과로 패킷이 버려졌습니다."),
+    ("TcpExt", "TCPWantZeroWindowAdv", ["net.ipv4.tcp_rmem"],
+     "수신 윈도우가 0으로 광고되었습니다. 애플리케이션 소비 속도 또는 수신 버퍼를 확인하세요."),
+    ("TcpExt", "ListenOverflows", ["net.core.somaxconn", "net.ipv4.tcp_max_syn_backlog"],
+     "listen 큐 초과로 연결 요청이 버려졌습니다."),
+    ("Udp", "RcvbufErrors", ["net.core.rmem_max", "net.core.rmem_default"],
+     "UDP 수신 버퍼 부족으로 데이터그램이 버려졌습니다. (튜닝 > UDP 튜닝)"),
+    ("Udp", "SndbufErrors", ["net.core.wmem_max", "net.core.wmem_default"],
+     "UDP 송신 버퍼 부족으로 전송이 실패했습니다. (튜닝 > UDP 튜닝)"),
+    ("Udp", "InErrors", ["net.core.rmem_max"],
+     "UDP 수신 오류가 발생했습니다. (대부분 수신 버퍼 부족)"),
+]
+
+# 참고용으로 함께 보고하는 카운터 (단독으로는 튜닝 대상 아님)
+INFO_COUNTERS = [("TcpExt", "TCPOFOQueue"), ("Tcp", "OutSegs"), ("Tcp", "InSegs"),
+                 ("Udp", "InDatagrams"), ("Udp", "OutDatagrams")]
+
+# 재전송 비율 경고 임계값 (RetransSegs / OutSegs)
+RETRANS_WARN_RATIO = 0.01
+
+def parse_snmp_text(text):
+    """/proc/net/snmp, /proc/net/netstat 형식(헤더/값 줄 쌍)을 {그룹: {카운터: 값}} 으로 변환"""
+    result = {}
+    lines = text.splitlines()
+    for header, values in zip(lines[::2], lines[1::2]):
+        group, _, names = header.partition(":")
+        vgroup, _, nums = values.partition(":")
+        if group != vgroup:
+            continue
+        result[group] = {name: int(v) for name, v in zip(names.split(), nums.split())}
+    return result
+
+def parse_sockstat_text(text):
+    """/proc/net/sockstat 을 {프로토콜: {항목: 값}} 으로 변환"""
+    result = {}
+    for line in text.splitlines():
+        proto, _, rest = line.partition(":")
+        fields = rest.split()
+        result[proto] = {k: int(v) for k, v in zip(fields[::2], fields[1::2])}
+    return result
+
+def snapshot(paths=SNMP_PATHS):
+    """SNMP/netstat 카운터 스냅샷"""
+    counters = {}
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                counters.update(parse_snmp_text(f.read()))
+        except OSError:
+            continue
+    return counters
+
+def read_sockstat(path=SOCKSTAT_PATH):
+    """소켓 사용량 게이지 (sockstat)"""
+    try:
+        with open(path, 'r') as f:
+            return parse_sockstat_text(f.read())
+    except OSError:
+        return {}
+
+def diff(before, after):
+    """두 스냅샷의 카운터 증가량 {그룹: {카운터: delta}} (변화 없는 항목 제외)"""
+    deltas = {}
+    for group, values in after.items():
+        prev = before.get(group, {})
+        changed = {k: v - prev[k] for k, v in values.items() if k in prev and v != prev[k]}
+        if changed:
+            deltas[group] = changed
+    return deltas
+
+def _tcp_mem_pressure(sockstat, tcp_mem):
+    """sockstat TCP mem(페이지)과 tcp_mem pressure 임계값 비교"""
+    mem = sockstat.get("TCP", {}).get("mem")
+    if mem is None or not isinstance(tcp_mem, tuple) or len(tcp_mem) != 3:
+        return None
+    return {"pages": mem, "pressure_pages": tcp_mem[1], "max_pages": tcp_mem[2],
+            "pressure_pct": round(mem / tcp_mem[1] * 100, 1) if tcp_mem[1] else None}
+
+def evaluate(deltas, interval, sockstat=None, tcp_mem=None):
+    """카운터 증가량을 규칙에 대입하여 발견 사항 목록 생성"""
+    findings = []
+    for group, counter, knobs, message in COUNTER_RULES:
+        delta = deltas.get(group, {}).get(counter, 0)
+        if delta > 0:
+            findings.append({
+                "counter": f"{group}.{counter}",
+                "delta": delta,
+                "rate_per_s": round(delta / interval, 2) if interval else None,
+                "knobs": knobs,
+                "message": message,
+            })
+
+    tcp = deltas.get("Tcp", {})
+    out_segs = tcp.get("OutSegs", 0)
+    retrans = tcp.get("RetransSegs", 0)
+    if out_segs and retrans / out_segs >= RETRANS_WARN_RATIO:
+        findings.append({
+            "counter": "Tcp.RetransSegs",
+            "delta": retrans,
+            "rate_per_s": round(retrans / interval, 2) if interval else None,
+            "ratio": round(retrans / out_segs, 4),
+            "knobs": ["net.ipv4.tcp_congestion_control", "net.core.default_qdisc"],
+            "message": f"재전송 비율 {retrans / out_segs * 100:.2f}%. BBR/fq 페이싱 적용을 검토하세요.",
+        })
+
+    pressure = _tcp_mem_pressure(sockstat or {}, tcp_mem)
+    if pressure and pressure["pressure_pct"] is not None and pressure["pressure_pct"] >= 80:
+        findings.append({
+            "counter": "sockstat.TCP.mem",
+            "delta": None,
+            "rate_per_s": None,
+            "knobs": ["net.ipv4.tcp_mem"],
+            "message": f"TCP 메모리 사용량이 pressure 임계값의 {pressure['pressure_pct']}%입니다.",
+        })
+    return findings
+
+def analyze(interval=1.0):
+    """interval 초 동안의 커널 카운터 변화를 측정하여 리포트 반환"""
+    from sysctl_reader import read_sysctl
+
+    before = snapshot()
+    start = time.monotonic()
+    time.sleep(interval)
+    after = snapshot()
+    elapsed = time.monotonic() - start
+    sockstat = read_sockstat()
+    deltas = diff(before, after)
+    tcp_mem = read_sysctl("net.ipv4.tcp_mem")
+
+    return {
+        "interval_s": round(elapsed, 3),
+        "findings": evaluate(deltas, elapsed, sockstat, tcp_mem),
+        "info": {f"{g}.{c}": deltas.get(g, {}).get(c, 0) for g, c in INFO_COUNTERS},
+        "tcp_mem": _tcp_mem_pressure(sockstat, tcp_mem),
+        "sockstat": sockstat,
+        "deltas": deltas,
+    }
@@ -0,0 +1,259 @@
+import os
+import socket
+import struct
+
+# --- netlink 공통 상수 ---
+NETLINK_ROUTE = 0
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+# --- rtnetlink 멀티캐스트 그룹 (이벤트 구독용) ---
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+RTMGRP_NETWORK_EVENTS = RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE
+
+# --- rtnetlink 메시지 타입 ---
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTM_GETROUTE = 26
+
+# --- 속성 타입 ---
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFLA_QDISC = 6
+IFLA_TXQLEN = 13
+IFLA_OPERSTATE = 16
+IFLA_NUM_TX_QUEUES = 31
+IFLA_NUM_RX_QUEUES = 32
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+RTA_PRIORITY = 6
+RTA_TABLE = 15
+
+RT_TABLE_MAIN = 254
+RTN_UNICAST = 1
+
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
+IFF_RUNNING = 0x40
+
+OPERSTATES = {0: "unknown", 1: "notpresent", 2: "down", 3: "lowerlayerdown",
+              4: "testing", 5: "dormant", 6: "up"}
+
+# --- 구조체 포맷 (네이티브 바이트 순서) ---
+NLMSGHDR = struct.Struct("=IHHII")     # len, type, flags, seq, pid
+RTATTR = struct.Struct("=HH")          # len, type
+IFINFOMSG = struct.Struct("=BxHiII")   # family, type, index, flags, change
+IFADDRMSG = struct.Struct("=BBBBI")    # family, prefixlen, flags, scope, index
+RTMSG = struct.Struct("=BBBBBBBBI")    # family, dst_len, src_len, tos, table, protocol, scope, type, flags
+
+_RECV_SIZE = 1 << 16
+
+class NetlinkError(OSError):
+    """커널이 NLMSG_ERROR로 응답한 경우"""
+
+def _align(n):
+    return (n + 3) & ~3
+
+def parse_attrs(buf, offset=0, end=None):
+    """rtattr 목록을 {type: bytes} 로 변환 (중첩 플래그 비트는 제거)"""
+    attrs = {}
+    end = len(buf) if end is None else end
+    while offset + RTATTR.size <= end:
+        length, atype = RTATTR.unpack_from(buf, offset)
+        if length < RTATTR.size:
+            break
+        attrs[atype & 0x3fff] = bytes(buf[offset + RTATTR.size:offset + length])
+        offset += _align(length)
+    return attrs
+
+def iter_messages(buf):
+    """수신 버퍼에서 (type, flags, seq, payload memoryview) 를 순서대로 생성"""
+    view = memoryview(buf)
+    offset = 0
+    while offset + NLMSGHDR.size <= len(buf):
+        length, mtype, flags, seq, _pid = NLMSGHDR.unpack_from(buf, offset)
+        if length < NLMSGHDR.size:
+            break
+        yield mtype, flags, seq, view[offset + NLMSGHDR.size:offset + length]
+        offset += _align(length)
+
+def _attr_str(attrs, key):
+    val = attrs.get(key)
+    return val.rstrip(b"\0").decode(errors="replace") if val is not None else None
+
+def _attr_u32(attrs, key):
+    val = attrs.get(key)
+    return struct.unpack("=I", val[:4])[0] if val is not None and len(val) >= 4 else None
+
+def _attr_addr(attrs, key, family):
+    val = attrs.get(key)
+    if val is None:
+        return None
+    try:
+        return socket.inet_ntop(family, val)
+    except (ValueError, OSError):
+        return None
+
+def _attr_mac(attrs, key):
+    val = attrs.get(key)
+    return ":".join(f"{b:02x}" for b in val) if val else None
+
+class NetlinkSocket:
+    """NETLINK 소켓 래퍼: 덤프 요청 송신과 멀티파트 응답 수신 담당"""
+
+    def __init__(self, protocol=NETLINK_ROUTE, groups=0):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, protocol)
+        self.sock.bind((0, groups))
+        self._seq = 0
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def recv_events(self):
+        """구독 중인 멀티캐스트 그룹에서 수신한 (type, payload) 이벤트 목록"""
+        data = self.sock.recv(_RECV_SIZE)
+        return [(mtype, body) for mtype, _flags, _seq, body in iter_messages(data)]
+
+    def request(self, mtype, payload, flags=NLM_F_REQUEST | NLM_F_DUMP):
+        """요청 송신 후 NLMSG_DONE 까지의 (type, payload) 메시지를 생성"""
+        self._seq += 1
+        seq = self._seq
+        self.sock.send(NLMSGHDR.pack(NLMSGHDR.size + len(payload), mtype, flags, seq, 0) + payload)
+        while True:
+            data = self.sock.recv(_RECV_SIZE)
+            if not data:
+                return
+            for rtype, rflags, rseq, body in iter_messages(data):
+                if rseq != seq:
+                    continue
+                if rtype == NLMSG_DONE:
+                    return
+                if rtype == NLMSG_ERROR:
+                    errno = -struct.unpack_from("=i", body)[0]
+                    if errno:
+                        raise NetlinkError(errno, os.strerror(errno))
+                    return
+                yield rtype, body
+            if not flags & NLM_F_DUMP:
+                return
+
+def _parse_link(body):
+    _family, iftype, index, flags, _change = IFINFOMSG.unpack_from(body)
+    attrs = parse_attrs(body, IFINFOMSG.size)
+    return {
+        "index": index,
+        "name": _attr_str(attrs, IFLA_IFNAME),
+        "type": iftype,
+        "flags": flags,
+        "is_up": bool(flags & IFF_UP),
+        "is_loopback": bool(flags & IFF_LOOPBACK),
+        "mtu": _attr_u32(attrs, IFLA_MTU),
+        "qdisc": _attr_str(attrs, IFLA_QDISC),
+        "operstate": OPERSTATES.get(attrs.get(IFLA_OPERSTATE, b"\0")[0], "unknown"),
+        "txqlen": _attr_u32(attrs, IFLA_TXQLEN),
+        "num_tx_queues": _attr_u32(attrs, IFLA_NUM_TX_QUEUES),
+        "num_rx_queues": _attr_u32(attrs, IFLA_NUM_RX_QUEUES),
+        "mac": _attr_mac(attrs, IFLA_ADDRESS),
+        "addresses": [],
+    }
+
+def _parse_addr(body):
+    family, prefixlen, _flags, scope, index = IFADDRMSG.unpack_from(body)
+    attrs = parse_attrs(body, IFADDRMSG.size)
+    # point-to-point 링크는 IFA_ADDRESS가 상대측 주소이므로 IFA_LOCAL 우선
+    addr = _attr_addr(attrs, IFA_LOCAL, family) or _attr_addr(attrs, IFA_ADDRESS, family)
+    return {"index": index, "family": family, "address": addr, "prefixlen": prefixlen, "scope": scope}
+
+def _parse_route(body):
+    family, dst_len, _src_len, _tos, table, protocol, scope, rtype, _flags = RTMSG.unpack_from(body)
+    attrs = parse_attrs(body, RTMSG.size)
+    return {
+        "family": family,
+        "dst": _attr_addr(attrs, RTA_DST, family),
+        "dst_len": dst_len,
+        "table": _attr_u32(attrs, RTA_TABLE) or table,
+        "protocol": protocol,
+        "scope": scope,
+        "type": rtype,
+        "oif": _attr_u32(attrs, RTA_OIF),
+        "gateway": _attr_addr(attrs, RTA_GATEWAY, family),
+        "metric": _attr_u32(attrs, RTA_PRIORITY) or 0,
+    }
+
+def dump_links(nl):
+    """RTM_GETLINK 덤프: {ifindex: 링크 정보}"""
+    payload = IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+    return {link["index"]: link for link in
+            (_parse_link(body) for mtype, body in nl.request(RTM_GETLINK, payload) if mtype == RTM_NEWLINK)}
+
+def dump_addresses(nl, family=socket.AF_UNSPEC):
+    """RTM_GETADDR 덤프: 주소 목록"""
+    payload = IFADDRMSG.pack(family, 0, 0, 0, 0)
+    return [_parse_addr(body) for mtype, body in nl.request(RTM_GETADDR, payload) if mtype == RTM_NEWADDR]
+
+def dump_routes(nl, family=socket.AF_INET):
+    """RTM_GETROUTE 덤프: 라우트 목록"""
+    payload = RTMSG.pack(family, 0, 0, 0, 0, 0, 0, 0, 0)
+    return [_parse_route(body) for mtype, body in nl.request(RTM_GETROUTE, payload) if mtype == RTM_NEWROUTE]
+
+def pick_default_route(routes):
+    """main 테이블의 기본 경로(0.0.0.0/0) 중 metric이 가장 낮은 것"""
+    defaults = [r for r in routes
+                if r["dst_len"] == 0 and r["table"] == RT_TABLE_MAIN and r["type"] == RTN_UNICAST and r["oif"]]
+    return min(defaults, key=lambda r: r["metric"]) if defaults else None
+
+def dump_network_state(family=socket.AF_INET):
+    """소켓 하나로 링크/주소/라우트를 덤프하여 한 번에 반환
+
+    반환값: {"links": {ifindex: link}, "by_name": {name: link}, "default_route": route | None}
+    각 link의 "addresses" 에 해당 인터페이스 주소가 채워진다.
+    """
+    with NetlinkSocket() as nl:
+        links = dump_links(nl)
+        addrs = dump_addresses(nl)
+        routes = dump_routes(nl, family)
+
+    for addr in addrs:
+        link = links.get(addr["index"])
+        if link is not None:
+            link["addresses"].append(addr)
+
+    default = pick_default_route(routes)
+    if default is not None:
+        link = links.get(default["oif"])
+        default["dev"] = link["name"] if link else None
+
+    return {
+        "links": links,
+        "by_name": {link["name"]: link for link in links.values()},
+        "default_route": default,
+    }
@@ -1,15 +1,15 @@
 import sys
 from utils import Colors, Messenger
-from diagnosis import run_diagnosis, show_explanations
-from test import run_iperf_test, run_precision_bdp_calculator
-import tuning
 
 def main_menu_diagnosis():
     """진단 기능 서브메뉴"""
+    from diagnosis import run_diagnosis, show_explanations, run_microburst_check, run_flow_check
     while True:
         print(f"\n{Colors.BOLD}{Colors.HEADER}   [ 1. 진단 기능 ]{Colors.ENDC}")
         print(f"   1. {Colors.OKGREEN}네트워크 상세 진단 시작{Colors.ENDC}")
         print(f"   2. {Colors.OKCYAN}각 진단 항목에 대한 설명 보기{Colors.ENDC}")
+        print(f"   3. {Colors.WARNING}마이크로버스트 측정 (NIC 카운터 고속 샘플링){Colors.ENDC}")
+        print(f"   4. {Colors.OKBLUE}TCP 플로우 제한 요인 분석 (tcp_info){Colors.ENDC}")
         print(f"   b. {Colors.BOLD}뒤로 가기{Colors.ENDC}")
         
         choice = input(f"\n {Colors.BOLD}선택 > {Colors.ENDC}").strip().lower()
@@ -17,15 +17,21 @@ def main_menu_diagnosis():
             run_diagnosis()
         elif choice == '2':
             show_explanations()
+        elif choice == '3':
+            run_microburst_check()
+        elif choice == '4':
+            run_flow_check()
         elif choice == 'b':
             break
 
 def main_menu_test():
     """테스트 기능 서브메뉴"""
+    from test import run_iperf_test, run_precision_bdp_calculator, run_native_bench
     while True:
         print(f"\n{Colors.BOLD}{Colors.HEADER}   [ 2. 테스트 기능 ]{Colors.ENDC}")
         print(f"   1. {Colors.WARNING}실시간 속도 측정 (iperf3){Colors.ENDC}")
         print(f"   2. {Colors.OKBLUE}정밀 BDP(대역폭-지연) 계산기{Colors.ENDC}")
+        print(f"   3. {Colors.WARNING}내장 TCP 처리량 측정 (멀티 스트림, iperf3 불필요){Colors.ENDC}")
         print(f"   b. {Colors.BOLD}뒤로 가기{Colors.ENDC}")
         
         choice = input(f"\n {Colors.BOLD}선택 > {Colors.ENDC}").strip().lower()
@@ -34,11 +40,15 @@ def main_menu_test():
             input("\n측정 완료 [Enter]를 누르면 메뉴로 이동합니다...")
         elif choice == '2':
             run_precision_bdp_calculator()
+        elif choice == '3':
+            run_native_bench()
+            input("\n측정 완료 [Enter]를 누르면 메뉴로 이동합니다...")
         elif choice == 'b':
             break
 
 def main_menu_tuning():
     """튜닝 및 설정 관리 서브메뉴"""
+    import tuning
     tuning.apply_tuning_placeholder()
 
 def main():
@@ -63,4 +73,8 @@ def main():
             Messenger.error("INVALID_INPUT")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 인자가 있으면 비대화형 서브커맨드 모드 (예: nettune.py diagnose --json)
+        import cli
+        sys.exit(cli.main(sys.argv[1:]))
     main()
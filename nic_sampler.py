@@ -0,0 +1,208 @@
+import os
+import time
+from array import array
+
+# 샘플링할 카운터 (/sys/class/net/<if>/statistics/ 파일명과 동일)
+STAT_FIELDS = ("rx_bytes", "tx_bytes", "rx_packets", "tx_packets", "rx_dropped", "tx_dropped")
+
+# /proc/net/dev 한 줄의 컬럼 순서 (인터페이스 이름 뒤)
+_PROC_NET_DEV_COLUMNS = (
+    "rx_bytes", "rx_packets", "rx_errors", "rx_dropped", "rx_fifo", "rx_frame", "rx_compressed", "rx_multicast",
+    "tx_bytes", "tx_packets", "tx_errors", "tx_dropped", "tx_fifo", "tx_colls", "tx_carrier", "tx_compressed",
+)
+
+MAX_HZ = 1000
+_PROC_NET_DEV_READ = 1 << 16
+
+class SysfsCounterReader:
+    """statistics/* 파일을 열어 두고 pread로 카운터를 읽는 리더"""
+
+    def __init__(self, iface, fields=STAT_FIELDS, root="/sys/class/net"):
+        self.fields = fields
+        self._fds = [os.open(os.path.join(root, iface, "statistics", f), os.O_RDONLY) for f in fields]
+
+    def read(self):
+        return tuple(int(os.pread(fd, 32, 0)) for fd in self._fds)
+
+    def close(self):
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+class ProcNetDevReader:
+    """/proc/net/dev 를 열어 두고 해당 인터페이스 줄만 파싱하는 리더"""
+
+    def __init__(self, iface, fields=STAT_FIELDS, path="/proc/net/dev"):
+        self.fields = fields
+        self._key = (iface + ":").encode()
+        self._cols = [_PROC_NET_DEV_COLUMNS.index(f) for f in fields]
+        self._fd = os.open(path, os.O_RDONLY)
+        self.read()  # 인터페이스 존재 확인
+
+    def read(self):
+        data = os.pread(self._fd, _PROC_NET_DEV_READ, 0)
+        for line in data.split(b"\n"):
+            name, sep, rest = line.partition(b":")
+            if sep and name.strip() + b":" == self._key:
+                values = rest.split()
+                return tuple(int(values[c]) for c in self._cols)
+        raise OSError(f"{self._key[:-1].decode()} not found in /proc/net/dev")
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class CounterRing:
+    """고정 크기 array 기반 링 버퍼 (타임스탬프 + 카운터 필드별 배열)"""
+
+    def __init__(self, capacity, fields=STAT_FIELDS):
+        self.capacity = capacity
+        self.fields = fields
+        self.times = array('d', bytes(8 * capacity))
+        self.values = {f: array('Q', bytes(8 * capacity)) for f in fields}
+        self._columns = [self.values[f] for f in fields]
+        self.count = 0
+
+    def append(self, t, values):
+        i = self.count % self.capacity
+        self.times[i] = t
+        for column, v in zip(self._columns, values):
+            column[i] = v
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def indices(self):
+        """오래된 순서의 슬롯 인덱스"""
+        if self.count <= self.capacity:
+            return range(self.count)
+        start = self.count % self.capacity
+        return [(start + k) % self.capacity for k in range(self.capacity)]
+
+def open_reader(iface, source="sysfs"):
+    """카운터 리더 생성 (sysfs 실패 시 /proc/net/dev 로 대체)"""
+    if source == "sysfs":
+        try:
+            return SysfsCounterReader(iface)
+        except OSError:
+            pass
+    return ProcNetDevReader(iface)
+
+def sample_counters(iface, hz=MAX_HZ, duration=1.0, capacity=None, source="sysfs"):
+    """hz 주기로 duration 초 동안 카운터를 샘플링하여 (CounterRing, 실행 통계) 반환
+
+    절대 시각 기준으로 다음 틱까지 sleep 하므로 busy-wait 없이 CPU 사용이 제한되며,
+    처리 지연으로 놓친 틱은 missed_ticks 로 집계한다.
+    """
+    hz = max(1, min(int(hz), MAX_HZ))
+    period = 1.0 / hz
+    ticks = max(2, int(duration * hz) + 1)
+    ring = CounterRing(capacity or ticks)
+    reader = open_reader(iface, source)
+
+    missed = 0
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    next_tick = wall_start
+    try:
+        for _ in range(ticks):
+            now = time.perf_counter()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            elif now - next_tick > period:
+                # 한 주기 이상 늦었으면 밀린 틱은 건너뛰고 일정을 다시 맞춤
+                skipped = int((now - next_tick) / period)
+                missed += skipped
+                next_tick += skipped * period
+            ring.append(time.perf_counter(), reader.read())
+            next_tick += period
+    finally:
+        reader.close()
+    wall = time.perf_counter() - wall_start
+    cpu = time.thread_time() - cpu_start
+
+    return ring, {
+        "hz": hz,
+        "duration_s": round(wall, 4),
+        "samples": len(ring),
+        "missed_ticks": missed,
+        "cpu_s": round(cpu, 4),
+        "cpu_pct": round(cpu / wall * 100, 2) if wall else 0.0,
+        "source": type(reader).__name__,
+    }
+
+def _rates(ring, field, scale):
+    """연속 샘플 간 (시작 시각, 구간 길이, 초당 변화율 * scale) 목록"""
+    idx = list(ring.indices())
+    times, values = ring.times, ring.values[field]
+    t0 = times[idx[0]] if idx else 0.0
+    out = []
+    for a, b in zip(idx, idx[1:]):
+        dt = times[b] - times[a]
+        if dt > 0:
+            out.append((times[a] - t0, dt, (values[b] - values[a]) * scale / dt))
+    return out
+
+def find_bursts(rates, threshold_bps):
+    """임계값을 넘는 연속 구간을 버스트 윈도로 병합"""
+    bursts = []
+    current = None
+    for start, dt, rate in rates:
+        if rate >= threshold_bps:
+            if current is None:
+                current = {"start_s": start, "end_s": start + dt, "peak_bps": rate}
+            else:
+                current["end_s"] = start + dt
+                current["peak_bps"] = max(current["peak_bps"], rate)
+        elif current is not None:
+            bursts.append(current)
+            current = None
+    if current is not None:
+        bursts.append(current)
+    for b in bursts:
+        b["duration_ms"] = round((b["end_s"] - b["start_s"]) * 1000, 3)
+        b["start_s"] = round(b["start_s"], 6)
+        b["end_s"] = round(b["end_s"], 6)
+    return bursts
+
+def analyze_direction(ring, field, link_bps, threshold):
+    """방향별(rx/tx) 평균/최대 속도, 피크 대 평균 비율, 버스트 윈도 계산"""
+    rates = _rates(ring, field, 8)
+    if not rates:
+        return {"intervals": 0, "mean_bps": 0.0, "peak_bps": 0.0, "peak_to_mean": None, "bursts": []}
+    total_time = sum(dt for _, dt, _ in rates)
+    mean = sum(rate * dt for _, dt, rate in rates) / total_time
+    peak = max(rate for _, _, rate in rates)
+    zero = sum(1 for _, _, rate in rates if rate == 0)
+    result = {
+        "intervals": len(rates),
+        "mean_bps": mean,
+        "peak_bps": peak,
+        "peak_to_mean": round(peak / mean, 2) if mean else None,
+        # 카운터를 주기적으로만 갱신하는 드라이버는 0 구간이 대부분을 차지한다
+        "zero_intervals_pct": round(zero / len(rates) * 100, 1),
+        "bursts": find_bursts(rates, link_bps * threshold) if link_bps else [],
+    }
+    return result
+
+def run_microburst_sampling(iface, link_mbps, hz=MAX_HZ, duration=1.0, threshold=0.9, source="sysfs"):
+    """샘플링 + 분석을 한 번에 수행하여 리포트 딕셔너리 반환
+
+    link_mbps: 링크 속도(Mbps). None 이면 버스트 윈도 판정은 생략된다.
+    threshold: 링크 속도 대비 버스트 판정 비율 (0.9 = 90%)
+    """
+    ring, run = sample_counters(iface, hz, duration, source=source)
+    link_bps = link_mbps * 1_000_000 if link_mbps else None
+    idx = list(ring.indices())
+    first, last = idx[0], idx[-1]
+    return {
+        "interface": iface,
+        "link_mbps": link_mbps,
+        "threshold": threshold,
+        **run,
+        "rx": analyze_direction(ring, "rx_bytes", link_bps, threshold),
+        "tx": analyze_direction(ring, "tx_bytes", link_bps, threshold),
+        "drops": {f: ring.values[f][last] - ring.values[f][first] for f in ("rx_dropped", "tx_dropped")},
+    }
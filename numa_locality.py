@@ -0,0 +1,196 @@
+import os
+import ctypes
+import platform
+import irq_stats
+
+SYS_ROOT = "/sys"
+PROC_ROOT = "/proc"
+
+STATUS_LOCAL = "local"
+STATUS_REMOTE = "remote"
+STATUS_UNPINNED = "unpinned"
+STATUS_NA = "n/a"
+
+MPOL_BIND = 2
+# set_mempolicy(2) 시스템 콜 번호 (glibc 는 래퍼를 제공하지 않음)
+_SET_MEMPOLICY_NR = {"x86_64": 238, "aarch64": 237, "i686": 276, "ppc64le": 261, "s390x": 270}
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def node_cpus(sys_root=SYS_ROOT):
+    """{NUMA 노드: CPU 목록}"""
+    base = os.path.join(sys_root, "devices/system/node")
+    nodes = {}
+    try:
+        names = os.listdir(base)
+    except OSError:
+        return nodes
+    for name in names:
+        if name.startswith("node") and name[4:].isdigit():
+            nodes[int(name[4:])] = irq_stats.parse_cpu_list(_read_text(os.path.join(base, name, "cpulist")))
+    return dict(sorted(nodes.items()))
+
+def nic_locality(iface, sys_root=SYS_ROOT):
+    """NIC 의 NUMA 노드와 로컬 CPU 목록"""
+    class_net = os.path.join(sys_root, "class", "net")
+    nodes = node_cpus(sys_root)
+    node = irq_stats.read_numa_node(iface, class_net)
+    local = irq_stats.parse_cpu_list(irq_stats.read_local_cpus(iface, class_net))
+    if not local and node in nodes:
+        local = nodes[node]
+    return {"interface": iface, "numa_node": node, "local_cpus": local, "nodes": nodes}
+
+def _nic_addresses(iface):
+    from utils import get_network_state
+    link = get_network_state()["by_name"].get(iface)
+    return {a["address"] for a in link["addresses"]} if link else set()
+
+def nic_socket_inodes(iface):
+    """NIC 주소를 로컬 주소로 사용하는 TCP/UDP 소켓 inode 집합"""
+    import socket
+    from inet_diag import dump_sockets
+    addresses = _nic_addresses(iface)
+    inodes = set()
+    for protocol in (socket.IPPROTO_TCP, socket.IPPROTO_UDP):
+        table = dump_sockets(protocol)
+        inode_col = table.columns["inode"]
+        for i in range(len(table)):
+            if inode_col[i] and table.address(i, "src") in addresses:
+                inodes.add(inode_col[i])
+    return inodes
+
+def socket_owners(inodes, proc_root=PROC_ROOT):
+    """/proc/<pid>/fd 를 훑어 {pid: 소켓 수} 반환 (권한 없는 프로세스는 건너뜀)"""
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    owners = {}
+    if not targets:
+        return owners
+    for pid in os.listdir(proc_root):
+        if not pid.isdigit():
+            continue
+        fd_dir = os.path.join(proc_root, pid, "fd")
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        count = 0
+        for fd in fds:
+            try:
+                if os.readlink(os.path.join(fd_dir, fd)) in targets:
+                    count += 1
+            except OSError:
+                continue
+        if count:
+            owners[int(pid)] = count
+    return owners
+
+def process_placement(pid, proc_root=PROC_ROOT):
+    """프로세스의 허용 CPU/메모리 노드와 마지막 실행 CPU"""
+    status = _read_text(os.path.join(proc_root, str(pid), "status")) or ""
+    fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+    stat = _read_text(os.path.join(proc_root, str(pid), "stat")) or ""
+    # comm 에 공백/괄호가 있을 수 있으므로 마지막 ')' 이후부터 필드를 센다 (processor 는 39번째)
+    rest = stat.rpartition(")")[2].split()
+    return {
+        "pid": pid,
+        "comm": fields.get("Name", "").strip(),
+        "cpus_allowed": irq_stats.parse_cpu_list(fields.get("Cpus_allowed_list", "").strip()),
+        "mems_allowed": irq_stats.parse_cpu_list(fields.get("Mems_allowed_list", "").strip()),
+        "last_cpu": int(rest[36]) if len(rest) > 36 else None,
+    }
+
+def classify_placement(placement, nic):
+    """프로세스 배치가 NIC 노드에 대해 local / remote / unpinned 인지 판정"""
+    if nic["numa_node"] is None or len(nic["nodes"]) < 2:
+        return STATUS_NA
+    local = set(nic["local_cpus"])
+    allowed = set(placement["cpus_allowed"])
+    if allowed and allowed <= local:
+        return STATUS_LOCAL
+    if not allowed & local:
+        return STATUS_REMOTE
+    return STATUS_UNPINNED
+
+def check_locality(iface, sys_root=SYS_ROOT, proc_root=PROC_ROOT):
+    """NIC 소켓을 사용하는 프로세스의 CPU 배치와 NIC NUMA 노드 비교 리포트"""
+    nic = nic_locality(iface, sys_root)
+    cpu_node = {cpu: node for node, cpus in nic["nodes"].items() for cpu in cpus}
+    processes = []
+    for pid, sockets in sorted(socket_owners(nic_socket_inodes(iface), proc_root).items()):
+        placement = process_placement(pid, proc_root)
+        placement["sockets"] = sockets
+        placement["last_node"] = cpu_node.get(placement["last_cpu"])
+        placement["status"] = classify_placement(placement, nic)
+        processes.append(placement)
+
+    findings = []
+    for p in processes:
+        if p["status"] == STATUS_REMOTE:
+            findings.append(f"{p['comm']}({p['pid']}) 가 NIC 노드 {nic['numa_node']} 가 아닌 CPU 에 고정되어 있습니다. "
+                            f"`nettune pin --iface {iface} -- <명령>` 으로 실행하세요.")
+        elif p["status"] == STATUS_UNPINNED and p["last_node"] not in (None, nic["numa_node"]):
+            findings.append(f"{p['comm']}({p['pid']}) 가 원격 노드 {p['last_node']} 에서 실행 중입니다 (고정되지 않음).")
+    return dict(nic, processes=processes, findings=findings)
+
+def prepare_mempolicy_bind(node):
+    """node 로 메모리 할당을 제한하는(MPOL_BIND) 호출 가능 객체를 미리 만든다 (지원하지 않으면 None)
+
+    ctypes 배열과 libc 핸들은 여기서 만들어 두므로, 반환된 함수는 fork 후 자식에서도
+    시스템 콜 하나만 호출한다. 실패하면 OSError 를 던진다.
+    """
+    nr = _SET_MEMPOLICY_NR.get(platform.machine())
+    if nr is None:
+        return None
+    bits = ctypes.sizeof(ctypes.c_ulong) * 8
+    mask = (ctypes.c_ulong * (node // bits + 1))()
+    mask[node // bits] = 1 << (node % bits)
+    # maxnode 는 커널이 마지막 비트를 버리므로 비트 수 + 1
+    maxnode = len(mask) * bits + 1
+    syscall = ctypes.CDLL(None, use_errno=True).syscall
+    get_errno = ctypes.get_errno
+    message = f"set_mempolicy(MPOL_BIND, node {node}) 실패"
+
+    def bind():
+        if syscall(nr, MPOL_BIND, mask, maxnode) != 0:
+            raise OSError(get_errno(), message)
+    return bind
+
+def set_mempolicy_bind(node):
+    """현재 프로세스의 메모리 할당을 node 로 제한 (MPOL_BIND). 지원하지 않으면 False, 실패하면 OSError"""
+    bind = prepare_mempolicy_bind(node)
+    if bind is None:
+        return False
+    bind()
+    return True
+
+def _prepare_binding(nic):
+    cpus = list(nic["local_cpus"])
+    bind_memory = prepare_mempolicy_bind(nic["numa_node"]) if nic["numa_node"] is not None else None
+
+    def bind():
+        if cpus:
+            os.sched_setaffinity(0, cpus)
+        if bind_memory is not None:
+            bind_memory()
+    return bind
+
+def bind_current_process(nic):
+    """현재 프로세스를 NIC 로컬 CPU / 메모리 노드에 고정 (실패하면 OSError)"""
+    _prepare_binding(nic)()
+
+def pin_preexec(iface, sys_root=SYS_ROOT):
+    """subprocess preexec_fn: 자식 프로세스를 NIC 노드에 고정 (Linux 외에는 None)
+
+    CPU affinity 와 메모리 정책은 exec 후에도 유지되므로 실행되는 명령 전체에 적용된다.
+    스레드가 있는 프로세스의 fork 직후에는 할당/임포트를 피해야 하므로 CPU 목록, nodemask,
+    libc 핸들은 fork 전에 모두 만들어 두고 자식에서는 sched_setaffinity 와 시스템 콜만 호출한다.
+    고정에 실패하면 예외가 나고 subprocess 는 명령을 실행하지 않고 SubprocessError 를 던진다.
+    """
+    if platform.system() != "Linux":
+        return None
+    return _prepare_binding(nic_locality(iface, sys_root))
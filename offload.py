@@ -0,0 +1,86 @@
+from ethtool_ioctl import get_features, ethtool_command
+from probe_cache import invalidate, CATEGORY_NIC
+
+# 점검 대상 오프로드: (커널 기능명, ethtool -k 표기, 권장 상태)
+# LRO 는 포워딩/브리지 환경에서 패킷을 변형하므로 권장 집합에 넣지 않고 상태만 보고한다.
+OFFLOAD_FEATURES = (
+    ("tx-scatter-gather", "scatter-gather", True),
+    ("tx-checksum-ip-generic", "tx-checksumming", True),
+    ("rx-checksum", "rx-checksumming", True),
+    ("tx-tcp-segmentation", "tcp-segmentation-offload (TSO)", True),
+    ("tx-tcp6-segmentation", "tx-tcp6-segmentation (TSO6)", True),
+    ("tx-generic-segmentation", "generic-segmentation-offload (GSO)", True),
+    ("rx-gro", "generic-receive-offload (GRO)", True),
+    ("rx-gro-hw", "rx-gro-hw (하드웨어 GRO)", True),
+    ("tx-udp-segmentation", "tx-udp-segmentation (USO)", True),
+    ("rx-lro", "large-receive-offload (LRO)", None),
+)
+# 범용 기능 대신 프로토콜별 기능을 노출하는 드라이버가 있으므로, 범용 기능을 쓸 수 없으면 같은 행을 대안으로 점검
+FEATURE_ALTERNATIVES = {
+    "tx-checksum-ip-generic": ("tx-checksum-ipv4", "tx-checksum-ipv6"),
+}
+
+STATUS_OK = "ok"
+STATUS_WARN = "warn"
+STATUS_UNAVAILABLE = "unavailable"
+STATUS_INFO = "info"
+
+def _audit_row(name, label, feature, recommended):
+    if recommended is None:
+        status = STATUS_INFO
+    elif feature["active"] == recommended:
+        status = STATUS_OK
+    elif feature["fixed"]:
+        status = STATUS_UNAVAILABLE
+    else:
+        status = STATUS_WARN
+    return {"name": name, "label": label, "active": feature["active"],
+            "fixed": feature["fixed"], "recommended": recommended, "status": status}
+
+def audit_features(features):
+    """get_features() 결과에서 성능 관련 오프로드 상태 점검 목록 생성
+
+    권장 기능이 꺼져 있고 변경 가능하면 warn, 드라이버가 지원하지 않아 고정이면 unavailable.
+    범용 기능이 없거나 고정으로 꺼져 있고 대안 기능(tx-checksum-ipv4/ipv6 등)이 있으면 대안을 점검한다.
+    """
+    rows = []
+    for name, label, recommended in OFFLOAD_FEATURES:
+        feature = features.get(name)
+        alternatives = [alt for alt in FEATURE_ALTERNATIVES.get(name, ()) if alt in features]
+        if alternatives and (feature is None or (feature["fixed"] and not feature["active"])):
+            rows += [_audit_row(alt, f"{label} ({alt})", features[alt], recommended) for alt in alternatives]
+            continue
+        if feature is not None:
+            rows.append(_audit_row(name, label, feature, recommended))
+    return rows
+
+def audit_offloads(iface, backend=None):
+    return audit_features(get_features(iface, backend))
+
+def recommended_changes(rows):
+    """경고 항목을 권장 상태로 바꾸는 변경 집합 {기능명: bool}"""
+    return {r["name"]: r["recommended"] for r in rows if r["status"] == STATUS_WARN}
+
+def snapshot_features(features):
+    """설정 백업용 오프로드 상태 {기능명: active} (변경 가능한 점검 대상만)"""
+    tracked = {name for name, _, _ in OFFLOAD_FEATURES}
+    tracked.update(alt for alts in FEATURE_ALTERNATIVES.values() for alt in alts)
+    return {name: f["active"] for name, f in features.items() if name in tracked and not f["fixed"]}
+
+def apply_features(iface, changes, backend=None, helper=None):
+    """권한 헬퍼의 `ethtool -K` 로 오프로드를 변경한 뒤 다시 읽어 반영 여부 확인
+
+    반환값: {"results": {기능명: bool}, "error": 명령 실패 사유 또는 None}
+    명령 자체가 실패하면(EPERM 등) error 를 채우고, 명령은 성공했지만 드라이버가
+    일부 요청을 무시한 경우에는 해당 기능만 False 가 된다.
+    """
+    if not changes:
+        return {"results": {}, "error": None}
+    from priv_helper import get_helper
+    ok, error = (helper or get_helper()).run(ethtool_command(iface, "features", changes))
+    invalidate(CATEGORY_NIC)
+    if not ok:
+        return {"results": {name: False for name in changes}, "error": error or "ethtool -K 실패"}
+    after = get_features(iface, backend)
+    return {"results": {name: name in after and after[name]["active"] == wanted for name, wanted in changes.items()},
+            "error": None}
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import errno
+import shlex
+import shutil
+from ethtool_ioctl import ethtool_command
+from tuning_plan import tc_commands, tx_queue_count
+
+# 실제 시스템에 설치할 때의 루트. 테스트에서는 임시 디렉터리를 넘긴다
+DEFAULT_ROOT = "/"
+DEFAULT_PRIORITY = 90
+
+HOOK_UDEV = "udev"
+HOOK_NM = "nm"
+
+STATE_PATH = "etc/nettune/state.json"
+SYSCTL_PATH = "etc/sysctl.d/{priority}-nettune.conf"
+UDEV_PATH = "etc/udev/rules.d/{priority}-nettune.rules"
+NM_PATH = "etc/NetworkManager/dispatcher.d/{priority}-nettune"
+UNIT_NAME = "nettune-apply.service"
+UNIT_PATH = "etc/systemd/system/" + UNIT_NAME
+
+# 인터페이스별 설정(udev/NM 훅)으로 내보내는 메커니즘
+NIC_MECHANISMS = ("ethtool", "ip link", "tc")
+
+_HEADER = "# NetTune 이 생성한 파일입니다. 직접 수정하지 말고 NetTune 으로 다시 생성하세요."
+
+def _path(root, relative):
+    return os.path.join(root, relative)
+
+def load_state(root=DEFAULT_ROOT):
+    """저장된 원하는 상태(desired state). 없으면 빈 딕셔너리"""
+    try:
+        with open(_path(root, STATE_PATH)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def merge_state(state, desired):
+    """메커니즘 → 대상 → 값 단위로 병합 (새 값이 우선). tc 는 인터페이스별 qdisc 전체를 교체"""
+    merged = json.loads(json.dumps(state))
+    for mechanism, targets in desired.items():
+        section = merged.setdefault(mechanism, {})
+        for target, value in targets.items():
+            if mechanism in ("ethtool", "ip link") and isinstance(section.get(target), dict):
+                for group, fields in value.items():
+                    if isinstance(fields, dict) and isinstance(section[target].get(group), dict):
+                        section[target][group].update(fields)
+                    else:
+                        section[target][group] = fields
+            else:
+                section[target] = value
+    return merged
+
+def _sysctl_text(value):
+    return " ".join(str(v) for v in value) if isinstance(value, (list, tuple)) else str(value)
+
+def render_sysctl(settings):
+    lines = [_HEADER, "# systemd-sysctl 이 부팅 시 적용합니다 (즉시 반영: sysctl --system)"]
+    lines += [f"{oid} = {_sysctl_text(value)}" for oid, value in settings.items()]
+    return "\n".join(lines) + "\n"
+
+def _binary(name):
+    # udev RUN 과 systemd ExecStart 는 절대 경로가 필요
+    return shutil.which(name) or f"/usr/sbin/{name}"
+
+def nic_commands(iface, state):
+    """인터페이스 하나에 대한 ethtool / tc 명령 목록 (MTU 는 훅마다 표현 방식이 달라 따로 처리)"""
+    commands = []
+    for group, fields in state.get("ethtool", {}).get(iface, {}).items():
+        if fields:
+            commands.append([_binary("ethtool")] + ethtool_command(iface, group, fields)[1:])
+    qdisc = state.get("tc", {}).get(iface)
+    if qdisc:
+        # mq + 큐별 자식이면 현재 TX 큐 수만큼 자식 qdisc 명령을 만든다
+        for cmd in tc_commands(iface, qdisc, tx_queue_count(iface)):
+            commands.append([_binary("tc")] + cmd[1:])
+    return commands
+
+def _nic_ifaces(state):
+    ifaces = []
+    for mechanism in NIC_MECHANISMS:
+        for iface in state.get(mechanism, {}):
+            if iface not in ifaces:
+                ifaces.append(iface)
+    return ifaces
+
+def render_udev(state):
+    """인터페이스가 생길 때(부팅/핫플러그/드라이버 재로드) MTU 와 ethtool/tc 설정을 다시 적용하는 udev 규칙"""
+    lines = [_HEADER]
+    for iface in _nic_ifaces(state):
+        match = f'ACTION=="add", SUBSYSTEM=="net", KERNEL=="{iface}"'
+        mtu = state.get("ip link", {}).get(iface, {}).get("mtu")
+        if mtu:
+            lines.append(f'{match}, ATTR{{mtu}}="{mtu}"')
+        for cmd in nic_commands(iface, state):
+            # udev 는 RUN 안의 % 를 치환하므로 이스케이프
+            lines.append(f'{match}, RUN+="{shlex.join(cmd).replace("%", "%%")}"')
+    return "\n".join(lines) + "\n"
+
+def render_nm_dispatcher(state):
+    """NetworkManager 가 인터페이스를 올릴 때 실행하는 dispatcher 스크립트"""
+    lines = ["#!/bin/sh", _HEADER, '[ "$2" = "up" ] || exit 0', 'case "$1" in']
+    for iface in _nic_ifaces(state):
+        lines.append(f"    {shlex.quote(iface)})")
+        mtu = state.get("ip link", {}).get(iface, {}).get("mtu")
+        if mtu:
+            lines.append(f"        {_binary('ip')} link set dev {shlex.quote(iface)} mtu {int(mtu)}")
+        lines += [f"        {shlex.join(cmd)}" for cmd in nic_commands(iface, state)]
+        lines.append("        ;;")
+    lines.append("esac")
+    return "\n".join(lines) + "\n"
+
+def render_unit(python=None, entry=None):
+    """부팅 후 저장된 상태 전체를 `tune plan --state` 로 한 번 다시 적용하는 oneshot 유닛
+
+    sysctl.d / udev 로 표현할 수 없는 sysfs 항목(큐 분산의 IRQ affinity/RPS/XPS, CPU 거버너)은
+    이 유닛이 적용한다. 상태에 기록된 항목만 복원하므로 영구 설정 생성 시 저장한 변경에 한정된다.
+    """
+    python = python or sys.executable
+    entry = entry or os.path.join(os.path.dirname(os.path.abspath(__file__)), "nettune.py")
+    exec_start = shlex.join([python, entry, "tune", "plan", "--state", "/" + STATE_PATH,
+                             "--apply", "--yes", "--no-backup"])
+    return "\n".join([
+        _HEADER,
+        "[Unit]",
+        "Description=NetTune network tuning (apply saved state)",
+        "After=network-online.target systemd-sysctl.service",
+        "Wants=network-online.target",
+        "",
+        "[Service]",
+        "Type=oneshot",
+        "RemainAfterExit=yes",
+        f"ExecStart={exec_start}",
+        "",
+        "[Install]",
+        "WantedBy=multi-user.target",
+    ]) + "\n"
+
+def render_artifacts(state, hook=HOOK_UDEV, priority=DEFAULT_PRIORITY, python=None, entry=None):
+    """상태에서 영구 설정 파일 {루트 기준 상대 경로: (내용, 권한)} 생성"""
+    artifacts = {STATE_PATH: (json.dumps(state, ensure_ascii=False, indent=2) + "\n", 0o644)}
+    if state.get("sysctl"):
+        artifacts[SYSCTL_PATH.format(priority=priority)] = (render_sysctl(state["sysctl"]), 0o644)
+    if _nic_ifaces(state):
+        if hook == HOOK_NM:
+            artifacts[NM_PATH.format(priority=priority)] = (render_nm_dispatcher(state), 0o755)
+        else:
+            artifacts[UDEV_PATH.format(priority=priority)] = (render_udev(state), 0o644)
+    artifacts[UNIT_PATH] = (render_unit(python, entry), 0o644)
+    return artifacts
+
+def write_artifacts(artifacts, root=DEFAULT_ROOT):
+    """파일을 임시 파일에 쓴 뒤 rename 으로 교체하고 기록한 절대 경로 목록 반환"""
+    written = []
+    for relative, (content, mode) in artifacts.items():
+        path = _path(root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+        written.append(path)
+    return written
+
+def check_root(root=DEFAULT_ROOT):
+    """실제 시스템(/)의 /etc 에 기록하려면 root 권한이 필요하므로, 권한이 없으면 쓰기 전에 PermissionError"""
+    if os.path.abspath(root) == "/" and os.geteuid() != 0:
+        raise PermissionError(errno.EACCES, "영구 설정 파일은 /etc 에 기록하므로 root 권한(sudo)으로 실행해야 합니다")
+
+def persist(desired, root=DEFAULT_ROOT, hook=HOOK_UDEV, priority=DEFAULT_PRIORITY, python=None, entry=None):
+    """적용한 상태를 저장된 상태에 병합하고 sysctl.d / udev(또는 NM) / systemd 파일로 기록"""
+    check_root(root)
+    state = merge_state(load_state(root), desired)
+    written = write_artifacts(render_artifacts(state, hook, priority, python, entry), root)
+    # 생성만 하고 활성화는 하지 않으므로 실행할 명령을 함께 돌려준다
+    activate = ["systemctl daemon-reload", f"systemctl enable {UNIT_NAME}"]
+    if hook == HOOK_UDEV and _nic_ifaces(state):
+        activate.append("udevadm control --reload")
+    return {"root": root, "state": state, "written": written, "activate": activate}
@@ -0,0 +1,262 @@
+import time
+import errno
+import socket
+import select
+import struct
+
+METHOD_AUTO = "auto"
+METHOD_ICMP = "icmp"
+METHOD_UDP = "udp"
+
+JUMBO_MTU = 9000
+DEFAULT_TIMEOUT = 1.0
+# 크기마다 동시에 보내는 프로브 수 (하나라도 도달하면 통과, 단발 손실을 실패로 오인하지 않도록)
+DEFAULT_TRIES = 3
+# 라운드마다 동시에 시험하는 크기 수 (구간을 width+1 등분하는 다분 탐색)
+DEFAULT_WIDTH = 4
+# traceroute 와 같은 고위 포트: 닫힌 포트의 ICMP Port Unreachable 로 도달을 확인
+DEFAULT_UDP_PORT = 33434
+# 커널은 Destination Unreachable 을 상대 호스트별로 제한 (버스트 6, 이후 net.ipv4.icmp_ratelimit=1000ms 당 1개)
+UNREACH_BURST = 6
+UNREACH_INTERVAL = 1.0
+
+IP_MTU_DISCOVER = getattr(socket, "IP_MTU_DISCOVER", 10)
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+IPV6_MTU_DISCOVER = getattr(socket, "IPV6_MTU_DISCOVER", 23)
+IPV6_RECVERR = getattr(socket, "IPV6_RECVERR", 25)
+IP_MTU = getattr(socket, "IP_MTU", 14)
+IPV6_MTU = getattr(socket, "IPV6_MTU", 24)
+# PROBE: DF 를 설정하되 캐시된 경로 MTU 는 무시하고 장치 MTU 까지 그대로 전송
+PMTUDISC_PROBE = 3
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP6_ECHO_REQUEST = 128
+ICMP6_ECHO_REPLY = 129
+ICMP_HEADER = struct.Struct("!BBHHH")
+# struct sock_extended_err: ee_errno, ee_origin, ee_type, ee_code, ee_pad, ee_info, ee_data
+EXTENDED_ERR = struct.Struct("=IBBBBII")
+
+_FAMILY = {
+    socket.AF_INET: {"ip_header": 20, "min_mtu": 576, "level": socket.IPPROTO_IP,
+                     "discover": IP_MTU_DISCOVER, "recverr": IP_RECVERR, "mtu": IP_MTU, "proto": socket.IPPROTO_ICMP,
+                     "request": ICMP_ECHO_REQUEST, "reply": ICMP_ECHO_REPLY},
+    socket.AF_INET6: {"ip_header": 40, "min_mtu": 1280, "level": socket.IPPROTO_IPV6,
+                      "discover": IPV6_MTU_DISCOVER, "recverr": IPV6_RECVERR, "mtu": IPV6_MTU,
+                      "proto": socket.IPPROTO_ICMPV6,
+                      "request": ICMP6_ECHO_REQUEST, "reply": ICMP6_ECHO_REPLY},
+}
+
+REASON_REPLY = "reply"
+REASON_REFUSED = "port_unreachable"
+REASON_LOCAL = "local_mtu"
+REASON_FRAG = "frag_needed"
+REASON_UNREACHABLE = "unreachable"
+REASON_TIMEOUT = "timeout"
+# 대상에 도달했음을 뜻하는 응답
+_REACHED = (REASON_REPLY, REASON_REFUSED)
+
+def open_probe_socket(family, sockaddr, method):
+    """DF(IP_PMTUDISC_PROBE) + IP_RECVERR 를 설정한 연결된 프로브 소켓"""
+    info = _FAMILY[family]
+    if method == METHOD_ICMP:
+        # 비특권 ICMP 데이터그램 소켓 (net.ipv4.ping_group_range 필요, id/checksum 은 커널이 채움)
+        sock = socket.socket(family, socket.SOCK_DGRAM, info["proto"])
+    else:
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(info["level"], info["discover"], PMTUDISC_PROBE)
+        sock.setsockopt(info["level"], info["recverr"], 1)
+        sock.connect(sockaddr)
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def payload_size(family, method, mtu):
+    """IP 패킷 전체가 mtu 바이트가 되도록 하는 send 길이 (ICMP 는 헤더를 직접 포함)"""
+    overhead = _FAMILY[family]["ip_header"] + (0 if method == METHOD_ICMP else 8)
+    return mtu - overhead
+
+def _read_error(sock):
+    """에러 큐에서 (사유, 다음 홉 MTU 힌트) 를 꺼냄. 큐가 비어 있으면 None"""
+    try:
+        _data, ancdata, _flags, _addr = sock.recvmsg(1, socket.CMSG_SPACE(512), socket.MSG_ERRQUEUE)
+    except (BlockingIOError, InterruptedError):
+        return None
+    for _level, _type, data in ancdata:
+        if len(data) < EXTENDED_ERR.size:
+            continue
+        ee_errno, _origin, _type, _code, _pad, ee_info, _ = EXTENDED_ERR.unpack_from(data)
+        if ee_errno == errno.EMSGSIZE:
+            return REASON_FRAG, ee_info or None
+        if ee_errno == errno.ECONNREFUSED:
+            return REASON_REFUSED, None
+        return REASON_UNREACHABLE, None
+    return REASON_UNREACHABLE, None
+
+def _read_reply(sock, family, method):
+    """수신 데이터/소켓 오류로 판정한 사유. 판정할 수 없으면 None"""
+    try:
+        data = sock.recv(65535)
+    except (BlockingIOError, InterruptedError):
+        return None
+    except ConnectionRefusedError:
+        return REASON_REFUSED
+    except OSError as e:
+        return REASON_FRAG if e.errno == errno.EMSGSIZE else REASON_UNREACHABLE
+    if method == METHOD_ICMP and len(data) >= ICMP_HEADER.size and data[0] == _FAMILY[family]["reply"]:
+        return REASON_REPLY
+    # UDP 대상 포트가 열려 있어 응답이 온 경우도 도달로 간주
+    return REASON_REPLY if method == METHOD_UDP else None
+
+def probe_sizes(family, sockaddr, mtus, method=METHOD_UDP, tries=DEFAULT_TRIES, timeout=DEFAULT_TIMEOUT):
+    """여러 크기를 동시에 프로브하여 {mtu: {"ok", "reason", "hint"}} 반환"""
+    results = {mtu: {"ok": False, "reason": REASON_TIMEOUT, "hint": None} for mtu in mtus}
+    pending = {}
+    request = _FAMILY[family]["request"]
+    try:
+        for mtu in mtus:
+            length = payload_size(family, method, mtu)
+            for seq in range(tries):
+                sock = open_probe_socket(family, sockaddr, method)
+                payload = bytearray(length)
+                if method == METHOD_ICMP:
+                    ICMP_HEADER.pack_into(payload, 0, request, 0, 0, 0, seq)
+                try:
+                    sock.send(payload)
+                except OSError as e:
+                    if e.errno != errno.EMSGSIZE:
+                        sock.close()
+                        raise
+                    # 로컬 장치 MTU 보다 큰 크기는 전송 전에 거부됨 (경로의 로컬 MTU 를 힌트로 사용)
+                    info = _FAMILY[family]
+                    results[mtu].update(reason=REASON_LOCAL, hint=sock.getsockopt(info["level"], info["mtu"]))
+                    sock.close()
+                    break
+                pending[sock] = mtu
+
+        deadline = time.monotonic() + timeout
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            readable, _, _ = select.select(list(pending), [], [], remaining)
+            for sock in readable:
+                mtu = pending[sock]
+                error = _read_error(sock)
+                reason, hint = error if error else (_read_reply(sock, family, method), None)
+                if reason is None:
+                    continue
+                del pending[sock]
+                sock.close()
+                result = results[mtu]
+                if reason in _REACHED:
+                    result.update(ok=True, reason=reason)
+                elif not result["ok"]:
+                    result.update(reason=reason, hint=hint or result["hint"])
+            # 이미 통과한 크기의 나머지 프로브는 기다리지 않음
+            for sock, mtu in list(pending.items()):
+                if results[mtu]["ok"]:
+                    del pending[sock]
+                    sock.close()
+    finally:
+        for sock in pending:
+            sock.close()
+    return results
+
+# 상대측 Destination Unreachable 제한을 흉내 낸 토큰 버킷 (프로세스 전체 공유)
+_unreach_budget = {"tokens": float(UNREACH_BURST), "at": None}
+
+def _wait_unreach_budget(count):
+    """UDP 프로브 count 개의 응답(Port Unreachable/Frag Needed)이 제한에 걸리지 않도록 대기"""
+    now = time.monotonic()
+    if _unreach_budget["at"] is not None:
+        refill = (now - _unreach_budget["at"]) / UNREACH_INTERVAL
+        _unreach_budget["tokens"] = min(float(UNREACH_BURST), _unreach_budget["tokens"] + refill)
+    _unreach_budget["at"] = now
+    shortage = count - _unreach_budget["tokens"]
+    if shortage > 0:
+        time.sleep(shortage * UNREACH_INTERVAL)
+        _unreach_budget["tokens"] += shortage
+        _unreach_budget["at"] = time.monotonic()
+    _unreach_budget["tokens"] -= count
+
+def _resolve(target, port):
+    family, _, _, _, sockaddr = socket.getaddrinfo(target, port, type=socket.SOCK_DGRAM)[0]
+    return family, sockaddr
+
+def _pick_method(family, sockaddr, method):
+    if method != METHOD_AUTO:
+        return method
+    try:
+        open_probe_socket(family, sockaddr, METHOD_ICMP).close()
+        return METHOD_ICMP
+    except PermissionError:
+        return METHOD_UDP
+
+def _candidates(low, high, width, hints):
+    """(low, high) 사이를 width+1 등분한 크기 + 구간 안의 MTU 힌트"""
+    span = high - low
+    sizes = {low + span * i // (width + 1) for i in range(1, width + 1)}
+    sizes |= {h for h in hints if low < h < high}
+    return sorted(s for s in sizes if low < s < high)
+
+def discover(target, max_mtu=JUMBO_MTU, method=METHOD_AUTO, tries=DEFAULT_TRIES, width=DEFAULT_WIDTH,
+             timeout=DEFAULT_TIMEOUT, port=DEFAULT_UDP_PORT):
+    """target 까지 DF 패킷이 도달하는 최대 MTU 를 다분 탐색으로 측정
+
+    method: icmp(Echo 응답으로 확인), udp(닫힌 포트의 Port Unreachable 로 확인), auto(icmp 가능하면 icmp).
+    udp 는 응답 ICMP 가 상대 호스트에서 속도 제한되므로 크기 하나씩 이분 탐색하며 전송 속도를 맞춘다.
+    max_mtu 가 로컬 장치 MTU 보다 크면 그 크기는 로컬에서 거부되므로 장치 MTU 를 먼저 올려야 검증할 수 있다.
+    """
+    result = {"target": target, "address": None, "method": None, "max_mtu": max_mtu, "path_mtu": None,
+              "verified": False, "rounds": 0, "probes": 0, "steps": [], "error": None}
+    try:
+        family, sockaddr = _resolve(target, port)
+        result["address"] = sockaddr[0]
+        method = _pick_method(family, sockaddr, method)
+    except OSError as e:
+        result["error"] = e.strerror or str(e)
+        return result
+    result["method"] = method if method == METHOD_ICMP else f"{METHOD_UDP}:{port}"
+    if method == METHOD_UDP:
+        tries, width = 1, 1
+
+    def run(sizes):
+        if method == METHOD_UDP:
+            _wait_unreach_budget(len(sizes) * tries)
+        outcome = probe_sizes(family, sockaddr, sizes, method, tries, timeout)
+        result["rounds"] += 1
+        result["probes"] += len(sizes) * tries
+        for mtu in sizes:
+            result["steps"].append(dict(outcome[mtu], mtu=mtu))
+        return outcome
+
+    floor = min(_FAMILY[family]["min_mtu"], max_mtu)
+    try:
+        outcome = run(sorted({floor, max_mtu}))
+        if not outcome[floor]["ok"]:
+            result["error"] = f"{floor} bytes 프로브도 응답이 없습니다 ({outcome[floor]['reason']})"
+            return result
+        if outcome[max_mtu]["ok"]:
+            result.update(path_mtu=max_mtu, verified=True)
+            return result
+        low, high = floor, max_mtu
+        hints = {o["hint"] for o in outcome.values() if o["hint"]}
+        while high - low > 1:
+            sizes = _candidates(low, high, width, hints)
+            outcome = run(sizes)
+            passed = [m for m in sizes if outcome[m]["ok"]]
+            low = max(passed, default=low)
+            high = min([m for m in sizes if m > low and not outcome[m]["ok"]], default=high)
+            hints |= {o["hint"] for o in outcome.values() if o["hint"]}
+            # Fragmentation Needed 가 알려 준 다음 홉 MTU 가 통과했다면 그보다 큰 크기는 모두 실패
+            if low in hints:
+                high = min(high, low + 1)
+    except OSError as e:
+        result["error"] = e.strerror or str(e)
+        return result
+    result["path_mtu"] = low
+    return result
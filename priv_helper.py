@@ -0,0 +1,299 @@
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import threading
+import subprocess
+
+# 설정하면 헬퍼가 실제 시스템 대신 이 디렉터리 아래에 쓰고 명령은 실행하지 않고 기록만 한다 (비특권 테스트용)
+FAKE_ROOT_ENV = "NETTUNE_FAKE_ROOT"
+FAKE_EXEC_LOG = "nettune-helper.log"
+
+OP_EXEC = "exec"
+OP_WRITE = "write"
+OP_SYSCTL = "sysctl"
+
+PROC_SYS = "/proc/sys"
+
+_IFACE_NAME = r"[\w.:@-]{1,15}"
+_IFACE = re.compile(f"^{_IFACE_NAME}$")
+_TOKEN = re.compile(r"^[\w.:/%+,-]+$")
+# 쓰기를 허용하는 속성 파일 (인터페이스 MTU/큐 길이, 큐별 RPS/XPS, IRQ affinity, CPU 거버너)
+WRITABLE_PATHS = (
+    re.compile(rf"^/sys/class/net/{_IFACE_NAME}/(mtu|tx_queue_len)$"),
+    re.compile(rf"^/sys/class/net/{_IFACE_NAME}/queues/rx-\d+/(rps_cpus|rps_flow_cnt)$"),
+    re.compile(rf"^/sys/class/net/{_IFACE_NAME}/queues/tx-\d+/xps_cpus$"),
+    re.compile(r"^/proc/irq/\d+/smp_affinity_list$"),
+    re.compile(r"^/sys/devices/system/cpu/cpufreq/policy\d+/scaling_governor$"),
+)
+# 설정을 허용하는 sysctl (네트워크 스택 튜닝 항목만)
+_SYSCTL_OID = re.compile(r"^net\.(core|ipv4|ipv6)(\.[\w-]+)+$")
+# 벡터 값(tcp_rmem 등)은 공백/탭으로 구분
+_SYSCTL_VALUE = re.compile(r"^[\w.:/%+,-]+([ \t]+[\w.:/%+,-]+)*$")
+# 혼잡 제어 알고리즘 모듈만 적재 허용 (tcp_bbr 등)
+_CONG_MODULE = re.compile(r"^tcp_[a-z0-9_]+$")
+CPUFREQ_GOVERNORS = ("performance", "powersave", "ondemand", "conservative", "schedutil", "userspace")
+ETHTOOL_FLAGS = ("-G", "-L", "-K", "-C", "-A")
+LINK_ATTRS = ("mtu", "txqueuelen")
+# tc 는 NetTune 이 만드는 qdisc(mq + 큐별 fq, 기본 fq_codel 복원)의 교체/삭제만 허용
+TC_VERBS = ("replace", "del")
+_TC_PARENT = re.compile(r"^[0-9a-f]{0,4}:[0-9a-f]{1,4}$")
+_TC_HANDLE = re.compile(r"^[0-9a-f]{1,4}:$")
+_TC_VALUE = re.compile(r"^\d+(\.\d+)?[a-z]*$")
+# qdisc 별 값을 받는 옵션과 값이 없는 플래그
+TC_QDISC_OPTIONS = {
+    "mq": ((), ()),
+    "fq": (("limit", "flow_limit", "quantum", "initial_quantum", "maxrate", "buckets", "orphan_mask",
+            "refill_delay", "low_rate_threshold", "ce_threshold", "timer_slack", "horizon"),
+           ("pacing", "nopacing", "horizon_drop", "horizon_cap")),
+    "fq_codel": (("limit", "flows", "target", "interval", "quantum", "ce_threshold", "memory_limit", "drop_batch"),
+                 ("ecn", "noecn")),
+}
+
+def _check_ethtool(args):
+    return len(args) >= 4 and args[0] in ETHTOOL_FLAGS and _IFACE.match(args[1]) and len(args) % 2 == 0
+
+def _check_tc_options(kind, options):
+    valued, flags = TC_QDISC_OPTIONS[kind]
+    i = 0
+    while i < len(options):
+        if options[i] in flags:
+            i += 1
+        elif options[i] in valued and i + 1 < len(options) and _TC_VALUE.match(options[i + 1]):
+            i += 2
+        else:
+            return False
+    return True
+
+def _check_tc(args):
+    """qdisc (replace|del) dev <if> (root|parent N:M) [handle N:] (fq|mq|fq_codel) [알려진 옵션...]"""
+    if len(args) < 5 or args[0] != "qdisc" or args[1] not in TC_VERBS or args[2] != "dev" \
+            or not _IFACE.match(args[3]):
+        return False
+    rest = args[4:]
+    if rest[0] == "root":
+        rest = rest[1:]
+    elif rest[0] == "parent" and len(rest) > 1 and _TC_PARENT.match(rest[1]):
+        rest = rest[2:]
+    else:
+        return False
+    if rest[:1] == ["handle"]:
+        if len(rest) < 2 or not _TC_HANDLE.match(rest[1]):
+            return False
+        rest = rest[2:]
+    if not rest:
+        # 삭제는 종류를 생략할 수 있다 (tc qdisc del dev eth0 root)
+        return args[1] == "del"
+    return rest[0] in TC_QDISC_OPTIONS and _check_tc_options(rest[0], rest[1:])
+
+def _check_ip(args):
+    return len(args) == 6 and args[:3] == ["link", "set", "dev"] and _IFACE.match(args[3]) \
+        and args[4] in LINK_ATTRS and args[5].isdigit()
+
+def _check_modprobe(args):
+    return len(args) == 1 and _CONG_MODULE.match(args[0])
+
+def _check_cpupower(args):
+    return len(args) == 3 and args[:2] == ["frequency-set", "-g"] and args[2] in CPUFREQ_GOVERNORS
+
+# 실행을 허용하는 명령과 인자 검사 함수
+ALLOWED_COMMANDS = {
+    "ethtool": _check_ethtool,
+    "tc": _check_tc,
+    "ip": _check_ip,
+    "modprobe": _check_modprobe,
+    "cpupower": _check_cpupower,
+}
+
+def validate(op):
+    """허용 목록에 없는 작업이면 거부 사유, 허용되면 None"""
+    kind = op.get("op")
+    if kind == OP_EXEC:
+        argv = op.get("argv")
+        if not isinstance(argv, list) or not argv or not all(isinstance(a, str) for a in argv):
+            return "argv 는 문자열 목록이어야 합니다"
+        check = ALLOWED_COMMANDS.get(argv[0])
+        if check is None:
+            return f"허용되지 않은 명령: {argv[0]}"
+        if not all(_TOKEN.match(a) for a in argv[1:]) or not check(argv[1:]):
+            return f"허용되지 않은 인자: {' '.join(argv)}"
+        return None
+    if kind == OP_WRITE:
+        path = op.get("path")
+        if not isinstance(path, str) or os.path.normpath(path) != path \
+                or not any(p.match(path) for p in WRITABLE_PATHS):
+            return f"쓰기가 허용되지 않은 경로: {path}"
+        if not _TOKEN.match(str(op.get("value", ""))):
+            return "허용되지 않은 값"
+        if path.endswith("/scaling_governor") and op.get("value") not in CPUFREQ_GOVERNORS:
+            return f"허용되지 않은 거버너: {op.get('value')}"
+        return None
+    if kind == OP_SYSCTL:
+        settings = op.get("settings")
+        if not isinstance(settings, dict) or not settings:
+            return "settings 는 {OID: 값} 이어야 합니다"
+        for oid, value in settings.items():
+            if not isinstance(oid, str) or not _SYSCTL_OID.match(oid):
+                return f"허용되지 않은 sysctl: {oid}"
+            if not isinstance(value, str) or not _SYSCTL_VALUE.match(value):
+                return f"허용되지 않은 sysctl 값: {oid}={value!r}"
+        return None
+    return f"알 수 없는 작업: {kind}"
+
+def _rebase(root, path):
+    return os.path.join(root, path.lstrip("/")) if root != "/" else path
+
+def _run_exec(argv, root):
+    if root != "/":
+        # 테스트 모드: 명령은 실행하지 않고 가짜 루트의 로그에 기록
+        with open(os.path.join(root, FAKE_EXEC_LOG), "a") as f:
+            f.write(json.dumps(argv) + "\n")
+        return True, None, ""
+    try:
+        proc = subprocess.run(argv, capture_output=True, text=True)
+    except OSError as e:
+        return False, e.strerror or str(e), ""
+    return proc.returncode == 0, proc.stderr.strip() or None, proc.stdout
+
+def execute(op, root="/"):
+    """검증된 작업 하나를 실행하고 {"op", "ok", "error", "output", "elapsed_us"} 반환"""
+    start = time.perf_counter_ns()
+    result = {"op": op.get("op"), "ok": False, "error": validate(op), "output": None}
+    if result["error"] is None:
+        if op["op"] == OP_EXEC:
+            result["ok"], result["error"], result["output"] = _run_exec(op["argv"], root)
+        elif op["op"] == OP_WRITE:
+            try:
+                with open(_rebase(root, op["path"]), "w") as f:
+                    f.write(f"{op['value']}\n")
+                result["ok"] = True
+            except OSError as e:
+                result["error"] = e.strerror or str(e)
+        else:
+            from sysctl_txn import apply_procfs
+            report = apply_procfs(op["settings"], _rebase(root, PROC_SYS))
+            result.update(ok=report["ok"], error=report["error"], output=report)
+    result["elapsed_us"] = (time.perf_counter_ns() - start) // 1000
+    return result
+
+def execute_batch(ops, root="/", stop_on_error=False):
+    """작업 목록을 순서대로 실행. stop_on_error 이면 첫 실패 이후 작업은 건너뛴 것으로 표시"""
+    results = []
+    for op in ops:
+        if stop_on_error and results and not results[-1]["ok"]:
+            results.append({"op": op.get("op"), "ok": False, "error": "이전 작업 실패로 건너뜀",
+                            "output": None, "elapsed_us": 0})
+            continue
+        results.append(execute(op, root))
+    return results
+
+def serve(stdin, stdout, root="/"):
+    """한 줄에 요청 하나({"id", "ops", "stop_on_error"})를 읽고 한 줄로 결과({"id", "results"})를 응답"""
+    for line in stdin:
+        try:
+            request = json.loads(line)
+            results = execute_batch(request.get("ops", []), root, request.get("stop_on_error", False))
+            response = {"id": request.get("id"), "results": results}
+        except (ValueError, AttributeError) as e:
+            response = {"id": None, "error": f"잘못된 요청: {e}", "results": []}
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+class PrivilegedHelper:
+    """세션 동안 한 번만 (필요하면 sudo 로) 띄워 두고 파이프로 작업 묶음을 보내는 권한 헬퍼 클라이언트"""
+
+    def __init__(self, root=None, sudo=None):
+        self.root = root or os.environ.get(FAKE_ROOT_ENV) or "/"
+        # 테스트 모드이거나 이미 root 면 sudo 없이 실행
+        self.sudo = (self.root == "/" and os.geteuid() != 0) if sudo is None else sudo
+        self._proc = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def fake(self):
+        return self.root != "/"
+
+    def _start(self):
+        cmd = [sys.executable, os.path.abspath(__file__), "--root", self.root]
+        if self.sudo:
+            cmd = ["sudo"] + cmd
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+
+    def request(self, ops, stop_on_error=False):
+        """작업 묶음을 한 번의 왕복으로 실행하고 작업별 결과 목록 반환"""
+        if not ops:
+            return []
+        with self._lock:
+            try:
+                if self._proc is None or self._proc.poll() is not None:
+                    self._start()
+                request_id = self._next_id
+                self._next_id += 1
+                self._proc.stdin.write(json.dumps({"id": request_id, "ops": ops, "stop_on_error": stop_on_error}) + "\n")
+                self._proc.stdin.flush()
+                line = self._proc.stdout.readline()
+                response = json.loads(line) if line else None
+            except (OSError, ValueError) as e:
+                response, error = None, getattr(e, "strerror", None) or str(e)
+            else:
+                error = "헬퍼가 응답 없이 종료되었습니다" if response is None else response.get("error")
+            if response is None or response.get("id") != request_id:
+                self.close()
+                return [{"op": op.get("op"), "ok": False, "error": f"권한 상승 실패: {error}", "output": None,
+                         "elapsed_us": 0} for op in ops]
+            return response["results"]
+
+    def run(self, argv):
+        """명령 하나 실행하고 (성공 여부, 오류 메시지) 반환"""
+        return self.run_batch([argv])[0]
+
+    def run_batch(self, commands):
+        """명령 목록을 한 번에 보내고 명령별 (성공 여부, 오류 메시지) 목록 반환"""
+        results = self.request([{"op": OP_EXEC, "argv": list(argv)} for argv in commands])
+        return [(r["ok"], r["error"]) for r in results]
+
+    def write(self, items):
+        """{경로: 값} 을 한 번에 쓰고 경로별 (성공 여부, 오류 메시지) 반환"""
+        results = self.request([{"op": OP_WRITE, "path": path, "value": str(value)} for path, value in items.items()])
+        return {path: (r["ok"], r["error"]) for path, r in zip(items, results)}
+
+    def sysctl(self, settings):
+        """sysctl 트랜잭션(sysctl_txn.apply_procfs)을 헬퍼 안에서 실행하고 보고서 반환 (실패 시 None)"""
+        result = self.request([{"op": OP_SYSCTL, "settings": settings}])[0]
+        return result["output"] if isinstance(result["output"], dict) else None
+
+    def close(self):
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+            self._proc = None
+
+_helper = None
+_helper_lock = threading.Lock()
+
+def get_helper():
+    """프로세스 전역 헬퍼 (처음 사용할 때 시작, 종료 시 정리)"""
+    global _helper
+    with _helper_lock:
+        if _helper is None:
+            _helper = PrivilegedHelper()
+            atexit.register(_helper.close)
+        return _helper
+
+def fake_root():
+    """테스트 모드의 가짜 루트 (설정되지 않았으면 None)"""
+    return os.environ.get(FAKE_ROOT_ENV) or None
+
+def _main(argv):
+    root = argv[argv.index("--root") + 1] if "--root" in argv else "/"
+    serve(sys.stdin, sys.stdout, root)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
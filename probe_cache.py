@@ -0,0 +1,157 @@
+import os
+import copy
+import time
+import select
+import platform
+import threading
+
+# 프로브 결과 유지 시간(초). 환경 변수 NETTUNE_PROBE_TTL 로 조정 가능 (잘못된 값이면 기본값)
+try:
+    DEFAULT_TTL = float(os.environ.get("NETTUNE_PROBE_TTL", "5"))
+except ValueError:
+    DEFAULT_TTL = 5.0
+# 같은 키를 로딩 중인 다른 스레드를 기다리는 최대 시간(초). 넘으면 캐시 없이 직접 프로브한다
+KEY_LOCK_TIMEOUT = 3.0
+
+# 캐시 키의 첫 번째 요소(카테고리)
+CATEGORY_SYSCTL = "sysctl"
+CATEGORY_NET = "net"
+CATEGORY_NIC = "nic"
+
+class SystemProbe:
+    """시스템 프로브 결과를 TTL 동안 메모이즈하는 프로세스 전역 캐시
+
+    키는 (카테고리, ...) 튜플이며, 튜닝 함수가 값을 쓰거나 netlink 링크/라우트
+    이벤트가 도착하면 해당 카테고리 단위로 즉시 무효화된다.
+    dict/list 값은 호출자마다 복사본을 돌려주므로 호출자가 수정해도 캐시에는 영향이 없다.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, clock=time.monotonic, lock_timeout=KEY_LOCK_TIMEOUT):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        # 카테고리별 무효화 세대: 로딩 중에 무효화되면 오래된 값을 저장하지 않기 위해 사용
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._watcher = None
+
+    def get(self, key, loader, ttl=None):
+        """key의 캐시 값 반환. 없거나 만료되었으면 loader()로 다시 채움"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() < entry[0]:
+                self.hits += 1
+                return _copy(entry[1])
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # 같은 키를 동시에 요청한 스레드는 한 번만 프로브하도록 키 단위로 직렬화.
+        # 먼저 로딩 중인 프로브가 멈춰 있으면(타임아웃된 동시 프로브 등) 기다리지 않고 직접 프로브한다
+        if not key_lock.acquire(timeout=self.lock_timeout):
+            with self._lock:
+                self.misses += 1
+            return loader()
+        try:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and self._clock() < entry[0]:
+                    self.hits += 1
+                    return _copy(entry[1])
+                self.misses += 1
+                generation = self._generation(key)
+            value = loader()
+            if ttl > 0:
+                with self._lock:
+                    # 로딩 도중 invalidate() 가 있었으면 값은 반환하되 캐시에는 넣지 않음
+                    if self._generation(key) == generation:
+                        self._entries[key] = (self._clock() + ttl, value)
+                        return _copy(value)
+            return value
+        finally:
+            key_lock.release()
+
+    def _generation(self, key):
+        return self._generations.get(None, 0), self._generations.get(key[0], 0)
+
+    def invalidate(self, *categories):
+        """지정한 카테고리(없으면 전체)의 캐시 항목 제거"""
+        with self._lock:
+            for category in categories or (None,):
+                self._generations[category] = self._generations.get(category, 0) + 1
+            if not categories:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [k for k in self._entries if k[0] in categories]
+                for k in stale:
+                    del self._entries[k]
+                removed = len(stale)
+            if removed:
+                self.invalidations += 1
+
+    def stats(self):
+        """hit/miss/무효화 카운터 및 현재 항목 수"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "netlink_watch": self._watcher is not None,
+            }
+
+    def start_netlink_watch(self):
+        """링크/주소/라우트 변경 이벤트 구독 스레드 시작 (Linux 전용)"""
+        if self._watcher is not None or platform.system() != "Linux":
+            return False
+        from netlink import NetlinkSocket, RTMGRP_NETWORK_EVENTS
+        try:
+            nl = NetlinkSocket(groups=RTMGRP_NETWORK_EVENTS)
+        except OSError:
+            return False
+        self._watcher = threading.Thread(target=self._watch, args=(nl,), name="nettune-netlink-watch", daemon=True)
+        self._watcher.start()
+        return True
+
+    def _watch(self, nl):
+        while True:
+            try:
+                ready, _, _ = select.select([nl], [], [])
+                if ready and nl.recv_events():
+                    self.invalidate(CATEGORY_NET, CATEGORY_NIC)
+            except OSError:
+                return
+
+def _copy(value):
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+_probe = None
+_probe_lock = threading.Lock()
+
+def get_probe():
+    """프로세스 전역 SystemProbe 반환 (최초 호출 시 생성 및 netlink 감시 시작)"""
+    global _probe
+    if _probe is None:
+        with _probe_lock:
+            if _probe is None:
+                probe = SystemProbe()
+                probe.start_netlink_watch()
+                _probe = probe
+    return _probe
+
+def cached(key, loader, ttl=None):
+    """전역 캐시를 통해 프로브 실행"""
+    return get_probe().get(key, loader, ttl)
+
+def invalidate(*categories):
+    """전역 캐시 무효화 (튜닝 함수가 값을 쓴 직후 호출)"""
+    get_probe().invalidate(*categories)
+
+def probe_stats():
+    """전역 캐시 카운터"""
+    return get_probe().stats()
@@ -0,0 +1,227 @@
+import os
+import irq_stats
+from ethtool_ioctl import get_channels, ethtool_command
+from probe_cache import invalidate, CATEGORY_NIC
+from priv_helper import get_helper, fake_root, OP_EXEC, OP_WRITE
+
+SYS_ROOT = "/sys"
+PROC_ROOT = "/proc"
+
+ACTION_CHANNELS = "channels"
+ACTION_IRQ = "irq_affinity"
+ACTION_RPS = "rps_cpus"
+ACTION_XPS = "xps_cpus"
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_text(path, value):
+    with open(path, 'w') as f:
+        f.write(f"{value}\n")
+
+def cpu_mask(cpus):
+    """CPU 목록을 커널 cpumask 표기(32비트 단위 콤마 구분 hex)로 변환"""
+    value = 0
+    for cpu in cpus:
+        value |= 1 << cpu
+    words = []
+    while True:
+        words.append(f"{value & 0xffffffff:08x}")
+        value >>= 32
+        if not value:
+            break
+    return ",".join(reversed(words))
+
+def parse_mask(text):
+    """cpumask 문자열을 CPU 번호 목록으로 변환"""
+    value = int((text or "0").replace(",", ""), 16)
+    return [cpu for cpu in range(value.bit_length()) if value >> cpu & 1]
+
+def online_cpus(sys_root=SYS_ROOT):
+    return irq_stats.parse_cpu_list(_read_text(os.path.join(sys_root, "devices/system/cpu/online")) or "0")
+
+def order_cpus(cpus, sys_root=SYS_ROOT):
+    """물리 코어의 첫 스레드를 먼저, SMT 형제 스레드를 나중에 배치한 순서"""
+    primary, siblings = [], []
+    for cpu in cpus:
+        text = _read_text(os.path.join(sys_root, f"devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"))
+        threads = irq_stats.parse_cpu_list(text) if text else [cpu]
+        (primary if cpu == min(threads) else siblings).append(cpu)
+    return primary + siblings, len(primary)
+
+def cpu_topology(iface, sys_root=SYS_ROOT):
+    """NIC 기준 CPU 배치 순서: 로컬 NUMA 노드 코어 우선, 원격 노드는 뒤에"""
+    class_net = os.path.join(sys_root, "class", "net")
+    online = online_cpus(sys_root)
+    local = [c for c in irq_stats.parse_cpu_list(irq_stats.read_local_cpus(iface, class_net)) if c in online]
+    local = local or online
+    remote = [c for c in online if c not in local]
+    local_order, local_cores = order_cpus(local, sys_root)
+    remote_order, _ = order_cpus(remote, sys_root)
+    return {
+        "online": online,
+        "numa_node": irq_stats.read_numa_node(iface, class_net),
+        "local": local_order,
+        "local_cores": local_cores,
+        "order": local_order + remote_order,
+    }
+
+def _queue_dirs(iface, prefix, sys_root):
+    path = os.path.join(sys_root, "class", "net", iface, "queues")
+    try:
+        names = [n for n in os.listdir(path) if n.startswith(prefix)]
+    except OSError:
+        return []
+    return [os.path.join(path, n) for n in sorted(names, key=lambda n: int(n.split("-")[1]))]
+
+def _action(kind, target, current, desired, changed):
+    return {"kind": kind, "target": target, "current": current, "desired": desired, "changed": changed}
+
+def plan_channels(iface, topo, backend=None):
+    """combined 채널 수를 로컬 물리 코어 수(하드웨어 최대 이내)로 맞추는 계획"""
+    try:
+        ch = get_channels(iface, backend)
+    except OSError:
+        return None
+    if not ch["max_combined"]:
+        return None
+    desired = max(1, min(ch["max_combined"], topo["local_cores"]))
+    return _action(ACTION_CHANNELS, iface, ch["combined"], desired, ch["combined"] != desired)
+
+def plan_irq_affinity(iface, topo, sys_root=SYS_ROOT, proc_root=PROC_ROOT):
+    """NIC 큐 IRQ 를 로컬 코어에 1:1 로 고정하는 계획 (큐가 더 많으면 순환 배치)"""
+    try:
+        with open(os.path.join(proc_root, "interrupts"), 'rb') as f:
+            names = irq_stats.parse_irq_names(f.read())
+    except OSError:
+        return []
+    irqs = irq_stats.find_nic_irqs(iface, names, os.path.join(sys_root, "class", "net"))
+    assignment = irq_stats.suggest_spread(irqs, topo["local"], topo["online"])
+    actions = []
+    for irq, cpu in assignment.items():
+        path = os.path.join(proc_root, "irq", str(irq), "smp_affinity_list")
+        current = _read_text(path)
+        changed = current is None or irq_stats.parse_cpu_list(current) != [cpu]
+        action = _action(ACTION_IRQ, path, current, str(cpu), changed)
+        action["irq"], action["name"] = irq, names.get(irq, "")
+        actions.append(action)
+    return actions
+
+def plan_rps(iface, topo, rx_queues, sys_root=SYS_ROOT):
+    """RPS 계획: 하드웨어 큐가 로컬 코어보다 적으면 로컬 코어 전체로 분산, 충분하면 비활성화(0)"""
+    dirs = _queue_dirs(iface, "rx-", sys_root)
+    spread = rx_queues < topo["local_cores"] and len(topo["online"]) > 1
+    desired = cpu_mask(topo["local"]) if spread else "0"
+    actions = []
+    for d in dirs:
+        path = os.path.join(d, "rps_cpus")
+        current = _read_text(path)
+        if current is None:
+            continue
+        actions.append(_action(ACTION_RPS, path, current, desired, parse_mask(current) != parse_mask(desired)))
+    return actions
+
+def plan_xps(iface, topo, sys_root=SYS_ROOT):
+    """XPS 계획: 모든 온라인 CPU 가 정확히 하나의 TX 큐에 대응하도록 순환 배정"""
+    dirs = [d for d in _queue_dirs(iface, "tx-", sys_root) if os.path.exists(os.path.join(d, "xps_cpus"))]
+    if len(dirs) < 2:
+        return []
+    per_queue = [[] for _ in dirs]
+    for i, cpu in enumerate(topo["order"]):
+        per_queue[i % len(dirs)].append(cpu)
+    actions = []
+    for d, cpus in zip(dirs, per_queue):
+        path = os.path.join(d, "xps_cpus")
+        current = _read_text(path)
+        desired = cpu_mask(cpus)
+        actions.append(_action(ACTION_XPS, path, current, desired, parse_mask(current) != parse_mask(desired)))
+    return actions
+
+def build_plan(iface, sys_root=SYS_ROOT, proc_root=PROC_ROOT, backend=None, channels=True):
+    """채널/IRQ affinity/RPS/XPS 변경 계획 (dry-run). 실제 변경은 apply_plan() 에서 수행"""
+    topo = cpu_topology(iface, sys_root)
+    actions = []
+    channel = plan_channels(iface, topo, backend) if channels else None
+    if channel:
+        actions.append(channel)
+    rx_queues = channel["desired"] if channel else len(_queue_dirs(iface, "rx-", sys_root))
+    actions += plan_irq_affinity(iface, topo, sys_root, proc_root)
+    actions += plan_rps(iface, topo, rx_queues, sys_root)
+    actions += plan_xps(iface, topo, sys_root)
+    return {"interface": iface, "topology": topo, "actions": actions,
+            # 채널 수가 바뀌면 큐 IRQ 와 queues/ 디렉터리가 다시 만들어지므로 적용 후 재계산한다
+            "replan_after_channels": bool(channel and channel["changed"])}
+
+def _helper_op(action):
+    """권한 헬퍼로 보내야 하는 항목이면 헬퍼 작업, 직접 쓸 수 있으면 None"""
+    if action["kind"] == ACTION_CHANNELS:
+        # 채널 변경은 CAP_NET_ADMIN 이 필요하므로 항상 권한 헬퍼의 `ethtool -L` 로 적용
+        return {"op": OP_EXEC, "argv": ethtool_command(action["target"], "channels", {"combined": action["desired"]})}
+    if fake_root() or not os.access(action["target"], os.W_OK):
+        return {"op": OP_WRITE, "path": action["target"], "value": str(action["desired"])}
+    return None
+
+def apply_actions(actions):
+    """계획 항목들을 적용하고 결과 항목(ok/error 포함) 목록을 반환
+
+    직접 쓸 수 있는 파일은 바로 쓰고, 나머지 쓰기/명령은 모아서 권한 헬퍼에 한 번의 요청으로 보낸다.
+    """
+    results = [dict(a, ok=True, error=None) for a in actions]
+    ops, pending = [], []
+    for result in results:
+        op = _helper_op(result)
+        if op is not None:
+            ops.append(op)
+            pending.append(result)
+            continue
+        try:
+            _write_text(result["target"], result["desired"])
+        except OSError as e:
+            result["ok"], result["error"] = False, e.strerror or str(e)
+    for result, reply in zip(pending, get_helper().request(ops)):
+        result["ok"], result["error"] = reply["ok"], reply["error"]
+    return results
+
+def apply_action(action):
+    """계획 항목 하나를 적용하고 결과 항목(ok/error 포함)을 반환"""
+    return apply_actions([action])[0]
+
+def apply_plan(plan, sys_root=SYS_ROOT, proc_root=PROC_ROOT, backend=None):
+    """변경이 필요한 항목만 적용 (채널 변경 시 나머지 계획을 새 큐 기준으로 다시 계산)"""
+    results = []
+    actions = plan["actions"]
+    if plan["replan_after_channels"]:
+        # 새 큐/IRQ 를 알아야 나머지를 계획할 수 있으므로 채널 변경만 먼저 보낸다
+        results += apply_actions(actions[:1])
+        if results[0]["ok"]:
+            actions = build_plan(plan["interface"], sys_root, proc_root, backend, channels=False)["actions"]
+        else:
+            actions = actions[1:]
+    results += apply_actions([a for a in actions if a["changed"]])
+    if results:
+        invalidate(CATEGORY_NIC)
+    return results
+
+def desired_state(plan, results):
+    """적용한 계획을 원하는 상태(tuning_plan / persist)의 ethtool(채널)·sysfs(IRQ/RPS/XPS) 항목으로 변환
+
+    이미 권장값이던 항목도 포함하고 실패한 항목은 제외한다. 채널 수를 바꿨다면 큐/IRQ 가 새로 만들어져
+    기존 계획의 나머지 항목은 더 이상 유효하지 않으므로 적용 결과만 사용한다.
+    IRQ 번호는 재부팅 후 달라질 수 있으므로 드라이버/커널 변경 후에는 다시 계획해 저장해야 한다.
+    """
+    actions = plan["actions"]
+    if plan["replan_after_channels"] and results and results[0]["ok"]:
+        actions = actions[:1]
+    entries = {a["target"]: a for a in actions if not a["changed"]}
+    entries.update({r["target"]: r for r in results if r["ok"]})
+    state = {}
+    for target, a in entries.items():
+        if a["kind"] == ACTION_CHANNELS:
+            state.setdefault("ethtool", {})[target] = {"channels": {"combined": a["desired"]}}
+        else:
+            state.setdefault("sysfs", {})[target] = a["desired"]
+    return state
@@ -0,0 +1,95 @@
+import os
+import time
+from ethtool_ioctl import get_ring_params, get_stats, get_speed_mbps, ethtool_command
+from probe_cache import invalidate, CATEGORY_NIC
+
+SYS_CLASS_NET = "/sys/class/net"
+
+# 링 부족으로 증가하는 수신 드롭 카운터 (sysfs statistics/)
+SYSFS_DROP_COUNTERS = ("rx_missed_errors", "rx_fifo_errors", "rx_over_errors")
+# 드라이버 확장 통계(ethtool -S)의 링 부족 카운터 (igb/ixgbe, mlx5 등)
+DRIVER_DROP_COUNTERS = ("rx_no_buffer_count", "rx_out_of_buffer")
+
+# 링크 속도(Mbps) 상한별 기본 링 크기
+SPEED_RING_TARGETS = ((1000, 1024), (10000, 4096), (40000, 8192))
+FAST_LINK_RING = 16384
+UNKNOWN_SPEED_RING = 4096
+
+def speed_ring_target(speed_mbps):
+    """링크 속도에 맞는 기본 링 크기"""
+    if not speed_mbps:
+        return UNKNOWN_SPEED_RING
+    for limit, size in SPEED_RING_TARGETS:
+        if speed_mbps <= limit:
+            return size
+    return FAST_LINK_RING
+
+def read_drop_counters(iface, backend=None, sys_root=SYS_CLASS_NET):
+    """링 부족 관련 드롭 카운터 합계 {카운터: 값} (없는 카운터는 제외)"""
+    counters = {}
+    for name in SYSFS_DROP_COUNTERS:
+        try:
+            with open(os.path.join(sys_root, iface, "statistics", name), 'r') as f:
+                counters[name] = int(f.read())
+        except (OSError, ValueError):
+            continue
+    try:
+        stats = get_stats(iface, backend)
+    except OSError:
+        stats = {}
+    for name in DRIVER_DROP_COUNTERS:
+        if name in stats:
+            counters[f"ethtool.{name}"] = stats[name]
+    return counters
+
+def measure_drop_rate(iface, interval=1.0, backend=None, sys_root=SYS_CLASS_NET):
+    """interval 초 동안의 링 부족 드롭 증가율 (초당), 카운터별 증가량"""
+    before = read_drop_counters(iface, backend, sys_root)
+    start = time.monotonic()
+    time.sleep(interval)
+    after = read_drop_counters(iface, backend, sys_root)
+    elapsed = time.monotonic() - start
+    deltas = {k: after[k] - before[k] for k in after if k in before and after[k] > before[k]}
+    rate = sum(deltas.values()) / elapsed if elapsed else 0.0
+    return round(rate, 2), deltas
+
+def propose_size(current, maximum, target, drop_rate=0.0):
+    """제안 크기와 사유: 줄이지 않고, 드롭이 있으면 두 배로, 하드웨어 최대를 넘지 않음"""
+    if not maximum:
+        return current, "하드웨어 최대값을 알 수 없음"
+    proposed, reason = max(current, target), f"링크 속도 기준 {target}"
+    if drop_rate > 0:
+        grown = max(proposed, current * 2)
+        if grown > proposed:
+            proposed, reason = grown, f"드롭 {drop_rate}/s 관측 → 현재의 2배"
+    if proposed > maximum:
+        proposed, reason = maximum, f"{reason} (하드웨어 최대 {maximum}로 제한)"
+    if proposed == current:
+        reason = "이미 최대" if current == maximum else "변경 불필요"
+    return proposed, reason
+
+def build_ring_plan(iface, interval=1.0, backend=None, sys_root=SYS_CLASS_NET):
+    """RX/TX 링 크기 계획 (현재/최대/제안). interval 동안 드롭률을 측정한다 (0이면 생략)"""
+    ring = get_ring_params(iface, backend)
+    speed = get_speed_mbps(iface, backend)
+    target = speed_ring_target(speed)
+    drop_rate, drops = measure_drop_rate(iface, interval, backend, sys_root) if interval > 0 else (0.0, {})
+
+    rows = {}
+    for direction, rate in (("rx", drop_rate), ("tx", 0.0)):
+        current, maximum = ring[direction], ring[f"{direction}_max"]
+        proposed, reason = propose_size(current, maximum, target, rate)
+        rows[direction] = {"current": current, "max": maximum, "proposed": proposed,
+                           "changed": proposed != current, "reason": reason}
+    return {"interface": iface, "speed_mbps": speed, "target": target,
+            "drop_rate_per_s": drop_rate, "drops": drops, "ring": rows}
+
+def apply_ring_plan(plan, helper=None):
+    """변경이 필요한 방향만 권한 헬퍼의 `ethtool -G` 한 번으로 적용 (링 변경은 링크를 잠시 재설정함)"""
+    sizes = {d: row["proposed"] for d, row in plan["ring"].items() if row["changed"]}
+    if not sizes:
+        return {"applied": {}, "ok": True, "error": None}
+    from priv_helper import get_helper
+    ok, error = (helper or get_helper()).run(ethtool_command(plan["interface"], "ring", sizes))
+    invalidate(CATEGORY_NIC)
+    return {"applied": sizes if ok else {}, "ok": ok, "error": error}
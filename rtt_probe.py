@@ -0,0 +1,204 @@
+import math
+import time
+import errno
+import socket
+import struct
+import asyncio
+from array import array
+
+METHOD_AUTO = "auto"
+METHOD_ICMP = "icmp"
+METHOD_TCP = "tcp"
+
+DEFAULT_COUNT = 10
+DEFAULT_INTERVAL = 0.2
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_TCP_PORT = 443
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP6_ECHO_REQUEST = 128
+ICMP6_ECHO_REPLY = 129
+# type, code, checksum, id, seq (id/checksum 은 ICMP 데이터그램 소켓에서 커널이 채움)
+ICMP_HEADER = struct.Struct("!BBHHH")
+
+# 고정 버킷 히스토그램: 1us ~ 60s 를 2^(1/8) 배(약 9%) 간격으로 나눈 상한값
+HIST_MIN_US = 1.0
+HIST_MAX_US = 60_000_000.0
+HIST_STEPS_PER_OCTAVE = 8
+HIST_BOUNDS_US = tuple(HIST_MIN_US * 2 ** (i / HIST_STEPS_PER_OCTAVE)
+                       for i in range(int(math.log2(HIST_MAX_US / HIST_MIN_US) * HIST_STEPS_PER_OCTAVE) + 2))
+
+PERCENTILES = (50, 90, 99)
+
+class RttHistogram:
+    """RTT 를 고정 로그 버킷에 누적하는 압축 히스토그램 (표본을 보관하지 않음)"""
+
+    def __init__(self):
+        self.counts = array("I", bytes(4 * len(HIST_BOUNDS_US)))
+        self.count = 0
+        self.lost = 0
+        self.min_us = None
+        self.max_us = None
+        self.sum_us = 0.0
+
+    def add(self, rtt_us):
+        index = min(len(HIST_BOUNDS_US) - 1,
+                    max(0, math.ceil(math.log2(max(rtt_us, HIST_MIN_US) / HIST_MIN_US) * HIST_STEPS_PER_OCTAVE)))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum_us += rtt_us
+        self.min_us = rtt_us if self.min_us is None else min(self.min_us, rtt_us)
+        self.max_us = rtt_us if self.max_us is None else max(self.max_us, rtt_us)
+
+    def percentile(self, pct):
+        """pct 분위수 (버킷 상한값, 관측 최소/최대로 보정). 표본이 없으면 None"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(max(HIST_BOUNDS_US[index], self.min_us), self.max_us)
+        return self.max_us
+
+    def summary(self):
+        sent = self.count + self.lost
+
+        def ms(us):
+            return round(us / 1000, 3) if us is not None else None
+        result = {"sent": sent, "received": self.count, "lost": self.lost,
+                  "loss_pct": round(self.lost * 100 / sent, 2) if sent else 0.0,
+                  "min_ms": ms(self.min_us),
+                  "mean_ms": ms(self.sum_us / self.count) if self.count else None}
+        for pct in PERCENTILES:
+            result[f"p{pct}_ms"] = ms(self.percentile(pct))
+        result["max_ms"] = ms(self.max_us)
+        # 0이 아닌 버킷만 {상한 ms: 개수} 로 보관
+        result["histogram"] = {f"{HIST_BOUNDS_US[i] / 1000:.3f}": n for i, n in enumerate(self.counts) if n}
+        return result
+
+async def _resolve(target, port):
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(target, port, type=socket.SOCK_STREAM)
+    family, _, _, _, sockaddr = infos[0]
+    return family, sockaddr
+
+def open_icmp_socket(family):
+    """비특권 ICMP 데이터그램 소켓 (net.ipv4.ping_group_range 에 그룹이 포함되어야 함)"""
+    proto = socket.IPPROTO_ICMPV6 if family == socket.AF_INET6 else socket.IPPROTO_ICMP
+    sock = socket.socket(family, socket.SOCK_DGRAM, proto)
+    sock.setblocking(False)
+    return sock
+
+async def _probe_icmp(sock, sockaddr, hist, count, interval, timeout):
+    loop = asyncio.get_running_loop()
+    family = sock.family
+    request = ICMP6_ECHO_REQUEST if family == socket.AF_INET6 else ICMP_ECHO_REQUEST
+    reply = ICMP6_ECHO_REPLY if family == socket.AF_INET6 else ICMP_ECHO_REPLY
+    # 데이터그램 소켓의 connect 는 블록되지 않음 (loop.sock_connect 는 ICMP 소켓 타입을 재확인하다 실패)
+    sock.connect(sockaddr)
+    pending = {}
+
+    async def receiver():
+        while pending or not sender_done.is_set():
+            data = await loop.sock_recv(sock, 2048)
+            now = time.monotonic()
+            if len(data) < ICMP_HEADER.size:
+                continue
+            icmp_type, _code, _sum, _id, seq = ICMP_HEADER.unpack_from(data)
+            sent_at = pending.pop(seq, None) if icmp_type == reply else None
+            if sent_at is not None:
+                hist.add((now - sent_at) * 1e6)
+
+    sender_done = asyncio.Event()
+    task = asyncio.ensure_future(receiver())
+    payload = bytes(range(48))
+    for seq in range(count):
+        pending[seq] = time.monotonic()
+        await loop.sock_sendall(sock, ICMP_HEADER.pack(request, 0, 0, 0, seq) + payload)
+        if seq < count - 1:
+            await asyncio.sleep(interval)
+    sender_done.set()
+    try:
+        await asyncio.wait_for(task, timeout)
+    except asyncio.TimeoutError:
+        pass
+    hist.lost += len(pending)
+
+async def _connect_time(family, sockaddr, timeout):
+    """TCP 연결 수립 시간(SYN → SYN-ACK/RST) 초. 응답이 없으면 None"""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    start = time.monotonic()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, sockaddr), timeout)
+    except ConnectionRefusedError:
+        # RST 도 한 번의 왕복이므로 RTT 로 사용
+        pass
+    except (asyncio.TimeoutError, OSError):
+        return None
+    finally:
+        sock.close()
+    return time.monotonic() - start
+
+async def _probe_tcp(family, sockaddr, hist, count, interval, timeout):
+    tasks = []
+    for seq in range(count):
+        tasks.append(asyncio.ensure_future(_connect_time(family, sockaddr, timeout)))
+        if seq < count - 1:
+            await asyncio.sleep(interval)
+    for rtt in await asyncio.gather(*tasks):
+        if rtt is None:
+            hist.lost += 1
+        else:
+            hist.add(rtt * 1e6)
+
+async def probe_target(target, count=DEFAULT_COUNT, interval=DEFAULT_INTERVAL, timeout=DEFAULT_TIMEOUT,
+                       method=METHOD_AUTO, port=DEFAULT_TCP_PORT):
+    """대상 하나의 RTT 분포. auto 는 ICMP 데이터그램 소켓을 쓰고, 권한이 없으면 TCP 연결 시간으로 대체"""
+    hist = RttHistogram()
+    result = {"target": target, "address": None, "method": None, "error": None}
+    try:
+        family, sockaddr = await _resolve(target, port)
+    except OSError as e:
+        result["error"] = f"주소 확인 실패: {e}"
+        return dict(result, **hist.summary())
+    result["address"] = sockaddr[0]
+    sock = None
+    if method in (METHOD_AUTO, METHOD_ICMP):
+        try:
+            sock = open_icmp_socket(family)
+        except OSError as e:
+            if method == METHOD_ICMP or e.errno not in (errno.EACCES, errno.EPERM, errno.EPROTONOSUPPORT):
+                result["error"] = f"ICMP 소켓 생성 실패: {e.strerror or e}"
+                return dict(result, **hist.summary())
+    try:
+        if sock is not None:
+            result["method"] = METHOD_ICMP
+            await _probe_icmp(sock, sockaddr, hist, count, interval, timeout)
+        else:
+            result["method"] = f"{METHOD_TCP}:{port}"
+            await _probe_tcp(family, sockaddr, hist, count, interval, timeout)
+    except OSError as e:
+        result["error"] = e.strerror or str(e)
+    finally:
+        if sock is not None:
+            sock.close()
+    return dict(result, **hist.summary())
+
+async def _probe_all(targets, **options):
+    return await asyncio.gather(*(probe_target(t, **options) for t in targets))
+
+def probe_targets(targets, count=DEFAULT_COUNT, interval=DEFAULT_INTERVAL, timeout=DEFAULT_TIMEOUT,
+                  method=METHOD_AUTO, port=DEFAULT_TCP_PORT):
+    """여러 대상을 동시에 측정하여 대상별 결과 목록 반환 (입력 순서 유지)"""
+    return asyncio.run(_probe_all(targets, count=count, interval=interval, timeout=timeout,
+                                  method=method, port=port))
+
+def pick_rtt(result, percentile):
+    """결과에서 BDP 산정에 사용할 RTT(ms). percentile 은 50/90/99 또는 'max'"""
+    key = "max_ms" if percentile == "max" else f"p{percentile}_ms"
+    return result.get(key)
@@ -0,0 +1,135 @@
+import os
+import platform
+import threading
+import subprocess
+
+# Linux 커널 튜너블이 노출되는 경로
+PROC_SYS_ROOT = "/proc/sys"
+
+# 한 번의 pread로 읽을 최대 바이트 (sysctl 값은 한 줄이므로 충분)
+_READ_SIZE = 4096
+
+def oid_to_path(oid, root=PROC_SYS_ROOT):
+    """sysctl OID(net.ipv4.tcp_rmem)를 /proc/sys 경로로 변환"""
+    # sysctl(8)과 동일하게 '/' 구분자도 허용 (예: net/ipv4/conf/eth0.100/rp_filter)
+    parts = oid.split("/") if "/" in oid else oid.split(".")
+    return os.path.join(root, *parts)
+
+def parse_value(raw):
+    """sysctl 원시 문자열을 int / int 튜플 / str 로 변환"""
+    text = raw.strip()
+    fields = text.split()
+    if not fields:
+        return text
+    try:
+        nums = tuple(int(f) for f in fields)
+    except ValueError:
+        return text
+    return nums[0] if len(nums) == 1 else nums
+
+def format_value(value):
+    """파싱된 값을 `sysctl -n` 출력과 같은 문자열로 되돌림"""
+    if isinstance(value, tuple):
+        return "\t".join(str(v) for v in value)
+    return str(value)
+
+class SysctlReader:
+    """/proc/sys 파일 핸들을 열어 둔 채 pread로 재사용하는 sysctl 리더
+
+    동시 프로브 스레드가 같은 리더를 공유하므로 핸들 조회/읽기/닫기는 잠금 안에서 수행한다
+    (다른 스레드가 닫은 fd 번호를 커널이 재사용해 엉뚱한 파일을 읽지 않도록).
+    """
+
+    def __init__(self, root=PROC_SYS_ROOT, system=None):
+        self.root = root
+        self.system = system or platform.system()
+        self._fds = {}
+        self._lock = threading.Lock()
+
+    def _fd(self, oid):
+        fd = self._fds.get(oid)
+        if fd is None:
+            fd = os.open(oid_to_path(oid, self.root), os.O_RDONLY)
+            self._fds[oid] = fd
+        return fd
+
+    def read_raw(self, oid):
+        """단일 OID의 원시 문자열 (없으면 None)"""
+        return self.read_raw_many([oid]).get(oid)
+
+    def read_raw_many(self, oids):
+        """여러 OID를 한 번에 읽어 {oid: 원시 문자열 또는 None} 반환"""
+        if self.system == "Darwin":
+            return _sysctl_fallback(oids)
+        result = {}
+        with self._lock:
+            for oid in oids:
+                try:
+                    result[oid] = os.pread(self._fd(oid), _READ_SIZE, 0).decode().strip()
+                except OSError:
+                    # 핸들이 무효화된 경우(모듈 언로드 등) 닫고 다음 호출에서 다시 연다
+                    self._forget(oid)
+                    result[oid] = None
+        return result
+
+    def read(self, oid):
+        """단일 OID를 타입 변환하여 반환 (없으면 None)"""
+        return self.read_many([oid]).get(oid)
+
+    def read_many(self, oids):
+        """여러 OID를 한 번에 읽어 {oid: int | tuple | str | None} 반환"""
+        return {oid: (parse_value(raw) if raw is not None else None)
+                for oid, raw in self.read_raw_many(oids).items()}
+
+    def _forget(self, oid):
+        fd = self._fds.pop(oid, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def close(self):
+        """열어 둔 모든 파일 핸들 닫기"""
+        with self._lock:
+            for oid in list(self._fds):
+                self._forget(oid)
+
+    def __del__(self):
+        self.close()
+
+def _sysctl_fallback(oids):
+    """macOS 등 /proc/sys가 없는 환경: sysctl 한 번 호출로 여러 OID 조회"""
+    result = {oid: None for oid in oids}
+    if not oids:
+        return result
+    # 없는 OID가 섞여 있어도 나머지는 출력되므로 종료 코드는 무시
+    proc = subprocess.run(["sysctl"] + list(oids), capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        name, sep, val = line.partition(":")
+        if not sep:
+            name, sep, val = line.partition("=")
+        name = name.strip()
+        if sep and name in result:
+            result[name] = val.strip()
+    return result
+
+_default_reader = None
+_default_reader_lock = threading.Lock()
+
+def get_reader():
+    """프로세스 전역 SysctlReader 반환 (최초 호출 시 생성)"""
+    global _default_reader
+    if _default_reader is None:
+        with _default_reader_lock:
+            if _default_reader is None:
+                _default_reader = SysctlReader()
+    return _default_reader
+
+def read_sysctl(oid):
+    """전역 리더로 단일 OID를 읽어 타입 변환 값 반환"""
+    return get_reader().read(oid)
+
+def read_sysctls(oids):
+    """전역 리더로 여러 OID를 한 번에 읽기"""
+    return get_reader().read_many(oids)
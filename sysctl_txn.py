@@ -0,0 +1,168 @@
+import os
+import time
+import platform
+import subprocess
+from sysctl_reader import PROC_SYS_ROOT, oid_to_path, parse_value, format_value
+
+STATUS_APPLIED = "applied"
+STATUS_UNCHANGED = "unchanged"
+STATUS_FAILED = "failed"
+STATUS_ROLLED_BACK = "rolled_back"
+STATUS_SKIPPED = "skipped"
+
+METHOD_PROCFS = "procfs"
+METHOD_HELPER = "sudo-helper"
+METHOD_SYSCTL = "sysctl"
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write(path, text):
+    # 한 번의 write 로 넘겨야 커널이 값 전체를 한 번에 파싱한다
+    with open(path, "w") as f:
+        f.write(text)
+
+def _as_text(value):
+    return format_value(value) if isinstance(value, tuple) else str(value)
+
+def _matches(raw, value):
+    return raw is not None and parse_value(raw) == parse_value(_as_text(value))
+
+def _new_item(oid, previous, desired):
+    return {"oid": oid, "previous": previous, "desired": _as_text(desired), "status": STATUS_SKIPPED,
+            "error": None, "write_us": None, "verified": False}
+
+def _rollback(applied, root):
+    """적용한 항목을 역순으로 이전 값으로 되돌리고 모두 복원되었는지 반환"""
+    restored = True
+    for item in reversed(applied):
+        path = oid_to_path(item["oid"], root)
+        try:
+            _write(path, item["previous"])
+        except OSError as e:
+            item["error"] = f"{item['error'] or ''} / 복원 실패: {e.strerror or e}".lstrip(" /")
+            restored = False
+            continue
+        if _matches(_read(path), item["previous"]):
+            item["status"] = STATUS_ROLLED_BACK
+        else:
+            restored = False
+    return restored
+
+def apply_procfs(settings, root=PROC_SYS_ROOT):
+    """/proc/sys 에 직접 쓰는 트랜잭션: 현재 값 읽기 → 순서대로 쓰기/재확인 → 하나라도 실패하면 전체 복원"""
+    start = time.perf_counter()
+    items = [_new_item(oid, _read(oid_to_path(oid, root)), value) for oid, value in settings.items()]
+    applied = []
+    failed = None
+    for item, value in zip(items, settings.values()):
+        if item["previous"] is None:
+            item.update(status=STATUS_FAILED, error="존재하지 않는 OID")
+            failed = item
+            break
+        if _matches(item["previous"], value):
+            item.update(status=STATUS_UNCHANGED, verified=True)
+            continue
+        path = oid_to_path(item["oid"], root)
+        t0 = time.perf_counter_ns()
+        try:
+            _write(path, item["desired"])
+        except OSError as e:
+            item.update(status=STATUS_FAILED, error=e.strerror or str(e),
+                        write_us=(time.perf_counter_ns() - t0) // 1000)
+            failed = item
+            break
+        item["write_us"] = (time.perf_counter_ns() - t0) // 1000
+        # 쓰기 도중 실패한 값이 일부 반영되었을 수 있으므로 복원 대상에 먼저 넣는다
+        applied.append(item)
+        readback = _read(path)
+        if not _matches(readback, value):
+            item.update(status=STATUS_FAILED, error=f"재확인 불일치 (읽은 값: {readback})")
+            failed = item
+            break
+        item.update(status=STATUS_APPLIED, verified=True)
+
+    rolled_back = False
+    if failed is not None:
+        restored = _rollback(applied, root)
+        if failed["status"] == STATUS_ROLLED_BACK:
+            failed["status"] = STATUS_FAILED
+        rolled_back = restored
+    return {
+        "ok": failed is None,
+        "method": METHOD_PROCFS,
+        "failed_oid": failed["oid"] if failed else None,
+        "error": failed["error"] if failed else None,
+        "rolled_back": rolled_back,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        "items": items,
+    }
+
+def _can_write_procfs(settings, root):
+    # 없는 OID 는 트랜잭션 안에서 실패로 처리되므로 권한 판단에서 제외
+    paths = [oid_to_path(oid, root) for oid in settings]
+    return all(os.access(p, os.W_OK) for p in paths if os.path.exists(p))
+
+def _apply_helper(settings, root):
+    """권한이 없으면 세션 동안 유지되는 권한 헬퍼 안에서 전체 트랜잭션을 실행"""
+    from priv_helper import get_helper
+    start = time.perf_counter()
+    report = get_helper().sysctl({oid: _as_text(v) for oid, v in settings.items()}) if root == PROC_SYS_ROOT else None
+    if report is None:
+        return {"ok": False, "method": METHOD_HELPER, "failed_oid": None, "error": "권한 상승 실패",
+                "rolled_back": False, "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+                "items": [_new_item(oid, None, v) for oid, v in settings.items()]}
+    report["method"] = METHOD_HELPER
+    report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return report
+
+def _apply_sysctl_command(settings):
+    """/proc/sys 가 없는 OS(macOS): sysctl 한 번으로 전체 적용, 실패 시 이전 값으로 한 번 더 호출"""
+    from sysctl_reader import _sysctl_fallback
+    start = time.perf_counter()
+    previous = _sysctl_fallback(list(settings))
+    items = [_new_item(oid, previous[oid], v) for oid, v in settings.items()]
+    args = [f"{item['oid']}={item['desired']}" for item in items]
+    proc = subprocess.run(["sudo", "sysctl", "-w"] + args, capture_output=True, text=True)
+    after = _sysctl_fallback(list(settings))
+    for item in items:
+        ok = _matches(after[item["oid"]], item["desired"])
+        item.update(status=STATUS_APPLIED if ok else STATUS_FAILED, verified=ok)
+    failed = next((item for item in items if item["status"] == STATUS_FAILED), None)
+    rolled_back = False
+    if failed is not None:
+        failed["error"] = proc.stderr.strip() or "재확인 불일치"
+        restore = [f"{item['oid']}={item['previous']}" for item in items if item["previous"] is not None]
+        subprocess.run(["sudo", "sysctl", "-w"] + restore, capture_output=True, text=True)
+        restored = _sysctl_fallback(list(settings))
+        rolled_back = all(_matches(restored[i["oid"]], i["previous"]) for i in items if i["previous"] is not None)
+        for item in items:
+            if item is not failed and item["status"] == STATUS_APPLIED and rolled_back:
+                item["status"] = STATUS_ROLLED_BACK
+    return {"ok": failed is None, "method": METHOD_SYSCTL, "failed_oid": failed["oid"] if failed else None,
+            "error": failed["error"] if failed else None, "rolled_back": rolled_back,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3), "items": items}
+
+def apply_transaction(settings, root=PROC_SYS_ROOT, system=None):
+    """sysctl 설정 딕셔너리를 원자적으로 적용 (전부 반영되거나 전부 이전 값으로 복원)
+
+    반환: {"ok", "method", "failed_oid", "error", "rolled_back", "elapsed_ms", "items": [OID별 결과]}
+    """
+    from probe_cache import invalidate, CATEGORY_SYSCTL
+    from priv_helper import fake_root
+    try:
+        if not settings:
+            return {"ok": True, "method": None, "failed_oid": None, "error": None, "rolled_back": False,
+                    "elapsed_ms": 0.0, "items": []}
+        if (system or platform.system()) != "Linux":
+            return _apply_sysctl_command(settings)
+        # 테스트 모드(가짜 루트)에서는 실제 /proc/sys 대신 항상 헬퍼를 거친다
+        if not (fake_root() and root == PROC_SYS_ROOT) and _can_write_procfs(settings, root):
+            return apply_procfs(settings, root)
+        return _apply_helper(settings, root)
+    finally:
+        invalidate(CATEGORY_SYSCTL)
@@ -0,0 +1,311 @@
+import os
+import errno
+import select
+import socket
+import struct
+import resource
+import tempfile
+import threading
+import time
+
+DEFAULT_PORT = 5301
+DEFAULT_BUFFER = 128 * 1024
+
+MODE_SEND = "send"
+MODE_SENDFILE = "sendfile"
+MODE_ZEROCOPY = "zerocopy"
+MODES = (MODE_SEND, MODE_SENDFILE, MODE_ZEROCOPY)
+
+SO_ZEROCOPY = getattr(socket, "SO_ZEROCOPY", 60)
+MSG_ZEROCOPY = getattr(socket, "MSG_ZEROCOPY", 0x4000000)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+SO_EE_ORIGIN_ZEROCOPY = 5
+# 커널이 zero-copy 대신 복사로 처리한 경우 (루프백 등)
+SO_EE_CODE_ZEROCOPY_COPIED = 1
+# sock_extended_err: errno, origin, type, code, pad, info, data
+SOCK_EXTENDED_ERR = struct.Struct("=IBBBBII")
+# 완료 알림을 이 횟수의 전송마다 회수 (optmem_max 초과로 인한 ENOBUFS 방지)
+ZEROCOPY_REAP_EVERY = 32
+# tcp_info 는 커널 버전에 따라 길이가 달라지므로 넉넉히 요청
+TCP_INFO_LEN = 256
+_RUSAGE = getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF)
+
+def _cpu_seconds():
+    usage = resource.getrusage(_RUSAGE)
+    return usage.ru_utime + usage.ru_stime
+
+def _tcp_info(sock):
+    from inet_diag import parse_tcp_info
+    if not hasattr(socket, "TCP_INFO"):
+        return None
+    return parse_tcp_info(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_LEN))
+
+def _sample(sock, elapsed):
+    info = _tcp_info(sock)
+    if info is None:
+        return None
+    return {"t": round(elapsed, 3), "bytes_acked": info["bytes_acked"], "retrans": info["total_retrans"],
+            "rtt_us": info["rtt_us"], "cwnd": info["cwnd"], "delivery_rate": info["delivery_rate"]}
+
+def _reap_zerocopy(sock, state, wait_ms=0):
+    """오류 큐에서 MSG_ZEROCOPY 완료 알림을 회수 (wait_ms 동안 알림 도착 대기 가능)"""
+    if wait_ms:
+        poller = select.poll()
+        poller.register(sock, 0)  # POLLERR 는 항상 보고됨
+        poller.poll(wait_ms)
+    cmsg_size = socket.CMSG_SPACE(SOCK_EXTENDED_ERR.size + 16)
+    while True:
+        try:
+            _, ancdata, _, _ = sock.recvmsg(0, cmsg_size, MSG_ERRQUEUE | socket.MSG_DONTWAIT)
+        except (BlockingIOError, InterruptedError):
+            return
+        for _level, _type, data in ancdata:
+            if len(data) < SOCK_EXTENDED_ERR.size:
+                continue
+            _err, origin, _t, code, _pad, lo, hi = SOCK_EXTENDED_ERR.unpack_from(data)
+            if origin != SO_EE_ORIGIN_ZEROCOPY:
+                continue
+            count = (hi - lo + 1) & 0xffffffff
+            state["completions"] += count
+            if code & SO_EE_CODE_ZEROCOPY_COPIED:
+                state["copied"] += count
+
+def _sender(sock, mode, size):
+    """모드별 1회 전송 함수와 zero-copy 상태, 정리 함수 반환
+
+    전송 버퍼는 한 번만 할당하고 memoryview 로 재사용한다 (부분 전송 시 나머지는 다음 호출에서 처음부터).
+    """
+    payload = memoryview(bytearray(os.urandom(size)))
+    if mode == MODE_SENDFILE:
+        tmp = tempfile.TemporaryFile()
+        tmp.write(payload)
+        tmp.flush()
+        fd, out = tmp.fileno(), sock.fileno()
+        offset = [0]
+
+        def send_once():
+            n = os.sendfile(out, fd, offset[0], size - offset[0])
+            offset[0] = (offset[0] + n) % size
+            return n
+        return send_once, None, tmp.close
+
+    if mode == MODE_ZEROCOPY:
+        sock.setsockopt(socket.SOL_SOCKET, SO_ZEROCOPY, 1)
+        state = {"sends": 0, "completions": 0, "copied": 0}
+
+        def send_once():
+            try:
+                n = sock.send(payload, MSG_ZEROCOPY)
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                # 완료 대기 중인 버퍼가 optmem_max 를 넘음: 알림을 회수한 뒤 다시 시도
+                _reap_zerocopy(sock, state, wait_ms=10)
+                return 0
+            state["sends"] += 1
+            if state["sends"] % ZEROCOPY_REAP_EVERY == 0:
+                _reap_zerocopy(sock, state)
+            return n
+        return send_once, state, lambda: None
+
+    return (lambda: sock.send(payload)), None, lambda: None
+
+def run_stream(host, port, mode=MODE_SEND, size=DEFAULT_BUFFER, duration=5.0, interval=0.5, stream_id=0):
+    """스트림 하나를 duration 초 동안 전송하고 tcp_info 샘플과 결과를 반환"""
+    sock = socket.create_connection((host, port), timeout=5)
+    sock.settimeout(None)
+    send_once, zc_state, cleanup = _sender(sock, mode, size)
+    samples = []
+    sent = 0
+    cpu_start = _cpu_seconds()
+    start = time.monotonic()
+    deadline, next_sample = start + duration, start + interval
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= next_sample:
+                sample = _sample(sock, now - start)
+                if sample:
+                    samples.append(sample)
+                next_sample = now + interval
+            sent += send_once()
+        elapsed = time.monotonic() - start
+        # 송신 종료 후 상대가 모두 읽고 닫을 때까지 기다려 bytes_acked 를 확정
+        sock.shutdown(socket.SHUT_WR)
+        sock.settimeout(5)
+        try:
+            while sock.recv(4096):
+                pass
+        except OSError:
+            pass
+        # 오류 큐 조회는 MSG_DONTWAIT 로 하므로 소켓 타임아웃(내부 poll 대기)을 해제
+        sock.settimeout(None)
+        if zc_state is not None:
+            while zc_state["completions"] < zc_state["sends"]:
+                before = zc_state["completions"]
+                _reap_zerocopy(sock, zc_state, wait_ms=100)
+                if zc_state["completions"] == before:
+                    break
+        final = _tcp_info(sock) or {}
+    finally:
+        cleanup()
+        sock.close()
+
+    # bytes_acked 에는 SYN/FIN 이 1바이트씩 포함되므로 실제 전송량을 넘지 않게 자른다
+    acked = min(final.get("bytes_acked", sent), sent)
+    result = {
+        "stream": stream_id,
+        "mode": mode,
+        "seconds": round(elapsed, 3),
+        "bytes_sent": sent,
+        "bytes_acked": acked,
+        "throughput_mbps": round(acked * 8 / elapsed / 1e6, 2) if elapsed else 0.0,
+        "retrans": final.get("total_retrans", 0),
+        "rtt_us": final.get("rtt_us"),
+        "cwnd": final.get("cwnd"),
+        "cpu_s": round(_cpu_seconds() - cpu_start, 3),
+        "samples": samples,
+    }
+    if zc_state is not None:
+        result["zerocopy"] = zc_state
+    return result
+
+def run_worker(spec):
+    """워커 프로세스: 할당된 스트림들을 스레드로 동시에 실행 (send/sendfile 은 GIL 을 놓고 대기)"""
+    results = [None] * len(spec["streams"])
+    errors = []
+
+    def worker(i, stream_id):
+        try:
+            results[i] = run_stream(spec["host"], spec["port"], spec["mode"], spec["size"],
+                                    spec["duration"], spec["interval"], stream_id)
+        except OSError as e:
+            errors.append(f"stream {stream_id}: {e.strerror or e}")
+
+    threads = [threading.Thread(target=worker, args=(i, s), daemon=True) for i, s in enumerate(spec["streams"])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"streams": [r for r in results if r], "errors": errors}
+
+def _aggregate(streams):
+    elapsed = max((s["seconds"] for s in streams), default=0)
+    acked = sum(s["bytes_acked"] for s in streams)
+    cpu = sum(s["cpu_s"] for s in streams)
+    return {
+        "streams": len(streams),
+        "bytes_acked": acked,
+        "throughput_mbps": round(acked * 8 / elapsed / 1e6, 2) if elapsed else 0.0,
+        "retrans": sum(s["retrans"] for s in streams),
+        "cpu_s": round(cpu, 3),
+        # 단일 코어 기준 점유율 (100% = 코어 하나)
+        "cpu_pct": round(cpu / elapsed * 100, 1) if elapsed else 0.0,
+    }
+
+def run_client(host, port=DEFAULT_PORT, streams=1, workers=None, mode=MODE_SEND,
+               size=DEFAULT_BUFFER, duration=5.0, interval=0.5, on_workers_ready=None):
+    """N 개 스트림을 워커 프로세스에 나눠 실행하고 스트림별/합계 결과 반환"""
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 전송 모드: {mode}")
+    workers = max(1, min(workers or os.cpu_count() or 1, streams))
+    base = {"host": host, "port": port, "mode": mode, "size": size, "duration": duration, "interval": interval}
+    specs = [dict(base, streams=list(range(w, streams, workers))) for w in range(workers)]
+
+    if workers == 1:
+        if on_workers_ready:
+            on_workers_ready()
+        outputs = [run_worker(specs[0])]
+    else:
+        import multiprocessing
+        # 워커를 먼저 만든 뒤 (로컬 서버 스레드 시작 전) 스트림을 실행한다
+        with multiprocessing.get_context().Pool(workers) as pool:
+            if on_workers_ready:
+                on_workers_ready()
+            outputs = pool.map(run_worker, specs)
+
+    per_stream = sorted((s for o in outputs for s in o["streams"]), key=lambda s: s["stream"])
+    return {
+        "target": f"{host}:{port}",
+        "mode": mode,
+        "buffer_bytes": size,
+        "workers": workers,
+        "per_stream": per_stream,
+        "aggregate": _aggregate(per_stream),
+        "errors": [e for o in outputs for e in o["errors"]],
+    }
+
+def open_listener(host="0.0.0.0", port=DEFAULT_PORT):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    return socket.create_server((host, port), family=family, backlog=128)
+
+def _receive(conn, peer, size, records, on_close):
+    """연결 하나를 EOF 까지 recv_into 로 읽음 (수신 버퍼도 한 번만 할당)"""
+    view = memoryview(bytearray(size))
+    total = 0
+    cpu_start = _cpu_seconds()
+    start = time.monotonic()
+    try:
+        while True:
+            n = conn.recv_into(view)
+            if not n:
+                break
+            total += n
+    except OSError:
+        pass
+    finally:
+        conn.close()
+    elapsed = time.monotonic() - start
+    record = {
+        "peer": f"{peer[0]}:{peer[1]}",
+        "bytes": total,
+        "seconds": round(elapsed, 3),
+        "throughput_mbps": round(total * 8 / elapsed / 1e6, 2) if elapsed else 0.0,
+        "cpu_s": round(_cpu_seconds() - cpu_start, 3),
+    }
+    records.append(record)
+    if on_close:
+        on_close(record)
+
+def serve(listener, connections=None, size=DEFAULT_BUFFER, on_close=None, accept_timeout=None):
+    """수신 서버: 연결마다 스레드로 수신. connections 개를 처리하면 종료 (None 이면 계속)"""
+    listener.settimeout(accept_timeout)
+    records, threads = [], []
+    try:
+        while connections is None or len(threads) < connections:
+            try:
+                conn, peer = listener.accept()
+            except socket.timeout:
+                break
+            conn.settimeout(None)
+            t = threading.Thread(target=_receive, args=(conn, peer, size, records, on_close), daemon=True)
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+    finally:
+        listener.close()
+    return records
+
+def run_local(streams=1, workers=None, mode=MODE_SEND, size=DEFAULT_BUFFER, duration=5.0,
+              interval=0.5, host="127.0.0.1"):
+    """같은 호스트에서 서버/클라이언트를 함께 실행 (루프백 또는 veth 주소)"""
+    listener = open_listener(host, 0)
+    port = listener.getsockname()[1]
+    server = {}
+
+    def start_server():
+        def run():
+            server["records"] = serve(listener, streams, size, accept_timeout=duration + 10)
+        server["thread"] = threading.Thread(target=run, name="nettune-bench-server", daemon=True)
+        server["thread"].start()
+
+    report = run_client(host, port, streams, workers, mode, size, duration, interval, on_workers_ready=start_server)
+    server["thread"].join(duration + 15)
+    records = server.get("records", [])
+    report["server"] = {"connections": records,
+                        "bytes": sum(r["bytes"] for r in records),
+                        "cpu_s": round(sum(r["cpu_s"] for r in records), 3)}
+    return report
@@ -1,6 +1,6 @@
 import platform
 import subprocess
-from utils import Colors, Messenger
+from utils import Colors, Messenger, get_default_interface
 
 def check_iperf3_installed():
     """iperf3 설치 여부 확인"""
@@ -10,45 +10,123 @@ def check_iperf3_installed():
     except:
         return False
 
+def print_iperf_interval(instance, record):
+    """iperf3 구간 결과 실시간 출력"""
+    print(f"    [#{instance['index']} :{instance['port']}] {record['start']:>5.1f}-{record['end']:<5.1f}s "
+          f"{record['bits_per_second'] / 1e9:>8.2f} Gbps  재전송 {record['retransmits']}")
+
+def print_iperf_report(report):
+    """iperf3 다중 인스턴스 측정 결과 (구간 시계열 + 인스턴스별 + 합계) 출력"""
+    agg = report["aggregate"]
+    print(f"\n{Colors.BOLD}{Colors.HEADER}📊 iperf3 측정 결과{Colors.ENDC} ({report['server']}, 인스턴스 {len(report['instances'])}개 x "
+          f"스트림 {report['parallel']}개)")
+    if agg["series"]:
+        print(f"    {'구간(s)':<9} {'합계 Gbps':>10} {'재전송':>8}")
+        for row in agg["series"]:
+            print(f"    {row['end']:<10.1f} {row['bits_per_second'] / 1e9:>10.2f} {row['retransmits']:>9}")
+    for inst in report["instances"]:
+        cpu = f", CPU {inst['cpu']}" if inst["cpu"] is not None else ""
+        if inst["error"]:
+            print(f"    - #{inst['index']} 포트 {inst['port']}{cpu}: {Colors.FAIL}{inst['error']}{Colors.ENDC}")
+        else:
+            # 중단된 실행이나 구버전 서버는 end 이벤트에 CPU 사용률이 없으므로 aggregate() 와 같이 0 으로 표시
+            print(f"    - #{inst['index']} 포트 {inst['port']}{cpu}: 수신 {(inst['received_bps'] or 0) / 1e9:.2f} Gbps, "
+                  f"재전송 {inst['retransmits'] or 0}, CPU 송신 {inst['cpu_host_pct'] or 0:.1f}% / "
+                  f"수신 {inst['cpu_remote_pct'] or 0:.1f}%")
+    if agg["instances_ok"]:
+        Messenger.success("MEASURE_SUCCESS")
+        received = f"{agg['received_bps'] / 1e9:.2f} Gbps"
+        print(f"    - 결과: {Messenger.highlight(received)} (송신 {agg['sent_bps'] / 1e9:.2f} Gbps), "
+              f"재전송 {agg['retransmits']}, CPU 송신 {agg['cpu_host_pct']}% / 수신 {agg['cpu_remote_pct']}%")
+
 def run_iperf_test():
-    """iperf3 속도 측정 측정"""
+    """iperf3 속도 측정 (다중 인스턴스, CPU 고정, JSON 점진 파싱)"""
+    from iperf_runner import run_instances, pin_cpus
     if not check_iperf3_installed():
         Messenger.error("IPERF3_NOT_FOUND")
         print(f"    - macOS: brew install iperf3")
         print(f"    - Ubuntu/Debian: sudo apt install iperf3")
         print(f"    - CentOS/RHEL: sudo yum install iperf3")
+        print(f"    - 또는 설치 없이 내장 측정 사용: nettune bench tcp --server / --client <서버>")
         return
 
     print(f"\n{Colors.BOLD}{Colors.OKCYAN}📊 iperf3 네트워크 속도 측정{Colors.ENDC}")
     server_ip = input(f" {Colors.BOLD}접속할 iperf3 서버 주소를 입력하세요 (기본: iperf.he.net) > {Colors.ENDC}").strip()
     if not server_ip:
         server_ip = "iperf.he.net"
-    
+    # iperf3 는 프로세스당 단일 스레드이므로 25Gbps 이상은 포트별 인스턴스를 여러 개 띄워야 한다
+    count = input(f" {Colors.BOLD}인스턴스 수 (서버에 5201 부터 포트별 iperf3 -s 필요, 기본: 1) > {Colors.ENDC}").strip()
+    count = int(count) if count.isdigit() and int(count) > 0 else 1
+
     print(f" {Colors.OKBLUE}🔍 {server_ip} 서버에 연결 중... (최대 10초 대기){Colors.ENDC}")
     try:
-        output = subprocess.check_output(
-            ["iperf3", "-c", server_ip, "-t", "5", "--connect-timeout", "5000"],
-            stderr=subprocess.STDOUT,
-            timeout=15
-        ).decode()
-        
-        for line in output.splitlines():
-            if "receiver" in line:
-                Messenger.success("MEASURE_SUCCESS")
-                print(f"    - 결과: {Messenger.highlight(line.strip())}")
-                break
-        else:
-            print(f"\n {Colors.WARNING}⚠️ 측정은 완료되었으나 요약 정보를 파싱하지 못했습니다.{Colors.ENDC}")
-            print(output)
-            
-    except subprocess.TimeoutExpired:
-        Messenger.error(f"시간 초과: {server_ip} 서버로부터 응답이 없습니다.")
-    except subprocess.CalledProcessError as e:
-        Messenger.error(f"연결 실패: {server_ip} 서버로 접근할 수 없습니다.")
-        error_msg = e.output.decode() if e.output else str(e)
-        print(f"    - 상세 에러: {error_msg.strip()}")
+        # 원격 NUMA 노드에서 실행되면 처리량이 떨어지므로 NIC 로컬 노드 코어에 인스턴스별로 고정
+        report = run_instances(server_ip, count, duration=5, cpus=pin_cpus(get_default_interface()),
+                               on_interval=print_iperf_interval)
     except Exception as e:
         Messenger.error(f"예상치 못한 에러 발생: {e}")
+        return
+    print_iperf_report(report)
+
+def print_bench_report(report):
+    """내장 TCP 처리량 측정 결과 (스트림별 + 합계) 출력"""
+    agg = report["aggregate"]
+    print(f"\n{Colors.BOLD}{Colors.HEADER}📊 TCP 처리량 측정 결과{Colors.ENDC} ({report['target']}, 모드 {report['mode']}, "
+          f"버퍼 {report['buffer_bytes'] // 1024} KB, 워커 {report['workers']}개)")
+    print(f"    {'스트림':<6} {'Mbps':>12} {'재전송':>8} {'RTT(us)':>9} {'cwnd':>7} {'CPU(s)':>8}")
+    for s in report["per_stream"]:
+        print(f"    {s['stream']:<9} {s['throughput_mbps']:>12.2f} {s['retrans']:>10} {s['rtt_us'] or 0:>9} "
+              f"{s['cwnd'] or 0:>7} {s['cpu_s']:>8.3f}")
+        zc = s.get("zerocopy")
+        if zc and zc["copied"]:
+            print(f"      {Colors.WARNING}zero-copy 전송 {zc['copied']}/{zc['completions']}건이 복사로 처리됨 (루프백/미지원 NIC){Colors.ENDC}")
+    color = Colors.OKGREEN if not agg["retrans"] else Colors.WARNING
+    print(f"    {Colors.BOLD}합계: {color}{agg['throughput_mbps']:.2f} Mbps{Colors.ENDC}{Colors.BOLD}, "
+          f"재전송 {agg['retrans']}, 송신 CPU {agg['cpu_s']}s ({agg['cpu_pct']}% of 1 core){Colors.ENDC}")
+    server = report.get("server")
+    if server:
+        print(f"    - 수신측: {server['bytes']} bytes, CPU {server['cpu_s']}s")
+    for error in report["errors"]:
+        Messenger.error(error)
+
+def run_native_bench():
+    """내장 멀티 스트림 TCP 처리량 측정 (iperf3 불필요)"""
+    import tcp_bench
+    print(f"\n{Colors.BOLD}{Colors.OKCYAN}📊 내장 TCP 처리량 측정{Colors.ENDC}")
+    target = input(f" {Colors.BOLD}서버 주소 (비우면 로컬 루프백 측정) > {Colors.ENDC}").strip()
+    streams = input(f" {Colors.BOLD}병렬 스트림 수 (기본: 4) > {Colors.ENDC}").strip()
+    streams = int(streams) if streams.isdigit() and int(streams) > 0 else 4
+    print(f" {Colors.OKBLUE}🔍 {target or '127.0.0.1'} 로 {streams}개 스트림 5초간 전송 중...{Colors.ENDC}")
+    try:
+        if target:
+            report = tcp_bench.run_client(target, streams=streams)
+        else:
+            report = tcp_bench.run_local(streams=streams)
+    except OSError as e:
+        Messenger.error(f"측정 실패: {e.strerror or e}")
+        return
+    print_bench_report(report)
+
+def print_udp_report(report):
+    """UDP 측정 결과 (송신 배치 효율 + 수신 손실/순서/지터/오버플로) 출력"""
+    snd, rcv = report["sender"], report["receiver"]
+    print(f"\n{Colors.BOLD}{Colors.HEADER}📊 UDP 측정 결과{Colors.ENDC} ({report['target']}, {report['size']} bytes x 배치 {report['batch']}, "
+          f"방식 {report['method']})")
+    print(f"    - 송신: {snd['mbps']:.2f} Mbps (목표 {report['target_mbps'] or '무제한'}), 데이터그램 {snd['datagrams']}, "
+          f"호출당 {snd['datagrams_per_call']}개, 송신 오류 {snd['send_errors']}")
+    if rcv is None:
+        Messenger.error("수신측 결과를 받지 못했습니다. (서버 미기동 또는 방화벽)")
+        return
+    color = Colors.OKGREEN if not rcv["lost"] else Colors.FAIL
+    print(f"    - 수신: {rcv['mbps']:.2f} Mbps, {color}손실 {rcv['lost']}/{rcv['expected']} ({rcv['loss_pct']}%){Colors.ENDC}, "
+          f"순서 뒤바뀜 {rcv['reordered']}, 소켓 오버플로 드롭 {rcv['socket_overflow_drops']}")
+    print(f"    - 지터: {rcv['jitter_us']} us (RFC 3550)")
+    total = sum(rcv["jitter_histogram"].values()) or 1
+    for label, count in rcv["jitter_histogram"].items():
+        if count:
+            print(f"      {label:>9} {'█' * max(1, count * 30 // total):<30} {count}")
+    if rcv["socket_overflow_drops"]:
+        print(f"    {Colors.WARNING}💡 Tip: 소켓 수신 버퍼 부족입니다. net.core.rmem_max 확장 후 SO_RCVBUF 를 늘리세요.{Colors.ENDC}")
 
 def run_traceroute(target):
     """지정된 대상까지의 네트워크 경로 추적 (Traceroute)"""
@@ -76,29 +154,37 @@ def run_traceroute(target):
         Messenger.error(f"Traceroute 실행 중 오류 발생: {e}")
         return False
 
-def measure_rtt(target):
-    """실시간 핑 측정을 통한 평균 RTT 추출"""
+def measure_rtt(target, count=10):
+    """RTT 분포 측정 (ICMP 데이터그램 소켓, 권한이 없으면 TCP 연결 시간). 실패 시 None"""
+    from rtt_probe import probe_targets
     print(f" {Colors.OKBLUE}🔍 {target} 서버로 경로 품질(RTT) 측정 중...{Colors.ENDC}")
-    try:
-        count = 4
-        if platform.system() == "Darwin":
-            cmd = ["ping", "-c", str(count), "-t", "2", target]
-        else:
-            cmd = ["ping", "-c", str(count), "-W", "2", target]
-            
-        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode()
-        
-        for line in output.splitlines():
-            if "min/avg/max" in line:
-                stats = line.split("=")[1].strip().split("/")
-                avg_rtt = float(stats[1])
-                return avg_rtt
-    except Exception:
-        return None
-    return None
+    result = probe_targets([target], count=count)[0]
+    return result if result["received"] else None
+
+def print_rtt_result(result):
+    """RTT 분포 (p50/p90/p99/max, 손실) 한 줄 출력"""
+    if not result["received"]:
+        reason = result["error"] or f"손실 {result['lost']}/{result['sent']}"
+        print(f"    - {result['target']:20} {Colors.FAIL}응답 없음{Colors.ENDC} ({reason})")
+        return
+    loss_color = Colors.FAIL if result["lost"] else Colors.OKGREEN
+    print(f"    - {result['target']:20} p50 {result['p50_ms']:>8.3f} / p90 {result['p90_ms']:>8.3f} / "
+          f"p99 {result['p99_ms']:>8.3f} / max {result['max_ms']:>8.3f} ms  "
+          f"{loss_color}손실 {result['loss_pct']}%{Colors.ENDC} ({result['method']})")
+
+def calculate_bdp(bandwidth_gbps, rtt_ms):
+    """대역폭(Gbps)과 RTT(ms)로 BDP 계산"""
+    bdp_bytes = int((bandwidth_gbps * 10**9 * (rtt_ms / 1000.0)) / 8)
+    return {
+        "bandwidth_gbps": bandwidth_gbps,
+        "rtt_ms": rtt_ms,
+        "bdp_bytes": bdp_bytes,
+        "bdp_mb": bdp_bytes / (1024 * 1024),
+    }
 
 def run_precision_bdp_calculator():
     """정밀 BDP(Bandwidth-Delay Product) 계산기 인터페이스"""
+    from rtt_probe import pick_rtt
     print(f"\n{Colors.BOLD}{Colors.OKCYAN}🗺️ 정밀 BDP(Bandwidth-Delay Product) 계산기{Colors.ENDC}")
     
     print(f"\n {Colors.BOLD}1) 측정 대상 선택{Colors.ENDC}")
@@ -121,10 +207,14 @@ def run_precision_bdp_calculator():
         if trace_yn == 'y':
             run_traceroute(target)
             
-        avg_rtt = measure_rtt(target)
-        if avg_rtt:
-            Messenger.success(f"측정된 평균 RTT: {avg_rtt} ms")
-            rtt = avg_rtt
+        measured = measure_rtt(target, count=20)
+        if measured:
+            print_rtt_result(measured)
+            # 평균은 꼬리 지연을 가리므로 버퍼 크기는 상위 분위수 기준으로 산정
+            print(f"\n {Colors.BOLD}BDP 산정에 사용할 RTT 기준{Colors.ENDC}: [1] p50  [2] p90  [3] p99 (기본)  [4] max")
+            pct = {'1': 50, '2': 90, '3': 99, '4': "max"}.get(input(f" {Colors.BOLD}선택 > {Colors.ENDC}").strip(), 99)
+            rtt = pick_rtt(measured, pct)
+            Messenger.success(f"RTT {'max' if pct == 'max' else f'p{pct}'}: {rtt} ms")
         else:
             Messenger.error("핑 측정에 실패했습니다. 기본값 100ms를 사용합니다.")
             rtt = 100
@@ -149,8 +239,9 @@ def run_precision_bdp_calculator():
         except ValueError:
             pass
 
-    bdp_bytes = int((bandwidth_gbps * 10**9 * (rtt / 1000.0)) / 8)
-    bdp_mb = bdp_bytes / (1024 * 1024)
+    bdp = calculate_bdp(bandwidth_gbps, rtt)
+    bdp_bytes = bdp["bdp_bytes"]
+    bdp_mb = bdp["bdp_mb"]
 
     print(f"\n{Colors.BOLD}{Colors.HEADER}📊 정밀 계산 결과{Colors.ENDC}")
     print(f" ┌────────────────────────────────────────────────────────┐")
@@ -158,4 +249,14 @@ def run_precision_bdp_calculator():
     print(f" │  지연시간(RTT)   : {Colors.BOLD}{rtt:>10} ms{Colors.ENDC}                      │")
     print(f" │  {Colors.OKGREEN}최적 TCP 버퍼   : {Colors.BOLD}{bdp_mb:>10.2f} MB{Colors.ENDC} ({bdp_bytes} bytes) │")
     print(f" └────────────────────────────────────────────────────────┘")
+
+    if platform.system() == "Linux":
+        import tuning
+        from buffer_engine import recommend
+        rec = recommend(bandwidth_gbps * 1000, rtt, tuning.PROFILE_FLOWS["general"])
+        tuning.print_recommendation(rec)
+        apply_yn = input(f"\n 위 권장값을 적용할까요? (y/n, 기본: n) > ").strip().lower()
+        if apply_yn == 'y':
+            tuning._apply_sysctl_settings(rec["settings"])
+            return
     input("\n메뉴로 돌아가려면 [Enter]를 누르세요...")
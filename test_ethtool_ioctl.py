@@ -0,0 +1,102 @@
+import struct
+import pytest
+import ethtool_ioctl as et
+
+class MockBackend:
+    """SIOCETHTOOL 대신 ethtool 구조체를 해석해 메모리 상태로 응답하는 모의 백엔드"""
+
+    def __init__(self, features=()):
+        self.ring = dict.fromkeys(et.RING_FIELDS, 0)
+        self.ring.update(rx_max=4096, tx_max=4096, rx=512, tx=512)
+        self.channels = dict.fromkeys(et.CHANNEL_FIELDS, 0)
+        self.channels.update(max_combined=16, combined=4)
+        self.features = list(features)
+        self.active = set()
+        self.fixed = set()
+        self.speed = 25000
+        self.calls = []
+
+    def _u32(self, buf, fields, state):
+        fmt = struct.Struct(f"={len(fields) + 1}I")
+        return fmt, fmt.pack(fmt.unpack(buf)[0], *(state[f] for f in fields))
+
+    def __call__(self, ifname, buf):
+        cmd = struct.unpack_from("=I", buf)[0]
+        self.calls.append(cmd)
+        if cmd in (et.ETHTOOL_GRINGPARAM, et.ETHTOOL_GCHANNELS):
+            fields, state = (et.RING_FIELDS, self.ring) if cmd == et.ETHTOOL_GRINGPARAM else (et.CHANNEL_FIELDS, self.channels)
+            buf[:] = self._u32(buf, fields, state)[1]
+        elif cmd in (et.ETHTOOL_SRINGPARAM, et.ETHTOOL_SCHANNELS):
+            fields, state = (et.RING_FIELDS, self.ring) if cmd == et.ETHTOOL_SRINGPARAM else (et.CHANNEL_FIELDS, self.channels)
+            state.update(zip(fields, struct.unpack(f"={len(fields) + 1}I", buf)[1:]))
+        elif cmd == et.ETHTOOL_GSSET_INFO:
+            struct.pack_into("=I", buf, et._SSET_INFO.size, len(self.features))
+        elif cmd == et.ETHTOOL_GSTRINGS:
+            for i, name in enumerate(self.features):
+                struct.pack_into(f"={et.ETH_GSTRING_LEN}s", buf, 12 + i * et.ETH_GSTRING_LEN, name.encode())
+        elif cmd == et.ETHTOOL_GFEATURES:
+            for i, name in enumerate(self.features):
+                offset, bit = 8 + (i // 32) * 16, 1 << (i % 32)
+                available, requested, active, never = struct.unpack_from("=4I", buf, offset)
+                if name not in self.fixed:
+                    available |= bit
+                if name in self.active:
+                    requested |= bit
+                    active |= bit
+                struct.pack_into("=4I", buf, offset, available, requested, active, never)
+        elif cmd == et.ETHTOOL_SFEATURES:
+            for i, name in enumerate(self.features):
+                valid, requested = struct.unpack_from("=II", buf, 8 + (i // 32) * 8)
+                bit = 1 << (i % 32)
+                if valid & bit and name not in self.fixed:
+                    (self.active.add if requested & bit else self.active.discard)(name)
+        elif cmd == et.ETHTOOL_GLINKSETTINGS:
+            fields = list(et._LINK_SETTINGS.unpack(bytes(buf[:et._LINK_SETTINGS.size])))
+            if fields[9] == 0:
+                # 핸드셰이크: link mode 비트맵 길이를 음수로 알려줌
+                fields[9] = -3
+            else:
+                fields[1], fields[2], fields[5] = self.speed, 1, 1
+            et._LINK_SETTINGS.pack_into(buf, 0, *fields)
+        elif cmd == et.ETHTOOL_GDRVINFO:
+            struct.pack_into("=32s", buf, 4, b"mlx5_core")
+            struct.pack_into("=32s", buf, 100, b"0000:3b:00.0")
+        else:
+            raise OSError(95, "Operation not supported")
+
+def test_ring_params_round_trip():
+    backend = MockBackend()
+    assert et.get_ring_params("eth0", backend)["rx"] == 512
+    et.set_ring_params("eth0", backend, rx=4096)
+    ring = et.get_ring_params("eth0", backend)
+    # 지정하지 않은 항목(tx)과 최대값은 유지
+    assert (ring["rx"], ring["tx"], ring["rx_max"]) == (4096, 512, 4096)
+
+def test_channels_round_trip():
+    backend = MockBackend()
+    et.set_channels("eth0", backend, combined=8)
+    channels = et.get_channels("eth0", backend)
+    assert (channels["combined"], channels["max_combined"]) == (8, 16)
+
+def test_features_round_trip_across_blocks():
+    names = [f"feature-{i}" for i in range(40)] + ["rx-gro", "tx-tcp-segmentation"]
+    backend = MockBackend(names)
+    backend.fixed.add("tx-tcp-segmentation")
+    et.set_features("eth0", {"rx-gro": True, "feature-3": True, "tx-tcp-segmentation": True}, backend)
+    features = et.get_features("eth0", backend)
+    assert features["rx-gro"] == {"active": True, "requested": True, "fixed": False}
+    assert features["feature-3"]["active"]
+    assert not features["feature-4"]["active"]
+    assert features["tx-tcp-segmentation"] == {"active": False, "requested": False, "fixed": True}
+
+def test_set_features_rejects_unknown_name():
+    with pytest.raises(OSError):
+        et.set_features("eth0", {"no-such-feature": True}, MockBackend(["rx-gro"]))
+
+def test_link_settings_handshake_and_driver_info():
+    backend = MockBackend()
+    link = et.get_link_settings("eth0", backend)
+    assert link == {"speed_mbps": 25000, "duplex": "Full", "autoneg": True}
+    assert backend.calls == [et.ETHTOOL_GLINKSETTINGS, et.ETHTOOL_GLINKSETTINGS]
+    info = et.get_driver_info("eth0", backend)
+    assert (info["driver"], info["bus_info"]) == ("mlx5_core", "0000:3b:00.0")
@@ -0,0 +1,52 @@
+import socket
+import pytest
+import inet_diag
+
+@pytest.fixture
+def tcp_pair():
+    """127.0.0.1 위의 연결된 TCP 소켓 쌍 (클라이언트, 서버 쪽 연결)"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    client = socket.create_connection(listener.getsockname())
+    server, _ = listener.accept()
+    # 데이터를 주고받아 rtt/cwnd 가 채워지도록 함
+    client.sendall(b"x" * 65536)
+    received = 0
+    while received < 65536:
+        received += len(server.recv(65536))
+    yield client, server
+    for s in (client, server, listener):
+        s.close()
+
+def test_dump_finds_loopback_pair_established(tcp_pair):
+    client, server = tcp_pair
+    try:
+        table = inet_diag.dump_tcp(families=(socket.AF_INET,))
+    except OSError as e:
+        pytest.skip(f"NETLINK_SOCK_DIAG 를 사용할 수 없습니다: {e}")
+    cport, sport = client.getsockname()[1], server.getsockname()[1]
+    rows = [table.row(i) for i in table.select(port=cport)]
+    client_row = next(r for r in rows if r["sport"] == cport and r["dport"] == sport)
+    server_row = next(r for r in rows if r["sport"] == sport and r["dport"] == cport)
+    for row in (client_row, server_row):
+        assert row["state"] == "ESTAB"
+        assert (row["src"], row["dst"]) == ("127.0.0.1", "127.0.0.1")
+        assert row["rtt_us"] is not None and row["rtt_us"] > 0
+        assert row["cwnd"] is not None and row["cwnd"] > 0
+    assert client_row["bytes_acked"] >= 65536
+    assert client_row["cong"]
+
+def test_select_by_peer(tcp_pair):
+    client, _ = tcp_pair
+    try:
+        table = inet_diag.dump_tcp(families=(socket.AF_INET,))
+    except OSError as e:
+        pytest.skip(f"NETLINK_SOCK_DIAG 를 사용할 수 없습니다: {e}")
+    assert set(table.select(port=client.getsockname()[1])) <= set(table.select(peer="127.0.0.1"))
+
+def test_parse_tcp_info_matches_getsockopt(tcp_pair):
+    client, _ = tcp_pair
+    info = inet_diag.parse_tcp_info(client.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 512))
+    assert inet_diag.TCP_STATES[info["state"]] == "ESTAB"
+    assert info["mss"] > 0 and info["cwnd"] > 0
@@ -0,0 +1,53 @@
+import os
+import platform
+import subprocess
+import pytest
+import numa_locality
+
+pytestmark = pytest.mark.skipif(platform.system() != "Linux", reason="Linux 전용")
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+def _fake_sys(root, local_cpus, numa_node):
+    _write(f"{root}/devices/system/node/node0/cpulist", local_cpus)
+    pci = f"{root}/devices/pci0000:00/0000:3b:00.0"
+    _write(f"{pci}/msi_irqs/40", "msix")
+    _write(f"{pci}/local_cpulist", local_cpus)
+    _write(f"{pci}/numa_node", str(numa_node))
+    os.makedirs(f"{root}/class/net/eth0")
+    os.symlink(pci, f"{root}/class/net/eth0/device")
+    return root
+
+def _status(field, preexec):
+    output = subprocess.run(["cat", "/proc/self/status"], preexec_fn=preexec, capture_output=True,
+                            text=True, check=True).stdout
+    return next(line.split(":", 1)[1].strip() for line in output.splitlines() if line.startswith(field))
+
+def test_nic_locality_from_fake_sysfs(tmp_path):
+    root = _fake_sys(str(tmp_path), "0-3", 0)
+    nic = numa_locality.nic_locality("eth0", root)
+    assert (nic["numa_node"], nic["local_cpus"], nic["nodes"]) == (0, [0, 1, 2, 3], {0: [0, 1, 2, 3]})
+
+def test_pin_preexec_binds_child_cpu_and_memory(tmp_path):
+    cpu = min(os.sched_getaffinity(0))
+    root = _fake_sys(str(tmp_path), str(cpu), 0)
+    preexec = numa_locality.pin_preexec("eth0", root)
+    assert _status("Cpus_allowed_list", preexec) == str(cpu)
+    if numa_locality.prepare_mempolicy_bind(0) is not None and os.path.exists("/proc/self/numa_maps"):
+        # 프로세스 메모리 정책은 numa_maps 의 각 매핑에 bind:<노드> 로 나타난다
+        maps = subprocess.run(["cat", "/proc/self/numa_maps"], preexec_fn=preexec, capture_output=True,
+                              text=True, check=True).stdout
+        assert " bind:0 " in maps
+
+def test_failed_memory_bind_is_reported():
+    bind = numa_locality.prepare_mempolicy_bind(1000)
+    if bind is None:
+        pytest.skip("set_mempolicy 를 지원하지 않는 아키텍처")
+    with pytest.raises(OSError):
+        bind()
+    preexec = numa_locality._prepare_binding({"local_cpus": [], "numa_node": 1000})
+    with pytest.raises(subprocess.SubprocessError):
+        subprocess.run(["true"], preexec_fn=preexec)
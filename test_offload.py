@@ -0,0 +1,50 @@
+import os
+import json
+from priv_helper import PrivilegedHelper, FAKE_EXEC_LOG
+from offload import audit_features, recommended_changes, apply_features, STATUS_WARN, STATUS_UNAVAILABLE
+from test_ethtool_ioctl import MockBackend
+
+class DeniedHelper:
+    def run(self, argv):
+        return False, "Operation not permitted"
+
+def test_audit_marks_changeable_and_fixed_features():
+    features = {"rx-gro": {"active": False, "fixed": False}, "tx-udp-segmentation": {"active": False, "fixed": True}}
+    rows = {r["name"]: r for r in audit_features(features)}
+    assert rows["rx-gro"]["status"] == STATUS_WARN
+    assert rows["tx-udp-segmentation"]["status"] == STATUS_UNAVAILABLE
+    assert recommended_changes(rows.values()) == {"rx-gro": True}
+
+def test_apply_features_reports_permission_error():
+    applied = apply_features("eth0", {"rx-gro": True}, MockBackend(["rx-gro"]), DeniedHelper())
+    assert applied == {"results": {"rx-gro": False}, "error": "Operation not permitted"}
+
+def test_apply_features_sends_ethtool_k_and_reads_back(tmp_path):
+    backend = MockBackend(["rx-gro", "rx-lro"])
+    backend.active.add("rx-gro")
+    helper = PrivilegedHelper(root=str(tmp_path))
+    try:
+        applied = apply_features("eth0", {"rx-gro": True, "rx-lro": True}, backend, helper)
+    finally:
+        helper.close()
+    # 명령은 성공했지만 rx-lro 는 (가짜 루트라) 반영되지 않았으므로 기능 단위로만 False
+    assert applied == {"results": {"rx-gro": True, "rx-lro": False}, "error": None}
+    with open(os.path.join(tmp_path, FAKE_EXEC_LOG)) as f:
+        assert json.loads(f.readline()) == ["ethtool", "-K", "eth0", "rx-gro", "on", "rx-lro", "on"]
+
+def test_per_protocol_tx_checksum_replaces_fixed_generic_row():
+    features = {
+        "tx-checksum-ip-generic": {"active": False, "fixed": True},
+        "tx-checksum-ipv4": {"active": True, "fixed": False},
+        "tx-checksum-ipv6": {"active": False, "fixed": False},
+    }
+    rows = {r["name"]: r["status"] for r in audit_features(features)}
+    assert rows == {"tx-checksum-ipv4": "ok", "tx-checksum-ipv6": STATUS_WARN}
+    assert recommended_changes(audit_features(features)) == {"tx-checksum-ipv6": True}
+
+def test_generic_tx_checksum_row_kept_when_usable():
+    features = {
+        "tx-checksum-ip-generic": {"active": True, "fixed": False},
+        "tx-checksum-ipv4": {"active": False, "fixed": True},
+    }
+    assert [(r["name"], r["status"]) for r in audit_features(features)] == [("tx-checksum-ip-generic", "ok")]
@@ -0,0 +1,83 @@
+import os
+import json
+import errno
+import stat
+import persist
+
+DESIRED = {
+    "sysctl": {"net.core.rmem_max": 67108864, "net.ipv4.tcp_rmem": [4096, 131072, 67108864]},
+    "ethtool": {"eth0": {"ring": {"rx": 4096}, "features": {"rx-gro": True}}},
+    "ip link": {"eth0": {"mtu": 9000}},
+    "tc": {"eth0": {"kind": "fq", "options": {"maxrate": "5gbit"}}},
+}
+
+def _read(root, relative):
+    with open(os.path.join(root, relative)) as f:
+        return f.read()
+
+def test_persist_writes_artifacts_under_root(tmp_path):
+    root = str(tmp_path)
+    result = persist.persist(DESIRED, root=root, python="/usr/bin/python3", entry="/opt/nettune/nettune.py")
+    relative = sorted(os.path.relpath(p, root) for p in result["written"])
+    assert relative == ["etc/nettune/state.json", "etc/sysctl.d/90-nettune.conf",
+                        "etc/systemd/system/nettune-apply.service", "etc/udev/rules.d/90-nettune.rules"]
+
+    sysctl = _read(root, "etc/sysctl.d/90-nettune.conf").splitlines()
+    assert "net.core.rmem_max = 67108864" in sysctl
+    assert "net.ipv4.tcp_rmem = 4096 131072 67108864" in sysctl
+
+    udev = _read(root, "etc/udev/rules.d/90-nettune.rules")
+    assert 'KERNEL=="eth0", ATTR{mtu}="9000"' in udev
+    assert "-G eth0 rx 4096" in udev
+    assert "-K eth0 rx-gro on" in udev
+    assert "qdisc replace dev eth0 root fq maxrate 5gbit" in udev
+
+    unit = _read(root, "etc/systemd/system/nettune-apply.service")
+    assert ("ExecStart=/usr/bin/python3 /opt/nettune/nettune.py tune plan --state /etc/nettune/state.json "
+            "--apply --yes --no-backup") in unit
+    assert "udevadm control --reload" in result["activate"]
+
+def test_persist_merges_with_saved_state(tmp_path):
+    root = str(tmp_path)
+    persist.persist(DESIRED, root=root)
+    persist.persist({"sysctl": {"net.core.rmem_max": 33554432},
+                     "ethtool": {"eth0": {"ring": {"tx": 2048}}}}, root=root)
+    state = json.loads(_read(root, persist.STATE_PATH))
+    assert state["sysctl"]["net.core.rmem_max"] == 33554432
+    assert state["sysctl"]["net.ipv4.tcp_rmem"] == [4096, 131072, 67108864]
+    assert state["ethtool"]["eth0"]["ring"] == {"rx": 4096, "tx": 2048}
+    assert state["ethtool"]["eth0"]["features"] == {"rx-gro": True}
+
+def test_nm_hook_renders_executable_dispatcher(tmp_path):
+    root = str(tmp_path)
+    persist.persist(DESIRED, root=root, hook=persist.HOOK_NM, priority=50)
+    path = os.path.join(root, persist.NM_PATH.format(priority=50))
+    assert os.stat(path).st_mode & stat.S_IXUSR
+    script = _read(root, persist.NM_PATH.format(priority=50))
+    assert script.startswith("#!/bin/sh\n")
+    assert "link set dev eth0 mtu 9000" in script
+    assert not os.path.exists(os.path.join(root, persist.UDEV_PATH.format(priority=50)))
+
+def test_persist_refuses_system_root_without_privileges(monkeypatch):
+    monkeypatch.setattr(os, "geteuid", lambda: 1000)
+    try:
+        persist.persist(DESIRED, root="/")
+    except PermissionError as e:
+        assert e.errno == errno.EACCES
+    else:
+        raise AssertionError("비 root 로 / 에 기록하면 PermissionError 여야 합니다")
+
+def test_sysfs_entries_are_kept_for_the_boot_unit(tmp_path):
+    root = str(tmp_path)
+    governor = "/sys/devices/system/cpu/cpufreq/policy0/scaling_governor"
+    xps = "/sys/class/net/eth0/queues/tx-0/xps_cpus"
+    persist.persist({"sysfs": {governor: "performance", xps: "00000005"},
+                     "ethtool": {"eth0": {"channels": {"combined": 4}, "pause": {"rx": True, "tx": True}}}},
+                    root=root)
+    state = json.loads(_read(root, persist.STATE_PATH))
+    assert state["sysfs"] == {governor: "performance", xps: "00000005"}
+    udev = _read(root, "etc/udev/rules.d/90-nettune.rules")
+    assert "-L eth0 combined 4" in udev
+    assert "-A eth0 rx on tx on" in udev
+    # sysfs 항목은 udev 규칙이 아니라 부팅 유닛(tune plan --state)이 적용
+    assert "xps_cpus" not in udev
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import shutil
+import subprocess
+import pytest
+import pmtu_probe
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def test_candidates_split_interval_and_keep_hints():
+    assert pmtu_probe._candidates(1000, 2000, 4, {1492, 5000}) == [1200, 1400, 1492, 1600, 1800]
+
+def test_loopback_accepts_jumbo_probe():
+    result = pmtu_probe.discover("127.0.0.1", max_mtu=9000, method=pmtu_probe.METHOD_UDP, timeout=0.5)
+    assert result["error"] is None
+    assert (result["path_mtu"], result["verified"]) == (9000, True)
+
+def _ip(*args, netns=None):
+    cmd = (["ip", "netns", "exec", netns, "ip"] if netns else ["ip"]) + list(args)
+    subprocess.run(cmd, check=True, capture_output=True)
+
+@pytest.fixture
+def routed_netns():
+    """client(MTU 9000) ─ router ─ server(MTU 1400) 구성의 네트워크 네임스페이스 3개"""
+    if os.geteuid() != 0 or not shutil.which("ip"):
+        pytest.skip("네트워크 네임스페이스 생성에는 root 와 iproute2 가 필요합니다")
+    prefix = f"nt{os.getpid()}"
+    client, router, server = (f"{prefix}{name}" for name in ("c", "r", "s"))
+    created = []
+    try:
+        for ns in (client, router, server):
+            _ip("netns", "add", ns)
+            created.append(ns)
+        _ip("link", "add", "vc", "netns", client, "type", "veth", "peer", "name", "vr1", "netns", router)
+        _ip("link", "add", "vr2", "netns", router, "type", "veth", "peer", "name", "vs", "netns", server)
+        for ns, dev, addr, mtu in ((client, "vc", "10.99.1.1/24", 9000), (router, "vr1", "10.99.1.2/24", 9000),
+                                   (router, "vr2", "10.99.2.1/24", 1400), (server, "vs", "10.99.2.2/24", 1400)):
+            _ip("addr", "add", addr, "dev", dev, netns=ns)
+            _ip("link", "set", "dev", dev, "mtu", str(mtu), "up", netns=ns)
+        _ip("route", "add", "default", "via", "10.99.1.2", netns=client)
+        _ip("route", "add", "default", "via", "10.99.2.1", netns=server)
+        subprocess.run(["ip", "netns", "exec", router, "sysctl", "-qw", "net.ipv4.ip_forward=1"], check=True)
+        subprocess.run(["ip", "netns", "exec", client, "sysctl", "-qw", "net.ipv4.ping_group_range=0 2147483647"],
+                       check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        for ns in created:
+            subprocess.run(["ip", "netns", "del", ns], capture_output=True)
+        pytest.skip(f"네트워크 네임스페이스 구성 실패: {e}")
+    yield client
+    for ns in created:
+        subprocess.run(["ip", "netns", "del", ns], capture_output=True)
+
+@pytest.mark.parametrize("method", [pmtu_probe.METHOD_ICMP, pmtu_probe.METHOD_UDP])
+def test_discovers_smaller_mtu_behind_router(routed_netns, method):
+    code = f"import json, pmtu_probe; print(json.dumps(pmtu_probe.discover('10.99.2.2', 9000, {method!r})))"
+    output = subprocess.run(["ip", "netns", "exec", routed_netns, sys.executable, "-c", code],
+                            cwd=HERE, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output)
+    assert result["error"] is None
+    assert (result["path_mtu"], result["verified"]) == (1400, False)
@@ -0,0 +1,125 @@
+import os
+import json
+import pytest
+import priv_helper
+from priv_helper import validate, PrivilegedHelper, OP_EXEC, OP_WRITE, OP_SYSCTL
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+def _read(path):
+    with open(path) as f:
+        return f.read().strip()
+
+@pytest.mark.parametrize("path", [
+    "/sys/class/net/eth0/mtu",
+    "/sys/class/net/eth0/tx_queue_len",
+    "/sys/class/net/eth0/queues/rx-3/rps_cpus",
+    "/sys/class/net/eth0/queues/rx-0/rps_flow_cnt",
+    "/sys/class/net/eth0.100/queues/tx-12/xps_cpus",
+    "/proc/irq/42/smp_affinity_list",
+])
+def test_validate_allows_tuned_attributes(path):
+    assert validate({"op": OP_WRITE, "path": path, "value": "0000000f"}) is None
+
+@pytest.mark.parametrize("path", [
+    "/sys/devices/pci0000:00/0000:3b:00.0/remove",
+    "/sys/class/net/eth0/device/driver/unbind",
+    "/sys/class/net/eth0/device/remove",
+    "/sys/class/net/eth0/queues/rx-0/../../flags",
+    "/sys/class/net/../../devices/system/cpu/cpu1/online",
+    "/proc/irq/42/../../sysrq-trigger",
+    "/proc/sys/kernel/core_pattern",
+    "/etc/passwd",
+])
+def test_validate_rejects_other_paths(path):
+    assert validate({"op": OP_WRITE, "path": path, "value": "1"}) is not None
+
+def test_validate_allows_cpufreq_governor():
+    path = "/sys/devices/system/cpu/cpufreq/policy0/scaling_governor"
+    assert validate({"op": OP_WRITE, "path": path, "value": "performance"}) is None
+    assert validate({"op": OP_WRITE, "path": path, "value": "0000000f"}) is not None
+    assert validate({"op": OP_WRITE, "path": "/sys/devices/system/cpu/cpufreq/boost", "value": "1"}) is not None
+
+def test_validate_rejects_write_value_with_newline():
+    assert validate({"op": OP_WRITE, "path": "/sys/class/net/eth0/mtu", "value": "9000\n1500"}) is not None
+
+def test_validate_sysctl_limits_oids_and_values():
+    assert validate({"op": OP_SYSCTL, "settings": {"net.ipv4.tcp_rmem": "4096\t131072\t67108864",
+                                                   "net.core.default_qdisc": "fq"}}) is None
+    for oid in ("kernel.core_pattern", "kernel.modprobe", "vm.overcommit_memory", "net", "net.core..rmem_max"):
+        assert validate({"op": OP_SYSCTL, "settings": {oid: "1"}}) is not None
+    for value in ("|/tmp/x", "1; reboot", "", "1\n2"):
+        assert validate({"op": OP_SYSCTL, "settings": {"net.core.rmem_max": value}}) is not None
+
+def test_validate_exec_whitelist():
+    assert validate({"op": OP_EXEC, "argv": ["ethtool", "-G", "eth0", "rx", "4096"]}) is None
+    assert validate({"op": OP_EXEC, "argv": ["ip", "link", "set", "dev", "eth0", "mtu", "9000"]}) is None
+    assert validate({"op": OP_EXEC, "argv": ["ethtool", "--flash", "eth0", "fw.bin"]}) is not None
+    assert validate({"op": OP_EXEC, "argv": ["sh", "-c", "id"]}) is not None
+    assert validate({"op": OP_EXEC, "argv": ["ip", "link", "set", "dev", "eth0", "down", "1"]}) is not None
+
+@pytest.mark.parametrize("argv", [
+    "tc qdisc replace dev eth0 root handle 1: mq",
+    "tc qdisc replace dev eth0 parent 1:a fq flow_limit 834 quantum 3072 maxrate 2.5gbit",
+    "tc qdisc replace dev eth0 parent :1 fq nopacing",
+    "tc qdisc replace dev eth0 root fq_codel limit 10240 ecn",
+    "tc qdisc del dev eth0 root",
+    "modprobe tcp_bbr",
+    "cpupower frequency-set -g performance",
+])
+def test_validate_allows_tuning_commands(argv):
+    assert validate({"op": OP_EXEC, "argv": argv.split()}) is None
+
+@pytest.mark.parametrize("argv", [
+    "tc qdisc add dev eth0 root netem delay 100ms loss 100%",
+    "tc qdisc replace dev eth0 root tbf rate 1kbit burst 1 latency 1ms",
+    "tc qdisc replace dev eth0 root fq bogus 1",
+    "tc qdisc replace dev eth0 root fq maxrate",
+    "tc qdisc replace dev eth0 parent 1 fq",
+    "tc qdisc replace dev eth0 root",
+    "tc filter replace dev eth0 root fq",
+    "tc filter add dev eth0 parent 1: u32 match ip dst 0.0.0.0/0 action drop",
+    "modprobe dummy",
+    "modprobe usb_storage",
+    "cpupower frequency-set -g turbo",
+])
+def test_validate_rejects_other_tuning_commands(argv):
+    assert validate({"op": OP_EXEC, "argv": argv.split()}) is not None
+
+@pytest.fixture
+def helper(tmp_path):
+    helper = PrivilegedHelper(root=str(tmp_path))
+    yield helper
+    helper.close()
+
+def test_fake_root_helper_rebases_writes_and_logs_commands(helper, tmp_path):
+    target = "/sys/class/net/eth0/queues/rx-0/rps_cpus"
+    _write(f"{tmp_path}{target}", "0")
+    status = helper.write({target: "f", "/sys/class/net/eth0/device/remove": "1"})
+    assert status[target] == (True, None)
+    assert status["/sys/class/net/eth0/device/remove"][0] is False
+    assert _read(f"{tmp_path}{target}") == "f"
+
+    assert helper.run_batch([["ethtool", "-L", "eth0", "combined", "4"], ["rm", "-rf", "/"]])[0] == (True, None)
+    with open(os.path.join(tmp_path, priv_helper.FAKE_EXEC_LOG)) as f:
+        assert [json.loads(line) for line in f] == [["ethtool", "-L", "eth0", "combined", "4"]]
+
+def test_fake_root_sysctl_transaction_rolls_back(helper, tmp_path):
+    _write(f"{tmp_path}/proc/sys/net/core/rmem_max", "212992")
+    _write(f"{tmp_path}/proc/sys/net/core/wmem_max", "212992")
+    report = helper.sysctl({"net.core.rmem_max": "67108864", "net.core.wmem_max": "67108864",
+                            "net.core.no_such_oid": "1"})
+    assert not report["ok"] and report["rolled_back"]
+    assert report["failed_oid"] == "net.core.no_such_oid"
+    assert [i["status"] for i in report["items"]] == ["rolled_back", "rolled_back", "failed"]
+    assert _read(f"{tmp_path}/proc/sys/net/core/rmem_max") == "212992"
+    assert _read(f"{tmp_path}/proc/sys/net/core/wmem_max") == "212992"
+
+def test_fake_root_sysctl_applies_all(helper, tmp_path):
+    _write(f"{tmp_path}/proc/sys/net/ipv4/tcp_rmem", "4096\t131072\t6291456")
+    report = helper.sysctl({"net.ipv4.tcp_rmem": "4096\t131072\t67108864"})
+    assert report["ok"]
+    assert _read(f"{tmp_path}/proc/sys/net/ipv4/tcp_rmem") == "4096\t131072\t67108864"
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+from probe_cache import SystemProbe, CATEGORY_NET, CATEGORY_NIC
+
+def test_cached_value_until_invalidated():
+    probe = SystemProbe(ttl=60)
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+    assert probe.get((CATEGORY_NET, "eth0"), loader) == 1
+    assert probe.get((CATEGORY_NET, "eth0"), loader) == 1
+    probe.invalidate(CATEGORY_NET)
+    assert probe.get((CATEGORY_NET, "eth0"), loader) == 2
+
+def test_invalidate_during_load_discards_stale_value():
+    probe = SystemProbe(ttl=60)
+    values = iter(["stale", "fresh"])
+
+    def loader():
+        value = next(values)
+        if value == "stale":
+            # 로딩 중 netlink 이벤트가 도착한 상황
+            probe.invalidate(CATEGORY_NET)
+        return value
+
+    assert probe.get((CATEGORY_NET, "eth0"), loader) == "stale"
+    assert probe.get((CATEGORY_NET, "eth0"), loader) == "fresh"
+
+def test_invalidate_other_category_keeps_loaded_value():
+    probe = SystemProbe(ttl=60)
+    values = iter(["first", "second"])
+
+    def loader():
+        value = next(values)
+        probe.invalidate(CATEGORY_NIC)
+        return value
+
+    assert probe.get((CATEGORY_NET, "eth0"), loader) == "first"
+    assert probe.get((CATEGORY_NET, "eth0"), loader) == "first"
+
+def test_callers_get_independent_copies():
+    probe = SystemProbe(ttl=60)
+    first = probe.get((CATEGORY_NET, "eth0"), lambda: {"mtu": 1500, "addrs": ["10.0.0.1"]})
+    first["addrs"].append("10.0.0.2")
+    assert probe.get((CATEGORY_NET, "eth0"), lambda: None) == {"mtu": 1500, "addrs": ["10.0.0.1"]}
+
+def test_stalled_loader_does_not_block_other_callers():
+    probe = SystemProbe(ttl=60, lock_timeout=0.05)
+    release = threading.Event()
+    stalled = threading.Thread(target=probe.get, args=((CATEGORY_NIC, "eth0"), release.wait), daemon=True)
+    stalled.start()
+    time.sleep(0.02)
+    start = time.monotonic()
+    assert probe.get((CATEGORY_NIC, "eth0"), lambda: "direct") == "direct"
+    assert time.monotonic() - start < 1.0
+    release.set()
+    stalled.join()
+
+def test_malformed_ttl_env_falls_back_to_default():
+    env = dict(os.environ, NETTUNE_PROBE_TTL="5s")
+    code = "import probe_cache; print(probe_cache.DEFAULT_TTL)"
+    output = subprocess.run([sys.executable, "-c", code], env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "5.0"
@@ -0,0 +1,117 @@
+import os
+import json
+import pytest
+import priv_helper
+import queue_tuning
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+@pytest.fixture
+def fake_sys(tmp_path):
+    """CPU 4개(물리 코어 2개 + SMT), RX 큐 1개, TX 큐 2개, 큐 IRQ 2개인 가짜 sysfs/procfs"""
+    sys_root, proc_root = tmp_path / "sys", tmp_path / "proc"
+    _write(f"{sys_root}/devices/system/cpu/online", "0-3")
+    for cpu in range(4):
+        _write(f"{sys_root}/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list", f"{cpu % 2},{cpu % 2 + 2}")
+    pci = f"{sys_root}/devices/pci0000:00/0000:3b:00.0"
+    for irq in (40, 41):
+        _write(f"{pci}/msi_irqs/{irq}", "msix")
+        _write(f"{proc_root}/irq/{irq}/smp_affinity_list", "0-3")
+    _write(f"{pci}/local_cpulist", "0-3")
+    _write(f"{pci}/numa_node", "0")
+    net = f"{sys_root}/class/net/eth0"
+    _write(f"{net}/queues/rx-0/rps_cpus", "0")
+    _write(f"{net}/queues/tx-0/xps_cpus", "0")
+    _write(f"{net}/queues/tx-1/xps_cpus", "0")
+    os.symlink(pci, f"{net}/device")
+    _write(f"{proc_root}/interrupts", "            CPU0       CPU1       CPU2       CPU3\n"
+           " 40:          1          0          0          0  IR-PCI-MSI  eth0-TxRx-0\n"
+           " 41:          0          1          0          0  IR-PCI-MSI  eth0-TxRx-1")
+    return str(sys_root), str(proc_root)
+
+@pytest.fixture
+def fake_root_helper(tmp_path, monkeypatch):
+    root = tmp_path / "fakeroot"
+    root.mkdir()
+    monkeypatch.setenv(priv_helper.FAKE_ROOT_ENV, str(root))
+    monkeypatch.setattr(priv_helper, "_helper", None)
+    yield str(root)
+    if priv_helper._helper is not None:
+        priv_helper._helper.close()
+
+def test_cpu_mask_round_trip():
+    assert queue_tuning.cpu_mask([0, 33]) == "00000002,00000001"
+    assert queue_tuning.parse_mask("00000002,00000001") == [0, 33]
+
+def test_plan_spreads_irqs_rps_and_xps_over_local_cores(fake_sys):
+    sys_root, proc_root = fake_sys
+    plan = queue_tuning.build_plan("eth0", sys_root, proc_root, channels=False)
+    assert plan["topology"]["order"] == [0, 1, 2, 3]
+    desired = {os.path.relpath(a["target"], os.path.dirname(sys_root)): a["desired"] for a in plan["actions"]}
+    assert desired == {
+        "proc/irq/40/smp_affinity_list": "0",
+        "proc/irq/41/smp_affinity_list": "1",
+        # RX 큐 1개 < 로컬 물리 코어 2개 → RPS 로 로컬 CPU 전체에 분산
+        "sys/class/net/eth0/queues/rx-0/rps_cpus": "0000000f",
+        "sys/class/net/eth0/queues/tx-0/xps_cpus": "00000005",
+        "sys/class/net/eth0/queues/tx-1/xps_cpus": "0000000a",
+    }
+
+def test_apply_plan_writes_fake_sysfs_and_replan_is_clean(fake_sys):
+    sys_root, proc_root = fake_sys
+    plan = queue_tuning.build_plan("eth0", sys_root, proc_root, channels=False)
+    results = queue_tuning.apply_plan(plan, sys_root, proc_root)
+    assert results and all(r["ok"] for r in results)
+    replan = queue_tuning.build_plan("eth0", sys_root, proc_root, channels=False)
+    assert not any(a["changed"] for a in replan["actions"])
+
+def test_channel_change_goes_through_helper(fake_root_helper):
+    action = {"kind": queue_tuning.ACTION_CHANNELS, "target": "eth0", "current": 8, "desired": 2, "changed": True}
+    assert queue_tuning.apply_action(action)["ok"]
+    with open(os.path.join(fake_root_helper, priv_helper.FAKE_EXEC_LOG)) as f:
+        assert [json.loads(line) for line in f] == [["ethtool", "-L", "eth0", "combined", "2"]]
+
+class RecordingHelper:
+    def __init__(self):
+        self.requests = []
+
+    def request(self, ops, stop_on_error=False):
+        self.requests.append(ops)
+        return [{"op": op["op"], "ok": True, "error": None} for op in ops]
+
+def test_apply_plan_sends_unwritable_entries_in_one_request(fake_sys, monkeypatch):
+    sys_root, proc_root = fake_sys
+    plan = queue_tuning.build_plan("eth0", sys_root, proc_root, channels=False)
+    helper = RecordingHelper()
+    monkeypatch.setattr(queue_tuning, "get_helper", lambda: helper)
+    monkeypatch.setattr(queue_tuning, "fake_root", lambda: "/tmp/fake")
+    results = queue_tuning.apply_plan(plan, sys_root, proc_root)
+    assert len(results) == 5 and all(r["ok"] for r in results)
+    assert len(helper.requests) == 1
+    assert [op["path"] for op in helper.requests[0]] == [a["target"] for a in plan["actions"]]
+
+def test_desired_state_records_applied_and_unchanged_entries(fake_sys):
+    sys_root, proc_root = fake_sys
+    plan = queue_tuning.build_plan("eth0", sys_root, proc_root, channels=False)
+    plan["actions"][0]["changed"] = False
+    results = [dict(a, ok=True, error=None) for a in plan["actions"][1:]]
+    results[-1]["ok"] = False
+    state = queue_tuning.desired_state(plan, results)
+    assert "ethtool" not in state
+    assert set(state["sysfs"]) == {a["target"] for a in plan["actions"][:-1]}
+
+def test_desired_state_after_channel_change_uses_results_only():
+    channel = {"kind": queue_tuning.ACTION_CHANNELS, "target": "eth0", "current": 8, "desired": 2, "changed": True}
+    stale = {"kind": queue_tuning.ACTION_RPS, "target": "/sys/class/net/eth0/queues/rx-7/rps_cpus",
+             "current": "0", "desired": "0", "changed": False}
+    xps = {"kind": queue_tuning.ACTION_XPS, "target": "/sys/class/net/eth0/queues/tx-0/xps_cpus",
+           "current": "0", "desired": "00000005", "changed": True}
+    plan = {"interface": "eth0", "actions": [channel, stale], "replan_after_channels": True}
+    results = [dict(channel, ok=True, error=None), dict(xps, ok=True, error=None)]
+    assert queue_tuning.desired_state(plan, results) == {
+        "ethtool": {"eth0": {"channels": {"combined": 2}}},
+        "sysfs": {xps["target"]: "00000005"},
+    }
@@ -0,0 +1,23 @@
+import os
+import json
+from priv_helper import PrivilegedHelper, FAKE_EXEC_LOG
+from ring_tuning import propose_size, apply_ring_plan
+
+def test_propose_size_grows_on_drops_within_hardware_max():
+    assert propose_size(512, 4096, 1024) == (1024, "링크 속도 기준 1024")
+    assert propose_size(2048, 4096, 1024, drop_rate=3.0)[0] == 4096
+    assert propose_size(4096, 4096, 8192) == (4096, "이미 최대")
+
+def test_apply_ring_plan_sends_ethtool_through_helper(tmp_path):
+    plan = {"interface": "eth0", "ring": {
+        "rx": {"current": 512, "max": 4096, "proposed": 4096, "changed": True},
+        "tx": {"current": 4096, "max": 4096, "proposed": 4096, "changed": False},
+    }}
+    helper = PrivilegedHelper(root=str(tmp_path))
+    try:
+        result = apply_ring_plan(plan, helper)
+    finally:
+        helper.close()
+    assert result == {"applied": {"rx": 4096}, "ok": True, "error": None}
+    with open(os.path.join(tmp_path, FAKE_EXEC_LOG)) as f:
+        assert [json.loads(line) for line in f] == [["ethtool", "-G", "eth0", "rx", "4096"]]
@@ -0,0 +1,50 @@
+import os
+import threading
+from sysctl_reader import SysctlReader, parse_value, format_value
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+def test_parse_and_format_round_trip():
+    assert parse_value("4096\t131072\t6291456\n") == (4096, 131072, 6291456)
+    assert parse_value("bbr") == "bbr"
+    assert format_value((4096, 131072)) == "4096\t131072"
+
+def test_reader_reuses_handles_and_sees_updates(tmp_path):
+    root = str(tmp_path)
+    _write(f"{root}/net/core/rmem_max", "212992")
+    reader = SysctlReader(root, system="Linux")
+    try:
+        assert reader.read_many(["net.core.rmem_max", "net.core.missing"]) == {
+            "net.core.rmem_max": 212992, "net.core.missing": None}
+        # 같은 파일을 제자리에서 덮어쓰면 열어 둔 핸들로도 새 값을 읽는다
+        with open(f"{root}/net/core/rmem_max", "r+") as f:
+            f.write("425984\n")
+        assert reader.read("net.core.rmem_max") == 425984
+    finally:
+        reader.close()
+
+def test_concurrent_reads_and_close_keep_values_consistent(tmp_path):
+    root = str(tmp_path)
+    oids = [f"net.core.value{i}" for i in range(8)]
+    for i, oid in enumerate(oids):
+        _write(f"{root}/net/core/value{i}", str(i))
+    reader = SysctlReader(root, system="Linux")
+    errors = []
+
+    def worker():
+        for _ in range(200):
+            values = reader.read_many(oids)
+            if values != {oid: i for i, oid in enumerate(oids)}:
+                errors.append(values)
+            reader.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    reader.close()
+    assert not errors
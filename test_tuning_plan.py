@@ -0,0 +1,165 @@
+import tuning_plan
+from tuning_plan import MECH_ETHTOOL, MECH_LINK, MECH_SYSFS, apply_plan
+
+class RecordingRunner:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, commands):
+        self.batches.append(commands)
+        return [(True, None)] * len(commands)
+
+def _action(mechanism, target, key, desired, changed=True):
+    return {"mechanism": mechanism, "target": target, "key": key, "current": None,
+            "desired": desired, "changed": changed}
+
+def test_apply_plan_sends_every_ethtool_group_through_runner():
+    plan = {"actions": [
+        _action(MECH_ETHTOOL, "eth0", "ring.rx", 4096),
+        _action(MECH_ETHTOOL, "eth0", "ring.tx", 4096),
+        _action(MECH_ETHTOOL, "eth0", "channels.combined", 8),
+        _action(MECH_ETHTOOL, "eth0", "features.rx-gro", True),
+        _action(MECH_ETHTOOL, "eth0", "coalesce.adaptive_rx", 1),
+        _action(MECH_ETHTOOL, "eth0", "coalesce.rx_usecs", 0),
+        _action(MECH_ETHTOOL, "eth0", "pause.rx", 0, changed=False),
+        _action(MECH_LINK, "eth0", "mtu", 9000),
+    ]}
+    runner = RecordingRunner()
+    results = apply_plan(plan, runner=runner)
+    assert all(r["ok"] for r in results) and len(results) == 7
+    # ethtool 그룹 전체를 한 번에, ip link 는 그 다음에 보낸다
+    assert runner.batches == [
+        [["ethtool", "-G", "eth0", "rx", "4096", "tx", "4096"],
+         ["ethtool", "-L", "eth0", "combined", "8"],
+         ["ethtool", "-K", "eth0", "rx-gro", "on"],
+         ["ethtool", "-C", "eth0", "adaptive-rx", "on", "rx-usecs", "0"]],
+        [["ip", "link", "set", "dev", "eth0", "mtu", "9000"]],
+    ]
+
+def test_ethtool_failure_marks_whole_group():
+    plan = {"actions": [_action(MECH_ETHTOOL, "eth0", "ring.rx", 4096), _action(MECH_ETHTOOL, "eth0", "ring.tx", 4096)]}
+    results = apply_plan(plan, runner=lambda commands: [(False, "Operation not permitted")] * len(commands))
+    assert [(r["ok"], r["error"]) for r in results] == [(False, "Operation not permitted")] * 2
+
+def test_sysfs_plan_and_apply_in_temp_dir(tmp_path):
+    path = str(tmp_path / "rps_cpus")
+    with open(path, "w") as f:
+        f.write("00000000,00000000\n")
+    plan = tuning_plan.build_plan({"sysfs": {path: "0"}})
+    assert plan["changes"] == 0
+    plan = tuning_plan.build_plan({"sysfs": {path: "f"}})
+    assert apply_plan(plan, runner=RecordingRunner())[0]["ok"]
+    assert tuning_plan.verify_plan({"sysfs": {path: "f"}})["ok"]
+
+def test_governor_state_lists_every_cpufreq_policy(tmp_path):
+    for policy in ("policy0", "policy4"):
+        (tmp_path / policy).mkdir()
+        (tmp_path / policy / "scaling_governor").write_text("schedutil\n")
+    state = tuning_plan.governor_state("performance", str(tmp_path))
+    assert state == {str(tmp_path / "policy0" / "scaling_governor"): "performance",
+                     str(tmp_path / "policy4" / "scaling_governor"): "performance"}
+    plan = tuning_plan.build_plan({MECH_SYSFS: state})
+    assert plan["changes"] == 2
+
+# `tc qdisc show dev eth0` 기본 상태: 큐 12개 NIC 의 mq 0: + 큐별 fq_codel (자식 parent 는 16진수)
+DEFAULT_MQ = "qdisc mq 0: root \n" + "".join(
+    f"qdisc fq_codel 0: parent :{q:x} limit 10240p flows 1024 quantum 1514 target 5ms interval 100ms "
+    f"memory_limit 32Mb ecn drop_batch 64 \n" for q in range(12, 0, -1))
+
+TUNED_MQ = "qdisc mq 1: root \n" + "".join(
+    f"qdisc fq 80{q:02x}: parent 1:{q:x} limit 10000p flow_limit 834p buckets 1024 orphan_mask 1023 "
+    f"quantum 3072b initial_quantum 15140b low_rate_threshold 550Kbit refill_delay 40ms maxrate 10Gbit "
+    f"timer_slack 10us horizon 10s horizon_drop \n" for q in range(1, 13))
+
+STATS = """qdisc mq 1: root 
+ Sent 3000 bytes 30 pkt (dropped 3, overlimits 0 requeues 1) 
+ backlog 0b 0p requeues 1
+qdisc fq 8001: parent 1:1 limit 10000p flow_limit 834p buckets 1024 quantum 3072b 
+ Sent 1000 bytes 10 pkt (dropped 1, overlimits 0 requeues 0) 
+ backlog 1514b 1p requeues 0
+  flows 3 (inactive 1 throttled 1)
+  gc 0 highprio 0 throttled 5 latency 10.5us flows_plimit 2
+qdisc fq 8002: parent 1:2 limit 10000p flow_limit 834p buckets 1024 quantum 3072b 
+ Sent 2000 bytes 20 pkt (dropped 2, overlimits 0 requeues 1) 
+ backlog 0b 0p requeues 1
+  flows 4 (inactive 4 throttled 0)
+  gc 0 highprio 0 throttled 7 latency 12us flows_plimit 1
+"""
+
+def _queues(tmp_path, count):
+    for q in range(count):
+        (tmp_path / "eth0" / "queues" / f"tx-{q}").mkdir(parents=True)
+    return str(tmp_path)
+
+def _show(output):
+    return lambda iface, stats=False: tuning_plan.parse_qdiscs(output)
+
+def test_mq_fq_spec_scales_with_link_speed():
+    assert tuning_plan.mq_fq_spec(1000) == {"kind": "mq", "child": {"kind": "fq",
+                                                                     "options": {"flow_limit": 100, "quantum": 3072}}}
+    spec = tuning_plan.mq_fq_spec(100000, 1500, 10)
+    assert spec["child"]["options"] == {"flow_limit": 834, "quantum": 30720, "maxrate": "10gbit"}
+    assert tuning_plan.mq_fq_spec(400000, 9000)["child"]["options"]["quantum"] == 65536
+
+def test_parse_qdiscs_reads_parents_and_units():
+    qdiscs = tuning_plan.parse_qdiscs(TUNED_MQ)
+    assert qdiscs[0]["parent"] is None and qdiscs[0]["handle"] == "1:"
+    assert [q["parent"] for q in qdiscs[1:]][-3:] == ["1:a", "1:b", "1:c"]
+    options = qdiscs[1]["options"]
+    assert options["flow_limit"] == "834p" and options["horizon_drop"] is True
+    assert tuning_plan.parse_tc_value(options["maxrate"]) == tuning_plan.parse_tc_value("10000mbit") == 1e10
+
+def test_default_mq_gets_per_queue_fq(tmp_path):
+    sys_root = _queues(tmp_path, 12)
+    spec = {"kind": "mq", "child": {"kind": "fq", "options": {"flow_limit": 834, "quantum": 3072}}}
+    actions = tuning_plan.plan_tc({"eth0": spec}, _show(DEFAULT_MQ), sys_root)
+    root, children = actions[0], actions[1:]
+    # 기존 mq 0: 는 그대로 두고 자식만 교체
+    assert not root["changed"] and "handle" not in root["spec"]
+    assert [a["key"] for a in children] == [f"parent :{q:x}" for q in range(1, 13)]
+    assert all(a["changed"] and a["current"].startswith("fq_codel") for a in children)
+    commands = [tuning_plan.tc_command("eth0", a["spec"]) for a in actions if a["changed"]]
+    assert commands[0] == ["tc", "qdisc", "replace", "dev", "eth0", "parent", ":1", "fq", "flow_limit", "834",
+                           "quantum", "3072"]
+    assert commands[-1][5:7] == ["parent", ":c"]
+
+def test_matching_fq_children_need_no_commands(tmp_path):
+    sys_root = _queues(tmp_path, 12)
+    # 10G 링크, 플로우별 10Gbit: flow_limit 834p / quantum 3072b / maxrate 10Gbit 으로 이미 설정된 상태
+    spec = tuning_plan.mq_fq_spec(10000, 1500, 10)
+    assert spec["child"]["options"] == {"flow_limit": 834, "quantum": 3072, "maxrate": "10gbit"}
+    actions = tuning_plan.plan_tc({"eth0": spec}, _show(TUNED_MQ), sys_root)
+    assert len(actions) == 13
+    assert not any(a["changed"] for a in actions)
+
+def test_mq_replacing_root_fq_takes_a_new_handle(tmp_path):
+    sys_root = _queues(tmp_path, 2)
+    output = "qdisc fq 1: root refcnt 3 limit 10000p flow_limit 100p quantum 3028b \n"
+    spec = {"kind": "mq", "child": {"kind": "fq", "options": {"quantum": 3072}}}
+    actions = tuning_plan.plan_tc({"eth0": spec}, _show(output), sys_root)
+    assert actions[0]["changed"] and actions[0]["spec"]["handle"] == "2:"
+    assert [tuning_plan.tc_command("eth0", a["spec"]) for a in actions] == [
+        ["tc", "qdisc", "replace", "dev", "eth0", "root", "handle", "2:", "mq"],
+        ["tc", "qdisc", "replace", "dev", "eth0", "parent", "2:1", "fq", "quantum", "3072"],
+        ["tc", "qdisc", "replace", "dev", "eth0", "parent", "2:2", "fq", "quantum", "3072"],
+    ]
+
+def test_tc_commands_install_mq_from_scratch():
+    spec = {"kind": "mq", "child": {"kind": "fq", "options": {"maxrate": "5gbit"}}}
+    assert tuning_plan.tc_commands("eth0", spec, 2) == [
+        ["tc", "qdisc", "replace", "dev", "eth0", "root", "handle", "1:", "mq"],
+        ["tc", "qdisc", "replace", "dev", "eth0", "parent", "1:1", "fq", "maxrate", "5gbit"],
+        ["tc", "qdisc", "replace", "dev", "eth0", "parent", "1:2", "fq", "maxrate", "5gbit"],
+    ]
+
+def test_qdisc_stats_totals_leaf_counters():
+    stats = tuning_plan.qdisc_stats("eth0", _show(STATS))
+    assert stats["leaves"] == 2
+    leaf = stats["qdiscs"][1]["stats"]
+    assert leaf["flows"] == 3 and leaf["inactive_flows"] == 1 and leaf["throttled_flows"] == 1
+    assert leaf["backlog_bytes"] == 1514 and leaf["latency"] == 10.5e-6
+    totals = stats["totals"]
+    # root mq 의 합산 통계는 자식과 중복되므로 제외
+    assert totals["sent_bytes"] == 3000 and totals["dropped"] == 3 and totals["requeues"] == 1
+    assert totals["flows"] == 7 and totals["throttled"] == 12 and totals["flows_plimit"] == 3
+    assert totals["throttled_flows"] == 1 and totals["backlog_packets"] == 1
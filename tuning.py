@@ -1,52 +1,107 @@
 import platform
-import subprocess
-from utils import Colors, Messenger, get_all_interfaces, get_default_interface
+from utils import Colors, Messenger, get_all_interfaces, get_default_interface, get_nic_info, LINUX_BUFFER_OIDS, DARWIN_BUFFER_OIDS
 import config_manager
+from sysctl_reader import read_sysctl, read_sysctls, parse_value, format_value
+from ethtool_ioctl import format_speed
+from probe_cache import invalidate, CATEGORY_SYSCTL, CATEGORY_NET, CATEGORY_NIC
 from diagnosis import calculate_guidelines
 
+# 튜닝 메뉴 시나리오: (설명, 링크 속도 Mbps, RTT ms). 실제 값은 buffer_engine 으로 생성한다.
+PRESET_SCENARIOS = {
+    '1': ("10G NIC (RTT <= 100ms)", 10000, 100),
+    '2': ("10G (RTT <= 200ms) / 40G (RTT <= 50ms)", 40000, 50),
+    '3': ("100G NIC (RTT <= 200ms)", 100000, 200),
+}
+# 프로파일별 예상 동시 플로우 수 (tcp_mem 산정용)
+PROFILE_FLOWS = {"general": 64, "testhost": 8}
+PRESET_NAMES = {'1': "10g", '2': "40g", '3': "100g"}
+
+LINUX_UDP_BUFFERS = {
+    "net.core.rmem_max": 4194304,
+    "net.core.wmem_max": 4194304,
+}
+
+LINUX_DEFAULTS = {
+    "net.core.rmem_max": 212992,
+    "net.core.wmem_max": 212992,
+    "net.ipv4.tcp_rmem": "4096 131072 6291456",
+    "net.ipv4.tcp_wmem": "4096 16384 4194304",
+    "net.core.default_qdisc": "fq_codel",
+    "net.ipv4.tcp_congestion_control": "cubic",
+    "net.ipv4.tcp_mtu_probing": 0,
+    "net.ipv4.tcp_no_metrics_save": 0,
+    "net.core.optmem_max": 20480,
+}
+
+MAC_DEFAULTS = {
+    "net.inet.tcp.autorcvbufmax": 1048576,
+    "net.inet.tcp.autosndbufmax": 1048576,
+    "net.inet.tcp.sendspace": 131072,
+    "net.inet.tcp.recvspace": 131072,
+    "net.inet.tcp.win_scale_factor": 3,
+    "kern.ipc.maxsockbuf": 4194304
+}
+
+def recommend_preset(profile, choice, total_mem=None):
+    """시나리오 번호에 해당하는 buffer_engine 권장 결과 (설정 + 근거)"""
+    from buffer_engine import recommend
+    _, link_mbps, rtt_ms = PRESET_SCENARIOS[choice]
+    return recommend(link_mbps, rtt_ms, PROFILE_FLOWS[profile], total_mem, profile)
+
+def named_presets():
+    """CLI(`nettune tune ...`)에서 사용하는 프리셋 이름별 설정 (현재 시스템 메모리 기준으로 생성)"""
+    presets = {}
+    for profile in ("general", "testhost"):
+        for choice, suffix in PRESET_NAMES.items():
+            presets[f"{profile}-{suffix}"] = recommend_preset(profile, choice)["settings"]
+    presets.update({"udp": LINUX_UDP_BUFFERS, "linux-defaults": LINUX_DEFAULTS, "mac-defaults": MAC_DEFAULTS})
+    return presets
+
 def run_sysctl_command(oid, value):
-    """sudo sysctl -w 명령 실행"""
-    cmd = ["sudo", "sysctl", "-w", f"{oid}={value}"]
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    """권한 헬퍼로 sysctl 값 하나를 설정 (쓰기 후 재확인)"""
+    from priv_helper import get_helper
+    report = get_helper().sysctl({oid: str(value)})
+    invalidate(CATEGORY_SYSCTL)
+    if report and report["ok"]:
         print(f"    {Colors.OKGREEN}✔{Colors.ENDC} {oid} -> {value} {Colors.OKBLUE}(성공){Colors.ENDC}")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"    {Colors.FAIL}✘{Colors.ENDC} {oid} 설정 실패: {e.stderr.strip()}")
-        return False
+    print(f"    {Colors.FAIL}✘{Colors.ENDC} {oid} 설정 실패: {report['error'] if report else '권한 상승 실패'}")
+    return False
+
+def run_privileged_command(argv):
+    """권한 헬퍼로 허용된 명령 하나를 실행하고 (성공 여부, 오류 메시지) 반환"""
+    from priv_helper import get_helper
+    return get_helper().run(argv)
 
 def run_ethtool_command(interface, *args):
-    """sudo ethtool 명령 실행"""
-    cmd = ["sudo", "ethtool"] + list(args) + [interface]
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"    {Colors.OKGREEN}✔{Colors.ENDC} ethtool {' '.join(args)} {interface} {Colors.OKBLUE}(성공){Colors.ENDC}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"    {Colors.FAIL}✘{Colors.ENDC} ethtool 명령 실패: {e.stderr.strip()}")
-        return False
+    """ethtool 명령 실행 (예: run_ethtool_command("eth0", "-C", "adaptive-rx", "on"))"""
+    ok, error = run_privileged_command(["ethtool", args[0], interface] + list(args[1:]))
+    invalidate(CATEGORY_NIC)
+    if ok:
+        print(f"    {Colors.OKGREEN}✔{Colors.ENDC} ethtool {args[0]} {interface} {' '.join(args[1:])} {Colors.OKBLUE}(성공){Colors.ENDC}")
+    else:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} ethtool 명령 실패: {error}")
+    return ok
 
 def run_tc_command(*args):
-    """sudo tc 명령 실행"""
-    cmd = ["sudo", "tc"] + list(args)
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    """tc 명령 실행"""
+    ok, error = run_privileged_command(["tc"] + list(args))
+    invalidate(CATEGORY_NET)
+    if ok:
         print(f"    {Colors.OKGREEN}✔{Colors.ENDC} tc {' '.join(args)} {Colors.OKBLUE}(성공){Colors.ENDC}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"    {Colors.FAIL}✘{Colors.ENDC} tc 명령 실패: {e.stderr.strip()}")
-        return False
+    else:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} tc 명령 실패: {error}")
+    return ok
 
 def run_modprobe(module):
-    """sudo modprobe 명령 실행"""
-    cmd = ["sudo", "modprobe", module]
-    try:
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    """modprobe 명령 실행"""
+    ok, error = run_privileged_command(["modprobe", module])
+    invalidate(CATEGORY_SYSCTL)
+    if ok:
         print(f"    {Colors.OKGREEN}✔{Colors.ENDC} modprobe {module} {Colors.OKBLUE}(성공){Colors.ENDC}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"    {Colors.FAIL}✘{Colors.ENDC} modprobe {module} 실패: {e.stderr.strip()}")
-        return False
+    else:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} modprobe {module} 실패: {error}")
+    return ok
 
 def _select_interface():
     """튜닝 적용할 네트워크 인터페이스 선택"""
@@ -74,161 +129,460 @@ def _select_interface():
         except ValueError:
             Messenger.error("REQUIRE_NUMBER")
 
-def _apply_sysctl_settings(settings):
-    """sysctl 설정 딕셔너리를 일괄 적용"""
-    config_manager.save_config("bk")
-    print(f"\n{Colors.BOLD}🛠️ 설정 적용 중...{Colors.ENDC}")
-    success = True
+def preview_sysctl_settings(settings):
+    """적용 예정 sysctl 값과 현재 값 비교 목록 반환"""
+    current = read_sysctls(list(settings))
+    preview = []
     for oid, val in settings.items():
-        success &= run_sysctl_command(oid, val)
+        cur = current.get(oid)
+        preview.append({
+            "oid": oid,
+            "current": format_value(cur) if cur is not None else None,
+            "desired": str(val),
+            "changed": cur is None or parse_value(str(val)) != cur,
+        })
+    return preview
+
+_TXN_MARKS = {
+    "applied": (Colors.OKGREEN, "✔", "성공"),
+    "unchanged": (Colors.OKGREEN, "✔", "변경 없음"),
+    "rolled_back": (Colors.WARNING, "↩", "복원됨"),
+    "failed": (Colors.FAIL, "✘", "실패"),
+    "skipped": (Colors.WARNING, "-", "건너뜀"),
+}
+
+def print_sysctl_transaction(report):
+    """sysctl 트랜잭션 결과를 OID별로 출력"""
+    for item in report["items"]:
+        color, mark, label = _TXN_MARKS[item["status"]]
+        timing = f" {item['write_us']}us" if item["write_us"] is not None else ""
+        error = f": {item['error']}" if item["error"] else ""
+        print(f"    {color}{mark}{Colors.ENDC} {item['oid']} -> {item['desired']} {Colors.OKBLUE}({label}{timing}){Colors.ENDC}{error}")
+    if not report["ok"]:
+        state = "모든 변경을 이전 값으로 복원했습니다" if report["rolled_back"] else "일부 항목을 복원하지 못했습니다"
+        Messenger.error(f"{report['failed_oid'] or 'sysctl'} 적용 실패 ({report['error']}) - {state}.")
+    print(f"    {Colors.OKBLUE}({report['method']}, {len(report['items'])}개 항목, {report['elapsed_ms']} ms){Colors.ENDC}")
+
+def write_sysctl_settings(settings):
+    """sysctl 설정 딕셔너리를 한 트랜잭션으로 적용 (실패 시 전체 복원)하고 결과 보고서 반환"""
+    from sysctl_txn import apply_transaction
+    report = apply_transaction(settings)
+    print_sysctl_transaction(report)
+    return report
+
+def print_tuning_plan(plan, show_unchanged=False):
+    """메커니즘별 변경 계획 출력 (기본: 변경이 필요한 항목만)"""
+    mechanism = None
+    for action in plan["actions"]:
+        if not action["changed"] and not show_unchanged:
+            continue
+        if action["mechanism"] != mechanism:
+            mechanism = action["mechanism"]
+            print(f"  {Colors.BOLD}[{mechanism}]{Colors.ENDC}")
+        mark = f"{Colors.WARNING}*{Colors.ENDC}" if action["changed"] else " "
+        target = f"{action['target']} {action['key']}" if action["key"] else action["target"]
+        current = str(action["current"]).replace("\t", " ")
+        print(f"  {mark} {target:40} {current:>28} -> {action['desired']}")
+    unchanged = len(plan["actions"]) - plan["changes"]
+    print(f"  {Colors.OKBLUE}변경 {plan['changes']}개, 이미 적용됨 {unchanged}개{Colors.ENDC}")
+
+def print_plan_results(results):
+    """계획 적용 결과를 항목별로 출력"""
+    for r in results:
+        target = f"{r['target']} {r['key']}" if r["key"] else r["target"]
+        if r["ok"]:
+            print(f"    {Colors.OKGREEN}✔{Colors.ENDC} [{r['mechanism']}] {target} -> {r['desired']} {Colors.OKBLUE}(성공){Colors.ENDC}")
+        else:
+            print(f"    {Colors.FAIL}✘{Colors.ENDC} [{r['mechanism']}] {target} 설정 실패: {r['error']}")
+
+def apply_desired_state(desired):
+    """원하는 상태와 현재 상태의 차이만 백업 후 적용. 변경이 없으면 아무것도 쓰지 않음. 성공 여부 반환"""
+    from tuning_plan import build_plan, apply_plan, verify_plan
+    plan = build_plan(desired)
+    print(f"\n{Colors.BOLD}📋 변경 계획{Colors.ENDC}")
+    print_tuning_plan(plan)
+    if not plan["changes"]:
+        Messenger.success("이미 모든 값이 적용되어 있습니다. (변경 없음)")
+        return True
+    config_manager.save_config("bk")
+    print(f"\n{Colors.BOLD}🛠️ 변경 항목만 적용 중...{Colors.ENDC}")
+    print_plan_results(apply_plan(plan))
+    verify = verify_plan(desired)
+    if not verify["ok"]:
+        Messenger.warn(f"적용 후에도 {len(verify['drift'])}개 항목이 원하는 값과 다릅니다.", bold=False)
+    return verify["ok"]
+
+def print_persist_result(result):
+    """생성한 영구 설정 파일과 활성화 명령 출력"""
+    for path in result["written"]:
+        print(f"    {Colors.OKGREEN}✔{Colors.ENDC} {path}")
+    print(f"  {Colors.OKBLUE}활성화 (최초 1회):{Colors.ENDC}")
+    for command in result["activate"]:
+        print(f"    sudo {command}")
+
+def _offer_persist(desired):
+    """적용한 상태를 재부팅 후에도 유지할 영구 설정 파일(sysctl.d / udev / systemd)로 기록할지 묻기"""
+    from persist import persist, check_root
+    Messenger.warn("설정이 즉시 반영되었으나, 재부팅 시 초기화됩니다.", bold=False)
+    try:
+        # /etc 에 쓸 권한이 없으면 묻기 전에 안내 (비 root 로 실행한 대화형 메뉴)
+        check_root()
+    except PermissionError as e:
+        Messenger.warn(f"{e.strerror} (또는 `sudo nettune tune plan ... --persist`)", bold=False)
+        return
+    confirm = input(f" {Colors.BOLD}재부팅 후에도 유지하도록 영구 설정 파일을 생성하시겠습니까? (y/n) > {Colors.ENDC}")
+    if confirm.strip().lower() != 'y':
+        return
+    try:
+        print_persist_result(persist(desired))
+    except OSError as e:
+        Messenger.error(f"영구 설정 파일 생성 실패: {e.strerror or e}")
+
+def _apply_sysctl_settings(settings):
+    """sysctl 설정 딕셔너리 중 현재 값과 다른 항목만 적용"""
+    success = apply_desired_state({"sysctl": settings})
     if success:
         Messenger.success("SUCCESS_TUNING")
-    Messenger.warn("설정이 즉시 반영되었으나, 재부팅 시 초기화됩니다.", bold=False)
-    Messenger.info("영구 반영: /etc/sysctl.conf 에 해당 설정을 추가하세요.", bold=False)
+        _offer_persist({"sysctl": settings})
     input("\n계속하려면 [Enter]를 누르세요...")
 
-def _apply_linux_general():
-    """일반 호스트 TCP 버퍼 최적화"""
-    print(f"\n{Colors.BOLD}{Colors.OKCYAN}📡 일반 호스트 튜닝 (TCP 버퍼 최적화){Colors.ENDC}")
-    print(f"  [1] 10G NIC (RTT <= 100ms)")
-    print(f"  [2] 10G (RTT <= 200ms) / 40G (RTT <= 50ms)")
-    print(f"  [3] 100G NIC (RTT <= 200ms)")
+def print_recommendation(rec):
+    """buffer_engine 권장 설정과 항목별 근거 출력"""
+    inputs = rec["inputs"]
+    print(f"\n {Colors.BOLD}📐 권장 버퍼 설정{Colors.ENDC} ({inputs['link_mbps'] / 1000:g} Gbps, RTT {inputs['rtt_ms']:g} ms, "
+          f"동시 플로우 {inputs['flows']}개, RAM {inputs['total_mem_bytes'] / 1024**3:.1f} GB)")
+    for oid, value in rec["settings"].items():
+        print(f"    - {oid:32}: {Colors.OKCYAN}{value}{Colors.ENDC}")
+        reason = rec["reasons"].get(oid)
+        if reason and reason != "프로파일 공통 설정":
+            print(f"      {reason}")
+    if rec["limited_by_memory"]:
+        Messenger.warn("메모리 한도로 BDP 전체를 버퍼로 확보하지 못했습니다. 장거리 단일 플로우 처리량이 제한될 수 있습니다.", bold=False)
+
+def _prompt_number(prompt, default):
+    while True:
+        text = input(f" {Colors.BOLD}{prompt} (기본: {default}) > {Colors.ENDC}").strip()
+        if not text:
+            return default
+        try:
+            value = float(text)
+            if value > 0:
+                return value
+        except ValueError:
+            pass
+        Messenger.error("INVALID_INPUT")
+
+def _prompt_recommendation(profile):
+    """링크 속도 / RTT / 동시 플로우 수를 직접 입력 받아 권장값 산출"""
+    from buffer_engine import recommend
+    from utils import get_link_speed_mbps
+    speed = get_link_speed_mbps(get_default_interface())
+    link_gbps = _prompt_number("링크 속도 (Gbps)", speed / 1000 if speed else 10)
+    rtt_ms = _prompt_number("RTT (ms)", 100)
+    flows = int(_prompt_number("예상 동시 플로우 수", PROFILE_FLOWS[profile]))
+    return recommend(link_gbps * 1000, rtt_ms, flows, profile=profile)
+
+def _apply_profile_menu(profile, title, labels):
+    print(f"\n{Colors.BOLD}{Colors.OKCYAN}{title}{Colors.ENDC}")
+    for choice, label in labels.items():
+        print(f"  [{choice}] {label}")
+    print(f"  [4] 직접 입력 (링크 속도 / RTT / 동시 플로우 수)")
     print(f"  [b] 뒤로 가기")
 
     choice = input(f"\n{Colors.BOLD}선택 > {Colors.ENDC}").strip().lower()
+    if choice in PRESET_SCENARIOS:
+        rec = recommend_preset(profile, choice)
+    elif choice == '4':
+        rec = _prompt_recommendation(profile)
+    else:
+        return
 
-    presets = {
-        '1': {
-            "net.core.rmem_max": 67108864,
-            "net.core.wmem_max": 67108864,
-            "net.ipv4.tcp_rmem": "4096 87380 33554432",
-            "net.ipv4.tcp_wmem": "4096 65536 33554432",
-            "net.ipv4.tcp_mtu_probing": 1,
-            "net.core.default_qdisc": "fq",
-        },
-        '2': {
-            "net.core.rmem_max": 134217728,
-            "net.core.wmem_max": 134217728,
-            "net.ipv4.tcp_rmem": "4096 87380 67108864",
-            "net.ipv4.tcp_wmem": "4096 65536 67108864",
-            "net.ipv4.tcp_mtu_probing": 1,
-            "net.core.default_qdisc": "fq",
-        },
-        '3': {
-            "net.core.rmem_max": 2147483647,
-            "net.core.wmem_max": 2147483647,
-            "net.ipv4.tcp_rmem": "4096 131072 1073741824",
-            "net.ipv4.tcp_wmem": "4096 16384 1073741824",
-            "net.ipv4.tcp_mtu_probing": 1,
-            "net.core.default_qdisc": "fq",
-            "net.core.optmem_max": 1048576,
-        },
-    }
-
-    if choice in presets:
-        Messenger.warn("CONFIRM_APPLY", bold=True)
-        confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
-        if confirm == 'y':
-            _apply_sysctl_settings(presets[choice])
+    print_recommendation(rec)
+    Messenger.warn("CONFIRM_APPLY", bold=True)
+    confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
+    if confirm == 'y':
+        _apply_sysctl_settings(rec["settings"])
+
+def _apply_linux_general():
+    """일반 호스트 TCP 버퍼 최적화"""
+    _apply_profile_menu("general", "📡 일반 호스트 튜닝 (TCP 버퍼 최적화)",
+                        {c: label for c, (label, _, _) in PRESET_SCENARIOS.items()})
 
 def _apply_linux_test_host():
     """테스트/측정 호스트 튜닝"""
-    print(f"\n{Colors.BOLD}{Colors.OKCYAN}🧪 테스트/측정 호스트 튜닝{Colors.ENDC}")
-    print(f"  [1] 일반 (10G, RTT <= 100ms)")
-    print(f"  [2] 고지연 경로 (10G RTT <= 200ms / 40G RTT <= 50ms)")
-    print(f"  [3] 초고속 (100G, RTT <= 200ms)")
-    print(f"  [b] 뒤로 가기")
-
-    choice = input(f"\n{Colors.BOLD}선택 > {Colors.ENDC}").strip().lower()
-
-    presets = {
-        '1': {
-            "net.core.rmem_max": 268435456,
-            "net.core.wmem_max": 268435456,
-            "net.ipv4.tcp_rmem": "4096 87380 134217728",
-            "net.ipv4.tcp_wmem": "4096 65536 134217728",
-            "net.ipv4.tcp_no_metrics_save": 1,
-            "net.ipv4.tcp_mtu_probing": 1,
-            "net.core.default_qdisc": "fq",
-        },
-        '2': {
-            "net.core.rmem_max": 536870912,
-            "net.core.wmem_max": 536870912,
-            "net.ipv4.tcp_rmem": "4096 87380 268435456",
-            "net.ipv4.tcp_wmem": "4096 65536 268435456",
-            "net.ipv4.tcp_no_metrics_save": 1,
-            "net.ipv4.tcp_mtu_probing": 1,
-            "net.core.default_qdisc": "fq",
-        },
-        '3': {
-            "net.core.rmem_max": 2147483647,
-            "net.core.wmem_max": 2147483647,
-            "net.ipv4.tcp_rmem": "4096 65536 1073741824",
-            "net.ipv4.tcp_wmem": "4096 65536 1073741824",
-            "net.ipv4.tcp_no_metrics_save": 1,
-            "net.ipv4.tcp_mtu_probing": 1,
-            "net.core.default_qdisc": "fq",
-            "net.core.optmem_max": 1048576,
-        },
-    }
-
-    if choice in presets:
-        Messenger.warn("CONFIRM_APPLY", bold=True)
-        confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
-        if confirm == 'y':
-            _apply_sysctl_settings(presets[choice])
+    _apply_profile_menu("testhost", "🧪 테스트/측정 호스트 튜닝", {
+        '1': "일반 (10G, RTT <= 100ms)",
+        '2': "고지연 경로 (10G RTT <= 200ms / 40G RTT <= 50ms)",
+        '3': "초고속 (100G, RTT <= 200ms)",
+    })
 
 def _apply_linux_100g_nic():
     """100G NIC 드라이버 최적화"""
     iface = _select_interface()
+    nic = get_nic_info(iface)
+    ring = nic["ring"]
 
     print(f"\n{Colors.BOLD}{Colors.OKCYAN}⚙️ 100G NIC 드라이버 최적화 ({iface}){Colors.ENDC}")
-    print(f"  [1] Ring Buffer 확장 (rx/tx 8192)")
+    print(f"  현재 속도: {format_speed(nic['speed_mbps'])}")
+    if ring:
+        print(f"  현재 Ring Buffer: rx {ring['rx']}/{ring['rx_max']}, tx {ring['tx']}/{ring['tx_max']} (현재/최대)")
+    print(f"  [1] Ring Buffer 조정 (링크 속도/드롭률 기반, 하드웨어 최대 이내)")
     print(f"  [2] Adaptive Interrupt Coalescence 활성화")
     print(f"  [3] Flow Control 활성화 (rx/tx on)")
     print(f"  [4] CPU Governor -> performance 설정")
     print(f"  [5] SMT(Hyper-Threading) 비활성화 안내")
-    print(f"  [a] 위 항목 모두 적용 (5번 제외)")
+    print(f"  [6] 멀티 큐 분산 (RSS 채널 / IRQ affinity / RPS / XPS)")
+    print(f"  [7] 오프로드 기능 활성화 (GRO/GSO/TSO/HW-GRO/USO)")
+    print(f"  [8] Jumbo Frame (MTU 9000, 경로 MTU 검증 후 적용)")
+    print(f"  [a] 위 항목 모두 적용 (5, 6, 7, 8번 제외)")
     print(f"  [b] 뒤로 가기")
 
     choice = input(f"\n{Colors.BOLD}선택 > {Colors.ENDC}").strip().lower()
     if choice == 'b':
         return
+    if choice == '6':
+        _apply_queue_spreading(iface)
+        return
+    if choice == '7':
+        _apply_offload_tuning(iface)
+        return
+    if choice == '8':
+        _apply_jumbo_frame(iface)
+        return
 
     Messenger.warn("SUDO_REQUIRED")
     print(f"\n{Colors.BOLD}🛠️ 설정 적용 중...{Colors.ENDC}")
 
+    # 반영된 항목(이미 설정되어 있던 항목 포함)을 원하는 상태로 모아 영구 설정 여부를 묻는다
+    ethtool = {}
+    desired = {}
     if choice in ['1', 'a']:
-        run_ethtool_command(iface, "-G", "rx", "8192", "tx", "8192")
+        ring = _apply_ring_tuning(iface)
+        if ring:
+            ethtool["ring"] = ring
     if choice in ['2', 'a']:
-        run_ethtool_command(iface, "-C", "adaptive-rx", "on", "adaptive-tx", "on")
+        coalesce = nic["coalesce"]
+        if coalesce and coalesce["adaptive_rx"] and coalesce["adaptive_tx"]:
+            print(f"    {Colors.OKGREEN}✔{Colors.ENDC} Adaptive Coalescence 이미 활성화됨 {Colors.OKBLUE}(건너뜀){Colors.ENDC}")
+            ethtool["coalesce"] = {"adaptive_rx": True, "adaptive_tx": True}
+        elif run_ethtool_command(iface, "-C", "adaptive-rx", "on", "adaptive-tx", "on"):
+            ethtool["coalesce"] = {"adaptive_rx": True, "adaptive_tx": True}
     if choice in ['3', 'a']:
-        run_ethtool_command(iface, "-A", "rx", "on", "tx", "on")
+        pause = nic["pause"]
+        if pause and pause["rx"] and pause["tx"]:
+            print(f"    {Colors.OKGREEN}✔{Colors.ENDC} Flow Control 이미 활성화됨 {Colors.OKBLUE}(건너뜀){Colors.ENDC}")
+            ethtool["pause"] = {"rx": True, "tx": True}
+        elif run_ethtool_command(iface, "-A", "rx", "on", "tx", "on"):
+            ethtool["pause"] = {"rx": True, "tx": True}
+    if ethtool:
+        desired["ethtool"] = {iface: ethtool}
     if choice in ['4', 'a']:
-        try:
-            subprocess.run(
-                ["sudo", "cpupower", "frequency-set", "-g", "performance"],
-                check=True, capture_output=True, text=True
-            )
+        ok, error = run_privileged_command(["cpupower", "frequency-set", "-g", "performance"])
+        if ok:
             print(f"    {Colors.OKGREEN}✔{Colors.ENDC} CPU Governor -> performance {Colors.OKBLUE}(성공){Colors.ENDC}")
-        except subprocess.CalledProcessError as e:
-            print(f"    {Colors.FAIL}✘{Colors.ENDC} CPU Governor 설정 실패: {e.stderr.strip()}")
-        except FileNotFoundError:
+            # cpupower 는 부팅 시 다시 실행되지 않으므로 정책별 scaling_governor 를 sysfs 항목으로 저장
+            from tuning_plan import governor_state
+            governor = governor_state("performance")
+            if governor:
+                desired["sysfs"] = governor
+        elif error and "No such file" in error:
             print(f"    {Colors.FAIL}✘{Colors.ENDC} cpupower가 설치되어 있지 않습니다. (linux-tools 패키지 필요)")
+        else:
+            print(f"    {Colors.FAIL}✘{Colors.ENDC} CPU Governor 설정 실패: {error}")
     if choice == '5':
         print(f"\n{Colors.BOLD}{Colors.WARNING}📌 SMT(Hyper-Threading) 비활성화 안내:{Colors.ENDC}")
         print(f"  SMT 비활성화는 BIOS/UEFI 설정에서 수행해야 합니다.")
         print(f"  - 서버 재부팅 -> BIOS 진입 -> Processor 설정 -> Hyper-Threading 비활성화")
         print(f"  - 또는 커널 파라미터: nosmt=force (GRUB 설정)")
 
+    if desired:
+        _offer_persist(desired)
+    input("\n계속하려면 [Enter]를 누르세요...")
+
+def print_ring_plan(plan):
+    """Ring Buffer 계획(현재/최대/제안) 출력"""
+    speed = format_speed(plan["speed_mbps"])
+    print(f"\n  {Colors.BOLD}Ring Buffer 계획 ({plan['interface']}, {speed}, 드롭 {plan['drop_rate_per_s']}/s){Colors.ENDC}")
+    print(f"    {'방향':4} {'현재':>7} {'최대':>7} {'제안':>7}  사유")
+    for direction, row in plan["ring"].items():
+        color = Colors.WARNING if row["changed"] else ""
+        print(f"    {color}{direction:6} {row['current']:>7} {row['max']:>7} {row['proposed']:>7}  {row['reason']}"
+              f"{Colors.ENDC if color else ''}")
+    for counter, delta in plan["drops"].items():
+        print(f"    - {counter} +{delta}")
+
+def _apply_ring_tuning(iface):
+    """드롭률 측정 후 변경이 필요한 링만 조정 (동일 값 재적용으로 인한 링크 재설정 방지)
+
+    반환값: 반영된 링 크기 {"rx": n, "tx": n} (영구 설정용), 실패하면 None
+    """
+    from ring_tuning import build_ring_plan, apply_ring_plan
+    Messenger.info("링 부족 드롭률을 1초간 측정합니다...", bold=False)
+    try:
+        plan = build_ring_plan(iface)
+    except OSError as e:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} Ring Buffer 정보를 조회할 수 없습니다: {e.strerror or e}")
+        return None
+    print_ring_plan(plan)
+    result = apply_ring_plan(plan)
+    if not result["applied"] and result["ok"]:
+        print(f"    {Colors.OKGREEN}✔{Colors.ENDC} Ring Buffer 이미 적정 크기 {Colors.OKBLUE}(건너뜀){Colors.ENDC}")
+    elif result["ok"]:
+        sizes = " ".join(f"{d} {n}" for d, n in result["applied"].items())
+        print(f"    {Colors.OKGREEN}✔{Colors.ENDC} Ring Buffer -> {sizes} {Colors.OKBLUE}(성공){Colors.ENDC}")
+    else:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} Ring Buffer 변경 실패: {result['error']}")
+        return None
+    return {d: row["proposed"] for d, row in plan["ring"].items()}
+
+def apply_offload_tuning(iface, backup=True):
+    """권장 오프로드를 켜고, 일부라도 반영되지 않으면 백업 상태로 되돌림
+
+    반환값: {"backup", "changes", "results", "error", "rolled_back", "success"}
+    """
+    from offload import audit_offloads, recommended_changes, apply_features
+    changes = recommended_changes(audit_offloads(iface))
+    outcome = {"backup": None, "changes": changes, "results": {}, "error": None, "rolled_back": False, "success": True}
+    if not changes:
+        return outcome
+    if backup:
+        outcome["backup"] = config_manager.save_config("bk", iface)
+    applied = apply_features(iface, changes)
+    outcome["results"], outcome["error"] = applied["results"], applied["error"]
+    outcome["success"] = applied["error"] is None and all(applied["results"].values())
+    # 명령 자체가 실패했으면(권한 부족 등) 바뀐 것이 없으므로 되돌리지 않는다
+    if not outcome["success"] and outcome["backup"] and outcome["error"] is None:
+        content = config_manager.load_config_file(outcome["backup"])
+        saved = (content or {}).get("settings", {}).get("offloads")
+        if saved:
+            Messenger.warn("일부 오프로드가 반영되지 않아 백업 상태로 되돌립니다.", bold=False)
+            outcome["rolled_back"] = _restore_offloads(iface, saved)
+    return outcome
+
+def _apply_offload_tuning(iface):
+    """오프로드 점검 결과를 보여주고 확인 후 권장 집합 적용"""
+    from offload import audit_offloads, recommended_changes
+    from diagnosis import print_offload_audit
+    try:
+        rows = audit_offloads(iface)
+    except OSError as e:
+        Messenger.error(f"오프로드 정보를 조회할 수 없습니다: {e.strerror or e}")
+        return
+    print(f"\n  {Colors.BOLD}오프로드 점검 ({iface}){Colors.ENDC}")
+    print_offload_audit(rows)
+    if not recommended_changes(rows):
+        Messenger.success("권장 오프로드가 모두 활성화되어 있습니다.")
+        input("\n계속하려면 [Enter]를 누르세요...")
+        return
+    Messenger.warn("CONFIRM_APPLY", bold=True)
+    if input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower() != 'y':
+        return
+    outcome = apply_offload_tuning(iface)
+    if outcome["error"]:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} 오프로드 변경 실패: {outcome['error']}")
+        input("\n계속하려면 [Enter]를 누르세요...")
+        return
+    for name, ok in outcome["results"].items():
+        if ok:
+            print(f"    {Colors.OKGREEN}✔{Colors.ENDC} {name} -> on {Colors.OKBLUE}(성공){Colors.ENDC}")
+        else:
+            print(f"    {Colors.FAIL}✘{Colors.ENDC} {name} 활성화 실패")
+    # 백업 상태로 되돌렸으면 남길 변경이 없다
+    if outcome["success"]:
+        _offer_persist({"ethtool": {iface: {"features": {name: True for name in outcome["results"]}}}})
+    input("\n계속하려면 [Enter]를 누르세요...")
+
+_QUEUE_ACTION_LABELS = {
+    "channels": "RSS 채널(combined)",
+    "irq_affinity": "IRQ affinity",
+    "rps_cpus": "RPS",
+    "xps_cpus": "XPS",
+}
+
+def print_queue_plan(plan):
+    """멀티 큐 분산 계획(dry-run) 출력"""
+    topo = plan["topology"]
+    node = topo["numa_node"] if topo["numa_node"] is not None else "N/A"
+    print(f"\n{Colors.BOLD}{Colors.OKCYAN}🧭 [{plan['interface']}] 멀티 큐 분산 계획{Colors.ENDC}")
+    print(f"  NUMA 노드 {node}, 로컬 CPU {','.join(map(str, topo['local']))} "
+          f"(물리 코어 {topo['local_cores']}개), 온라인 CPU {len(topo['online'])}개")
+    if not plan["actions"]:
+        print(f"  {Colors.WARNING}조정할 수 있는 큐/IRQ 항목이 없습니다.{Colors.ENDC}")
+    for action in plan["actions"]:
+        label = _QUEUE_ACTION_LABELS[action["kind"]]
+        target = action.get("name") or action["target"].rsplit("/queues/", 1)[-1]
+        mark = f"{Colors.WARNING}*{Colors.ENDC}" if action["changed"] else " "
+        print(f"  {mark} {label:18} {target:28} {str(action['current']):>12} -> {action['desired']}")
+    if plan["replan_after_channels"]:
+        print(f"  {Colors.OKBLUE}* 채널 수 변경 후 IRQ/큐 배치는 새 큐 기준으로 다시 계산됩니다.{Colors.ENDC}")
+
+def _apply_queue_spreading(iface):
+    """멀티 큐 분산 계획을 보여주고 확인 후 적용"""
+    from queue_tuning import build_plan, apply_plan, desired_state
+    plan = build_plan(iface)
+    print_queue_plan(plan)
+    if not any(a["changed"] for a in plan["actions"]):
+        Messenger.success("이미 권장 배치로 설정되어 있습니다.")
+        input("\n계속하려면 [Enter]를 누르세요...")
+        return
+    Messenger.warn("CONFIRM_APPLY", bold=True)
+    if input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower() != 'y':
+        return
+    Messenger.warn("irqbalance 서비스가 실행 중이면 IRQ affinity 를 다시 변경할 수 있습니다.", bold=False)
+    results = apply_plan(plan)
+    for result in results:
+        label = _QUEUE_ACTION_LABELS[result["kind"]]
+        target = result.get("name") or result["target"]
+        if result["ok"]:
+            print(f"    {Colors.OKGREEN}✔{Colors.ENDC} {label} {target} -> {result['desired']} {Colors.OKBLUE}(성공){Colors.ENDC}")
+        else:
+            print(f"    {Colors.FAIL}✘{Colors.ENDC} {label} {target} 설정 실패: {result['error']}")
+    desired = desired_state(plan, results)
+    if desired:
+        _offer_persist(desired)
     input("\n계속하려면 [Enter]를 누르세요...")
 
+def print_qdisc_stats(stats):
+    """`tc -s qdisc` 통계 출력 (큐별 qdisc 와 합계, 페이싱 병목 여부)"""
+    print(f"\n{Colors.BOLD}현재 qdisc 설정 ({stats['interface']}):{Colors.ENDC}")
+    if not stats["qdiscs"]:
+        print("  설정 없음")
+        return
+    for q in stats["qdiscs"]:
+        st = q["stats"]
+        where = f"parent {q['parent']}" if q["parent"] else "root"
+        line = f"  {q['kind']:8} {q['handle']:6} {where:12} 전송 {st.get('sent_packets', 0)}pkt, 드롭 {st.get('dropped', 0)}"
+        if "flows" in st:
+            line += f", 플로우 {st['flows']} (대기 {st.get('throttled_flows', 0)}), throttled {st.get('throttled', 0)}"
+        print(line)
+    totals = stats["totals"]
+    print(f"  {Colors.OKBLUE}합계 ({stats['leaves']}개 qdisc): 드롭 {totals.get('dropped', 0)}, "
+          f"flow_limit 초과 드롭 {totals.get('flows_plimit', 0)}, throttled {totals.get('throttled', 0)}, "
+          f"백로그 {totals.get('backlog_packets', 0)}pkt{Colors.ENDC}")
+    if totals.get("flows_plimit"):
+        Messenger.warn("flow_limit 초과 드롭이 있습니다. 페이싱 큐가 병목입니다. (flow_limit 확대 필요)", bold=False)
+    elif totals.get("dropped"):
+        Messenger.warn("qdisc 드롭이 있습니다. limit 또는 maxrate 설정을 확인하세요.", bold=False)
+    elif totals.get("sent_packets"):
+        Messenger.success("qdisc 드롭 없음: 페이싱이 병목이 아닙니다.")
+
+def _pacing_spec(iface, rate):
+    """TX 큐가 여러 개면 mq + 큐별 fq(링크 속도 기반 flow_limit/quantum), 하나면 root fq"""
+    from tuning_plan import mq_fq_spec, tx_queue_count
+    from ethtool_ioctl import get_speed_mbps
+    from utils import get_mtu
+    mtu = get_mtu(iface)
+    spec = mq_fq_spec(get_speed_mbps(iface), int(mtu) if str(mtu).isdigit() else 1500, float(rate))
+    if tx_queue_count(iface) > 1:
+        return spec
+    return dict(spec["child"])
+
 def _apply_linux_packet_pacing():
     """패킷 페이싱 설정"""
     print(f"\n{Colors.BOLD}{Colors.OKCYAN}📦 패킷 페이싱 설정{Colors.ENDC}")
     print(f"  [1] fq qdisc 활성화 (sysctl)")
-    print(f"  [2] 인터페이스별 maxrate 설정 (tc)")
-    print(f"  [3] 현재 qdisc 설정 확인")
+    print(f"  [2] 플로우별 maxrate 설정 (tc, 멀티 큐 NIC 은 mq + 큐별 fq)")
+    print(f"  [3] 현재 qdisc 설정 및 통계 확인 (드롭/throttled/플로우)")
     print(f"  [b] 뒤로 가기")
 
     choice = input(f"\n{Colors.BOLD}선택 > {Colors.ENDC}").strip().lower()
@@ -237,14 +591,14 @@ def _apply_linux_packet_pacing():
         Messenger.warn("CONFIRM_APPLY", bold=True)
         confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
         if confirm == 'y':
-            config_manager.save_config("bk")
-            print(f"\n{Colors.BOLD}🛠️ 설정 적용 중...{Colors.ENDC}")
-            run_sysctl_command("net.core.default_qdisc", "fq")
+            desired = {"sysctl": {"net.core.default_qdisc": "fq"}}
+            if apply_desired_state(desired):
+                _offer_persist(desired)
             input("\n계속하려면 [Enter]를 누르세요...")
 
     elif choice == '2':
         iface = _select_interface()
-        rate = input(f"{Colors.BOLD}maxrate 입력 (Gbps 단위, 예: 10) > {Colors.ENDC}").strip()
+        rate = input(f"{Colors.BOLD}플로우별 maxrate 입력 (Gbps 단위, 예: 10) > {Colors.ENDC}").strip()
         if not rate:
             Messenger.warn("CANCELLED")
             return
@@ -253,31 +607,90 @@ def _apply_linux_packet_pacing():
         except ValueError:
             Messenger.error("REQUIRE_NUMBER")
             return
+        spec = _pacing_spec(iface, rate)
+        if spec["kind"] == "mq":
+            # root 에 fq 하나를 두면 모든 TX 큐가 qdisc 락 하나를 공유하므로 큐마다 fq 를 둔다
+            print(f"  멀티 큐 NIC: mq root 아래 TX 큐마다 fq ({', '.join(f'{k} {v}' for k, v in spec['child']['options'].items())})")
         Messenger.warn("CONFIRM_APPLY", bold=True)
         confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
         if confirm == 'y':
-            print(f"\n{Colors.BOLD}🛠️ 설정 적용 중...{Colors.ENDC}")
-            run_tc_command("qdisc", "add", "dev", iface, "root", "fq", "maxrate", f"{rate}gbit")
+            # tc qdisc replace 로 적용하므로 기존 root qdisc 가 있어도 실패하지 않고, 값이 같으면 건너뜀
+            desired = {"tc": {iface: spec}}
+            if apply_desired_state(desired):
+                _offer_persist(desired)
             input("\n계속하려면 [Enter]를 누르세요...")
 
     elif choice == '3':
-        iface = _select_interface()
-        try:
-            result = subprocess.run(
-                ["tc", "qdisc", "show", "dev", iface],
-                capture_output=True, text=True
-            )
-            print(f"\n{Colors.BOLD}현재 qdisc 설정 ({iface}):{Colors.ENDC}")
-            print(f"  {result.stdout.strip() if result.stdout.strip() else '설정 없음'}")
-        except Exception as e:
-            Messenger.error(f"qdisc 확인 실패: {e}")
+        from tuning_plan import qdisc_stats
+        print_qdisc_stats(qdisc_stats(_select_interface()))
         input("\n계속하려면 [Enter]를 누르세요...")
 
+def set_interface_mtu(iface, mtu):
+    """인터페이스 MTU 변경. 실패 시 오류 메시지, 성공 시 None"""
+    ok, error = run_privileged_command(["ip", "link", "set", "dev", iface, "mtu", str(mtu)])
+    invalidate(CATEGORY_NET)
+    return None if ok else error
+
+def print_pmtu_result(result):
+    """경로 MTU 측정 결과 출력"""
+    if result["error"]:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} {result['target']} 경로 MTU 측정 실패: {result['error']}")
+        return
+    color = Colors.OKGREEN if result["verified"] else Colors.WARNING
+    print(f"    - {result['target']} ({result['method']}): 경로 MTU {color}{result['path_mtu']}{Colors.ENDC}"
+          f" / 목표 {result['max_mtu']} ({result['rounds']}라운드, 프로브 {result['probes']}개)")
+    hints = sorted({s["hint"] for s in result["steps"] if s["hint"] and s["reason"] == "frag_needed"})
+    if hints:
+        print(f"      Fragmentation Needed 로 보고된 다음 홉 MTU: {', '.join(map(str, hints))}")
+
+def _apply_jumbo_frame(iface, mtu=9000):
+    """경로 MTU 검증을 통과할 때만 Jumbo Frame 을 유지 (실패하면 이전 MTU 로 복원)"""
+    from utils import get_mtu
+    import pmtu_probe
+
+    current = get_mtu(iface)
+    print(f"\n{Colors.WARNING}⚠️ Jumbo Frame 설정 전 확인 사항:{Colors.ENDC}")
+    print(f"  - 경로 상의 모든 스위치/라우터가 MTU {mtu}을 지원해야 합니다.")
+    print(f"  - 대상까지 DF 패킷으로 경로 MTU 를 측정하여 {mtu} bytes 가 도달할 때만 설정을 유지합니다.")
+    print(f"  - 현재 {iface} MTU: {current}")
+    target = input(f" {Colors.BOLD}검증 대상 (같은 Jumbo 구간의 상대 호스트 IP) > {Colors.ENDC}").strip()
+    if not target:
+        Messenger.warn("CANCELLED")
+        return
+    Messenger.warn("CONFIRM_APPLY", bold=True)
+    if input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower() != 'y':
+        return
+
+    # 장치 MTU 보다 큰 프로브는 로컬에서 거부되므로 먼저 MTU 를 올린 뒤 측정
+    changed = not current.isdigit() or int(current) < mtu
+    if changed:
+        error = set_interface_mtu(iface, mtu)
+        if error:
+            print(f"    {Colors.FAIL}✘{Colors.ENDC} MTU 설정 실패: {error}")
+            input("\n계속하려면 [Enter]를 누르세요...")
+            return
+    print(f" {Colors.OKBLUE}🔍 {target} 까지 경로 MTU 측정 중...{Colors.ENDC}")
+    result = pmtu_probe.discover(target, max_mtu=mtu)
+    print_pmtu_result(result)
+    if result["verified"]:
+        print(f"    {Colors.OKGREEN}✔{Colors.ENDC} {iface} MTU -> {mtu} {Colors.OKBLUE}(경로 검증 완료){Colors.ENDC}")
+        _offer_persist({"ip link": {iface: {"mtu": mtu}}})
+    elif changed and current.isdigit():
+        error = set_interface_mtu(iface, current)
+        if error:
+            print(f"    {Colors.FAIL}✘{Colors.ENDC} MTU 복원 실패: {error}")
+        else:
+            print(f"    {Colors.WARNING}↩{Colors.ENDC} 경로가 {mtu} bytes 를 통과시키지 못해 {iface} MTU 를 {current} 로 복원했습니다.")
+    else:
+        print(f"    {Colors.WARNING}⚠{Colors.ENDC} 경로가 {mtu} bytes 를 통과시키지 못합니다. 대형 패킷이 유실될 수 있습니다.")
+    input("\n계속하려면 [Enter]를 누르세요...")
+
 def _apply_linux_udp():
     """UDP 튜닝"""
     print(f"\n{Colors.BOLD}{Colors.OKCYAN}📡 UDP 튜닝{Colors.ENDC}")
     print(f"  [1] UDP 소켓 버퍼 확장 (rmem_max/wmem_max -> 4MB)")
-    print(f"  [2] Jumbo Frame (MTU 9000) 설정")
+    print(f"  [2] Jumbo Frame (MTU 9000, 경로 MTU 검증 후 적용)")
+    print(f"  [3] UDP 성능 측정 (루프백, 손실/지터/소켓 오버플로)")
     print(f"  [b] 뒤로 가기")
 
     choice = input(f"\n{Colors.BOLD}선택 > {Colors.ENDC}").strip().lower()
@@ -286,40 +699,33 @@ def _apply_linux_udp():
         Messenger.warn("CONFIRM_APPLY", bold=True)
         confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
         if confirm == 'y':
-            _apply_sysctl_settings({
-                "net.core.rmem_max": 4194304,
-                "net.core.wmem_max": 4194304,
-            })
+            _apply_sysctl_settings(LINUX_UDP_BUFFERS)
 
     elif choice == '2':
-        iface = _select_interface()
-        print(f"\n{Colors.WARNING}⚠️ Jumbo Frame 설정 전 확인 사항:{Colors.ENDC}")
-        print(f"  - 경로 상의 모든 스위치/라우터가 MTU 9000을 지원해야 합니다.")
-        print(f"  - 미지원 장비가 있으면 패킷이 분할되거나 통신 장애가 발생할 수 있습니다.")
-        Messenger.warn("CONFIRM_APPLY", bold=True)
-        confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
-        if confirm == 'y':
-            try:
-                subprocess.run(
-                    ["sudo", "ip", "link", "set", "dev", iface, "mtu", "9000"],
-                    check=True, capture_output=True, text=True
-                )
-                print(f"    {Colors.OKGREEN}✔{Colors.ENDC} {iface} MTU -> 9000 {Colors.OKBLUE}(성공){Colors.ENDC}")
-            except subprocess.CalledProcessError as e:
-                print(f"    {Colors.FAIL}✘{Colors.ENDC} MTU 설정 실패: {e.stderr.strip()}")
-            input("\n계속하려면 [Enter]를 누르세요...")
+        _apply_jumbo_frame(_select_interface())
+
+    elif choice == '3':
+        import udp_bench
+        from test import print_udp_report
+        rate = input(f" {Colors.BOLD}목표 전송률 Mbps (기본: 1000, 0=무제한) > {Colors.ENDC}").strip()
+        rate = float(rate) if rate.replace(".", "", 1).isdigit() else 1000.0
+        # 튜닝한 rmem_max 가 실제로 쓰이도록 수신 소켓 버퍼를 최대값으로 요청
+        rcvbuf = read_sysctl("net.core.rmem_max")
+        print(f" {Colors.OKBLUE}🔍 루프백으로 5초간 전송 중...{Colors.ENDC}")
+        try:
+            print_udp_report(udp_bench.run_local(rate, 5.0, rcvbuf=int(rcvbuf) if rcvbuf else None))
+        except OSError as e:
+            Messenger.error(f"측정 실패: {e.strerror or e}")
+        input("\n계속하려면 [Enter]를 누르세요...")
 
 def _apply_linux_bbr():
     """BBR 혼잡제어 활성화"""
     print(f"\n{Colors.BOLD}{Colors.OKCYAN}🚀 BBR 혼잡제어 활성화{Colors.ENDC}")
 
-    try:
-        cc = subprocess.check_output(
-            ["sysctl", "-n", "net.ipv4.tcp_congestion_control"],
-            stderr=subprocess.DEVNULL
-        ).decode().strip()
+    cc = read_sysctl("net.ipv4.tcp_congestion_control")
+    if cc is not None:
         print(f"  현재 혼잡제어: {Colors.BOLD}{cc}{Colors.ENDC}")
-    except:
+    else:
         cc = "unknown"
         print(f"  현재 혼잡제어: 확인 불가")
 
@@ -336,14 +742,9 @@ def _apply_linux_bbr():
         run_modprobe("tcp_bbr")
         run_sysctl_command("net.ipv4.tcp_congestion_control", "bbr")
 
-        try:
-            result = subprocess.check_output(
-                ["sysctl", "-n", "net.ipv4.tcp_congestion_control"],
-                stderr=subprocess.DEVNULL
-            ).decode().strip()
+        result = read_sysctl("net.ipv4.tcp_congestion_control")
+        if result is not None:
             print(f"\n  적용 결과: {Colors.OKGREEN}{Colors.BOLD}{result}{Colors.ENDC}")
-        except:
-            pass
         input("\n계속하려면 [Enter]를 누르세요...")
 
 def _apply_linux_tuning():
@@ -382,22 +783,8 @@ def _reset_linux_defaults():
 
     if confirm == 'y':
         config_manager.save_config("bk")
-        defaults = {
-            "net.core.rmem_max": 212992,
-            "net.core.wmem_max": 212992,
-            "net.ipv4.tcp_rmem": "4096 131072 6291456",
-            "net.ipv4.tcp_wmem": "4096 16384 4194304",
-            "net.core.default_qdisc": "fq_codel",
-            "net.ipv4.tcp_congestion_control": "cubic",
-            "net.ipv4.tcp_mtu_probing": 0,
-            "net.ipv4.tcp_no_metrics_save": 0,
-            "net.core.optmem_max": 20480,
-        }
         print(f"\n{Colors.BOLD}🛠️ 기본값 복원 중...{Colors.ENDC}")
-        success = True
-        for oid, val in defaults.items():
-            success &= run_sysctl_command(oid, val)
-        if success:
+        if write_sysctl_settings(LINUX_DEFAULTS)["ok"]:
             Messenger.success("SUCCESS_RESTORE")
         input("\n계속하려면 [Enter]를 누르세요...")
 
@@ -409,7 +796,7 @@ def _apply_mac_tuning():
     
     print(f"\n{Colors.BOLD}{Colors.OKCYAN}🚀 macOS 네트워크 최적화 설정{Colors.ENDC}")
     print(f" [옵션 1] 고속망 권장값 (32 MB)")
-    print(f" [옵션 2] NetTune RAM 기반 권장값 ({guide['suggested_max_buffer_mb']} MB)")
+    print(f" [옵션 2] NetTune BDP/RAM 기반 권장값 ({guide['suggested_max_buffer_mb']} MB)")
     
     choice = input(f"\n{Colors.BOLD}선택 (1 또는 2) > {Colors.ENDC}").strip()
     if choice not in ['1', '2']:
@@ -423,11 +810,12 @@ def _apply_mac_tuning():
     if confirm == 'y':
         config_manager.save_config("bk")
         print(f"\n{Colors.BOLD}🛠️ 설정 적용 중...{Colors.ENDC}")
-        success = True
-        success &= run_sysctl_command("net.inet.tcp.win_scale_factor", 8)
-        success &= run_sysctl_command("net.inet.tcp.autorcvbufmax", target_val)
-        success &= run_sysctl_command("net.inet.tcp.autosndbufmax", target_val)
-        
+        success = write_sysctl_settings({
+            "net.inet.tcp.win_scale_factor": 8,
+            "net.inet.tcp.autorcvbufmax": target_val,
+            "net.inet.tcp.autosndbufmax": target_val,
+        })["ok"]
+
         if success:
             Messenger.success("SUCCESS_TUNING")
             Messenger.warn("설정이 즉시 반영되었으나, 재부팅 시 초기화될 수 있습니다.", bold=False)
@@ -450,18 +838,7 @@ def _reset_mac_defaults():
     
     if confirm == 'y':
         config_manager.save_config("bk")
-        defaults = {
-            "net.inet.tcp.autorcvbufmax": 1048576,
-            "net.inet.tcp.autosndbufmax": 1048576,
-            "net.inet.tcp.sendspace": 131072,
-            "net.inet.tcp.recvspace": 131072,
-            "net.inet.tcp.win_scale_factor": 3,
-            "kern.ipc.maxsockbuf": 4194304
-        }
-        success = True
-        for oid, val in defaults.items():
-            success &= run_sysctl_command(oid, val)
-        if success:
+        if write_sysctl_settings(MAC_DEFAULTS)["ok"]:
             Messenger.success("SUCCESS_RESTORE")
         input("\n계속하려면 [Enter]를 누르세요...")
 
@@ -475,51 +852,69 @@ def reset_to_defaults():
     else:
         Messenger.error(f"OS_NOT_SUPPORTED: {system}")
 
-def restore_config(content):
-    """백업 데이터로부터 시스템 설정을 복원/적용"""
-    Messenger.warn("SUDO_REQUIRED")
-    Messenger.warn("CONFIRM_APPLY", bold=True)
-    confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
-    
-    if confirm != 'y':
-        Messenger.warn("CANCELLED")
-        return
+def _restore_offloads(iface, saved):
+    """백업된 오프로드 상태 중 현재와 다른 항목만 되돌림"""
+    from offload import apply_features
+    features = get_nic_info(iface)["features"] or {}
+    changes = {name: active for name, active in saved.items()
+               if name in features and features[name]["active"] != active}
+    applied = apply_features(iface, changes)
+    if applied["error"]:
+        print(f"    {Colors.FAIL}✘{Colors.ENDC} {iface} 오프로드 복원 실패: {applied['error']}")
+        return False
+    for name, ok in applied["results"].items():
+        if ok:
+            print(f"    {Colors.OKGREEN}✔{Colors.ENDC} {iface} {name} -> {'on' if changes[name] else 'off'} {Colors.OKBLUE}(성공){Colors.ENDC}")
+        else:
+            print(f"    {Colors.FAIL}✘{Colors.ENDC} {iface} {name} 복원 실패")
+    return all(applied["results"].values())
+
+def restore_config(content, interactive=True):
+    """백업 데이터로부터 시스템 설정을 복원/적용 (성공 여부 반환)"""
+    if interactive:
+        Messenger.warn("SUDO_REQUIRED")
+        Messenger.warn("CONFIRM_APPLY", bold=True)
+        confirm = input(f" {Colors.BOLD}(y/n) > {Colors.ENDC}").strip().lower()
+        
+        if confirm != 'y':
+            Messenger.warn("CANCELLED")
+            return False
 
     success = True
     print(f"\n{Colors.BOLD}🛠️ 설정을 복원 중...{Colors.ENDC}")
 
-    targets = {
-        'tcp_sendspace': "net.inet.tcp.sendspace",
-        'tcp_recvspace': "net.inet.tcp.recvspace",
-        'maxsockbuf': "kern.ipc.maxsockbuf",
-        'autorcvbufmax': "net.inet.tcp.autorcvbufmax",
-        'autosndbufmax': "net.inet.tcp.autosndbufmax",
-        'win_scale_factor': "net.inet.tcp.win_scale_factor"
-    }
+    targets = LINUX_BUFFER_OIDS if content['metadata'].get('os') == "Linux" else DARWIN_BUFFER_OIDS
 
     if 'tcp_buffers' in content['settings']:
-        for label, value in content['settings']['tcp_buffers'].items():
-            if label in targets and value != "Not found":
-                success &= run_sysctl_command(targets[label], value)
+        saved = {targets[label]: value for label, value in content['settings']['tcp_buffers'].items()
+                 if label in targets and value != "Not found"}
+        success &= write_sysctl_settings(saved)["ok"]
 
-    if 'mtu' in content['settings'] and content['settings']['mtu'] != "Unknown":
+    if 'mtu' in content['settings'] and content['settings']['mtu'] not in ("Unknown", "N/A"):
         iface = content['metadata']['interface']
         if iface and iface != "Not Found":
-            try:
-                print(f"    🛠️ MTU 설정 적용 중 ({iface} -> {content['settings']['mtu']})...")
-                subprocess.run(["sudo", "ifconfig", iface, "mtu", str(content['settings']['mtu'])], check=True)
+            print(f"    🛠️ MTU 설정 적용 중 ({iface} -> {content['settings']['mtu']})...")
+            ok, error = run_privileged_command(["ip", "link", "set", "dev", iface, "mtu", str(content['settings']['mtu'])])
+            invalidate(CATEGORY_NET)
+            if ok:
                 print(f"    {Colors.OKGREEN}✔{Colors.ENDC} MTU 설정 성공")
-            except:
-                print(f"    {Colors.FAIL}✘{Colors.ENDC} MTU 설정 실패")
+            else:
+                print(f"    {Colors.FAIL}✘{Colors.ENDC} MTU 설정 실패: {error}")
                 success = False
 
+    offloads = content['settings'].get('offloads')
+    if offloads and content['metadata'].get('os') == "Linux" and platform.system() == "Linux":
+        success &= _restore_offloads(content['metadata']['interface'], offloads)
+
     if success:
         Messenger.success("SUCCESS_RESTORE")
         Messenger.warn("설정이 복원되었으나, 영구 반영을 위해서는 별도 설정 파일 작업이 필요합니다.", bold=False)
     else:
         Messenger.error("ERROR_RESTORE")
     
-    input("\n계속하려면 [Enter]를 누르세요...")
+    if interactive:
+        input("\n계속하려면 [Enter]를 누르세요...")
+    return success
 
 def show_backup_list():
     """저장된 백업 목록 표시 및 상세 보기 / 적용"""
@@ -0,0 +1,410 @@
+import os
+import re
+import glob
+import math
+import subprocess
+from sysctl_reader import PROC_SYS_ROOT, SysctlReader, parse_value, format_value
+from probe_cache import invalidate, CATEGORY_SYSCTL, CATEGORY_NET, CATEGORY_NIC
+
+MECH_SYSCTL = "sysctl"
+MECH_SYSFS = "sysfs"
+MECH_ETHTOOL = "ethtool"
+MECH_LINK = "ip link"
+MECH_TC = "tc"
+# 적용 순서: sysctl(default_qdisc 등)이 먼저 반영되어야 이후 생성되는 qdisc 에 적용되고,
+# 채널/Ring/MTU 변경은 큐를 다시 만들 수 있으므로 큐별 sysfs(RPS/XPS)와 tc 는 그 뒤에 적용한다
+MECHANISMS = (MECH_SYSCTL, MECH_ETHTOOL, MECH_LINK, MECH_SYSFS, MECH_TC)
+
+SYS_CLASS_NET = "/sys/class/net"
+CPUFREQ_ROOT = "/sys/devices/system/cpu/cpufreq"
+
+# tc 수치 단위: 전송률은 10진(bit), 크기는 2진(byte), 패킷 수는 p
+_TC_UNITS = {
+    "bit": 1, "kbit": 1e3, "mbit": 1e6, "gbit": 1e9, "tbit": 1e12,
+    "bps": 8, "kbps": 8e3, "mbps": 8e6, "gbps": 8e9,
+    "b": 1, "kb": 1024, "k": 1024, "mb": 1024 ** 2, "m": 1024 ** 2, "gb": 1024 ** 3, "g": 1024 ** 3,
+    "p": 1, "": 1,
+    "us": 1e-6, "ms": 1e-3, "s": 1,
+}
+_TC_NUMBER = re.compile(r"^(\d+(?:\.\d+)?)([a-zA-Z]*)$")
+# tc 가 출력할 때 쓰는 옵션 이름이 입력 이름과 다른 경우
+_TC_OPTION_ALIASES = {"latency": "lat"}
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_text(path, value):
+    with open(path, 'w') as f:
+        f.write(f"{value}\n")
+
+def run_privileged(commands):
+    """명령 목록을 권한 헬퍼에 한 번에 보내 명령별 (성공 여부, 오류 메시지) 목록 반환"""
+    from priv_helper import get_helper
+    return get_helper().run_batch(commands)
+
+def _action(mechanism, target, key, current, desired, changed):
+    return {"mechanism": mechanism, "target": target, "key": key, "current": current,
+            "desired": desired, "changed": changed}
+
+def _sysctl_text(value):
+    # 저장된 상태(JSON)에서 읽은 값은 튜플 대신 리스트
+    return format_value(tuple(value)) if isinstance(value, (tuple, list)) else str(value)
+
+def plan_sysctl(settings, root=PROC_SYS_ROOT):
+    reader = SysctlReader(root)
+    try:
+        current = reader.read_many(list(settings))
+    finally:
+        reader.close()
+    return [_action(MECH_SYSCTL, oid, None, format_value(current[oid]) if current[oid] is not None else None,
+                    _sysctl_text(value), current[oid] is None or current[oid] != parse_value(_sysctl_text(value)))
+            for oid, value in settings.items()]
+
+def _same_sysfs(current, desired):
+    if current == desired:
+        return True
+    # cpumask(00000000,0000000f) 처럼 0 패딩/콤마 구분 16진수는 값으로 비교
+    try:
+        return int(current.replace(",", ""), 16) == int(desired.replace(",", ""), 16)
+    except (AttributeError, ValueError):
+        return False
+
+def plan_sysfs(values):
+    actions = []
+    for path, value in values.items():
+        current = _read_text(path)
+        actions.append(_action(MECH_SYSFS, path, None, current, str(value), not _same_sysfs(current, str(value))))
+    return actions
+
+def governor_state(governor, root=CPUFREQ_ROOT):
+    """CPU 거버너를 원하는 상태의 sysfs 항목(cpufreq 정책별 scaling_governor)으로 표현"""
+    return {path: governor for path in sorted(glob.glob(os.path.join(root, "policy*", "scaling_governor")))}
+
+def _ethtool_current(iface, group, backend):
+    from ethtool_ioctl import get_ring_params, get_channels, get_features, get_coalesce, get_pause
+    if group == "features":
+        return {name: f["active"] for name, f in get_features(iface, backend).items()}
+    reader = {"ring": get_ring_params, "channels": get_channels, "coalesce": get_coalesce, "pause": get_pause}[group]
+    return reader(iface, backend)
+
+def plan_ethtool(ifaces, backend=None):
+    """{iface: {그룹: {필드: 값}}} 을 현재 NIC 상태와 비교 (조회 실패 시 current=None 으로 변경 대상)"""
+    actions = []
+    for iface, groups in ifaces.items():
+        for group, fields in groups.items():
+            try:
+                current = _ethtool_current(iface, group, backend)
+            except OSError:
+                current = {}
+            for field, value in fields.items():
+                cur = current.get(field)
+                # 불리언/0·1 로 표현되는 항목(adaptive_rx, pause rx 등)은 정수로 비교
+                wanted = int(value) if isinstance(value, bool) and group != "features" else value
+                actions.append(_action(MECH_ETHTOOL, iface, f"{group}.{field}", cur, wanted, cur != wanted))
+    return actions
+
+def plan_link(ifaces, sys_root=SYS_CLASS_NET):
+    actions = []
+    for iface, attrs in ifaces.items():
+        for attr, value in attrs.items():
+            raw = _read_text(os.path.join(sys_root, iface, attr))
+            current = int(raw) if raw and raw.isdigit() else raw
+            actions.append(_action(MECH_LINK, iface, attr, current, value, current != value))
+    return actions
+
+def parse_tc_value(text):
+    """tc 출력/입력 값(10Gbit, 100p, 3028b, 40ms)을 비교 가능한 수치로 변환 (단위를 모르면 원문)"""
+    match = _TC_NUMBER.match(str(text).strip())
+    if not match or match.group(2).lower() not in _TC_UNITS:
+        return str(text).strip()
+    return float(match.group(1)) * _TC_UNITS[match.group(2).lower()]
+
+def _parse_options(tokens):
+    options, i = {}, 0
+    while i < len(tokens):
+        # 이어지는 수치를 값으로 묶음 (priomap 처럼 여러 개면 공백 구분), 값이 없는 플래그는 True
+        j = i + 1
+        while j < len(tokens) and _TC_NUMBER.match(tokens[j]):
+            j += 1
+        options[tokens[i]] = " ".join(tokens[i + 1:j]) if j > i + 1 else True
+        i = j
+    return options
+
+def _stat_value(text):
+    value = int(text) if text.isdigit() else parse_tc_value(text)
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+def _parse_stats(line, stats):
+    """`tc -s` 통계 줄 하나를 stats 딕셔너리에 누적"""
+    tokens = line.replace("(", " ").replace(")", " ").replace(",", " ").split()
+    if tokens[0] == "Sent":
+        # Sent 123 bytes 4 pkt dropped 0 overlimits 0 requeues 0
+        stats.update(sent_bytes=int(tokens[1]), sent_packets=int(tokens[3]))
+        tokens = tokens[5:]
+    elif tokens[0] == "backlog":
+        stats.update(backlog_bytes=_stat_value(tokens[1]), backlog_packets=_stat_value(tokens[2]))
+        tokens = tokens[3:]
+    elif tokens[0] == "flows":
+        # fq: flows 2 (inactive 1 throttled 0) → 현재 플로우 수와 페이싱 대기 중인 플로우 수
+        stats["flows"] = int(tokens[1])
+        tokens = [f"{t}_flows" if k % 2 == 0 else t for k, t in enumerate(tokens[2:])]
+    for key, value in zip(tokens[::2], tokens[1::2]):
+        if _TC_NUMBER.match(value):
+            stats[key] = _stat_value(value)
+
+def parse_qdiscs(output):
+    """`tc [-s] qdisc show dev X` 출력 → [{"kind", "handle", "parent", "options", "stats"}] (root 는 parent None)"""
+    qdiscs = []
+    for line in output.splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        if fields[0] != "qdisc":
+            if qdiscs:
+                _parse_stats(line, qdiscs[-1]["stats"])
+            continue
+        if len(fields) < 4:
+            continue
+        if fields[3] == "root":
+            parent, rest = None, fields[4:]
+        elif fields[3] == "parent" and len(fields) > 4:
+            parent, rest = fields[4], fields[5:]
+        else:
+            parent, rest = fields[3], fields[4:]
+        if rest[:1] == ["refcnt"]:
+            rest = rest[2:]
+        qdiscs.append({"kind": fields[1], "handle": fields[2], "parent": parent,
+                       "options": _parse_options(rest), "stats": {}})
+    return qdiscs
+
+def parse_root_qdisc(output):
+    """`tc qdisc show dev X` 출력에서 root qdisc 의 {"kind", "handle", "options"} (없으면 None)"""
+    return next((q for q in parse_qdiscs(output) if q["parent"] is None), None)
+
+def show_qdiscs(iface, stats=False):
+    cmd = ["tc"] + (["-s"] if stats else []) + ["qdisc", "show", "dev", iface]
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True).stdout
+    except OSError:
+        return []
+    return parse_qdiscs(output)
+
+def show_root_qdisc(iface):
+    return next((q for q in show_qdiscs(iface) if q["parent"] is None), None)
+
+def tx_queue_count(iface, sys_root=SYS_CLASS_NET):
+    try:
+        return sum(1 for name in os.listdir(os.path.join(sys_root, iface, "queues")) if name.startswith("tx-"))
+    except OSError:
+        return 0
+
+# 큐별 fq 가 한 번에 내보낼 수 있는 양의 상한 (TSO 최대 세그먼트)
+FQ_MAX_QUANTUM = 65536
+# 플로우 큐가 담아야 하는 시간: 이 시간 동안 한 플로우가 보낼 수 있는 패킷 수를 flow_limit 으로 사용
+FQ_FLOW_QUEUE_SEC = 0.001
+FQ_DEFAULT_FLOW_LIMIT = 100
+
+# qdisc_stats 에서 합산하는 통계 (fq: throttled 는 페이싱으로 지연된 횟수, flows_plimit 은 flow_limit 초과 드롭)
+QDISC_STAT_KEYS = ("sent_bytes", "sent_packets", "dropped", "overlimits", "requeues", "backlog_bytes",
+                   "backlog_packets", "flows", "inactive_flows", "throttled_flows", "throttled", "flows_plimit")
+
+def mq_fq_spec(speed_mbps, mtu=1500, maxrate_gbit=None):
+    """링크 속도에 맞춘 mq + 큐별 fq 사양. maxrate 는 fq 의 플로우별 상한
+
+    quantum: 기본(2×MTU)을 10G 단위로 늘려 고속 링크에서 라운드 수를 줄이되 64KB 이하, 1KB 단위
+    flow_limit: 플로우 상한(없으면 링크 속도)으로 1ms 동안 보낼 패킷 수 (기본 100 이상)
+    """
+    scale = max(1, -(-int(speed_mbps or 0) // 10000))
+    quantum = min(FQ_MAX_QUANTUM, -(-2 * mtu * scale // 1024) * 1024)
+    rate_bps = maxrate_gbit * 1e9 if maxrate_gbit else (speed_mbps or 10000) * 1e6
+    flow_limit = max(FQ_DEFAULT_FLOW_LIMIT, math.ceil(rate_bps * FQ_FLOW_QUEUE_SEC / (8 * mtu)))
+    options = {"flow_limit": flow_limit, "quantum": quantum}
+    if maxrate_gbit:
+        options["maxrate"] = f"{maxrate_gbit:g}gbit"
+    return {"kind": "mq", "child": {"kind": "fq", "options": options}}
+
+def _qdisc_text(kind, options):
+    return " ".join([kind] + [f"{k} {v}" for k, v in options.items()])
+
+def _qdisc_differs(current, kind, options):
+    return (current is None or current["kind"] != kind
+            or any(parse_tc_value(current["options"].get(_TC_OPTION_ALIASES.get(k, k), "")) != parse_tc_value(v)
+                   for k, v in options.items()))
+
+def _child_parent(major, index):
+    # tc 는 큐 번호를 16진수로, 핸들 0: 의 자식은 ":1" 처럼 출력
+    return f"{'' if major == '0' else major}:{index:x}"
+
+def plan_tc(ifaces, show=show_qdiscs, sys_root=SYS_CLASS_NET):
+    """{iface: {"kind": "fq", "options": {...}}} 과 현재 root qdisc 비교 (지정한 옵션만 비교)
+
+    {"kind": "mq", "child": {...}} 이면 root mq 와 TX 큐별 자식 qdisc 를 각각 비교한다.
+    """
+    actions = []
+    for iface, spec in ifaces.items():
+        options = spec.get("options", {})
+        qdiscs = show(iface)
+        root = next((q for q in qdiscs if q["parent"] is None), None)
+        root_changed = _qdisc_differs(root, spec["kind"], options)
+        current_text = _qdisc_text(root["kind"], root["options"]) if root else None
+        actions.append(_action(MECH_TC, iface, "root", current_text, _qdisc_text(spec["kind"], options), root_changed))
+        actions[-1]["spec"] = {"kind": spec["kind"], "options": options, "parent": None}
+        child = spec.get("child")
+        if not child:
+            continue
+        # 새로 mq 를 설치하면 핸들 1: 을 사용하고(기존 root 가 1: 이면 종류를 바꿀 수 없어 2:), 기존 mq 는 핸들을 유지한다
+        if root_changed:
+            major = "2" if root and root["handle"] == "1:" else "1"
+            actions[-1]["spec"]["handle"] = f"{major}:"
+        else:
+            major = root["handle"].rstrip(":")
+        children = {q["parent"]: q for q in qdiscs if q["parent"]}
+        for index in range(1, tx_queue_count(iface, sys_root) + 1):
+            parent = _child_parent(major, index)
+            current = None if root_changed else children.get(parent)
+            child_options = child.get("options", {})
+            actions.append(_action(MECH_TC, iface, f"parent {parent}",
+                                   _qdisc_text(current["kind"], current["options"]) if current else None,
+                                   _qdisc_text(child["kind"], child_options),
+                                   _qdisc_differs(current, child["kind"], child_options)))
+            actions[-1]["spec"] = {"kind": child["kind"], "options": child_options, "parent": parent}
+    return actions
+
+def tc_command(iface, spec):
+    """plan_tc 의 spec 하나를 적용하는 `tc qdisc replace` 명령"""
+    # replace: qdisc 가 이미 있어도 실패하지 않고, 같은 종류면 옵션만 바꾼다
+    cmd = ["tc", "qdisc", "replace", "dev", iface]
+    cmd += ["parent", spec["parent"]] if spec.get("parent") else ["root"]
+    if spec.get("handle"):
+        cmd += ["handle", spec["handle"]]
+    cmd.append(spec["kind"])
+    for key, value in spec["options"].items():
+        cmd += [key] if value is True else [key, str(value)]
+    return cmd
+
+def tc_commands(iface, spec, queues):
+    """원하는 tc 상태 전체를 처음부터 설치하는 명령 목록 (mq 면 root 후 큐별 자식)"""
+    if not spec.get("child"):
+        return [tc_command(iface, dict(spec, parent=None))]
+    commands = [tc_command(iface, {"kind": spec["kind"], "options": spec.get("options", {}), "handle": "1:"})]
+    for index in range(1, queues + 1):
+        commands.append(tc_command(iface, dict(spec["child"], parent=_child_parent("1", index))))
+    return commands
+
+def qdisc_stats(iface, show=show_qdiscs):
+    """`tc -s qdisc` 통계: qdisc 목록과 리프 qdisc(mq 자식 등) 합계 (drop/throttled/flows 등)"""
+    qdiscs = show(iface, stats=True)
+    # root(mq)는 자식 통계를 합산해 보여주므로 자식 qdisc 가 있으면 자식만 합산
+    leaves = [q for q in qdiscs if q["parent"]] or qdiscs
+    totals = {}
+    for q in leaves:
+        for key in QDISC_STAT_KEYS:
+            if isinstance(q["stats"].get(key), (int, float)):
+                totals[key] = totals.get(key, 0) + q["stats"][key]
+    return {"interface": iface, "qdiscs": qdiscs, "leaves": len(leaves), "totals": totals}
+
+def build_plan(desired, sysctl_root=PROC_SYS_ROOT, sys_root=SYS_CLASS_NET, backend=None, show_qdisc=show_qdiscs):
+    """원하는 상태와 현재 커널 상태를 비교한 계획 (dry-run)
+
+    desired: {"sysctl": {oid: 값}, "sysfs": {경로: 값}, "ethtool": {iface: {그룹: {필드: 값}}},
+              "ip link": {iface: {"mtu": 9000}}, "tc": {iface: {"kind": "fq", "options": {...}}}}
+             (tc 는 {"kind": "mq", "child": {"kind": "fq", ...}} 로 큐별 자식 qdisc 지정 가능)
+    """
+    planners = {
+        MECH_SYSCTL: lambda spec: plan_sysctl(spec, sysctl_root),
+        MECH_SYSFS: plan_sysfs,
+        MECH_ETHTOOL: lambda spec: plan_ethtool(spec, backend),
+        MECH_LINK: lambda spec: plan_link(spec, sys_root),
+        MECH_TC: lambda spec: plan_tc(spec, show_qdisc, sys_root),
+    }
+    actions = []
+    for mechanism in MECHANISMS:
+        if desired.get(mechanism):
+            actions += planners[mechanism](desired[mechanism])
+    return {"actions": actions, "changes": sum(1 for a in actions if a["changed"])}
+
+def _result(action, ok, error=None):
+    return dict(action, ok=ok, error=error)
+
+def _apply_sysctl(actions, sysctl_root):
+    from sysctl_txn import apply_transaction
+    report = apply_transaction({a["target"]: a["desired"] for a in actions}, root=sysctl_root)
+    status = {item["oid"]: item for item in report["items"]}
+    return [_result(a, status[a["target"]]["status"] in ("applied", "unchanged"),
+                    status[a["target"]]["error"] or (None if report["ok"] else f"트랜잭션 복원됨 ({report['error']})"))
+            for a in actions]
+
+def _apply_sysfs(actions):
+    from priv_helper import get_helper, fake_root
+    results = []
+    privileged = []
+    for a in actions:
+        # 직접 쓸 수 없는 경로(또는 테스트 모드)는 권한 헬퍼에 한 번에 보낸다
+        if fake_root() or not os.access(a["target"], os.W_OK):
+            privileged.append(a)
+            continue
+        try:
+            _write_text(a["target"], a["desired"])
+            results.append(_result(a, True))
+        except OSError as e:
+            results.append(_result(a, False, e.strerror or str(e)))
+    if privileged:
+        status = get_helper().write({a["target"]: a["desired"] for a in privileged})
+        results += [_result(a, *status[a["target"]]) for a in privileged]
+    return results
+
+def _apply_ethtool(actions, runner):
+    """인터페이스/그룹 단위로 묶은 ethtool 명령(-G/-L/-K/-C/-A)을 권한 헬퍼에 한 번에 보내 적용"""
+    from ethtool_ioctl import ethtool_command
+    groups = {}
+    for a in actions:
+        group, field = a["key"].split(".", 1)
+        groups.setdefault((a["target"], group), []).append((field, a))
+    commands = [ethtool_command(iface, group, {field: a["desired"] for field, a in items})
+                for (iface, group), items in groups.items()]
+    results = []
+    for items, (ok, error) in zip(groups.values(), runner(commands)):
+        results += [_result(a, ok, error) for _, a in items]
+    return results
+
+def _apply_link(actions, runner):
+    commands = [["ip", "link", "set", "dev", a["target"], a["key"], str(a["desired"])] for a in actions]
+    return [_result(a, ok, error) for a, (ok, error) in zip(actions, runner(commands))]
+
+def _apply_tc(actions, runner):
+    # root(mq)가 자식보다 먼저 오도록 계획 순서대로 한 번에 보낸다
+    commands = [tc_command(a["target"], a["spec"]) for a in actions]
+    return [_result(a, ok, error) for a, (ok, error) in zip(actions, runner(commands))]
+
+def apply_plan(plan, sysctl_root=PROC_SYS_ROOT, runner=run_privileged):
+    """변경이 필요한 항목만 메커니즘별로 묶어 적용하고 항목별 결과(ok/error 포함) 반환"""
+    changed = {}
+    for a in plan["actions"]:
+        if a["changed"]:
+            changed.setdefault(a["mechanism"], []).append(a)
+    appliers = {
+        MECH_SYSCTL: lambda actions: _apply_sysctl(actions, sysctl_root),
+        MECH_SYSFS: _apply_sysfs,
+        MECH_ETHTOOL: lambda actions: _apply_ethtool(actions, runner),
+        MECH_LINK: lambda actions: _apply_link(actions, runner),
+        MECH_TC: lambda actions: _apply_tc(actions, runner),
+    }
+    results = []
+    for mechanism in MECHANISMS:
+        if mechanism in changed:
+            results += appliers[mechanism](changed[mechanism])
+    if results:
+        invalidate(CATEGORY_SYSCTL)
+        invalidate(CATEGORY_NET)
+        invalidate(CATEGORY_NIC)
+    return results
+
+def verify_plan(desired, **kwargs):
+    """적용 후 다시 계획을 세워 남은 차이(drift)를 반환. 차이가 없으면 ok"""
+    plan = build_plan(desired, **kwargs)
+    drift = [a for a in plan["actions"] if a["changed"]]
+    return {"ok": not drift, "drift": drift}
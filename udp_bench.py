@@ -0,0 +1,334 @@
+import os
+import json
+import errno
+import bisect
+import ctypes
+import socket
+import struct
+import time
+
+DEFAULT_PORT = 5302
+# 1500 MTU 에서 IP/UDP 헤더를 뺀 최대 페이로드
+DEFAULT_SIZE = 1472
+MAX_UDP_PAYLOAD = 65507
+# 커널 UDP_MAX_SEGMENTS (GSO 한 번에 보낼 수 있는 최대 세그먼트 수)
+MAX_SEGMENTS = 64
+
+SOL_UDP = getattr(socket, "SOL_UDP", 17)
+UDP_SEGMENT = getattr(socket, "UDP_SEGMENT", 103)
+UDP_GRO = getattr(socket, "UDP_GRO", 104)
+SO_RXQ_OVFL = getattr(socket, "SO_RXQ_OVFL", 40)
+
+METHOD_GSO = "gso"
+METHOD_MMSG = "mmsg"
+METHOD_SEND = "send"
+METHODS = (METHOD_GSO, METHOD_MMSG, METHOD_SEND)
+
+# 데이터그램 헤더: 일련번호, 송신 시각(monotonic ns)
+HEADER = struct.Struct("!QQ")
+# 종료 표시 데이터그램 (두 번째 필드에 송신한 데이터그램 수)
+FIN_SEQ = 0xffffffffffffffff
+FIN_REPEAT = 3
+# 지터(연속 패킷 간 전송 지연 차이) 히스토그램 구간 상한(us)
+JITTER_BUCKETS_US = (10, 50, 100, 500, 1000, 5000, 10000)
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.POINTER(_IOVec)), ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+def default_batch(size):
+    return max(1, min(MAX_SEGMENTS, MAX_UDP_PAYLOAD // size))
+
+def _gso_sender(sock, buf, size, batch):
+    """UDP_SEGMENT: 배치 전체를 한 번의 send 로 넘기면 커널(또는 NIC)이 size 단위로 분할"""
+    sock.setsockopt(SOL_UDP, UDP_SEGMENT, size)
+    view = memoryview(buf)[:size * batch]
+
+    def send():
+        sock.send(view)
+        return batch
+    return send
+
+def _mmsg_sender(sock, buf, size, batch):
+    """sendmmsg(2): 미리 만든 mmsghdr 배열로 데이터그램 batch 개를 한 번에 전송"""
+    libc = ctypes.CDLL(None, use_errno=True)
+    if not hasattr(libc, "sendmmsg"):
+        raise OSError(errno.ENOSYS, "sendmmsg 미지원")
+    base = ctypes.addressof((ctypes.c_char * len(buf)).from_buffer(buf))
+    iovs = (_IOVec * batch)()
+    msgs = (_MMsgHdr * batch)()
+    for i in range(batch):
+        iovs[i].iov_base = base + i * size
+        iovs[i].iov_len = size
+        msgs[i].msg_hdr.msg_iov = ctypes.pointer(iovs[i])
+        msgs[i].msg_hdr.msg_iovlen = 1
+    fd = sock.fileno()
+
+    def send():
+        n = libc.sendmmsg(fd, msgs, batch, 0)
+        if n < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        return n
+    # 배열이 해제되지 않도록 클로저에 묶어 둔다
+    send.keep = (iovs, msgs)
+    return send
+
+def _plain_sender(sock, buf, size, batch):
+    views = [memoryview(buf)[i * size:(i + 1) * size] for i in range(batch)]
+
+    def send():
+        for v in views:
+            sock.send(v)
+        return batch
+    return send
+
+_SENDERS = {METHOD_GSO: _gso_sender, METHOD_MMSG: _mmsg_sender, METHOD_SEND: _plain_sender}
+
+def make_sender(sock, buf, size, batch, method=None):
+    """(전송 방식, 1회 전송 함수). method 가 None 이면 gso → mmsg → send 순으로 사용 가능한 방식 선택"""
+    for name in ([method] if method else METHODS):
+        try:
+            return name, _SENDERS[name](sock, buf, size, batch)
+        except (OSError, AttributeError):
+            if method:
+                raise
+    raise OSError(errno.ENOSYS, "사용 가능한 전송 방식이 없습니다")
+
+def send_stream(host, port=DEFAULT_PORT, rate_mbps=1000.0, duration=5.0, size=DEFAULT_SIZE,
+                batch=None, method=None, reply_timeout=2.0):
+    """목표 전송률로 duration 초 동안 송신. 수신측이 보내는 결과(JSON)가 오면 함께 반환"""
+    if not HEADER.size <= size <= MAX_UDP_PAYLOAD:
+        raise ValueError(f"데이터그램 크기는 {HEADER.size}~{MAX_UDP_PAYLOAD} bytes 여야 합니다")
+    batch = batch or default_batch(size)
+    if size * batch > MAX_UDP_PAYLOAD:
+        batch = default_batch(size)
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.connect((host, port))
+    buf = bytearray(size * batch)
+    method, send = make_sender(sock, buf, size, batch, method)
+
+    rate_bps = rate_mbps * 1e6
+    seq = sent = calls = errors = 0
+    start = time.monotonic()
+    deadline = start + duration
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        if rate_bps:
+            ahead = start + sent * size * 8 / rate_bps - now
+            if ahead > 0:
+                time.sleep(ahead)
+                continue
+        stamp = time.monotonic_ns()
+        for i in range(batch):
+            HEADER.pack_into(buf, i * size, seq + i, stamp)
+        try:
+            n = send()
+        except OSError as e:
+            # 송신 큐 부족(ENOBUFS) / 수신측 미기동(ECONNREFUSED) 은 세고 계속 진행
+            if e.errno not in (errno.ENOBUFS, errno.EAGAIN, errno.ECONNREFUSED):
+                sock.close()
+                raise
+            errors += 1
+            continue
+        seq += n
+        sent += n
+        calls += 1 if method != METHOD_SEND else n
+    elapsed = time.monotonic() - start
+
+    fin = bytearray(HEADER.size)
+    HEADER.pack_into(fin, 0, FIN_SEQ, sent)
+    if method == METHOD_GSO:
+        sock.setsockopt(SOL_UDP, UDP_SEGMENT, 0)
+    for _ in range(FIN_REPEAT):
+        try:
+            sock.send(fin)
+        except OSError:
+            pass
+    receiver = None
+    sock.settimeout(reply_timeout)
+    try:
+        receiver = json.loads(sock.recv(MAX_UDP_PAYLOAD))
+    except (OSError, ValueError):
+        pass
+    sock.close()
+    return {
+        "target": f"{host}:{port}",
+        "method": method,
+        "size": size,
+        "batch": batch,
+        "target_mbps": rate_mbps,
+        "sender": {
+            "datagrams": sent,
+            "seconds": round(elapsed, 3),
+            "mbps": round(sent * size * 8 / elapsed / 1e6, 2) if elapsed else 0.0,
+            "syscalls": calls,
+            "datagrams_per_call": round(sent / calls, 1) if calls else 0.0,
+            "send_errors": errors,
+        },
+        "receiver": receiver,
+    }
+
+def open_receiver(host="0.0.0.0", port=DEFAULT_PORT, rcvbuf=None):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind((host, port))
+    return sock
+
+def new_stats():
+    return {"datagrams": 0, "bytes": 0, "max_seq": -1, "reordered": 0, "duplicates_or_late": 0,
+            "jitter_us": 0.0, "histogram": [0] * (len(JITTER_BUCKETS_US) + 1),
+            "last_transit": None, "expected": None, "first_ns": None, "last_ns": None}
+
+def account(stats, seq, sent_ns, length, now_ns):
+    """데이터그램 하나를 통계에 반영 (RFC 3550 지터: 송신/수신 시계 오프셋은 차분으로 상쇄)"""
+    if seq == FIN_SEQ:
+        stats["expected"] = sent_ns
+        return True
+    transit = now_ns - sent_ns
+    last = stats["last_transit"]
+    if last is not None:
+        d_us = abs(transit - last) / 1000
+        stats["jitter_us"] += (d_us - stats["jitter_us"]) / 16
+        stats["histogram"][bisect.bisect_right(JITTER_BUCKETS_US, d_us)] += 1
+    stats["last_transit"] = transit
+    if seq > stats["max_seq"]:
+        stats["max_seq"] = seq
+    elif seq < stats["max_seq"]:
+        stats["reordered"] += 1
+    else:
+        stats["duplicates_or_late"] += 1
+    stats["datagrams"] += 1
+    stats["bytes"] += length
+    if stats["first_ns"] is None:
+        stats["first_ns"] = now_ns
+    stats["last_ns"] = now_ns
+    return False
+
+def summarize(stats, overflow):
+    expected = stats["expected"] if stats["expected"] is not None else stats["max_seq"] + 1
+    lost = max(0, expected - stats["datagrams"])
+    seconds = (stats["last_ns"] - stats["first_ns"]) / 1e9 if stats["first_ns"] is not None else 0.0
+    labels = [f"<{b}us" for b in JITTER_BUCKETS_US] + [f">={JITTER_BUCKETS_US[-1]}us"]
+    return {
+        "datagrams": stats["datagrams"],
+        "expected": expected,
+        "lost": lost,
+        "loss_pct": round(lost * 100 / expected, 3) if expected else 0.0,
+        "reordered": stats["reordered"],
+        "duplicates_or_late": stats["duplicates_or_late"],
+        "mbps": round(stats["bytes"] * 8 / seconds / 1e6, 2) if seconds else 0.0,
+        "seconds": round(seconds, 3),
+        "jitter_us": round(stats["jitter_us"], 2),
+        "jitter_histogram": dict(zip(labels, stats["histogram"])),
+        # SO_RXQ_OVFL: 수신 버퍼가 가득 차 소켓 단계에서 버려진 패킷 수 (GRO 로 묶인 경우 묶음 단위)
+        "socket_overflow_drops": overflow,
+        "fin_received": stats["expected"] is not None,
+    }
+
+def receive_session(sock, first_timeout=None, idle_timeout=2.0, overflow_base=0):
+    """FIN 또는 idle_timeout 동안 수신이 없을 때까지 한 세션을 수신하고 (요약, 송신자 주소, 누적 오버플로) 반환
+
+    SO_RXQ_OVFL 은 소켓 생성 이후의 누적값이며 0이 아닐 때만 전달되므로 이전 세션까지의 값(overflow_base)을 뺀다.
+    UDP_GRO 를 켜면 한 번의 recvmsg 로 여러 데이터그램이 묶여 오므로 세그먼트 크기로 나눠 처리한다.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+    try:
+        sock.setsockopt(SOL_UDP, UDP_GRO, 1)
+    except OSError:
+        pass
+    buf = bytearray(65536)
+    view = memoryview(buf)
+    cmsg_size = socket.CMSG_SPACE(4) * 2
+    stats = new_stats()
+    overflow = overflow_base
+    peer = None
+    sock.settimeout(first_timeout)
+    while True:
+        try:
+            n, ancdata, _flags, addr = sock.recvmsg_into([view], cmsg_size)
+        except socket.timeout:
+            break
+        now = time.monotonic_ns()
+        sock.settimeout(idle_timeout)
+        peer = addr
+        segment = n
+        for level, ctype, data in ancdata:
+            if level == socket.SOL_SOCKET and ctype == SO_RXQ_OVFL:
+                overflow = struct.unpack("=I", data[:4])[0]
+            elif level == SOL_UDP and ctype == UDP_GRO:
+                segment = struct.unpack("=i", data[:4])[0] or n
+        done = False
+        for offset in range(0, n, segment):
+            length = min(segment, n - offset)
+            if length < HEADER.size:
+                continue
+            seq, sent_ns = HEADER.unpack_from(buf, offset)
+            done |= account(stats, seq, sent_ns, length, now)
+        if done and not stats["datagrams"]:
+            # 이전 세션에서 중복 전송된 종료 표시는 무시
+            stats["expected"] = None
+            peer = None
+            sock.settimeout(first_timeout)
+            continue
+        if done:
+            break
+    return summarize(stats, overflow - overflow_base), peer, overflow
+
+def serve(sock, on_session=None, sessions=None):
+    """세션마다 결과를 송신자에게 JSON 으로 회신. sessions 개를 처리하면 종료 (None 이면 계속)"""
+    count = overflow = 0
+    results = []
+    while sessions is None or count < sessions:
+        summary, peer, overflow = receive_session(sock, overflow_base=overflow)
+        if peer is None:
+            continue
+        count += 1
+        results.append(summary)
+        try:
+            sock.sendto(json.dumps(summary).encode(), peer)
+        except OSError:
+            pass
+        if on_session:
+            on_session(peer, summary)
+    return results
+
+def _serve_once(sock, timeout, queue):
+    summary, peer, _ = receive_session(sock, first_timeout=timeout)
+    if peer is not None:
+        sock.sendto(json.dumps(summary).encode(), peer)
+    queue.put(summary)
+
+def run_local(rate_mbps=1000.0, duration=5.0, size=DEFAULT_SIZE, batch=None, method=None,
+              host="127.0.0.1", rcvbuf=None):
+    """수신측을 자식 프로세스로 띄우고 같은 호스트에서 측정 (루프백 또는 veth 주소)"""
+    import multiprocessing
+    sock = open_receiver(host, 0, rcvbuf)
+    port = sock.getsockname()[1]
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_serve_once, args=(sock, duration + 5, queue), daemon=True)
+    proc.start()
+    sock.close()
+    try:
+        report = send_stream(host, port, rate_mbps, duration, size, batch, method)
+        if report["receiver"] is None:
+            report["receiver"] = queue.get(timeout=5)
+    finally:
+        proc.join(5)
+        if proc.is_alive():
+            proc.terminate()
+    return report
@@ -1,7 +1,12 @@
 import os
 import platform
+import re
 import subprocess
-import psutil
+import ethtool_ioctl
+from netlink import dump_network_state
+from ethtool_ioctl import get_speed_mbps, read_sysfs_speed, format_speed
+from probe_cache import cached, CATEGORY_SYSCTL, CATEGORY_NET, CATEGORY_NIC
+from sysctl_reader import read_sysctl, read_sysctls, format_value
 
 class Colors:
     HEADER = '\033[95m'
@@ -14,6 +19,18 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+_ANSI_ESCAPE = re.compile(r"\033\[[0-9;]*m")
+
+def strip_colors(value):
+    """문자열/딕셔너리/리스트 안의 ANSI 색상 코드를 재귀적으로 제거 (JSON 출력용)"""
+    if isinstance(value, str):
+        return _ANSI_ESCAPE.sub("", value)
+    if isinstance(value, dict):
+        return {k: strip_colors(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [strip_colors(v) for v in value]
+    return value
+
 class Messenger:
     """메시지 출력 관리 클래스"""
     
@@ -74,6 +91,10 @@ class Messenger:
 
 def get_all_interfaces():
     """시스템의 모든 유효한 네트워크 인터페이스 목록 반환"""
+    if platform.system() == "Linux":
+        return _get_all_interfaces_netlink()
+
+    import psutil
     interfaces = []
     stats = psutil.net_if_stats()
     addrs = psutil.net_if_addrs()
@@ -99,6 +120,30 @@ def get_all_interfaces():
         })
     return interfaces
 
+def get_network_state():
+    """rtnetlink 링크/주소/라우트 덤프 (프로브 캐시 경유)"""
+    return cached((CATEGORY_NET, "state"), dump_network_state)
+
+def get_nic_info(interface):
+    """NIC 구조화 레코드 (프로브 캐시 경유)"""
+    return cached((CATEGORY_NIC, "info", interface), lambda: ethtool_ioctl.get_nic_info(interface))
+
+def _get_all_interfaces_netlink():
+    """rtnetlink 덤프 한 번으로 인터페이스 목록 구성 (Linux)"""
+    interfaces = []
+    state = get_network_state()
+    for link in state["links"].values():
+        if link["is_loopback"]:
+            continue
+        ip = next((a["address"] for a in link["addresses"] if a["family"] == 2), "N/A")
+        interfaces.append({
+            "name": link["name"],
+            "ip": ip,
+            "status": "Up" if link["is_up"] else "Down",
+            "speed": read_sysfs_speed(link["name"])
+        })
+    return interfaces
+
 def get_default_interface():
     """외부 망으로 나가는 기본 네트워크 인터페이스 식별"""
     try:
@@ -107,6 +152,10 @@ def get_default_interface():
             for line in output.splitlines():
                 if "interface:" in line:
                     return line.split(":")[1].strip()
+        elif platform.system() == "Linux":
+            route = get_network_state()["default_route"]
+            if route and route.get("dev"):
+                return route["dev"]
         else:
             output = subprocess.check_output(["ip", "route", "show", "default"]).decode()
             parts = output.split()
@@ -124,6 +173,10 @@ def get_mtu(interface):
             for line in output.splitlines():
                 if "mtu" in line.lower():
                     return line.split("mtu")[1].strip()
+        elif platform.system() == "Linux":
+            link = get_network_state()["by_name"].get(interface)
+            if link and link["mtu"] is not None:
+                return str(link["mtu"])
         else:
             output = subprocess.check_output(["ip", "link", "show", interface]).decode()
             for line in output.splitlines():
@@ -133,18 +186,20 @@ def get_mtu(interface):
         return f"Error: {e}"
     return "Unknown"
 
+def get_link_speed_mbps(interface):
+    """링크 속도(Mbps) 숫자값 (Linux 전용, 알 수 없으면 None)"""
+    if platform.system() != "Linux":
+        return None
+    return cached((CATEGORY_NIC, "speed", interface), lambda: get_speed_mbps(interface))
+
 def get_physical_speed(interface):
     """물리 속도 체크"""
     try:
         if platform.system() == "Linux":
-            try:
-                output = subprocess.check_output(["ethtool", interface], stderr=subprocess.STDOUT).decode()
-                for line in output.splitlines():
-                    if "Speed:" in line:
-                        speed = line.split(":")[1].strip()
-                        return f"{Colors.OKGREEN}{speed}{Colors.ENDC}"
-            except:
-                return f"{Colors.FAIL}ethtool not available or permission denied{Colors.ENDC}"
+            speed = get_link_speed_mbps(interface)
+            if speed:
+                return f"{Colors.OKGREEN}{format_speed(speed)}{Colors.ENDC}"
+            return f"{Colors.WARNING}{format_speed(None)}{Colors.ENDC}"
         elif platform.system() == "Darwin":
             try:
                 output = subprocess.check_output(["ifconfig", interface]).decode()
@@ -160,60 +215,66 @@ def get_physical_speed(interface):
         return f"{Colors.FAIL}Error: {e}{Colors.ENDC}"
     return "Unknown"
 
+# get_tcp_buffers() 출력 라벨 -> sysctl OID (백업/복원에서도 사용)
+LINUX_BUFFER_OIDS = {
+    'tcp_rmem (min default max)': "net.ipv4.tcp_rmem",
+    'tcp_wmem (min default max)': "net.ipv4.tcp_wmem",
+    'core_rmem_max': "net.core.rmem_max",
+    'core_wmem_max': "net.core.wmem_max",
+    'tcp_mtu_probing': "net.ipv4.tcp_mtu_probing",
+    'default_qdisc': "net.core.default_qdisc",
+    'optmem_max': "net.core.optmem_max",
+    'tcp_no_metrics_save': "net.ipv4.tcp_no_metrics_save",
+}
+
+DARWIN_BUFFER_OIDS = {
+    'tcp_sendspace': "net.inet.tcp.sendspace",
+    'tcp_recvspace': "net.inet.tcp.recvspace",
+    'maxsockbuf': "kern.ipc.maxsockbuf",
+    'autorcvbufmax': "net.inet.tcp.autorcvbufmax",
+    'autosndbufmax': "net.inet.tcp.autosndbufmax",
+    'win_scale_factor': "net.inet.tcp.win_scale_factor"
+}
+
+def _read_labeled_sysctls(targets):
+    """{라벨: OID} 목록을 한 번에 읽어 {라벨: 문자열 값 또는 "Not found"} 반환"""
+    values = read_sysctls(list(targets.values()))
+    return {label: format_value(values[oid]) if values.get(oid) is not None else "Not found"
+            for label, oid in targets.items()}
+
 def get_tcp_buffers():
     """TCP/IP 버퍼 사이즈 추출"""
+    return cached((CATEGORY_SYSCTL, "tcp_buffers"), _probe_tcp_buffers)
+
+def _probe_tcp_buffers():
     buffers = {}
     try:
         system = platform.system()
         if system == "Linux":
-            targets = {
-                'tcp_rmem (min default max)': "net.ipv4.tcp_rmem",
-                'tcp_wmem (min default max)': "net.ipv4.tcp_wmem",
-                'core_rmem_max': "net.core.rmem_max",
-                'core_wmem_max': "net.core.wmem_max",
-                'tcp_mtu_probing': "net.ipv4.tcp_mtu_probing",
-                'default_qdisc': "net.core.default_qdisc",
-                'optmem_max': "net.core.optmem_max",
-                'tcp_no_metrics_save': "net.ipv4.tcp_no_metrics_save",
-            }
-            for label, oid in targets.items():
-                try:
-                    val = subprocess.check_output(["sysctl", "-n", oid], stderr=subprocess.DEVNULL).decode().strip()
-                    buffers[label] = val
-                except:
-                    buffers[label] = "Not found"
+            buffers.update(_read_labeled_sysctls(LINUX_BUFFER_OIDS))
         elif system == "Darwin":
-            targets = {
-                'tcp_sendspace': "net.inet.tcp.sendspace",
-                'tcp_recvspace': "net.inet.tcp.recvspace",
-                'maxsockbuf': "kern.ipc.maxsockbuf",
-                'autorcvbufmax': "net.inet.tcp.autorcvbufmax",
-                'autosndbufmax': "net.inet.tcp.autosndbufmax",
-                'win_scale_factor': "net.inet.tcp.win_scale_factor"
-            }
-            for label, oid in targets.items():
-                try:
-                    val = subprocess.check_output(["sysctl", "-n", oid], stderr=subprocess.DEVNULL).decode().strip()
-                    buffers[label] = val
-                except:
-                    buffers[label] = "Not found"
+            buffers.update(_read_labeled_sysctls(DARWIN_BUFFER_OIDS))
     except Exception as e:
         return {"error": str(e)}
     return buffers
 
 def get_congestion_control():
     """혼잡제어 알고리즘 확인"""
+    return cached((CATEGORY_SYSCTL, "congestion_control"), _probe_congestion_control)
+
+def _probe_congestion_control():
     try:
         if platform.system() == "Linux":
-            cc = subprocess.check_output(["sysctl", "-n", "net.ipv4.tcp_congestion_control"], stderr=subprocess.DEVNULL).decode().strip()
+            cc = read_sysctl("net.ipv4.tcp_congestion_control")
+            if cc is None:
+                return f"{Colors.OKCYAN}Unknown{Colors.ENDC}"
             return f"{Colors.OKCYAN}{cc}{Colors.ENDC}"
         elif platform.system() == "Darwin":
-            for oid in ["net.inet.tcp.cc_algo", "net.inet.tcp.available_congestion_control"]:
-                try:
-                    cc = subprocess.check_output(["sysctl", "-n", oid], stderr=subprocess.DEVNULL).decode().strip()
-                    if cc: return f"{Colors.OKCYAN}{cc}{Colors.ENDC}"
-                except:
-                    continue
+            oids = ["net.inet.tcp.cc_algo", "net.inet.tcp.available_congestion_control"]
+            values = read_sysctls(oids)
+            for oid in oids:
+                if values.get(oid):
+                    return f"{Colors.OKCYAN}{values[oid]}{Colors.ENDC}"
             return f"{Colors.OKCYAN}Default (Cubic/NewReno){Colors.ENDC}"
     except Exception:
         return f"{Colors.OKCYAN}Unknown{Colors.ENDC}"